@@ -0,0 +1,363 @@
+"""Audit — DAO 查询的执行计划与索引检查。
+
+在本地数据库中为各表插入 ``--rows`` 行测试数据，逐个调用 DAO 的查询方法，记录它们
+实际发出的 SQL，再以 ``EXPLAIN (ANALYZE, BUFFERS)`` 执行，标记对已插入数据的表做
+全表扫描（Seq Scan，或沿主键索引逐行过滤）的查询，并统计每次调用的耗时。
+存在全表扫描时退出码为 1。
+
+``--compare`` 先删除 ``--migration``（默认 add_lookup_indexes.sql）中的索引审计一遍，
+再通过 db_migrate 以 ``CREATE INDEX CONCURRENTLY`` 重新建立索引后审计一遍，输出
+前后对比。该模式会删除索引，只应在本地 / 测试数据库上使用。
+
+需要 PostgreSQL（DATABASE_URL），插入的数据以 ``audit-`` 前缀标记，结束时删除
+（``--keep`` 保留数据，便于重复运行）。
+
+用法::
+
+    DATABASE_URL=postgresql://... python benchmarks/audit_query_plans.py [--rows 200000] [--compare]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, text
+
+import db_migrate
+from core.database.connection import db
+from core.database.dao.comments import CommentsDAO
+from core.database.dao.favourites import FavouritesDAO
+from core.database.dao.illegal_requests import IllegalRequestsDAO
+from core.database.dao.personal_logs import PersonalLogsDAO
+from core.database.dao.relations import RelationsDAO
+from core.database.dao.request_logs import RequestLogsDAO
+from core.database.dao.tokens import TokensDAO
+from core.database.dao.users import UsersDAO
+from core.database.dao.wall_sayings import WallSayingsDAO
+
+_SQL_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "core", "database", "migrations", "SQL"
+)
+
+# 外键类取值的基数：每个取值约对应 rows / _KEYS 行
+_KEYS = 2000
+
+# 扫描节点过滤掉的行数超过该值时，视同顺序扫描
+_FILTERED_ROWS = 1000
+
+# 各表的测试数据（:rows 行），以及清理条件
+_SEED = {
+    "users": (
+        "INSERT INTO users (uuid, nickname, user_role) "
+        "SELECT 'audit-u-' || g, 'audit', 'user' FROM generate_series(1, :rows) g",
+        "uuid LIKE 'audit-%'",
+    ),
+    "tokens": (
+        "INSERT INTO tokens (uuid, belong_to, permission, current_status) "
+        "SELECT 'audit-t-' || g, 'audit-u-' || (g % :keys), 'read', 'active' "
+        "FROM generate_series(1, :rows) g",
+        "uuid LIKE 'audit-%'",
+    ),
+    "illegal_requests": (
+        'INSERT INTO illegal_requests (uuid, "user", happened_at, type, path, ip) '
+        "SELECT 'audit-i-' || g, 'audit-u-' || (g % :keys), "
+        "       timestamp '2024-01-01' + g * interval '1 second', 'audit', '/audit', "
+        "       '10.9.' || (g % :keys / 250) || '.' || (g % 250) "
+        "FROM generate_series(1, :rows) g",
+        "uuid LIKE 'audit-%'",
+    ),
+    "relations": (
+        "INSERT INTO relations (tags_uuid, related_uuid, relation_type) "
+        "SELECT 'audit-tag-' || (g % :keys), 'audit-rel-' || (g % (:keys * 10)), 'audit' "
+        "FROM generate_series(1, :rows) g",
+        "relation_type = 'audit'",
+    ),
+    "request_logs": (
+        "INSERT INTO request_logs (request_path, frequency) "
+        "SELECT '/audit/' || g, 1 FROM generate_series(1, :rows) g",
+        "request_path LIKE '/audit/%'",
+    ),
+    "comments": (
+        "INSERT INTO comments (uuid, comment_place_uuid, content) "
+        "SELECT 'audit-c-' || g, 'audit-place-' || (g % :keys), 'audit' "
+        "FROM generate_series(1, :rows) g",
+        "uuid LIKE 'audit-%'",
+    ),
+    "wall_sayings": (
+        "INSERT INTO wall_sayings (uuid, author_uuid, content) "
+        "SELECT 'audit-w-' || g, 'audit-u-' || (g % :keys), 'audit' "
+        "FROM generate_series(1, :rows) g",
+        "uuid LIKE 'audit-%'",
+    ),
+    "favourites": (
+        "INSERT INTO favourites (uuid, user_uuid, types) "
+        "SELECT 'audit-f-' || g, 'audit-u-' || (g % :keys), 'audit' "
+        "FROM generate_series(1, :rows) g",
+        "uuid LIKE 'audit-%'",
+    ),
+    "personal_logs": (
+        "INSERT INTO personal_logs (uuid, user_uuid, content) "
+        "SELECT 'audit-p-' || g, 'audit-u-' || (g % :keys), 'audit' "
+        "FROM generate_series(1, :rows) g",
+        "uuid LIKE 'audit-%'",
+    ),
+}
+
+
+@dataclass
+class Shape:
+    """一种 DAO 查询：名称与调用方式。"""
+
+    name: str
+    call: Callable[[], Any]
+
+
+def query_shapes() -> list[Shape]:
+    users, tokens, illegal = UsersDAO(), TokensDAO(), IllegalRequestsDAO()
+    relations = RelationsDAO()
+    return [
+        Shape("users.find_by_uuid", lambda: users.find_by_uuid("audit-u-4242")),
+        Shape("users.find_all(offset=1000)", lambda: users.find_all(limit=50, offset=1000)),
+        Shape("tokens.find_by_belong_to", lambda: tokens.find_by_belong_to("audit-u-42")),
+        Shape("tokens.find_active_by_belong_to", lambda: tokens.find_active_by_belong_to("audit-u-42")),
+        Shape("illegal_requests.find_by_ip", lambda: illegal.find_by_ip("10.9.0.42")),
+        Shape("illegal_requests.find_by_user", lambda: illegal.find_by_user("audit-u-42")),
+        Shape(
+            "illegal_requests.find_page(-happened_at)",
+            lambda: illegal.find_page(limit=50, order_by=("-happened_at", "-id")),
+        ),
+        Shape("relations.find_by_id", lambda: relations.find_by_id(42)),
+        Shape("relations.find_by_tags_uuid", lambda: relations.find_by_tags_uuid("audit-tag-42")),
+        Shape(
+            "relations[related_uuid]",
+            lambda: relations.find_page(limit=50, filters={"related_uuid": "audit-rel-42"}),
+        ),
+        Shape("request_logs.find_by_path", lambda: RequestLogsDAO().find_by_path("/audit/4242")),
+        Shape(
+            "comments[comment_place_uuid]",
+            lambda: CommentsDAO().find_page(limit=50, filters={"comment_place_uuid": "audit-place-42"}),
+        ),
+        Shape(
+            "wall_sayings[author_uuid]",
+            lambda: WallSayingsDAO().find_page(
+                limit=50, order_by=("-sent_at",), filters={"author_uuid": "audit-u-42"}
+            ),
+        ),
+        Shape(
+            "favourites[user_uuid]",
+            lambda: FavouritesDAO().find_page(limit=50, filters={"user_uuid": "audit-u-42"}),
+        ),
+        Shape(
+            "personal_logs[user_uuid]",
+            lambda: PersonalLogsDAO().find_page(limit=50, filters={"user_uuid": "audit-u-42"}),
+        ),
+    ]
+
+
+# ------------------------------------------------------------------
+# 数据准备
+# ------------------------------------------------------------------
+
+
+def seed(rows: int) -> None:
+    with db.get_session() as session:
+        for table, (insert, where) in _SEED.items():
+            session.execute(text(f"DELETE FROM {table} WHERE {where}"))
+            session.execute(text(insert), {"rows": rows, "keys": _KEYS})
+    analyze()
+
+
+def cleanup() -> None:
+    with db.get_session() as session:
+        for table, (_, where) in _SEED.items():
+            session.execute(text(f"DELETE FROM {table} WHERE {where}"))
+
+
+def analyze() -> None:
+    with db.get_session() as session:
+        for table in _SEED:
+            session.execute(text(f"ANALYZE {table}"))
+
+
+def migration_indexes(migration: str) -> tuple[str, list[str]]:
+    with open(os.path.join(_SQL_DIR, migration)) as f:
+        script = f.read()
+    return script, db_migrate._CONCURRENT_INDEX_RE.findall(script)
+
+
+def drop_indexes(names: list[str]) -> None:
+    with db.get_session() as session:
+        for name in names:
+            session.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    analyze()
+
+
+def create_indexes(script: str) -> None:
+    conn = db_migrate.connect_to_database()
+    try:
+        db_migrate.execute_without_transaction(conn, script)
+    finally:
+        conn.close()
+    analyze()
+
+
+# ------------------------------------------------------------------
+# 审计
+# ------------------------------------------------------------------
+
+
+@contextmanager
+def capture_statements():
+    """记录 DAO 调用期间发往数据库的 SELECT 语句及参数。"""
+    captured: list[tuple[str, Any]] = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany) -> None:
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    engine = db._get_engine()
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+
+def plan_nodes(node: dict) -> list[dict]:
+    nodes = [node]
+    for child in node.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+def explain(statement: str, parameters: Any) -> dict:
+    raw = db._get_engine().raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, parameters)
+        plan = cursor.fetchone()[0]
+        raw.rollback()
+    finally:
+        raw.close()
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]
+
+
+def is_full_scan(node: dict) -> bool:
+    """顺序扫描，或沿主键索引逐行过滤（如 ``ORDER BY id`` 加未建索引的过滤条件）。"""
+    if node["Node Type"] == "Seq Scan":
+        return True
+    return node.get("Rows Removed by Filter", 0) > _FILTERED_ROWS
+
+
+def describe(node: dict) -> str:
+    """执行计划的访问路径摘要，如 ``Index Scan idx_relations_tags_uuid``。"""
+    parts = []
+    for n in plan_nodes(node):
+        if "Relation Name" in n or "Index Name" in n:
+            parts.append(f"{n['Node Type']} {n.get('Index Name') or n['Relation Name']}")
+    return ", ".join(parts) or node["Node Type"]
+
+
+def audit(shapes: list[Shape], repeat: int) -> list[dict]:
+    results = []
+    for shape in shapes:
+        with capture_statements() as captured:
+            shape.call()
+        statement, parameters = captured[-1]
+        plan = explain(statement, parameters)
+        root = plan["Plan"]
+        seq_scans = sorted(
+            {
+                n["Relation Name"]
+                for n in plan_nodes(root)
+                if n.get("Relation Name") in _SEED and is_full_scan(n)
+            }
+        )
+        latencies = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            shape.call()
+            latencies.append(time.perf_counter() - start)
+        results.append(
+            {
+                "name": shape.name,
+                "access": describe(root),
+                "seq_scans": seq_scans,
+                # 根节点的缓冲区计数已包含所有子节点
+                "buffers": root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0),
+                "execution_ms": plan["Execution Time"],
+                "p50_ms": statistics.median(latencies) * 1000,
+            }
+        )
+    return results
+
+
+def print_audit(title: str, results: list[dict]) -> None:
+    print(f"\n== {title}")
+    print(f"{'query':<42} {'exec':>9} {'call p50':>9} {'buffers':>8}  access path")
+    for r in results:
+        flag = "  <-- FULL SCAN" if r["seq_scans"] else ""
+        print(
+            f"{r['name']:<42} {r['execution_ms']:8.2f}ms {r['p50_ms']:8.2f}ms {r['buffers']:8d}  "
+            f"{r['access']}{flag}"
+        )
+
+
+def print_comparison(before: list[dict], after: list[dict]) -> None:
+    print("\n== before / after (call p50)")
+    print(f"{'query':<42} {'before':>9} {'after':>9} {'speedup':>8}")
+    for b, a in zip(before, after):
+        print(
+            f"{b['name']:<42} {b['p50_ms']:8.2f}ms {a['p50_ms']:8.2f}ms "
+            f"{b['p50_ms'] / a['p50_ms']:7.1f}x"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000, help="每张表插入的测试数据行数")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--compare", action="store_true", help="删除迁移中的索引后审计，再建立索引审计")
+    parser.add_argument("--migration", default="add_lookup_indexes.sql")
+    parser.add_argument("--keep", action="store_true", help="结束时保留插入的数据")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    seed(args.rows)
+    print(f"seeded {args.rows} rows x {len(_SEED)} tables in {time.perf_counter() - start:.1f}s")
+    shapes = query_shapes()
+    try:
+        if args.compare:
+            script, names = migration_indexes(args.migration)
+            drop_indexes(names)
+            before = audit(shapes, args.repeat)
+            print_audit(f"before {args.migration}", before)
+            create_indexes(script)
+            after = audit(shapes, args.repeat)
+            print_audit(f"after {args.migration}", after)
+            print_comparison(before, after)
+        else:
+            after = audit(shapes, args.repeat)
+            print_audit("current indexes", after)
+    finally:
+        if not args.keep:
+            cleanup()
+        db.dispose_engine()
+
+    flagged = [r["name"] for r in after if r["seq_scans"]]
+    if flagged:
+        print(f"\n{len(flagged)} 个查询对大表做了全表扫描: {', '.join(flagged)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
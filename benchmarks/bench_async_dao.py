@@ -0,0 +1,121 @@
+"""Benchmark — DAO 密集型接口：同步 DAO vs 异步 DAO（*_async）。
+
+同一个接口每次请求执行 3 次 ``find_by_uuid`` 与 1 次 ``find_all(limit=20)``，
+分别以三种方式实现并在进程内并发压测：
+
+* sync-in-async：``async def`` 路由中直接调用同步 DAO（阻塞事件循环）；
+* sync-threadpool：``def`` 路由调用同步 DAO（FastAPI 放入线程池执行）；
+* async：``async def`` 路由调用 ``*_async`` DAO（asyncpg）。
+
+需要 PostgreSQL（DATABASE_URL，TCP 连接），会向 users 表写入并在结束时删除
+测试数据。``--delay`` 在数据库前加一个延迟代理，模拟应用与数据库之间的网络
+往返（同机数据库的往返过短，无法体现事件循环被阻塞的影响）。
+
+用法::
+
+    DATABASE_URL=postgresql://... python benchmarks/bench_async_dao.py [--delay 2] [--concurrency 50]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid as uuid_lib
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import delete
+
+from core.database.connection.db import dispose_async_engine, get_session
+from core.database.dao.users import User, UsersDAO
+from benchmarks.bench_firewall_redis_latency import start_latency_proxy
+
+dao = UsersDAO()
+NICKNAME = "bench-async-dao"
+
+
+def build_app(uuids: list[str]) -> FastAPI:
+    app = FastAPI()
+
+    def pick() -> list[str]:
+        return random.sample(uuids, 3)
+
+    @app.get("/sync-in-async")
+    async def sync_in_async():
+        users = [dao.find_by_uuid(u) for u in pick()]
+        return {"users": len(users), "page": len(dao.find_all(limit=20))}
+
+    @app.get("/sync-threadpool")
+    def sync_threadpool():
+        users = [dao.find_by_uuid(u) for u in pick()]
+        return {"users": len(users), "page": len(dao.find_all(limit=20))}
+
+    @app.get("/async")
+    async def async_route():
+        users = [await dao.find_by_uuid_async(u) for u in pick()]
+        return {"users": len(users), "page": len(await dao.find_all_async(limit=20))}
+
+    return app
+
+
+async def run(app: FastAPI, path: str, total: int, concurrency: int) -> tuple[float, list[float]]:
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+    remaining = iter(range(total))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker() -> None:
+            for _ in remaining:
+                start = time.perf_counter()
+                resp = await client.get(path)
+                latencies.append(time.perf_counter() - start)
+                assert resp.status_code == 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    await dispose_async_engine()
+    return elapsed, latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--delay", type=float, default=0, help="数据库往返的注入延迟（毫秒）")
+    args = parser.parse_args()
+
+    if args.delay:
+        url = urlparse(os.environ["DATABASE_URL"])
+        port = start_latency_proxy(url.hostname, url.port or 5432, args.delay / 1000)
+        os.environ["DATABASE_URL"] = url._replace(
+            netloc=url.netloc.rsplit("@", 1)[0] + f"@127.0.0.1:{port}"
+        ).geturl()
+
+    uuids = [str(uuid_lib.uuid4()) for _ in range(args.rows)]
+    with get_session() as session:
+        session.add_all(User(uuid=u, nickname=NICKNAME, user_role="user") for u in uuids)
+    try:
+        app = build_app(uuids)
+        for path in ("/sync-in-async", "/sync-threadpool", "/async"):
+            asyncio.run(run(app, path, 100, args.concurrency))  # 预热
+            elapsed, latencies = asyncio.run(run(app, path, args.requests, args.concurrency))
+            latencies.sort()
+            p99 = latencies[int(len(latencies) * 0.99) - 1]
+            print(
+                f"{path:<18} {len(latencies) / elapsed:>8.0f} req/s   "
+                f"p50={statistics.median(latencies) * 1000:.1f}ms   p99={p99 * 1000:.1f}ms"
+            )
+    finally:
+        with get_session() as session:
+            session.execute(delete(User).where(User.nickname == NICKNAME))
+
+
+if __name__ == "__main__":
+    main()
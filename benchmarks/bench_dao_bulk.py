@@ -0,0 +1,87 @@
+"""Benchmark — BaseDAO 批量方法 vs 逐行方法（create / update / delete）。
+
+对 1k / 10k / 100k 行分别执行：
+
+* 逐行：``create`` / ``update`` / ``delete`` 每行一个事务；
+* 批量：``create_many`` / ``update_many`` / ``upsert_many`` / ``delete_many``，一个事务。
+
+逐行方法很慢，超过 ``--per-row-limit`` 行时只测前 ``--per-row-limit`` 行并按
+吞吐量（行/秒）比较。需要 PostgreSQL（DATABASE_URL），数据写入 users 表，
+结束时删除。
+
+用法::
+
+    DATABASE_URL=postgresql://... python benchmarks/bench_dao_bulk.py [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid as uuid_lib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete
+
+from core.database.connection.db import dispose_engine, get_session
+from core.database.dao.users import User, UsersDAO
+
+dao = UsersDAO()
+NICKNAME = "bench-dao-bulk"
+
+
+def rows(n: int) -> list[dict]:
+    return [
+        {"uuid": str(uuid_lib.uuid4()), "nickname": NICKNAME, "user_role": "user", "score": i}
+        for i in range(n)
+    ]
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def report(label: str, n: int, elapsed: float) -> None:
+    print(f"  {label:<28} {n:>7} 行  {elapsed:8.2f}s  {n / elapsed:>10.0f} 行/s")
+
+
+def bench_per_row(n: int) -> None:
+    data = rows(n)
+    report("create（逐行）", n, timed(lambda: [dao.create(r) for r in data]))
+    report("update（逐行）", n, timed(lambda: [dao.update(r["uuid"], {"score": -1}) for r in data]))
+    report("delete（逐行）", n, timed(lambda: [dao.delete(r["uuid"]) for r in data]))
+
+
+def bench_bulk(n: int, chunk_size: int) -> None:
+    data = rows(n)
+    report("create_many", n, timed(lambda: dao.create_many(data, chunk_size)))
+    updates = [{"uuid": r["uuid"], "score": -1} for r in data]
+    report("update_many", n, timed(lambda: dao.update_many(updates, chunk_size)))
+    report("upsert_many", n, timed(lambda: dao.upsert_many(data, chunk_size, returning=False)))
+    keys = [r["uuid"] for r in data]
+    report("delete_many", n, timed(lambda: dao.delete_many(keys, chunk_size)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--per-row-limit", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=UsersDAO.BULK_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    try:
+        for n in args.sizes:
+            print(f"== {n} 行 ==")
+            bench_per_row(min(n, args.per_row_limit))
+            bench_bulk(n, args.chunk_size)
+    finally:
+        with get_session() as session:
+            session.execute(delete(User).where(User.nickname == NICKNAME))
+        dispose_engine()
+
+
+if __name__ == "__main__":
+    main()
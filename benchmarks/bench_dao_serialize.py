@@ -0,0 +1,113 @@
+"""Benchmark — DAO 行序列化：逐行遍历 mapper vs 预编译序列化器 vs Core 行直接转字典。
+
+对 ``--rows`` 行（默认 10 万）的 users 记录对比：
+
+内存中（不含数据库往返，只比较 ORM 实例 / 结果行 → 字典的 CPU 开销）：
+
+* mapper walk：原 ``_to_dict``，每行遍历 ``__mapper__.column_attrs`` 并逐列 ``getattr``；
+* compiled：当前 ``_to_dict``，每个模型缓存列名与 ``attrgetter``；
+* core rows：``_rows_to_dicts``，Core 结果行按位置 ``dict(zip(columns, row))``；
+* row mapping：``dict(RowMapping)``，作为参照。
+
+端到端（需要 PostgreSQL，DATABASE_URL）：
+
+* orm：``select(User)`` 构建 ORM 实例（identity map）+ 原 ``_to_dict``；
+* core：``_select_rows()`` + ``_rows_to_dicts``（当前 find_* 的实现）。
+
+数据写入 users 表，结束时删除。
+
+用法::
+
+    DATABASE_URL=postgresql://... python benchmarks/bench_dao_serialize.py [--rows 100000]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid as uuid_lib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, select
+
+from core.database.connection.db import dispose_engine, get_session
+from core.database.dao.users import User, UsersDAO
+
+dao = UsersDAO()
+NICKNAME = "bench-dao-serialize"
+
+
+def mapper_walk(obj) -> dict:
+    """原 _to_dict 实现。"""
+    return {
+        col_prop.columns[0].name: getattr(obj, col_prop.key)
+        for col_prop in type(obj).__mapper__.column_attrs
+    }
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def report(label: str, seconds: float, rows: int, baseline: float) -> None:
+    print(
+        f"{label:<14} {seconds * 1000:8.1f}ms   {rows / seconds:>10,.0f} rows/s   "
+        f"x{baseline / seconds:4.2f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    dao.create_many(
+        (
+            {"uuid": str(uuid_lib.uuid4()), "nickname": NICKNAME, "user_role": "user", "score": i}
+            for i in range(args.rows)
+        ),
+        returning=False,
+    )
+    try:
+        with get_session() as session:
+            objs = session.scalars(select(User).where(User.nickname == NICKNAME)).all()
+            stmt = dao._select_rows().where(User.nickname == NICKNAME)
+            rows = session.execute(stmt).all()
+            mappings = session.execute(stmt).mappings().all()
+
+            print(f"in-memory, {args.rows} rows")
+            base = timed(lambda: [mapper_walk(o) for o in objs], args.repeat)
+            report("mapper walk", base, args.rows, base)
+            report("compiled", timed(lambda: [dao._to_dict(o) for o in objs], args.repeat), args.rows, base)
+            report("core rows", timed(lambda: dao._rows_to_dicts(rows), args.repeat), args.rows, base)
+            report("row mapping", timed(lambda: [dict(m) for m in mappings], args.repeat), args.rows, base)
+
+        def orm_path():
+            with get_session() as session:
+                return [mapper_walk(o) for o in session.scalars(select(User).where(User.nickname == NICKNAME))]
+
+        def core_path():
+            with get_session() as session:
+                return dao._rows_to_dicts(session.execute(stmt))
+
+        assert orm_path() == core_path()
+        print(f"end-to-end, {args.rows} rows")
+        base = timed(orm_path, args.repeat)
+        report("orm", base, args.rows, base)
+        report("core", timed(core_path, args.repeat), args.rows, base)
+    finally:
+        with get_session() as session:
+            session.execute(delete(User).where(User.nickname == NICKNAME))
+        dispose_engine()
+
+
+if __name__ == "__main__":
+    main()
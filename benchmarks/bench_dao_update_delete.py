@@ -0,0 +1,108 @@
+"""Benchmark — BaseDAO.update / delete：单语句 RETURNING vs 先查询再修改。
+
+对比每次调用的耗时：
+
+* legacy：原实现，SELECT 取出 ORM 对象 → 赋值 → flush → refresh（update），
+  SELECT → ORM delete（delete）；
+* returning：当前实现，``UPDATE ... RETURNING *`` / ``DELETE ... RETURNING id``。
+
+需要 PostgreSQL（DATABASE_URL，TCP 连接），数据写入 users 表，结束时删除。
+``--delay`` 在数据库前加一个延迟代理，模拟网络往返。
+
+用法::
+
+    DATABASE_URL=postgresql://... python benchmarks/bench_dao_update_delete.py [--delay 1]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid as uuid_lib
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, select
+
+from core.database.connection.db import dispose_engine, get_session
+from core.database.dao.users import User, UsersDAO
+from benchmarks.bench_firewall_redis_latency import start_latency_proxy
+
+dao = UsersDAO()
+NICKNAME = "bench-dao-update-delete"
+
+
+def legacy_update(uuid: str, data: dict) -> dict | None:
+    with get_session() as session:
+        obj = session.scalars(select(User).where(User.uuid == uuid)).first()
+        if obj is None:
+            return None
+        for k, v in dao._data_to_kwargs(data).items():
+            setattr(obj, k, v)
+        session.flush()
+        session.refresh(obj)
+        return dao._to_dict(obj)
+
+
+def legacy_delete(uuid: str) -> bool:
+    with get_session() as session:
+        obj = session.scalars(select(User).where(User.uuid == uuid)).first()
+        if obj is None:
+            return False
+        session.delete(obj)
+        return True
+
+
+def measure(fn, args_list) -> list[float]:
+    latencies = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(label: str, latencies: list[float]) -> None:
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{label:<20} p50={statistics.median(latencies) * 1000:6.2f}ms   "
+        f"mean={statistics.fmean(latencies) * 1000:6.2f}ms   p99={p99 * 1000:6.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--delay", type=float, default=0, help="数据库往返的注入延迟（毫秒）")
+    args = parser.parse_args()
+
+    if args.delay:
+        url = urlparse(os.environ["DATABASE_URL"])
+        port = start_latency_proxy(url.hostname, url.port or 5432, args.delay / 1000)
+        os.environ["DATABASE_URL"] = url._replace(
+            netloc=url.netloc.rsplit("@", 1)[0] + f"@127.0.0.1:{port}"
+        ).geturl()
+
+    rows = [
+        {"uuid": str(uuid_lib.uuid4()), "nickname": NICKNAME, "user_role": "user"}
+        for _ in range(args.calls * 2)
+    ]
+    dao.create_many(rows, returning=False)
+    legacy_rows, new_rows = rows[: args.calls], rows[args.calls:]
+    try:
+        dao.find_by_uuid(rows[0]["uuid"])  # 预热连接池
+        report("update legacy", measure(legacy_update, [(r["uuid"], {"score": 1}) for r in legacy_rows]))
+        report("update returning", measure(dao.update, [(r["uuid"], {"score": 1}) for r in new_rows]))
+        report("delete legacy", measure(legacy_delete, [(r["uuid"],) for r in legacy_rows]))
+        report("delete returning", measure(dao.delete, [(r["uuid"],) for r in new_rows]))
+    finally:
+        with get_session() as session:
+            session.execute(delete(User).where(User.nickname == NICKNAME))
+        dispose_engine()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark — 连接池探活策略（DB_POOL_PRE_PING）与连接池耗尽时的取用等待。
+
+1. 依次以 ``always`` / ``idle`` / ``never`` 策略执行 ``find_by_uuid``，比较单次
+   查询耗时：``always`` 每次取用连接多一次数据库往返；
+2. 以远超连接池容量的线程数并发查询，输出 ``pool_stats()`` 中的占用情况与
+   取用等待直方图，演示连接池耗尽在统计中的表现。
+
+需要 PostgreSQL（DATABASE_URL，TCP 连接）。``--delay`` 在数据库前加一个延迟
+代理，模拟应用与数据库（或 PgBouncer）之间的网络往返。
+
+用法::
+
+    DATABASE_URL=postgresql://... python benchmarks/bench_db_pool.py [--delay 1]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import uuid as uuid_lib
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database.connection import db
+from core.database.dao.users import UsersDAO
+from benchmarks.bench_firewall_redis_latency import start_latency_proxy
+
+dao = UsersDAO()
+
+
+def bench_pre_ping(strategy: str, iterations: int) -> list[float]:
+    os.environ["DB_POOL_PRE_PING"] = strategy
+    db.dispose_engine()
+    missing = str(uuid_lib.uuid4())
+    dao.find_by_uuid(missing)  # 预热：建立连接
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        dao.find_by_uuid(missing)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_exhaustion(threads: int, per_thread: int) -> dict:
+    os.environ["DB_POOL_PRE_PING"] = "idle"
+    db.dispose_engine()
+    db._pool_metrics.reset()
+    missing = str(uuid_lib.uuid4())
+
+    def work() -> None:
+        for _ in range(per_thread):
+            dao.find_by_uuid(missing)
+
+    with ThreadPoolExecutor(threads) as pool:
+        for future in [pool.submit(work) for _ in range(threads)]:
+            future.result()
+    return db.pool_stats()["sync"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=60)
+    parser.add_argument("--delay", type=float, default=0, help="数据库往返的注入延迟（毫秒）")
+    args = parser.parse_args()
+
+    if args.delay:
+        url = urlparse(os.environ["DATABASE_URL"])
+        port = start_latency_proxy(url.hostname, url.port or 5432, args.delay / 1000)
+        os.environ["DATABASE_URL"] = url._replace(
+            netloc=url.netloc.rsplit("@", 1)[0] + f"@127.0.0.1:{port}"
+        ).geturl()
+
+    print("== 探活策略：单次 find_by_uuid 耗时 ==")
+    for strategy in ("always", "idle", "never"):
+        latencies = bench_pre_ping(strategy, args.iterations)
+        print(
+            f"{strategy:<8} p50={statistics.median(latencies) * 1000:.2f}ms   "
+            f"mean={statistics.fmean(latencies) * 1000:.2f}ms"
+        )
+
+    print(f"\n== 连接池耗尽：{args.threads} 个线程共享默认连接池 ==")
+    stats = bench_exhaustion(args.threads, 20)
+    print(json.dumps(stats, indent=2))
+    db.dispose_engine()
+
+
+if __name__ == "__main__":
+    main()
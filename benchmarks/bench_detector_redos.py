@@ -0,0 +1,112 @@
+"""Benchmark — 检测正则的最坏情况耗时（ReDoS）。
+
+用一组针对回溯构造的输入（大量单引号、重复关键字、未闭合的标签等），在不同
+长度下比较：
+
+* legacy：改动前的正则（注释截断分支为 ``'[\\s\\S]*?--``），不截断输入；
+* re：当前正则 + 单次检测长度上限，使用 re 引擎；
+* re2：同上，使用 RE2 引擎（需安装 google-re2，否则跳过）。
+
+输出每种输入在各长度下单次检测的耗时（ms）。legacy 的耗时随长度平方增长；
+当前实现受长度上限约束，最坏情况有界，RE2 下与长度成线性关系。
+
+用法::
+
+    python benchmarks/bench_detector_redos.py [--sizes 1024,8192,65536]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.middleware.firewall.config import (
+    _DETECT_MAX_LENGTH,
+    _SQLI_PATTERNS,
+    _XSS_PATTERNS,
+)
+from core.middleware.firewall.detector import AttackDetector, compile_pattern, re2
+
+LEGACY_XSS = re.compile(
+    r"(<\s*script[\s\S]*?>|<\s*/\s*script\s*>|javascript\s*:|vbscript\s*:"
+    r"|on\w+\s*=\s*[\"']|<\s*iframe|<\s*object|<\s*embed|<\s*link"
+    r"|<\s*img[^>]+onerror|document\s*\.\s*cookie|eval\s*\(|expression\s*\()",
+    re.IGNORECASE,
+)
+LEGACY_SQLI = re.compile(
+    r"(\b(select|insert|update|delete|drop|truncate|alter|create|replace"
+    r"|union|exec|execute|xp_|sp_)\b.*\b(from|into|table|where|set)\b"
+    r"|'[\s\S]*?--"
+    r"|;\s*(drop|delete|update|insert|select)"
+    r"|\bor\b\s+[\w'\"]+\s*=\s*[\w'\"]+"
+    r"|\band\b\s+[\w'\"]+\s*=\s*[\w'\"]+"
+    r"|\/\*[\s\S]*?\*\/)",
+    re.IGNORECASE,
+)
+
+# 名称 -> 重复单元
+ADVERSARIAL = {
+    "quotes": "'",
+    "select-no-from": "select ",
+    "open-script": "<script",
+    "img-no-close": "<img ",
+    "on-run": "on",
+    "or-run": "or aaaa",
+}
+
+
+def legacy_detect(text: str) -> str | None:
+    if LEGACY_XSS.search(text):
+        return "xss"
+    if LEGACY_SQLI.search(text):
+        return "sql_injection"
+    return None
+
+
+def timed(func, text: str) -> float:
+    start = time.perf_counter()
+    func(text)
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1024,8192,65536")
+    parser.add_argument("--legacy-max", type=int, default=16384,
+                        help="legacy 只测到该长度，更长的输入耗时过长")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    engines = {"re": AttackDetector(_XSS_PATTERNS, _SQLI_PATTERNS, _DETECT_MAX_LENGTH)}
+    if re2 is not None:
+        engines["re2"] = AttackDetector(
+            compile_pattern(_XSS_PATTERNS, "re2"),
+            compile_pattern(_SQLI_PATTERNS, "re2"),
+            _DETECT_MAX_LENGTH,
+        )
+    else:
+        print("google-re2 未安装，跳过 re2")
+
+    header = f"{'input':<16} {'size':>7} {'legacy':>10}" + "".join(
+        f" {name:>10}" for name in engines
+    )
+    print(header)
+    worst = dict.fromkeys(engines, 0.0)
+    for name, unit in ADVERSARIAL.items():
+        for size in sizes:
+            text = (unit * (size // len(unit) + 1))[:size]
+            legacy = f"{timed(legacy_detect, text):>8.1f}ms" if size <= args.legacy_max else f"{'-':>10}"
+            row = f"{name:<16} {size:>7} {legacy}"
+            for engine, detector in engines.items():
+                elapsed = timed(detector.detect, text)
+                worst[engine] = max(worst[engine], elapsed)
+                row += f" {elapsed:>8.2f}ms"
+            print(row)
+    print("worst case:", ", ".join(f"{name}={ms:.2f}ms" for name, ms in worst.items()))
+
+
+if __name__ == "__main__":
+    main()
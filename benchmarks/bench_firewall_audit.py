@@ -0,0 +1,123 @@
+"""Benchmark — 被拦截请求的吞吐：逐条同步写 illegal_requests vs 审计队列批量写入。
+
+两种实现共用同一个最小拦截逻辑（爬虫 UA 一律返回 403），区别只在记录方式：
+
+* inline：每个被拦截请求在线程池中开启一个事务写入一行，并等待写入完成；
+* sink：只把记录放入 ``audit_sink`` 队列，由后台线程每批一条多行 INSERT 写入。
+
+需要可写入 illegal_requests 表的 DATABASE_URL；未设置时使用临时 SQLite
+文件并自动建表（每次提交同样需要落盘，能反映逐条事务的开销）。
+
+用法::
+
+    DATABASE_URL=postgresql://... python benchmarks/bench_firewall_audit.py [--requests 3000]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid as uuid_lib
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.environ.get("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_audit.db"
+
+import httpx
+from starlette.datastructures import Headers
+
+from core.database.connection.db import _get_engine, get_session
+from core.database.dao.illegal_requests import IllegalRequest
+from core.middleware.firewall.audit import audit_sink
+from core.middleware.firewall.config import _CRAWLER_UA_PATTERNS
+from core.middleware.firewall.helpers import build_reject_response, run_blocking
+
+
+def write_one(attack_type: str, path: str, ip: str, ua: str) -> None:
+    """旧实现：每条违规记录一个事务。"""
+    with get_session() as session:
+        session.add(IllegalRequest(
+            uuid=str(uuid_lib.uuid4()), user="unknown", happened_at=datetime.now(),
+            type=attack_type, path=path, ip=ip, ua=ua,
+        ))
+
+
+def build_app(mode: str):
+    async def app(scope, receive, send):
+        ua = Headers(scope=scope).get("User-Agent", "")
+        if _CRAWLER_UA_PATTERNS.search(ua):
+            ip = scope["client"][0] if scope.get("client") else "unknown"
+            if mode == "inline":
+                await run_blocking(write_one, "crawler", scope["path"], ip, ua)
+            else:
+                audit_sink.submit("crawler", scope["path"], ip, ua, user="unknown")
+            await build_reject_response("blocked")(scope, receive, send)
+            return
+        raise AssertionError("bench only sends blocked requests")
+
+    return app
+
+
+async def run(app, total: int, concurrency: int) -> tuple[float, list[float]]:
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+    remaining = iter(range(total))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker() -> None:
+            for _ in remaining:
+                start = time.perf_counter()
+                resp = await client.get("/", headers={"User-Agent": "python-requests/2.31"})
+                latencies.append(time.perf_counter() - start)
+                assert resp.status_code == 403
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return elapsed, latencies
+
+
+def count_rows() -> int:
+    from sqlalchemy import func, select
+
+    with get_session() as session:
+        return session.scalar(select(func.count()).select_from(IllegalRequest))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    if _get_engine().dialect.name == "sqlite":
+        IllegalRequest.__table__.create(_get_engine(), checkfirst=True)
+
+    audit_sink.start()
+    try:
+        for mode in ("inline", "sink"):
+            before = count_rows()
+            elapsed, latencies = asyncio.run(run(build_app(mode), args.requests, args.concurrency))
+            flush_start = time.perf_counter()
+            if mode == "sink":
+                audit_sink.flush()
+            flush = time.perf_counter() - flush_start
+            latencies.sort()
+            p99 = latencies[int(len(latencies) * 0.99) - 1]
+            print(
+                f"{mode:<8} {len(latencies) / elapsed:>8.0f} blocked req/s   "
+                f"p50={statistics.median(latencies) * 1000:.2f}ms   p99={p99 * 1000:.2f}ms   "
+                f"rows+={count_rows() - before}   tail flush={flush * 1000:.0f}ms"
+            )
+    finally:
+        audit_sink.stop()
+    print("sink stats:", audit_sink.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Benchmark — FirewallMiddleware：BaseHTTPMiddleware 旧实现 vs 纯 ASGI 新实现。
+
+在进程内通过 httpx.ASGITransport 并发压测同一个最小应用，对比两种中间件
+的吞吐（req/s）与 p99 延迟。未配置 Redis 时防火墙的 Redis 检查直接短路，
+因此测得的差异主要来自中间件本身的封装开销。
+
+用法::
+
+    python benchmarks/bench_firewall_middleware.py [--requests 5000] [--concurrency 50]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from core.middleware.firewall.config import _CRAWLER_UA_PATTERNS, _GLOBAL_RATE_LIMIT, _KEY_RATE
+from core.middleware.firewall.helpers import (
+    build_reject_response,
+    check_request,
+    detect_attack,
+    get_client_ip,
+)
+from core.middleware.firewall.index import FirewallMiddleware
+
+
+class LegacyFirewallMiddleware(BaseHTTPMiddleware):
+    """旧版基于 BaseHTTPMiddleware 的防火墙（仅保留放行路径，用于对比）。"""
+
+    async def dispatch(self, request: Request, call_next):
+        ip = get_client_ip(request)
+        ua = request.headers.get("User-Agent", "")
+        path = request.url.path
+        query = str(request.url.query)
+        offense = None
+        if ua and _CRAWLER_UA_PATTERNS.search(ua):
+            offense = "crawler"
+        else:
+            combined = path + "?" + query if query else path
+            offense = detect_attack(combined) or detect_attack(request.headers.get("Referer", ""))
+        verdict, _ = await check_request(ip, offense, [(f"{_KEY_RATE}{ip}", _GLOBAL_RATE_LIMIT)])
+        if verdict is not None:
+            return build_reject_response("blocked")
+        return await call_next(request)
+
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(middleware)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def run(app: FastAPI, total: int, concurrency: int) -> tuple[float, list[float]]:
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker() -> None:
+            while True:
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                start = time.perf_counter()
+                resp = await client.get(
+                    "/ping?page=1", headers={"User-Agent": "Mozilla/5.0"}
+                )
+                latencies.append(time.perf_counter() - start)
+                assert resp.status_code == 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return elapsed, latencies
+
+
+def report(name: str, elapsed: float, latencies: list[float]) -> None:
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{name:<28} {len(latencies) / elapsed:>10.0f} req/s   "
+        f"p50={statistics.median(latencies) * 1000:.2f}ms   p99={p99 * 1000:.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    for name, middleware in (
+        ("BaseHTTPMiddleware (old)", LegacyFirewallMiddleware),
+        ("pure ASGI (new)", FirewallMiddleware),
+    ):
+        app = build_app(middleware)
+        # 预热
+        asyncio.run(run(app, 200, args.concurrency))
+        elapsed, latencies = asyncio.run(run(app, args.requests, args.concurrency))
+        report(name, elapsed, latencies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Load test — 注入 Redis 延迟时防火墙的尾延迟：同步 redis 客户端 vs redis.asyncio。
+
+在真实 Redis 前启动一个延迟代理（每个 Redis 响应延迟 ``--delay`` 毫秒），
+分别以「在事件循环中直接调用同步客户端」的旧方式和当前的异步防火墙处理
+按固定速率到达的正常请求（开环），输出吞吐与 p50 / p99 延迟。同步方式下
+每次 Redis 往返都会阻塞整个事件循环，请求排队导致尾延迟持续增长；异步方式
+下各请求的往返互相重叠。
+
+需要可用的 Redis::
+
+    REDIS_URL=redis://localhost:6379/0 python benchmarks/bench_firewall_redis_latency.py --delay 5
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import redis as redis_lib
+from fastapi import FastAPI
+from starlette.datastructures import Headers
+
+from core.database.connection.redis import redis_conn
+from core.middleware.firewall.config import _KEY_BAN, _KEY_RATE
+from core.middleware.firewall.helpers import get_scope_client_ip
+from core.middleware.firewall.index import FirewallMiddleware
+
+
+# ---------------------------------------------------------------------------
+# 延迟代理
+# ---------------------------------------------------------------------------
+
+def start_latency_proxy(target_host: str, target_port: int, delay: float) -> int:
+    """在后台线程中启动 TCP 代理，返回监听端口。"""
+    ready = threading.Event()
+    port_box: list[int] = []
+
+    async def pipe(reader, writer, delayed: bool) -> None:
+        try:
+            while data := await reader.read(65536):
+                if delayed:
+                    await asyncio.sleep(delay)
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle(client_reader, client_writer) -> None:
+        server_reader, server_writer = await asyncio.open_connection(target_host, target_port)
+        await asyncio.gather(
+            pipe(client_reader, server_writer, False),
+            pipe(server_reader, client_writer, True),
+        )
+
+    async def serve() -> None:
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port_box.append(server.sockets[0].getsockname()[1])
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    threading.Thread(target=lambda: asyncio.run(serve()), daemon=True).start()
+    ready.wait()
+    return port_box[0]
+
+
+# ---------------------------------------------------------------------------
+# 旧方式：在事件循环中直接调用同步客户端
+# ---------------------------------------------------------------------------
+
+class BlockingFirewallMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http":
+            ip = get_scope_client_ip(scope, Headers(scope=scope))
+            client = redis_conn.get_client()
+            client.exists(f"{_KEY_BAN}{ip}")
+            key = f"{_KEY_RATE}{ip}"
+            if client.incr(key) == 1:
+                client.expire(key, 1)
+        await self.app(scope, receive, send)
+
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(middleware)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def run(app: FastAPI, total: int, rate: float) -> tuple[float, list[float]]:
+    """开环压测：请求按固定速率到达，延迟从计划到达时刻开始计算。"""
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+
+        async def one(i: int) -> None:
+            scheduled = start + i / rate
+            await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            # 每个请求使用不同 IP，避免触发速率限制
+            await client.get("/ping", headers={"X-Forwarded-For": f"10.1.{i // 250}.{i % 250}"})
+            latencies.append(time.perf_counter() - scheduled)
+
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+    await redis_conn.close_async_client()
+    return elapsed, latencies
+
+
+def report(name: str, elapsed: float, latencies: list[float]) -> None:
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{name:<26} {len(latencies) / elapsed:>8.0f} req/s   "
+        f"p50={statistics.median(latencies) * 1000:.1f}ms   p99={p99 * 1000:.1f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delay", type=float, default=5.0, help="每个 Redis 响应注入的延迟（毫秒）")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=200, help="请求到达速率（req/s）")
+    args = parser.parse_args()
+
+    target = urlparse(os.environ["REDIS_URL"])
+    port = start_latency_proxy(target.hostname or "localhost", target.port or 6379, args.delay / 1000)
+    proxy_url = target._replace(netloc=f"127.0.0.1:{port}").geturl()
+    os.environ["REDIS_URL"] = proxy_url
+    redis_conn._client = redis_lib.from_url(proxy_url, decode_responses=True)
+
+    print(f"injected Redis latency: {args.delay}ms, arrival rate: {args.rate:.0f} req/s")
+    for name, middleware in (
+        ("sync redis (old)", BlockingFirewallMiddleware),
+        ("redis.asyncio (new)", FirewallMiddleware),
+    ):
+        elapsed, latencies = asyncio.run(run(build_app(middleware), args.requests, args.rate))
+        report(name, elapsed, latencies)
+
+
+if __name__ == "__main__":
+    main()
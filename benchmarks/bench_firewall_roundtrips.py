@@ -0,0 +1,103 @@
+"""Benchmark — 每个请求的防火墙 Redis 往返次数：逐条命令（旧） vs 单脚本（新）。
+
+通过统计 redis.asyncio 连接上实际发送的命令包数量得到往返次数，分别模拟
+正常请求与违规请求（违规时累加违规计数，必要时封禁）。
+
+需要可用的 Redis::
+
+    REDIS_URL=redis://localhost:6379/0 python benchmarks/bench_firewall_roundtrips.py
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import redis as redis_lib
+import redis.asyncio as redis_asyncio
+
+from core.database.connection.redis import redis_conn
+from core.middleware.firewall.config import (
+    _BAN_DURATION,
+    _BAN_THRESHOLD,
+    _GLOBAL_RATE_LIMIT,
+    _KEY_BAN,
+    _KEY_RATE,
+    _KEY_VIOL,
+    _MAX_REQUESTS_PER_SECOND,
+)
+from core.middleware.firewall.helpers import check_request as _check_request
+
+_sent = 0
+
+
+async def check_request(ip: str, offense: str | None):
+    return await _check_request(ip, offense, [(f"{_KEY_RATE}{ip}", _GLOBAL_RATE_LIMIT)])
+
+
+class CountingConnection(redis_asyncio.Connection):
+    """统计发送到服务端的命令包数量（一次发送即一次往返）。"""
+
+    async def send_packed_command(self, command, check_health=True):
+        global _sent
+        _sent += 1
+        return await super().send_packed_command(command, check_health)
+
+
+async def legacy_check(client, ip: str, offense: str | None) -> None:
+    """旧实现的命令序列：EXISTS → INCR (+EXPIRE) → INCR/EXPIRE 违规 (+SET 封禁)。"""
+    if await client.exists(f"{_KEY_BAN}{ip}"):
+        return
+    key = f"{_KEY_RATE}{ip}"
+    count = await client.incr(key)
+    if count == 1:
+        await client.expire(key, 1)
+    if count > _MAX_REQUESTS_PER_SECOND:
+        offense = "rate_limit"
+    if offense:
+        viol_key = f"{_KEY_VIOL}{ip}"
+        violations = await client.incr(viol_key)
+        await client.expire(viol_key, _BAN_DURATION)
+        if violations >= _BAN_THRESHOLD:
+            await client.set(f"{_KEY_BAN}{ip}", "1", ex=_BAN_DURATION)
+
+
+async def measure(label: str, func, subnet: int, n: int = 200) -> None:
+    """每个 IP 发两次请求：窗口内首个请求与后续请求分别统计。"""
+    global _sent
+    counts = []
+    for _ in range(2):
+        _sent = 0
+        for i in range(n):
+            await func(f"10.2.{subnet}.{i}")
+        counts.append(_sent / n)
+    print(f"{label:<40} first={counts[0]:.2f}  subsequent={counts[1]:.2f} round-trips/request")
+
+
+async def main() -> None:
+    url = os.environ["REDIS_URL"]
+    pool = redis_asyncio.ConnectionPool.from_url(
+        url, decode_responses=True, connection_class=CountingConnection
+    )
+    client = redis_asyncio.Redis(connection_pool=pool)
+    redis_conn._client = redis_lib.from_url(url, decode_responses=True)
+    redis_conn._async_clients[asyncio.get_running_loop()] = client
+
+    # 预热：建立连接并加载脚本
+    await client.ping()
+    await check_request("10.2.255.255", None)
+
+    await measure("legacy, clean request", lambda ip: legacy_check(client, ip, None), 1)
+    await measure("legacy, offending request", lambda ip: legacy_check(client, ip, "xss"), 2)
+    await measure("script (EVALSHA), clean request", lambda ip: check_request(ip, None), 3)
+    await measure("script (EVALSHA), offending request", lambda ip: check_request(ip, "xss"), 4)
+
+    for prefix in (_KEY_BAN, _KEY_RATE, _KEY_VIOL):
+        async for key in client.scan_iter(f"{prefix}10.2.*"):
+            await client.delete(key)
+    await client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+"""Benchmark — 深分页：OFFSET（find_all）vs 游标分页（find_page）。
+
+在 illegal_requests 表中按 ``generate_series`` 插入 ``--rows`` 行（默认 500 万），
+按 ``happened_at DESC, id DESC`` 排序，对比翻到第 ``--page`` 页（默认第 1000 页）的耗时：
+
+* offset：``ORDER BY ... LIMIT n OFFSET (page - 1) * n``，数据库需要扫描并丢弃前面所有行；
+* keyset：``find_page(after=游标)``，从上一页最后一行处沿索引继续读取 n 行。
+
+需要 PostgreSQL（DATABASE_URL），插入的数据以 type 列标记，结束时删除
+（``--keep`` 保留数据，便于重复运行）。
+
+用法::
+
+    DATABASE_URL=postgresql://... python benchmarks/bench_keyset_pagination.py [--rows 5000000] [--page 1000]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, func, select, text
+
+from core.database.connection.db import dispose_engine, get_session
+from core.database.dao.illegal_requests import IllegalRequest, IllegalRequestsDAO
+
+dao = IllegalRequestsDAO()
+TYPE = "bench-keyset"
+ORDER_BY = ("-happened_at", "-id")
+
+
+def seed(rows: int) -> None:
+    with get_session() as session:
+        existing = session.scalar(
+            select(func.count()).select_from(IllegalRequest).where(IllegalRequest.type == TYPE)
+        )
+        if existing >= rows:
+            return
+        # 每秒一行、每 10 行同一时刻，检验 id 兜底排序
+        session.execute(
+            text(
+                "INSERT INTO illegal_requests (uuid, happened_at, type, path, ip) "
+                "SELECT 'bench-keyset-' || g, "
+                "       timestamp '2024-01-01' + (g / 10) * interval '1 second', "
+                "       :type, '/bench', '10.0.0.' || (g % 250) "
+                "FROM generate_series(:start, :stop) AS g"
+            ),
+            {"type": TYPE, "start": existing + 1, "stop": rows},
+        )
+    with get_session() as session:
+        session.execute(text("ANALYZE illegal_requests"))
+
+
+def offset_page(page: int, limit: int) -> list[dict]:
+    model = IllegalRequest
+    with get_session() as session:
+        stmt = (
+            select(*model.__table__.c)
+            .where(model.type == TYPE)
+            .order_by(model.happened_at.desc(), model.id.desc())
+            .limit(limit)
+            .offset((page - 1) * limit)
+        )
+        return [dict(r) for r in session.execute(stmt).mappings()]
+
+
+def keyset_cursor(page: int, limit: int) -> str | None:
+    """翻到第 page 页之前的游标（逐页翻过去，与客户端的实际用法一致）。"""
+    cursor = None
+    for _ in range(page - 1):
+        cursor = dao.find_page(cursor, limit, ORDER_BY, {"type": TYPE})["next_cursor"]
+    return cursor
+
+
+def measure(fn, repeat: int) -> list[float]:
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(label: str, latencies: list[float]) -> None:
+    print(
+        f"{label:<14} p50={statistics.median(latencies) * 1000:9.2f}ms   "
+        f"min={min(latencies) * 1000:9.2f}ms   max={max(latencies) * 1000:9.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="结束时保留插入的数据")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    seed(args.rows)
+    print(f"seeded {args.rows} rows in {time.perf_counter() - start:.1f}s")
+    try:
+        cursor = keyset_cursor(args.page, args.limit)
+        first = offset_page(args.page, args.limit)
+        second = dao.find_page(cursor, args.limit, ORDER_BY, {"type": TYPE})["items"]
+        assert [r["id"] for r in first] == [r["id"] for r in second], "两种分页结果不一致"
+
+        report("offset p1", measure(lambda: offset_page(1, args.limit), args.repeat))
+        report(f"offset p{args.page}", measure(lambda: offset_page(args.page, args.limit), args.repeat))
+        report(
+            f"keyset p{args.page}",
+            measure(lambda: dao.find_page(cursor, args.limit, ORDER_BY, {"type": TYPE}), args.repeat),
+        )
+    finally:
+        if not args.keep:
+            with get_session() as session:
+                session.execute(delete(IllegalRequest).where(IllegalRequest.type == TYPE))
+        dispose_engine()
+
+
+if __name__ == "__main__":
+    main()
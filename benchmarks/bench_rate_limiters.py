@@ -0,0 +1,99 @@
+"""Benchmark — 各限流算法每次判定的 Redis 操作数与 CPU 开销。
+
+* 进程内实现：测量每次判定的 CPU 时间。
+* Redis 实现（需设置 REDIS_URL）：通过 ``INFO commandstats`` 统计脚本内部
+  执行的命令数，通过 ``INFO cpu`` 统计 Redis 服务端 CPU 时间，并记录客户端
+  往返延迟。
+
+用法::
+
+    python benchmarks/bench_rate_limiters.py [--decisions 100000] [--keys 1000]
+    REDIS_URL=redis://localhost:6379/0 python benchmarks/bench_rate_limiters.py
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.middleware.firewall.ratelimit import (
+    ALGORITHMS,
+    MemoryRateLimiter,
+    RateLimit,
+    RedisRateLimiter,
+)
+
+
+def make_limit(algorithm: str) -> RateLimit:
+    return RateLimit.parse("300/minute", algorithm=algorithm, burst=40)
+
+
+def bench_memory(decisions: int, keys: int) -> None:
+    print(f"in-memory ({decisions} decisions over {keys} keys)")
+    for algorithm in ALGORITHMS:
+        limiter = MemoryRateLimiter()
+        limit = make_limit(algorithm)
+        names = [f"bench:{algorithm}:{i}" for i in range(keys)]
+        start = time.process_time()
+        for i in range(decisions):
+            limiter.hit([(names[i % keys], limit)])
+        cpu = time.process_time() - start
+        print(f"  {algorithm:<16} {cpu / decisions * 1e6:>7.2f} µs CPU/decision")
+
+
+async def bench_redis(url: str, decisions: int, keys: int) -> None:
+    import redis.asyncio as redis_asyncio
+
+    client = redis_asyncio.from_url(url, decode_responses=True)
+
+    async def snapshot() -> tuple[int, float]:
+        stats = await client.info("commandstats")
+        ops = sum(
+            v["calls"] for k, v in stats.items()
+            if k not in ("cmdstat_evalsha", "cmdstat_eval", "cmdstat_info", "cmdstat_script")
+        )
+        cpu = await client.info("cpu")
+        return ops, cpu["used_cpu_user"] + cpu["used_cpu_sys"]
+
+    print(f"redis ({decisions} decisions over {keys} keys)")
+    for algorithm in ALGORITHMS:
+        limiter = RedisRateLimiter()
+        limit = make_limit(algorithm)
+        names = [f"bench:{algorithm}:{i}" for i in range(keys)]
+        await limiter.hit(client, [(names[0], limit)])  # 加载脚本
+        await client.config_resetstat()
+        ops_before, cpu_before = await snapshot()
+        start = time.perf_counter()
+        for i in range(decisions):
+            await limiter.hit(client, [(names[i % keys], limit)])
+        elapsed = time.perf_counter() - start
+        ops_after, cpu_after = await snapshot()
+        print(
+            f"  {algorithm:<16} {(ops_after - ops_before) / decisions:>5.2f} redis ops/decision   "
+            f"{(cpu_after - cpu_before) / decisions * 1e6:>6.2f} µs server CPU/decision   "
+            f"{elapsed / decisions * 1e6:>7.1f} µs round-trip"
+        )
+        for name in names:
+            await client.delete(name)
+    await client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--decisions", type=int, default=100_000)
+    parser.add_argument("--keys", type=int, default=1000)
+    args = parser.parse_args()
+
+    bench_memory(args.decisions, args.keys)
+    url = os.getenv("REDIS_URL")
+    if url:
+        asyncio.run(bench_redis(url, args.decisions // 10, args.keys))
+    else:
+        print("REDIS_URL 未设置，跳过 Redis 实现")
+
+
+if __name__ == "__main__":
+    main()
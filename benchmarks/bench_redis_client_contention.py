@@ -0,0 +1,165 @@
+"""Benchmark — 多线程并发调用 ``redis_conn.get_client()`` 的锁竞争。
+
+对比旧的访问方式（``get_client()`` 每次加锁，心跳 ``_is_alive`` 持锁执行 PING）
+与当前实现（``get_client()`` 不加锁，PING 在锁外执行）：
+
+1. ``--threads`` 个线程各调用 ``get_client()`` ``--calls`` 次，输出吞吐；
+2. 后台线程经延迟代理（每个 Redis 响应延迟 ``--delay`` 毫秒）不断执行心跳，
+   同时请求线程调用 ``get_client()``，输出 p50 / p99 / max 耗时：旧方式下每次
+   慢心跳都会让所有请求线程等待整整一次 PING；
+3. 以 ``REDIS_MAX_CONNECTIONS`` 远小于线程数的连接池并发执行命令，输出实际
+   建立的连接数，验证连接池有界。
+
+需要可用的 Redis::
+
+    REDIS_URL=redis://localhost:6379/0 python benchmarks/bench_redis_client_contention.py [--delay 20]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database.connection.redis import RedisConnectionManager, RedisPoolSettings
+from benchmarks.bench_firewall_redis_latency import start_latency_proxy
+
+
+class LegacyRedisConnectionManager(RedisConnectionManager):
+    """旧实现：读取客户端与心跳 PING 都持有同一把锁。"""
+
+    def get_client(self):
+        with self._lock:
+            return self._client
+
+    def _is_alive(self) -> bool:
+        with self._lock:
+            if self._client is None:
+                return False
+        try:
+            with self._lock:
+                self._client.ping()
+            return True
+        except Exception:
+            return False
+
+
+def bench_accessor(manager: RedisConnectionManager, threads: int, calls: int) -> float:
+    """返回 ``get_client()`` 的总吞吐（次 / 秒）。"""
+    barrier = threading.Barrier(threads)
+
+    def work() -> None:
+        barrier.wait()
+        for _ in range(calls):
+            manager.get_client()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        for future in [pool.submit(work) for _ in range(threads)]:
+            future.result()
+    return threads * calls / (time.perf_counter() - start)
+
+
+def bench_slow_heartbeat(manager: RedisConnectionManager, threads: int, calls: int) -> list[float]:
+    """心跳持续 PING 期间，请求线程每次调用 ``get_client()`` 的耗时。"""
+    stop = threading.Event()
+
+    def heartbeat() -> None:
+        while not stop.is_set():
+            manager._is_alive()
+
+    beat = threading.Thread(target=heartbeat, daemon=True)
+    beat.start()
+
+    def work() -> list[float]:
+        latencies = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            manager.get_client()
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.001)
+        return latencies
+
+    with ThreadPoolExecutor(threads) as pool:
+        results = [f.result() for f in [pool.submit(work) for _ in range(threads)]]
+    stop.set()
+    beat.join()
+    return [latency for result in results for latency in result]
+
+
+def bench_bounded_pool(url: str, max_connections: int, threads: int, calls: int) -> tuple[int, float]:
+    """返回并发执行命令后连接池中建立的连接数与总吞吐。"""
+    os.environ["REDIS_URL"] = url
+    manager = RedisConnectionManager(RedisPoolSettings(max_connections=max_connections))
+    assert manager._connect()
+    client = manager.get_client()
+
+    def work(i: int) -> None:
+        for n in range(calls):
+            client.set(f"bench:pool:{i}", n)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        for future in [pool.submit(work, i) for i in range(threads)]:
+            future.result()
+    elapsed = time.perf_counter() - start
+    created = len(client.connection_pool._connections)
+    client.delete(*[f"bench:pool:{i}" for i in range(threads)])
+    manager._close()
+    return created, threads * calls / elapsed
+
+
+def connect(cls: type[RedisConnectionManager], url: str) -> RedisConnectionManager:
+    os.environ["REDIS_URL"] = url
+    manager = cls(RedisPoolSettings())
+    assert manager._connect(), "无法连接 Redis"
+    return manager
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--delay", type=float, default=20, help="心跳场景中每个 Redis 响应的延迟（毫秒）")
+    parser.add_argument("--max-connections", type=int, default=4)
+    args = parser.parse_args()
+
+    url = os.environ.get("REDIS_URL")
+    if not url:
+        raise SystemExit("需要设置 REDIS_URL")
+    parsed = urlparse(url)
+    proxy_port = start_latency_proxy(parsed.hostname, parsed.port or 6379, args.delay / 1000)
+    proxy_url = f"redis://127.0.0.1:{proxy_port}{parsed.path}"
+
+    print(f"== get_client() 吞吐：{args.threads} 线程 × {args.calls} 次")
+    for label, cls in (("legacy (lock)", LegacyRedisConnectionManager), ("current", RedisConnectionManager)):
+        manager = connect(cls, url)
+        rate = bench_accessor(manager, args.threads, args.calls)
+        manager._close()
+        print(f"{label:<16} {rate / 1e6:8.2f} M calls/s")
+
+    calls = max(args.calls // 100, 50)
+    print(f"\n== 心跳 PING 延迟 {args.delay:g}ms 时 get_client() 的耗时：{args.threads} 线程 × {calls} 次")
+    print(f"{'':<16} {'p50':>10} {'p99':>10} {'max':>10}")
+    for label, cls in (("legacy (lock)", LegacyRedisConnectionManager), ("current", RedisConnectionManager)):
+        manager = connect(cls, proxy_url)
+        latencies = sorted(bench_slow_heartbeat(manager, args.threads, calls))
+        manager._close()
+        p50 = statistics.median(latencies) * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        print(f"{label:<16} {p50:8.3f}ms {p99:8.3f}ms {latencies[-1] * 1000:8.3f}ms")
+
+    created, rate = bench_bounded_pool(url, args.max_connections, args.threads, calls)
+    print(
+        f"\n== 有界连接池：REDIS_MAX_CONNECTIONS={args.max_connections}，{args.threads} 线程并发 SET\n"
+        f"建立连接 {created} 条，{rate:,.0f} ops/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
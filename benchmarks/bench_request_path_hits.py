@@ -0,0 +1,172 @@
+"""Benchmark — 请求路径访问计数：每个请求一次 upsert_by_path vs 进程内聚合批量写入。
+
+两种实现都按路由模板计数，``--requests`` 个请求以 ``--concurrency`` 并发访问
+``/songs/{song_id}``（同一行 request_logs），区别只在写入方式：
+
+* inline：每个请求结束后在线程池中调用 ``RequestLogsDAO.upsert_by_path``，
+  所有请求争用同一行的行锁；
+* aggregated：``RequestAnalyticsMiddleware`` 只在内存中计数，后台线程每
+  ``--flush-interval`` 秒一条多行 upsert 写入。
+
+运行期间后台线程每毫秒采样 ``pg_stat_activity``，统计等待行锁
+（``wait_event_type = 'Lock'``）的连接数。
+
+需要 PostgreSQL（``ON CONFLICT``），request_logs 表不存在时自动创建::
+
+    DATABASE_URL=postgresql://... python benchmarks/bench_request_path_hits.py [--requests 1000 --concurrency 1000]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import APIRouter, FastAPI
+from sqlalchemy import text
+
+import core.middleware.analytics.middleware as analytics_middleware
+from core.database.connection.db import _get_engine
+from core.database.dao.request_logs import RequestLog, RequestLogsDAO
+from core.middleware.analytics.aggregator import PathHitAggregator, route_path
+from core.middleware.analytics.middleware import RequestAnalyticsMiddleware
+
+_HOT_PATH = "/songs/{song_id}"
+
+
+class InlineUpsertMiddleware:
+    """旧方式：每个请求结束后同步 upsert 一次（在线程池中执行，不阻塞事件循环）。"""
+
+    def __init__(self, app, executor: ThreadPoolExecutor) -> None:
+        self.app = app
+        self.executor = executor
+        self.dao = RequestLogsDAO()
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.executor, self.dao.upsert_by_path, route_path(scope))
+
+
+def build_app() -> FastAPI:
+    router = APIRouter(prefix="/songs")
+
+    @router.get("/{song_id}")
+    async def get_song(song_id: int):
+        return {"id": song_id}
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+class LockWaitSampler:
+    """后台采样等待行锁的连接数。"""
+
+    def __init__(self) -> None:
+        self.samples: list[int] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "LockWaitSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        with _get_engine().connect() as conn:
+            while not self._stop.is_set():
+                waiting = conn.execute(text(
+                    "SELECT count(*) FROM pg_stat_activity "
+                    "WHERE datname = current_database() AND wait_event_type = 'Lock'"
+                )).scalar()
+                self.samples.append(waiting)
+                conn.rollback()
+                self._stop.wait(0.001)
+
+
+async def run(app, total: int, concurrency: int) -> tuple[float, list[float]]:
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+    remaining = iter(range(total))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker() -> None:
+            for i in remaining:
+                start = time.perf_counter()
+                resp = await client.get(f"/songs/{i}")
+                latencies.append(time.perf_counter() - start)
+                assert resp.status_code == 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return elapsed, latencies
+
+
+def frequency() -> int:
+    row = RequestLogsDAO().find_by_path(_HOT_PATH, fields="frequency")
+    return row["frequency"] if row else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--db-threads", type=int, default=32, help="inline 模式执行 upsert 的线程数")
+    parser.add_argument("--flush-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    if _get_engine().dialect.name != "postgresql":
+        raise SystemExit("需要 PostgreSQL 的 DATABASE_URL")
+    RequestLog.__table__.create(_get_engine(), checkfirst=True)
+
+    print(f"== {args.requests} 个请求，并发 {args.concurrency}，均命中 {_HOT_PATH}")
+    print(f"{'mode':<11} {'req/s':>8} {'p50':>9} {'p99':>9} {'lock waits':>11} {'max waiting':>12} {'rows+':>7}")
+    executor = ThreadPoolExecutor(args.db_threads)
+    aggregator = PathHitAggregator(flush_interval=args.flush_interval)
+    analytics_middleware.path_hits = aggregator
+    apps = {
+        "inline": InlineUpsertMiddleware(build_app(), executor),
+        "aggregated": RequestAnalyticsMiddleware(build_app()),
+    }
+    aggregator.start()
+    try:
+        for mode, app in apps.items():
+            before = frequency()
+            with LockWaitSampler() as sampler:
+                elapsed, latencies = asyncio.run(run(app, args.requests, args.concurrency))
+                if mode == "aggregated":
+                    aggregator.flush()
+            latencies.sort()
+            p99 = latencies[int(len(latencies) * 0.99) - 1]
+            waiting = [n for n in sampler.samples if n]
+            print(
+                f"{mode:<11} {len(latencies) / elapsed:>8.0f} "
+                f"{statistics.median(latencies) * 1000:>7.2f}ms {p99 * 1000:>7.2f}ms "
+                f"{len(waiting) / max(len(sampler.samples), 1):>10.0%} "
+                f"{max(sampler.samples, default=0):>12} {frequency() - before:>7}"
+            )
+    finally:
+        aggregator.stop()
+        executor.shutdown()
+    print("aggregator stats:", aggregator.stats())
+    print("lock waits: 采样中至少一个连接在等待行锁的比例；max waiting: 同时等待行锁的最大连接数")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,15 +6,49 @@
 
     with get_session() as session:
         session.add(obj)
+
+``async def`` 中请使用异步版本（asyncpg 驱动，共用同一套 ORM 模型）::
+
+    from core.database.connection.db import get_async_session
+
+    async with get_async_session() as session:
+        session.add(obj)
+
+只读查询可传入 ``readonly=True``，配置了 ``DATABASE_REPLICA_URLS`` 时路由到只读
+副本（见 :mod:`core.database.connection.replicas`），未配置时与主库 Session 相同。
+
+连接池参数与探活策略由环境变量配置，见 :mod:`core.database.connection.pool`；
+:func:`pool_stats` 返回各连接池的占用情况与取用统计。
 """
 
 import os
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from core.database.connection.pool import PoolMetrics, PoolSettings, install_idle_pre_ping
+from core.database.connection.replicas import (
+    Replica,
+    ReplicaRouter,
+    ReplicaSettings,
+    mark_write,
+)
 
-__all__ = ["Base", "get_session", "dispose_engine"]
+__all__ = [
+    "Base",
+    "get_session",
+    "dispose_engine",
+    "get_async_session",
+    "dispose_async_engine",
+    "pool_stats",
+    "replica_stats",
+    "read_your_writes_window",
+]
 
 # ------------------------------------------------------------------
 # 声明式基类（所有 ORM 模型均应继承此类）
@@ -31,55 +65,280 @@ class Base(DeclarativeBase):
 
 _engine = None
 _session_factory = None
+_async_engine = None
+_async_session_factory = None
+_router: ReplicaRouter | None = None
+
+# 连接池统计在引擎重建后保留，便于观察整个进程生命周期内的情况
+_pool_metrics = PoolMetrics("sync")
+_async_pool_metrics = PoolMetrics("async")
+
+# Session.info 中标记「本 Session 有写操作」的键，提交后据此开始读己之写窗口
+_WROTE = "wrote"
+
+
+def _get_database_url() -> str:
+    url = os.environ.get("DATABASE_URL")
+    if not url:
+        raise EnvironmentError("环境变量 DATABASE_URL 未设置")
+    return url
+
+
+def _build_engine(url: str, metrics: PoolMetrics):
+    # SQLAlchemy 2.x 需要 postgresql+psycopg2:// 协议前缀
+    if url.startswith("postgresql://"):
+        url = url.replace("postgresql://", "postgresql+psycopg2://", 1)
+    settings = PoolSettings.from_env()
+    engine = create_engine(
+        url,
+        poolclass=metrics.pool_class(QueuePool),
+        **settings.engine_kwargs(),
+    )
+    if settings.pre_ping == "idle":
+        install_idle_pre_ping(engine.pool, engine.dialect, settings.pre_ping_idle, metrics)
+    return engine
+
+
+def _build_async_engine(url: str, metrics: PoolMetrics):
+    # 异步引擎使用 asyncpg 驱动
+    for prefix in ("postgresql://", "postgresql+psycopg2://"):
+        if url.startswith(prefix):
+            url = url.replace(prefix, "postgresql+asyncpg://", 1)
+            break
+    settings = PoolSettings.from_env()
+    engine = create_async_engine(
+        url,
+        poolclass=metrics.pool_class(AsyncAdaptedQueuePool),
+        **settings.engine_kwargs(),
+    )
+    sync_engine = engine.sync_engine
+    if settings.pre_ping == "idle":
+        install_idle_pre_ping(
+            sync_engine.pool, sync_engine.dialect, settings.pre_ping_idle, metrics
+        )
+    return engine
+
+
+def _make_session_factory(engine):
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+
+def _make_async_session_factory(engine):
+    # 提交后不使对象过期：异步 Session 中访问过期属性会触发隐式 IO
+    return async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
 
 
 def _get_engine():
     global _engine
     if _engine is None:
-        url = os.environ.get("DATABASE_URL")
-        if not url:
-            raise EnvironmentError("环境变量 DATABASE_URL 未设置")
-        # SQLAlchemy 2.x 需要 postgresql+psycopg2:// 协议前缀
-        if url.startswith("postgresql://"):
-            url = url.replace("postgresql://", "postgresql+psycopg2://", 1)
-        _engine = create_engine(url, pool_pre_ping=True)
+        _engine = _build_engine(_get_database_url(), _pool_metrics)
     return _engine
 
 
+def _get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = _build_async_engine(_get_database_url(), _async_pool_metrics)
+    return _async_engine
+
+
 def _get_session_factory():
     global _session_factory
     if _session_factory is None:
-        _session_factory = sessionmaker(
-            bind=_get_engine(), autocommit=False, autoflush=False
-        )
+        _session_factory = _make_session_factory(_get_engine())
     return _session_factory
 
 
+def _get_async_session_factory():
+    global _async_session_factory
+    if _async_session_factory is None:
+        _async_session_factory = _make_async_session_factory(_get_async_engine())
+    return _async_session_factory
+
+
+def _get_router() -> ReplicaRouter | None:
+    """返回副本路由器，未配置 DATABASE_REPLICA_URLS 时返回 None。"""
+    global _router
+    if _router is None:
+        _router = ReplicaRouter(
+            ReplicaSettings.from_env(),
+            lambda url, metrics: _make_session_factory(_build_engine(url, metrics)),
+            lambda url, metrics: _make_async_session_factory(_build_async_engine(url, metrics)),
+        )
+    return _router if _router.replicas else None
+
+
+# ------------------------------------------------------------------
+# 写操作标记：ORM flush 与非 SELECT 语句都算写入（text() 无法区分读写，按写入处理）
+# ------------------------------------------------------------------
+
+
+@event.listens_for(Session, "after_flush")
+def _on_flush(session, flush_context) -> None:
+    session.info[_WROTE] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_execute(orm_execute_state) -> None:
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info[_WROTE] = True
+
+
+# ------------------------------------------------------------------
+# Session
+# ------------------------------------------------------------------
+
+
 def dispose_engine() -> None:
     """释放引擎，关闭连接池中的所有连接。在应用停止时调用。"""
-    global _engine, _session_factory
+    global _engine, _session_factory, _router
     if _engine is not None:
         _engine.dispose()
         _engine = None
         _session_factory = None
+    if _router is not None:
+        _router.dispose()
+        if not any(r.async_session_factory for r in _router.replicas):
+            _router = None
+
+
+def _open_read_session(router: ReplicaRouter) -> tuple[Session, Replica] | None:
+    """依次尝试候选副本并取用连接，应使用主库时返回 None。"""
+    candidates = router.candidates()
+    for replica in candidates:
+        session: Session = router.session_factory(replica, use_async=False)()
+        router.acquire(replica)
+        try:
+            session.connection()
+        except SQLAlchemyError as exc:
+            session.close()
+            router.release(replica, ok=False)
+            router.mark_unhealthy(replica, exc)
+            continue
+        return session, replica
+    if candidates:
+        router.record_fallback()
+    return None
 
 
 @contextmanager
-def get_session() -> Session:
+def get_session(readonly: bool = False) -> Session:
     """上下文管理器，自动提交或回滚，并在退出时关闭 session。
 
+    Args:
+        readonly: 为 True 时优先使用只读副本（未配置副本、处于读己之写窗口内
+            或副本均不可用时使用主库）。只读 Session 中不应执行写操作。
+
     示例::
 
         with get_session() as session:
             session.add(some_object)
     """
-    factory = _get_session_factory()
-    session: Session = factory()
+    replica = None
+    router = _get_router() if readonly else None
+    if router is not None:
+        opened = _open_read_session(router)
+        if opened is not None:
+            session, replica = opened
+    if replica is None:
+        session = _get_session_factory()()
     try:
         yield session
         session.commit()
+        if not readonly and session.info.get(_WROTE):
+            mark_write()
     except Exception:
         session.rollback()
         raise
     finally:
         session.close()
+        if replica is not None:
+            router.release(replica)
+
+
+async def dispose_async_engine() -> None:
+    """释放异步引擎，关闭其连接池中的所有连接。在应用停止时调用。"""
+    global _async_engine, _async_session_factory, _router
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+    if _router is not None:
+        await _router.dispose_async()
+        if not any(r.session_factory for r in _router.replicas):
+            _router = None
+
+
+async def _open_async_read_session(router: ReplicaRouter) -> tuple[AsyncSession, Replica] | None:
+    """:func:`_open_read_session` 的异步版本。"""
+    candidates = router.candidates()
+    for replica in candidates:
+        session: AsyncSession = router.session_factory(replica, use_async=True)()
+        router.acquire(replica)
+        try:
+            await session.connection()
+        except SQLAlchemyError as exc:
+            await session.close()
+            router.release(replica, ok=False)
+            router.mark_unhealthy(replica, exc)
+            continue
+        return session, replica
+    if candidates:
+        router.record_fallback()
+    return None
+
+
+@asynccontextmanager
+async def get_async_session(readonly: bool = False) -> AsyncIterator[AsyncSession]:
+    """异步上下文管理器，提交 / 回滚 / 关闭语义及 ``readonly`` 参数与 :func:`get_session` 相同。
+
+    示例::
+
+        async with get_async_session() as session:
+            session.add(some_object)
+    """
+    replica = None
+    router = _get_router() if readonly else None
+    if router is not None:
+        opened = await _open_async_read_session(router)
+        if opened is not None:
+            session, replica = opened
+    if replica is None:
+        session = _get_async_session_factory()()
+    try:
+        yield session
+        await session.commit()
+        if not readonly and session.info.get(_WROTE):
+            mark_write()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+        if replica is not None:
+            router.release(replica)
+
+
+# ------------------------------------------------------------------
+# 统计
+# ------------------------------------------------------------------
+
+
+def pool_stats() -> dict:
+    """返回同步与异步连接池的占用情况（常驻 / 已取出 / 空闲 / 溢出连接数）与取用统计。"""
+    return {
+        "sync": _pool_metrics.stats(),
+        "async": _async_pool_metrics.stats(),
+    }
+
+
+def read_your_writes_window() -> float | None:
+    """返回读己之写窗口（秒），未配置副本时返回 None。"""
+    router = _get_router()
+    return router.settings.read_your_writes_window if router is not None else None
+
+
+def replica_stats() -> dict | None:
+    """返回只读副本的路由统计与健康状态，未配置副本时返回 None。"""
+    router = _get_router()
+    return router.stats() if router is not None else None
@@ -0,0 +1,241 @@
+"""SQLAlchemy 连接池的配置与监控。
+
+连接池参数从环境变量读取（均可省略，连接数与超时的默认值与 SQLAlchemy 一致）：
+
+==========================  =======  ==========================================
+环境变量                     默认值    说明
+==========================  =======  ==========================================
+``DB_POOL_SIZE``             5        常驻连接数
+``DB_MAX_OVERFLOW``          10       超出常驻连接数后最多再创建的连接数
+``DB_POOL_TIMEOUT``          30       连接耗尽时等待空闲连接的秒数，超时抛出 TimeoutError
+``DB_POOL_RECYCLE``          -1       连接存活超过该秒数后在下次取用时重建，-1 为不重建
+``DB_POOL_PRE_PING``         idle     取用连接前的探活策略：always / idle / never
+``DB_POOL_PRE_PING_IDLE``    30       ``idle`` 策略下，空闲超过该秒数的连接才探活
+==========================  =======  ==========================================
+
+``always`` 每次取用连接都多一次数据库往返；``idle`` 只对空闲较久、可能已被
+PgBouncer / 防火墙断开的连接探活，探活失败时由连接池丢弃并换一条新连接。
+
+同步与异步引擎各有一个连接池，实际占用的数据库连接上限为
+``2 × (DB_POOL_SIZE + DB_MAX_OVERFLOW)``（每个 worker 进程）。
+"""
+
+import bisect
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.exc import DisconnectionError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool
+
+# 取用连接耗时直方图的桶上界（毫秒），最后一个桶收纳其余所有样本
+_WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+_PRE_PING_STRATEGIES = ("always", "idle", "never")
+
+# 连接最近一次归还时刻在 ConnectionRecord.info 中的键
+_LAST_CHECKIN = "last_checkin"
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise EnvironmentError(f"环境变量 {name} 必须为整数，当前值: {value!r}") from None
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise EnvironmentError(f"环境变量 {name} 必须为数字，当前值: {value!r}") from None
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """连接池参数，见模块文档。"""
+
+    size: int = 5
+    max_overflow: int = 10
+    timeout: float = 30
+    recycle: int = -1
+    pre_ping: str = "idle"
+    pre_ping_idle: float = 30
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        """从环境变量读取连接池参数，取值非法时抛出 EnvironmentError。"""
+        pre_ping = os.environ.get("DB_POOL_PRE_PING", cls.pre_ping).strip().lower()
+        if pre_ping not in _PRE_PING_STRATEGIES:
+            raise EnvironmentError(
+                f"环境变量 DB_POOL_PRE_PING 必须为 {' / '.join(_PRE_PING_STRATEGIES)}，"
+                f"当前值: {pre_ping!r}"
+            )
+        return cls(
+            size=_env_int("DB_POOL_SIZE", cls.size),
+            max_overflow=_env_int("DB_MAX_OVERFLOW", cls.max_overflow),
+            timeout=_env_float("DB_POOL_TIMEOUT", cls.timeout),
+            recycle=_env_int("DB_POOL_RECYCLE", cls.recycle),
+            pre_ping=pre_ping,
+            pre_ping_idle=_env_float("DB_POOL_PRE_PING_IDLE", cls.pre_ping_idle),
+        )
+
+    def engine_kwargs(self) -> dict[str, Any]:
+        """传给 ``create_engine`` / ``create_async_engine`` 的连接池参数。"""
+        return {
+            "pool_size": self.size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.timeout,
+            "pool_recycle": self.recycle,
+            "pool_pre_ping": self.pre_ping == "always",
+        }
+
+
+class PoolMetrics:
+    """单个连接池的取用统计：等待耗时直方图、取用失败次数、探活次数。
+
+    通过 :meth:`pool_class` 生成绑定本对象的连接池类，在取用连接时计时；
+    :meth:`stats` 同时读取连接池当前的占用情况。
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._pool: Pool | None = None
+        self.reset()
+
+    def reset(self) -> None:
+        """清零所有计数。"""
+        with self._lock:
+            self._buckets = [0] * (len(_WAIT_BUCKETS_MS) + 1)
+            self._wait_count = 0
+            self._wait_sum = 0.0
+            self._wait_max = 0.0
+            self._timeouts = 0
+            self._errors = 0
+            self._pings = 0
+            self._ping_failures = 0
+
+    # ------------------------------------------------------------------
+    # 采集
+    # ------------------------------------------------------------------
+
+    def observe_wait(self, seconds: float) -> None:
+        """记录一次成功取用连接的耗时。"""
+        ms = seconds * 1000
+        with self._lock:
+            self._buckets[bisect.bisect_left(_WAIT_BUCKETS_MS, ms)] += 1
+            self._wait_count += 1
+            self._wait_sum += ms
+            if ms > self._wait_max:
+                self._wait_max = ms
+
+    def observe_failure(self, exc: BaseException) -> None:
+        """记录一次取用失败：连接池耗尽超时或建立连接出错。"""
+        with self._lock:
+            if isinstance(exc, PoolTimeoutError):
+                self._timeouts += 1
+            else:
+                self._errors += 1
+
+    def observe_ping(self, ok: bool) -> None:
+        """记录一次 ``idle`` 策略下的探活。"""
+        with self._lock:
+            self._pings += 1
+            if not ok:
+                self._ping_failures += 1
+
+    def pool_class(self, base: type[Pool]) -> type[Pool]:
+        """返回 ``base`` 的子类，取用连接时把耗时与失败记录到本对象。
+
+        统计对象挂在类上而非实例上：``engine.dispose()`` 会按原类重建连接池，
+        重建后的连接池继续向同一个对象上报。
+        """
+        metrics = self
+
+        class MeteredPool(base):  # type: ignore[valid-type, misc]
+            def __init__(self, *args: Any, **kwargs: Any) -> None:
+                super().__init__(*args, **kwargs)
+                metrics._pool = self
+
+            def _do_get(self):
+                start = time.perf_counter()
+                try:
+                    conn = super()._do_get()
+                except Exception as exc:
+                    metrics.observe_failure(exc)
+                    raise
+                metrics.observe_wait(time.perf_counter() - start)
+                return conn
+
+        MeteredPool.__name__ = MeteredPool.__qualname__ = f"Metered{base.__name__}"
+        return MeteredPool
+
+    # ------------------------------------------------------------------
+    # 读取
+    # ------------------------------------------------------------------
+
+    def stats(self) -> dict[str, Any]:
+        """返回连接池占用情况与取用统计；连接池尚未创建时占用项为 None。"""
+        pool = self._pool
+        occupancy: dict[str, Any] = {
+            "size": None,
+            "checked_out": None,
+            "checked_in": None,
+            "overflow": None,
+        }
+        if pool is not None and hasattr(pool, "checkedout"):
+            occupancy = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                # QueuePool.overflow() 在常驻连接未建满时为负数
+                "overflow": max(pool.overflow(), 0),
+            }
+        with self._lock:
+            labels = [f"le_{b}ms" for b in _WAIT_BUCKETS_MS] + [f"gt_{_WAIT_BUCKETS_MS[-1]}ms"]
+            return {
+                **occupancy,
+                "checkouts": self._wait_count,
+                "wait_ms": {
+                    "avg": round(self._wait_sum / self._wait_count, 3) if self._wait_count else 0.0,
+                    "max": round(self._wait_max, 3),
+                    "histogram": dict(zip(labels, self._buckets)),
+                },
+                "checkout_timeouts": self._timeouts,
+                "checkout_errors": self._errors,
+                "pings": self._pings,
+                "ping_failures": self._ping_failures,
+            }
+
+
+def install_idle_pre_ping(pool: Pool, dialect, idle: float, metrics: PoolMetrics) -> None:
+    """为连接池注册 ``idle`` 探活：空闲超过 ``idle`` 秒的连接在取用前探活。
+
+    探活失败时抛出 DisconnectionError，连接池会丢弃该连接并重新取用。
+    """
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection, record) -> None:
+        record.info[_LAST_CHECKIN] = time.monotonic()
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, record, proxy) -> None:
+        last = record.info.get(_LAST_CHECKIN)
+        if last is None or time.monotonic() - last < idle:
+            return
+        try:
+            dialect.do_ping(dbapi_connection)
+        except Exception as exc:
+            metrics.observe_ping(False)
+            raise DisconnectionError("空闲连接探活失败") from exc
+        metrics.observe_ping(True)
@@ -1,123 +1,538 @@
+"""Redis 连接管理：部署方式、有界连接池、后台心跳与断线重连。
+
+部署方式由 ``REDIS_MODE`` 选择：
+
+================  ==============================================================
+``REDIS_MODE``    说明
+================  ==============================================================
+``standalone``    默认，单节点，连接 ``REDIS_URL``
+``sentinel``      经 ``REDIS_SENTINELS``（``host:port`` 逗号分隔）发现
+                  ``REDIS_SENTINEL_MASTER``（默认 ``mymaster``）的主节点；
+                  ``REDIS_URL`` 可省略，设置时只取其中的用户名 / 密码 / 库号，
+                  ``REDIS_SENTINEL_PASSWORD`` 为哨兵自身的密码
+``cluster``       Redis Cluster，``REDIS_URL`` 为任一节点，其余节点自动发现
+================  ==============================================================
+
+主从切换时客户端无需重建：哨兵模式下断开的连接在重试时重新向哨兵查询主节点，
+集群模式下由 redis-py 按 MOVED / 连接错误刷新槽位表。哨兵模式下命令在连接
+错误时按指数退避重试 ``_FAILOVER_RETRIES`` 次，覆盖新主节点接管前的短暂窗口。
+
+集群模式下，同一 IP 的防火墙 key 用哈希标签（``fw:ban:{<ip>}``，见
+:meth:`RedisConnectionManager.hash_tag`）落在同一个槽，Lua 脚本才能一次操作
+多个 key；单节点与哨兵模式不加标签，key 与旧版本一致。
+
+同步客户端与各事件循环的异步客户端分别使用一个 ``BlockingConnectionPool``，
+连接数达到上限时取用连接的调用方等待空闲连接，而不是无限制地新建连接。
+连接池参数从环境变量读取（均可省略）：
+
+================================  =======  ==========================================
+环境变量                           默认值    说明
+================================  =======  ==========================================
+``REDIS_MAX_CONNECTIONS``          50       每个连接池的最大连接数
+``REDIS_POOL_TIMEOUT``             5        连接耗尽时等待空闲连接的秒数，超时抛出 ConnectionError
+``REDIS_SOCKET_TIMEOUT``           5        单条命令的读写超时（秒）
+``REDIS_SOCKET_CONNECT_TIMEOUT``   5        建立连接的超时（秒）
+``REDIS_HEALTH_CHECK_INTERVAL``    30       连接空闲超过该秒数后，取用时先 PING 探活
+================================  =======  ==========================================
+
+同步连接池在多线程间共享，异步连接池与创建它的事件循环绑定，因此每个 worker
+进程实际占用的连接上限为 ``(1 + 事件循环数) × REDIS_MAX_CONNECTIONS``。集群
+模式下上述上限按节点计算；异步集群客户端的节点连接用尽时直接抛出错误，不等待。
+"""
+
+import asyncio
 import os
 import threading
+from dataclasses import dataclass
+from typing import Any, Callable
 
 import redis as redis_lib
+import redis.asyncio as redis_asyncio
 from redis import Redis
+from redis.asyncio.retry import Retry as AsyncRetry
+from redis.asyncio.sentinel import Sentinel as AsyncSentinel
+from redis.asyncio.sentinel import SentinelConnectionPool as AsyncSentinelConnectionPool
+from redis.backoff import ExponentialBackoff
+from redis.connection import parse_url
+from redis.retry import Retry
+from redis.sentinel import Sentinel, SentinelConnectionPool
 
+from core.database.connection.pool import _env_float, _env_int
 from core.helper.ContainerCustomLog.index import custom_log
 
 # 重连间隔（秒），每次失败后指数增长，最大不超过 _MAX_RETRY_INTERVAL
 _INITIAL_RETRY_INTERVAL = 2
 _MAX_RETRY_INTERVAL = 60
 
+# 心跳检测间隔（秒）
+_HEARTBEAT_INTERVAL = 10
+
+_MODES = ("standalone", "sentinel", "cluster")
+
+# 哨兵模式下命令遇到连接错误时的重试次数与退避（秒）：每次重试重新解析主节点
+_FAILOVER_RETRIES = 3
+_FAILOVER_BACKOFF_BASE = 0.1
+_FAILOVER_BACKOFF_CAP = 1.0
+
+
+@dataclass(frozen=True)
+class RedisPoolSettings:
+    """Redis 连接池参数，见模块文档。"""
+
+    max_connections: int = 50
+    pool_timeout: float = 5
+    socket_timeout: float = 5
+    socket_connect_timeout: float = 5
+    health_check_interval: int = 30
+
+    @classmethod
+    def from_env(cls) -> "RedisPoolSettings":
+        """从环境变量读取连接池参数，取值非法时抛出 EnvironmentError。"""
+        settings = cls(
+            max_connections=_env_int("REDIS_MAX_CONNECTIONS", cls.max_connections),
+            pool_timeout=_env_float("REDIS_POOL_TIMEOUT", cls.pool_timeout),
+            socket_timeout=_env_float("REDIS_SOCKET_TIMEOUT", cls.socket_timeout),
+            socket_connect_timeout=_env_float(
+                "REDIS_SOCKET_CONNECT_TIMEOUT", cls.socket_connect_timeout
+            ),
+            health_check_interval=_env_int(
+                "REDIS_HEALTH_CHECK_INTERVAL", cls.health_check_interval
+            ),
+        )
+        if settings.max_connections < 1:
+            raise EnvironmentError(
+                f"环境变量 REDIS_MAX_CONNECTIONS 必须为正整数，当前值: {settings.max_connections}"
+            )
+        return settings
+
+    def pool_kwargs(self) -> dict[str, Any]:
+        """传给 ``BlockingConnectionPool.from_url`` 的参数。"""
+        return {
+            "max_connections": self.max_connections,
+            "timeout": self.pool_timeout,
+            "socket_timeout": self.socket_timeout,
+            "socket_connect_timeout": self.socket_connect_timeout,
+            "health_check_interval": self.health_check_interval,
+            "decode_responses": True,
+        }
+
+
+@dataclass(frozen=True)
+class RedisTopology:
+    """Redis 部署方式与地址，见模块文档。"""
+
+    mode: str = "standalone"
+    url: str | None = None
+    sentinels: tuple[tuple[str, int], ...] = ()
+    master_name: str = "mymaster"
+    sentinel_password: str | None = None
+
+    @classmethod
+    def from_env(cls) -> "RedisTopology":
+        """从环境变量读取部署方式，取值非法时抛出 EnvironmentError。
+
+        地址是否齐全在 :meth:`RedisConnectionManager.start` 中检查（见 :meth:`validate`），
+        因此未配置 Redis 的进程也可以读取部署方式。
+        """
+        mode = os.environ.get("REDIS_MODE", cls.mode).strip().lower() or cls.mode
+        if mode not in _MODES:
+            raise EnvironmentError(
+                f"环境变量 REDIS_MODE 必须为 {' / '.join(_MODES)}，当前值: {mode!r}"
+            )
+        sentinels = []
+        for item in os.environ.get("REDIS_SENTINELS", "").split(","):
+            if not item.strip():
+                continue
+            host, _, port = item.strip().rpartition(":")
+            if not host or not port.isdigit():
+                raise EnvironmentError(
+                    f"环境变量 REDIS_SENTINELS 的每一项须为 host:port，当前值: {item.strip()!r}"
+                )
+            sentinels.append((host, int(port)))
+        return cls(
+            mode=mode,
+            url=os.environ.get("REDIS_URL") or None,
+            sentinels=tuple(sentinels),
+            master_name=os.environ.get("REDIS_SENTINEL_MASTER") or cls.master_name,
+            sentinel_password=os.environ.get("REDIS_SENTINEL_PASSWORD") or None,
+        )
+
+    @property
+    def cluster(self) -> bool:
+        return self.mode == "cluster"
+
+    @property
+    def configured(self) -> bool:
+        """是否配置了 Redis 地址（哨兵模式看 ``REDIS_SENTINELS``，其他模式看 ``REDIS_URL``）。"""
+        if self.mode == "sentinel":
+            return bool(self.sentinels)
+        return bool(self.url)
+
+    def validate(self) -> None:
+        """检查显式选择的部署方式是否给出了地址，缺失时抛出 EnvironmentError。
+
+        单节点模式未设置 ``REDIS_URL`` 视为未配置 Redis，不报错。
+        """
+        if self.mode == "sentinel" and not self.sentinels:
+            raise EnvironmentError("REDIS_MODE=sentinel 时必须设置 REDIS_SENTINELS")
+        if self.cluster and not self.url:
+            raise EnvironmentError("REDIS_MODE=cluster 时必须设置 REDIS_URL")
+
+    def require_url(self) -> str:
+        if not self.url:
+            raise EnvironmentError("环境变量 REDIS_URL 未设置")
+        return self.url
+
+    def sentinel_args(self, settings: RedisPoolSettings) -> tuple[list, dict, dict]:
+        """返回创建 ``Sentinel`` 的参数：哨兵地址、哨兵连接参数、主节点连接参数。"""
+        if not self.sentinels:
+            raise EnvironmentError("REDIS_MODE=sentinel 时必须设置 REDIS_SENTINELS")
+        sentinel_kwargs = {
+            "socket_timeout": settings.socket_timeout,
+            "socket_connect_timeout": settings.socket_connect_timeout,
+            "password": self.sentinel_password,
+        }
+        connection_kwargs = {}
+        if self.url:
+            parsed = parse_url(self.url)
+            connection_kwargs = {
+                key: parsed[key] for key in ("username", "password", "db") if key in parsed
+            }
+        return list(self.sentinels), sentinel_kwargs, connection_kwargs
+
+
+class _BlockingSentinelConnectionPool(SentinelConnectionPool, redis_lib.BlockingConnectionPool):
+    """由哨兵解析主节点地址的有界连接池（连接用尽时等待，与单节点模式一致）。"""
+
+
+class _AsyncBlockingSentinelConnectionPool(
+    AsyncSentinelConnectionPool, redis_asyncio.BlockingConnectionPool
+):
+    """:class:`_BlockingSentinelConnectionPool` 的 asyncio 版本。"""
+
 
 class RedisConnectionManager:
     """Redis 连接管理器。
 
     在应用启动时通过 :meth:`start` 建立连接，停止时通过 :meth:`stop` 关闭。
     若连接中途断开，后台线程将持续尝试重连，直到成功或管理器被停止。
+
+    同步客户端供后台线程与同步代码使用；异步代码（如防火墙中间件）应通过
+    :meth:`get_async_client` 获取 ``redis.asyncio`` 客户端，避免阻塞事件循环。
+
+    客户端只在建立 / 替换 / 关闭连接时整体赋值，:meth:`get_client` 直接读取
+    属性、不加锁；锁只用于串行化连接的替换与关闭，不会在持锁期间访问网络。
+
+    连接断开（心跳失败，或调用方通过 :meth:`report_failure` 报告命令失败）到
+    重连成功之间，:attr:`degraded` 为 True，防火墙等调用方据此改用进程内状态；
+    恢复后在监控线程中依次执行 :meth:`add_recovery_callback` 注册的回调。
+    未配置 Redis 地址时 :meth:`start` 不建立连接、不启动监控线程，也不进入降级状态。
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        settings: RedisPoolSettings | None = None,
+        topology: RedisTopology | None = None,
+    ) -> None:
+        self._settings = settings
+        self._topology = topology
         self._client: Redis | None = None
+        # 事件循环 -> 异步客户端：异步连接与创建它的事件循环绑定
+        self._async_clients: dict[
+            asyncio.AbstractEventLoop, redis_asyncio.Redis | redis_asyncio.RedisCluster
+        ] = {}
         self._lock = threading.Lock()
         self._stop_event = threading.Event()
+        # 唤醒监控线程：心跳间隔到期前提前检查连接（命令失败 / 停止）
+        self._wake = threading.Event()
         self._monitor_thread: threading.Thread | None = None
+        self._degraded = False
+        self._recovery_callbacks: list[Callable[[Redis | redis_lib.RedisCluster], None]] = []
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
     def start(self) -> None:
-        """建立初始连接并启动后台监控线程。"""
+        """校验配置、建立初始连接并启动后台监控线程。
+
+        未配置 Redis 地址时直接返回：依赖 Redis 的功能按「未启用」处理，而不是按宕机降级。
+        已配置但初始连接失败时进入降级状态，由监控线程继续重连。
+        """
         self._stop_event.clear()
-        self._connect()
+        # 部署方式与连接池参数只在启动时解析一次：取值非法时直接抛出 EnvironmentError
+        # 使应用启动失败，而不是在请求路径上（拼接 key 时）才报错
+        topology = self._get_topology()
+        topology.validate()
+        self._get_settings()
+        if not topology.configured:
+            custom_log("WARNING", "未配置 Redis 地址，跳过 Redis 连接")
+            return
+        if not self._connect():
+            self._degraded = True
         self._monitor_thread = threading.Thread(
             target=self._monitor_loop, daemon=True, name="redis-monitor"
         )
         self._monitor_thread.start()
 
     def stop(self) -> None:
-        """停止监控线程并关闭连接。"""
+        """停止监控线程并关闭连接（含尚未通过 :meth:`close_async_client` 关闭的异步客户端）。"""
         self._stop_event.set()
+        self._wake.set()
         if self._monitor_thread is not None:
             self._monitor_thread.join(timeout=5)
         with self._lock:
             self._close()
+            async_clients, self._async_clients = self._async_clients, {}
+        for loop, client in async_clients.items():
+            self._discard_async_client(loop, client)
         custom_log("SUCCESS", "Redis 连接已关闭")
 
-    def get_client(self) -> Redis | None:
+    def get_client(self) -> Redis | redis_lib.RedisCluster | None:
         """返回当前活跃的 Redis 客户端，若尚未连接则返回 None。"""
+        return self._client
+
+    @property
+    def degraded(self) -> bool:
+        """Redis 不可用、后台正在重连时为 True。"""
+        return self._degraded
+
+    def report_failure(self, exc: BaseException) -> None:
+        """报告一次 Redis 命令失败：立即进入降级状态并唤醒监控线程检查连接。
+
+        连接实际可用（偶发错误）时，监控线程的 PING 成功后马上恢复。
+        """
+        if not self._degraded:
+            self._degraded = True
+            custom_log("WARNING", f"Redis 命令失败，进入降级模式: {exc}")
+        self._wake.set()
+
+    def add_recovery_callback(
+        self, callback: Callable[[Redis | redis_lib.RedisCluster], None]
+    ) -> None:
+        """注册连接恢复回调，在监控线程中以同步客户端为参数调用。"""
+        self._recovery_callbacks.append(callback)
+
+    def get_async_client(self) -> redis_asyncio.Redis | redis_asyncio.RedisCluster | None:
+        """返回绑定当前事件循环的 ``redis.asyncio`` 客户端。
+
+        连接状态以同步客户端为准：管理器未连接（或正在重连）时返回 None。
+        必须在事件循环中调用。每个事件循环各有一个客户端（例如测试中每个
+        TestClient 使用独立循环）；创建新客户端时顺带释放已关闭的循环遗留的客户端。
+        """
+        if self.get_client() is None:
+            return None
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is not None:
+            return client
+        client = self._build_async_client()
         with self._lock:
-            return self._client
+            stale = self._pop_closed_loops()
+            self._async_clients[loop] = client
+        for stale_loop, stale_client in stale.items():
+            self._discard_async_client(stale_loop, stale_client)
+        return client
+
+    def hash_tag(self, value: str) -> str:
+        """集群模式下返回哈希标签 ``{value}``，其他模式原样返回。
+
+        用于拼接需要在同一个 Lua 脚本中操作的 key（同一 IP 的封禁、违规与限流计数），
+        集群只按花括号内的部分计算槽位。
+        """
+        return f"{{{value}}}" if self.cluster else value
+
+    @property
+    def cluster(self) -> bool:
+        """是否为集群模式（``REDIS_MODE=cluster``）。
+
+        只读取 :meth:`start` 时已解析的部署方式，不访问环境变量、不会抛出异常；
+        启动前视为非集群模式。
+        """
+        return self._topology is not None and self._topology.cluster
+
+    async def close_async_client(self) -> None:
+        """关闭当前事件循环中的异步客户端，并释放已关闭的循环遗留的客户端。在应用停止时调用。"""
+        with self._lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+            stale = self._pop_closed_loops()
+        for stale_loop, stale_client in stale.items():
+            self._discard_async_client(stale_loop, stale_client)
+        if client is not None:
+            try:
+                await client.aclose()
+            except Exception:
+                pass
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
-    def _get_url(self) -> str:
-        url = os.getenv("REDIS_URL")
-        if not url:
-            raise EnvironmentError("环境变量 REDIS_URL 未设置")
-        return url
+    def _get_settings(self) -> RedisPoolSettings:
+        if self._settings is None:
+            self._settings = RedisPoolSettings.from_env()
+        return self._settings
+
+    def _get_topology(self) -> RedisTopology:
+        if self._topology is None:
+            self._topology = RedisTopology.from_env()
+        return self._topology
+
+    def _build_client(self) -> Redis | redis_lib.RedisCluster:
+        """按部署方式创建同步客户端；客户端关闭时一并断开其连接池。"""
+        topology, settings = self._get_topology(), self._get_settings()
+        if topology.cluster:
+            return redis_lib.RedisCluster.from_url(
+                topology.require_url(),
+                connection_pool_class=redis_lib.BlockingConnectionPool,
+                **settings.pool_kwargs(),
+            )
+        if topology.mode == "sentinel":
+            sentinels, sentinel_kwargs, connection_kwargs = topology.sentinel_args(settings)
+            sentinel = Sentinel(sentinels, sentinel_kwargs=sentinel_kwargs, **connection_kwargs)
+            return sentinel.master_for(
+                topology.master_name,
+                connection_pool_class=_BlockingSentinelConnectionPool,
+                retry=Retry(
+                    ExponentialBackoff(_FAILOVER_BACKOFF_CAP, _FAILOVER_BACKOFF_BASE),
+                    _FAILOVER_RETRIES,
+                ),
+                **settings.pool_kwargs(),
+            )
+        pool = redis_lib.BlockingConnectionPool.from_url(
+            topology.require_url(), **settings.pool_kwargs()
+        )
+        return Redis.from_pool(pool)
+
+    def _build_async_client(self) -> redis_asyncio.Redis | redis_asyncio.RedisCluster:
+        """:meth:`_build_client` 的 asyncio 版本。"""
+        topology, settings = self._get_topology(), self._get_settings()
+        kwargs = settings.pool_kwargs()
+        if topology.cluster:
+            # 异步集群客户端的节点连接池不支持等待空闲连接
+            kwargs.pop("timeout")
+            return redis_asyncio.RedisCluster.from_url(topology.require_url(), **kwargs)
+        if topology.mode == "sentinel":
+            sentinels, sentinel_kwargs, connection_kwargs = topology.sentinel_args(settings)
+            sentinel = AsyncSentinel(
+                sentinels, sentinel_kwargs=sentinel_kwargs, **connection_kwargs
+            )
+            return sentinel.master_for(
+                topology.master_name,
+                connection_pool_class=_AsyncBlockingSentinelConnectionPool,
+                retry=AsyncRetry(
+                    ExponentialBackoff(_FAILOVER_BACKOFF_CAP, _FAILOVER_BACKOFF_BASE),
+                    _FAILOVER_RETRIES,
+                ),
+                **kwargs,
+            )
+        pool = redis_asyncio.BlockingConnectionPool.from_url(topology.require_url(), **kwargs)
+        return redis_asyncio.Redis.from_pool(pool)
 
     def _connect(self) -> bool:
         """尝试建立连接，成功返回 True，失败返回 False。"""
+        client = None
         try:
-            url = self._get_url()
-            client = redis_lib.from_url(url, decode_responses=True)
-            # 立即执行 PING 验证连通性
+            client = self._build_client()
+            # 立即执行 PING 验证连通性（不持锁）
             client.ping()
-            with self._lock:
-                self._close()
-                self._client = client
-            custom_log("SUCCESS", "Redis 连接成功")
-            return True
         except Exception as exc:
+            self._close_client(client)
             custom_log("ERROR", f"Redis 连接失败: {exc}")
             return False
+        with self._lock:
+            previous, self._client = self._client, client
+        self._close_client(previous)
+        custom_log("SUCCESS", "Redis 连接成功")
+        return True
 
     def _close(self) -> None:
-        """关闭当前连接（不加锁，调用方负责加锁）。"""
-        if self._client is not None:
+        """关闭当前连接（调用方负责加锁）。"""
+        previous, self._client = self._client, None
+        self._close_client(previous)
+
+    @staticmethod
+    def _close_client(client: Redis | redis_lib.RedisCluster | None) -> None:
+        # 仍持有旧客户端的调用方下一条命令会失败，与连接断开时的行为一致
+        if client is not None:
             try:
-                self._client.close()
+                client.close()
             except Exception:
                 pass
-            self._client = None
+
+    def _pop_closed_loops(
+        self,
+    ) -> dict[asyncio.AbstractEventLoop, redis_asyncio.Redis | redis_asyncio.RedisCluster]:
+        """移出已关闭的事件循环对应的异步客户端（调用方负责加锁）。"""
+        closed = {loop: client for loop, client in self._async_clients.items() if loop.is_closed()}
+        for loop in closed:
+            del self._async_clients[loop]
+        return closed
+
+    @staticmethod
+    def _discard_async_client(
+        loop: asyncio.AbstractEventLoop,
+        client: redis_asyncio.Redis | redis_asyncio.RedisCluster,
+    ) -> None:
+        """关闭不在当前事件循环中的异步客户端。
+
+        所属循环仍在（其他线程中）运行时，把 ``aclose()`` 调度到该循环执行；循环已停止或
+        关闭时协程无法再执行，只丢弃引用，底层 socket 在对象被回收时关闭。
+        """
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
 
     def _is_alive(self) -> bool:
-        """检查 Redis 连接是否仍然存活。"""
-        with self._lock:
-            if self._client is None:
-                return False
+        """检查 Redis 连接是否仍然存活。
+
+        PING 在锁外执行：心跳较慢（受 ``REDIS_SOCKET_TIMEOUT`` 约束）时，
+        请求线程读取客户端不受影响。
+        """
+        client = self._client
+        if client is None:
+            return False
         try:
-            with self._lock:
-                self._client.ping()
+            client.ping()
             return True
         except Exception:
             return False
 
+    def _recover(self) -> None:
+        """退出降级状态并执行恢复回调；回调出错只记录日志。"""
+        self._degraded = False
+        custom_log("SUCCESS", "Redis 已恢复，退出降级模式")
+        client = self._client
+        for callback in self._recovery_callbacks:
+            try:
+                callback(client)
+            except Exception as exc:
+                custom_log("ERROR", f"Redis 恢复回调执行失败: {exc}")
+
     def _monitor_loop(self) -> None:
         """后台线程：定期检查连接健康，断开时自动重连。"""
         retry_interval = _INITIAL_RETRY_INTERVAL
         while not self._stop_event.is_set():
-            # 每 10 秒做一次心跳检测
-            self._stop_event.wait(timeout=10)
+            self._wake.wait(timeout=_HEARTBEAT_INTERVAL)
+            self._wake.clear()
             if self._stop_event.is_set():
                 break
-            if not self._is_alive():
-                custom_log("WARNING", "Redis 连接已断开，正在尝试重连...")
-                while not self._stop_event.is_set():
-                    if self._connect():
-                        retry_interval = _INITIAL_RETRY_INTERVAL
-                        break
-                    custom_log(
-                        "WARNING",
-                        f"Redis 重连失败，{retry_interval} 秒后重试...",
-                    )
-                    self._stop_event.wait(timeout=retry_interval)
-                    retry_interval = min(retry_interval * 2, _MAX_RETRY_INTERVAL)
+            if self._is_alive():
+                if self._degraded:
+                    self._recover()
+                continue
+            self._degraded = True
+            custom_log("WARNING", "Redis 连接已断开，正在尝试重连...")
+            while not self._stop_event.is_set():
+                if self._connect():
+                    retry_interval = _INITIAL_RETRY_INTERVAL
+                    self._recover()
+                    break
+                custom_log(
+                    "WARNING",
+                    f"Redis 重连失败，{retry_interval} 秒后重试...",
+                )
+                self._stop_event.wait(timeout=retry_interval)
+                retry_interval = min(retry_interval * 2, _MAX_RETRY_INTERVAL)
 
 
 # 全局单例
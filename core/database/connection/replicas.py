@@ -0,0 +1,281 @@
+"""只读副本（read replica）路由。
+
+配置 ``DATABASE_REPLICA_URLS`` 后，``get_session(readonly=True)`` /
+``get_async_session(readonly=True)`` 打开的 Session 会路由到副本，其余 Session
+仍连接主库（``DATABASE_URL``）：
+
+==============================  ===========  =====================================
+环境变量                         默认值        说明
+==============================  ===========  =====================================
+``DATABASE_REPLICA_URLS``        （空）        副本连接字符串，逗号分隔；为空时全部走主库
+``DB_REPLICA_STRATEGY``          round_robin  副本选择策略：round_robin / least_connections
+``DB_READ_YOUR_WRITES_WINDOW``   5            写入后该秒数内，同一客户端的只读 Session 仍走主库
+``DB_REPLICA_RETRY_INTERVAL``    30           副本连接失败后暂停使用的秒数
+==============================  ===========  =====================================
+
+读己之写（read-your-writes）按 ``contextvars`` 上下文跟踪：同一个请求（同一个
+asyncio 任务，或同一次线程池调用）内写入主库后，之后的读取不会落到可能尚未
+同步的副本上。跨请求时（例如 POST 之后重定向到 GET），由
+``ReadYourWritesMiddleware``（``core.middleware.replicas``）把本次请求的写入时刻
+写入 cookie，客户端下一个请求带回后经 :func:`track_writes` 恢复，窗口期内仍读主库。
+
+副本在打开 Session 时即取用连接，连接失败时该副本在 ``DB_REPLICA_RETRY_INTERVAL``
+秒内不再被选中，本次读取依次尝试其余副本，全部不可用时回退到主库。
+"""
+
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+
+from core.database.connection.pool import PoolMetrics, _env_float
+from core.helper.ContainerCustomLog.index import custom_log
+
+_STRATEGIES = ("round_robin", "least_connections")
+
+# 当前上下文最近一次写入主库的时刻（Unix 时间戳，需与客户端带回的 cookie 比较，不用 monotonic）
+_last_write: ContextVar[float | None] = ContextVar("db_last_write", default=None)
+
+
+class WriteRecord:
+    """一次请求内的写入记录，由 :func:`track_writes` 创建。
+
+    线程池中执行的同步路由运行在复制出的上下文里，对 ``_last_write`` 的修改
+    传不回请求所在的上下文；写入时刻因此同时记在这个共享对象上。
+    """
+
+    __slots__ = ("last_write",)
+
+    def __init__(self) -> None:
+        # 本次请求最近一次写入主库的时刻，未写入时为 None
+        self.last_write: float | None = None
+
+
+_request_writes: ContextVar[WriteRecord | None] = ContextVar("db_request_writes", default=None)
+
+
+def mark_write() -> None:
+    """记录当前上下文刚写入主库，开始读己之写窗口。"""
+    now = time.time()
+    _last_write.set(now)
+    record = _request_writes.get()
+    if record is not None:
+        record.last_write = now
+
+
+def in_write_window(window: float) -> bool:
+    """当前上下文是否处于最近一次写入后的 ``window`` 秒内。"""
+    last = _last_write.get()
+    return last is not None and 0 <= time.time() - last < window
+
+
+@contextmanager
+def track_writes(carried: float | None = None) -> Iterator[WriteRecord]:
+    """在一次请求内跟踪写入。
+
+    Args:
+        carried: 客户端带回的上一次写入时刻（已确认在窗口内），请求开始时即按该时刻判断窗口。
+
+    Yields:
+        本次请求的 :class:`WriteRecord`，请求结束后据此决定是否把写入时刻交给客户端。
+    """
+    record = WriteRecord()
+    last_token = _last_write.set(carried)
+    record_token = _request_writes.set(record)
+    try:
+        yield record
+    finally:
+        _request_writes.reset(record_token)
+        _last_write.reset(last_token)
+
+
+@dataclass(frozen=True)
+class ReplicaSettings:
+    """副本路由参数，见模块文档。"""
+
+    urls: tuple[str, ...] = ()
+    strategy: str = "round_robin"
+    read_your_writes_window: float = 5
+    retry_interval: float = 30
+
+    @classmethod
+    def from_env(cls) -> "ReplicaSettings":
+        """从环境变量读取副本路由参数，取值非法时抛出 EnvironmentError。"""
+        raw = os.environ.get("DATABASE_REPLICA_URLS", "")
+        strategy = os.environ.get("DB_REPLICA_STRATEGY", cls.strategy).strip().lower()
+        if strategy not in _STRATEGIES:
+            raise EnvironmentError(
+                f"环境变量 DB_REPLICA_STRATEGY 必须为 {' / '.join(_STRATEGIES)}，"
+                f"当前值: {strategy!r}"
+            )
+        return cls(
+            urls=tuple(url.strip() for url in raw.split(",") if url.strip()),
+            strategy=strategy,
+            read_your_writes_window=_env_float(
+                "DB_READ_YOUR_WRITES_WINDOW", cls.read_your_writes_window
+            ),
+            retry_interval=_env_float("DB_REPLICA_RETRY_INTERVAL", cls.retry_interval),
+        )
+
+
+class Replica:
+    """单个副本：延迟创建的同步 / 异步 Session 工厂、进行中的 Session 数与健康状态。"""
+
+    def __init__(self, index: int, url: str) -> None:
+        self.index = index
+        self.url = url
+        self.metrics = PoolMetrics(f"replica{index}")
+        self.async_metrics = PoolMetrics(f"replica{index}-async")
+        self.session_factory = None
+        self.async_session_factory = None
+        # 进行中的 Session 数（least_connections 策略依据）
+        self.in_flight = 0
+        # 在该时刻（monotonic）之前不再选中此副本
+        self.unhealthy_until = 0.0
+        self.reads = 0
+        self.failures = 0
+
+    def is_healthy(self, now: float) -> bool:
+        return now >= self.unhealthy_until
+
+
+class ReplicaRouter:
+    """按策略为只读 Session 选择副本，并记录路由统计。
+
+    Args:
+        settings: 副本路由参数。
+        make_session_factory: ``(url, metrics) -> sessionmaker``，创建副本的同步 Session 工厂。
+        make_async_session_factory: 同上，创建异步 Session 工厂。
+    """
+
+    def __init__(
+        self,
+        settings: ReplicaSettings,
+        make_session_factory: Callable[[str, PoolMetrics], Any],
+        make_async_session_factory: Callable[[str, PoolMetrics], Any],
+    ) -> None:
+        self.settings = settings
+        self.replicas = [Replica(i, url) for i, url in enumerate(settings.urls)]
+        self._make_session_factory = make_session_factory
+        self._make_async_session_factory = make_async_session_factory
+        self._lock = threading.Lock()
+        self._round_robin = itertools.count()
+        self.sticky_reads = 0
+        self.fallback_reads = 0
+
+    # ------------------------------------------------------------------
+    # 选择副本
+    # ------------------------------------------------------------------
+
+    def candidates(self) -> list[Replica]:
+        """按策略排序的健康副本列表；处于读己之写窗口内或没有健康副本时返回空列表。"""
+        if not self.replicas:
+            return []
+        if in_write_window(self.settings.read_your_writes_window):
+            with self._lock:
+                self.sticky_reads += 1
+            return []
+        now = time.monotonic()
+        with self._lock:
+            healthy = [r for r in self.replicas if r.is_healthy(now)]
+            if not healthy:
+                self.fallback_reads += 1
+                return []
+            if self.settings.strategy == "least_connections":
+                return sorted(healthy, key=lambda r: r.in_flight)
+            start = next(self._round_robin) % len(healthy)
+            return healthy[start:] + healthy[:start]
+
+    def session_factory(self, replica: Replica, use_async: bool):
+        """返回副本的 Session 工厂，首次使用时创建引擎。"""
+        with self._lock:
+            if use_async:
+                if replica.async_session_factory is None:
+                    replica.async_session_factory = self._make_async_session_factory(
+                        replica.url, replica.async_metrics
+                    )
+                return replica.async_session_factory
+            if replica.session_factory is None:
+                replica.session_factory = self._make_session_factory(replica.url, replica.metrics)
+            return replica.session_factory
+
+    # ------------------------------------------------------------------
+    # 生命周期回调
+    # ------------------------------------------------------------------
+
+    def dispose(self) -> None:
+        """释放所有副本的同步连接池。"""
+        with self._lock:
+            factories = [r.session_factory for r in self.replicas if r.session_factory]
+            for replica in self.replicas:
+                replica.session_factory = None
+        for factory in factories:
+            factory.kw["bind"].dispose()
+
+    async def dispose_async(self) -> None:
+        """释放所有副本的异步连接池。"""
+        with self._lock:
+            factories = [r.async_session_factory for r in self.replicas if r.async_session_factory]
+            for replica in self.replicas:
+                replica.async_session_factory = None
+        for factory in factories:
+            await factory.kw["bind"].dispose()
+
+    def acquire(self, replica: Replica) -> None:
+        with self._lock:
+            replica.in_flight += 1
+
+    def release(self, replica: Replica, ok: bool = True) -> None:
+        with self._lock:
+            replica.in_flight -= 1
+            if ok:
+                replica.reads += 1
+
+    def mark_unhealthy(self, replica: Replica, exc: BaseException) -> None:
+        """副本连接失败：在重试间隔内不再选中。"""
+        with self._lock:
+            replica.failures += 1
+            replica.unhealthy_until = time.monotonic() + self.settings.retry_interval
+        custom_log(
+            "WARNING",
+            f"[DB] 只读副本 #{replica.index} 连接失败，{self.settings.retry_interval:g} 秒内改用其他副本或主库: {exc}",
+        )
+
+    def record_fallback(self) -> None:
+        """记录一次因候选副本均连接失败而回退到主库的读取。"""
+        with self._lock:
+            self.fallback_reads += 1
+
+    # ------------------------------------------------------------------
+    # 读取
+    # ------------------------------------------------------------------
+
+    def stats(self) -> dict[str, Any]:
+        """返回路由统计与各副本的健康状态、连接池统计。"""
+        now = time.monotonic()
+        with self._lock:
+            replicas = [
+                {
+                    "index": r.index,
+                    "healthy": r.is_healthy(now),
+                    "in_flight": r.in_flight,
+                    "reads": r.reads,
+                    "failures": r.failures,
+                }
+                for r in self.replicas
+            ]
+            summary = {
+                "strategy": self.settings.strategy,
+                "sticky_reads": self.sticky_reads,
+                "fallback_reads": self.fallback_reads,
+            }
+        for entry, replica in zip(replicas, self.replicas):
+            entry["pool"] = {
+                "sync": replica.metrics.stats(),
+                "async": replica.async_metrics.stats(),
+            }
+        return {**summary, "replicas": replicas}
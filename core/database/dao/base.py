@@ -1,8 +1,117 @@
-from typing import Any, ClassVar, Type
+from itertools import islice
+from operator import attrgetter, itemgetter
+from typing import Any, AsyncIterator, ClassVar, Iterable, Iterator, Sequence, Type
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Column,
+    ColumnElement,
+    Select,
+    and_,
+    any_,
+    bindparam,
+    cast,
+    column,
+    delete,
+    false,
+    insert,
+    literal,
+    or_,
+    select,
+    true,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.sql import Executable
 
-from core.database.connection.db import Base, get_session
+from core.database.connection.db import Base, get_async_session, get_session
+from core.helper.PageCursor.index import get_page_cursor
+
+# 单条语句最多可绑定的参数个数（PostgreSQL 协议上限，asyncpg 超出时直接报错）
+_MAX_BIND_PARAMS = 32767
+
+
+class _ModelSerializer:
+    """单个 ORM 模型的列映射与行转换函数，每个模型只构建一次（见 :func:`_serializer_for`）。
+
+    ``columns`` 为数据库列名，``attrs`` 为对应的 ORM 属性名（如 users 表的
+    ``class`` 列对应 ``User.class_``），两者顺序一致。
+    """
+
+    def __init__(self, model: Type[Base]) -> None:
+        props = list(model.__mapper__.column_attrs)
+        self.columns: tuple[str, ...] = tuple(p.columns[0].name for p in props)
+        self.attrs: tuple[str, ...] = tuple(p.key for p in props)
+        self.column_set = frozenset(self.columns)
+        self.col_to_attr = dict(zip(self.columns, self.attrs))
+        self.attr_to_col = dict(zip(self.attrs, self.columns))
+        self.table_name: str = model.__table__.name
+        # 与 columns 顺序一致的 Column 对象，select(*select_columns) 的结果行可直接按位置转换
+        self.select_columns: tuple[Column, ...] = tuple(p.columns[0] for p in props)
+        # attrgetter / itemgetter 只有一个键时返回标量而非元组
+        if len(self.attrs) > 1:
+            self._get_loaded = itemgetter(*self.attrs)
+            self._get_attrs = attrgetter(*self.attrs)
+        else:
+            loaded, attrs = itemgetter(*self.attrs), attrgetter(*self.attrs)
+            self._get_loaded = lambda d: (loaded(d),)
+            self._get_attrs = lambda obj: (attrs(obj),)
+
+    def to_dict(self, obj: Base) -> dict[str, Any]:
+        """ORM 实例 → 以列名为键的字典。
+
+        已加载的列直接从实例 ``__dict__`` 读取，绕过属性描述符；有列已过期或
+        未加载时改用 ``getattr``，由 ORM 按需加载。
+        """
+        try:
+            values = self._get_loaded(obj.__dict__)
+        except KeyError:
+            values = self._get_attrs(obj)
+        return dict(zip(self.columns, values))
+
+    def projection(self, fields: Iterable[str] | str | None) -> tuple[tuple[str, ...], tuple[Column, ...]]:
+        """按 ``fields`` 选取列，返回 (列名, Column)，顺序与 ``fields`` 一致。
+
+        ``fields`` 可以是列名或 ORM 属性名（``class`` / ``class_`` 均可），也可以是逗号
+        分隔的字符串；None 表示全部列。字段不存在或为空时抛出 ValueError。
+        """
+        if fields is None:
+            return self.columns, self.select_columns
+        if isinstance(fields, str):
+            fields = [f.strip() for f in fields.split(",") if f.strip()]
+        names: dict[str, Column] = {}
+        by_name = dict(zip(self.columns, self.select_columns))
+        for field in fields:
+            name = field if field in self.column_set else self.attr_to_col.get(field)
+            if name is None:
+                raise ValueError(f"{self.table_name} 表不存在字段: {field}")
+            names.setdefault(name, by_name[name])
+        if not names:
+            raise ValueError("fields 不能为空")
+        return tuple(names), tuple(names.values())
+
+    def rows_to_dicts(
+        self, rows: Iterable[Sequence[Any]], names: Sequence[str] | None = None
+    ) -> list[dict[str, Any]]:
+        """``select(*columns)`` 的结果行 → 字典列表（不经 ORM 实例与 identity map）。
+
+        ``names`` 为所选列的列名，默认为全部列。
+        """
+        columns = self.columns if names is None else names
+        return [dict(zip(columns, row)) for row in rows]
+
+
+_serializers: dict[type, _ModelSerializer] = {}
+
+
+def _serializer_for(model: Type[Base]) -> _ModelSerializer:
+    """返回模型的 :class:`_ModelSerializer`，首次调用时构建并缓存。"""
+    serializer = _serializers.get(model)
+    if serializer is None:
+        serializer = _serializers[model] = _ModelSerializer(model)
+    return serializer
 
 
 class BaseDAO:
@@ -11,15 +120,39 @@ class BaseDAO:
     子类只需声明 :attr:`MODEL` 属性（对应 ORM 模型类），即可继承：
 
     * :meth:`find_by_uuid` – 根据 uuid 查询单条记录
-    * :meth:`find_all`     – 分页查询所有记录
+    * :meth:`find_all`     – 分页查询所有记录（OFFSET 分页）
+    * :meth:`find_page`    – 游标（keyset）分页查询，支持排序与过滤
     * :meth:`create`       – 插入新记录
     * :meth:`update`       – 根据 uuid 更新记录
     * :meth:`delete`       – 根据 uuid 删除记录
+
+    每个方法都有对应的 ``*_async`` 版本（如 :meth:`find_by_uuid_async`），
+    基于 :func:`get_async_session`，供 ``async def`` 路由使用；两者共用同一组
+    语句构造方法，查询语义与返回值完全一致。
+
+    只读方法（``find_*``）使用 ``get_session(readonly=True)``，配置了只读副本时
+    由副本承担；写方法始终使用主库。
+
+    批量方法 :meth:`create_many` / :meth:`update_many` / :meth:`upsert_many` /
+    :meth:`delete_many` 在同一个事务中按 ``chunk_size`` 分块执行多行语句，
+    以 :attr:`KEY_COLUMN` 定位记录。
+
+    :meth:`stream` / :meth:`iter_all` 通过服务端游标分批读取整张表，内存占用只与
+    ``batch_size`` 有关，供导出等全表扫描使用。
     """
 
     #: 子类必须将此属性设置为对应的 SQLAlchemy ORM 模型类。
     MODEL: ClassVar[Type[Base]]
 
+    #: 批量方法定位记录所用的唯一列（数据库列名）。
+    KEY_COLUMN: ClassVar[str] = "uuid"
+
+    #: 批量方法的默认分块大小（每条语句处理的行数）。
+    BULK_CHUNK_SIZE: ClassVar[int] = 1000
+
+    #: 流式读取的默认批大小（服务端游标每次取回的行数）。
+    STREAM_BATCH_SIZE: ClassVar[int] = 1000
+
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
@@ -33,51 +166,459 @@ class BaseDAO:
             )
         return model
 
+    def _serializer(self) -> _ModelSerializer:
+        return _serializer_for(self._get_model())
+
     @staticmethod
     def _to_dict(obj) -> dict[str, Any]:
         """将 ORM 实例转换为以数据库列名为键的字典。"""
         if obj is None:
             return {}
-        return {
-            col_prop.columns[0].name: getattr(obj, col_prop.key)
-            for col_prop in type(obj).__mapper__.column_attrs
-        }
+        return _serializer_for(type(obj)).to_dict(obj)
 
     @classmethod
     def _data_to_kwargs(cls, data: dict[str, Any]) -> dict[str, Any]:
         """将数据库列名字典转换为 ORM 模型属性名字典（处理列名与属性名不同的情况）。"""
-        col_to_attr = {
-            col_prop.columns[0].name: col_prop.key
-            for col_prop in cls.MODEL.__mapper__.column_attrs
-        }
+        col_to_attr = _serializer_for(cls.MODEL).col_to_attr
         return {col_to_attr.get(k, k): v for k, v in data.items()}
 
+    def _rows_to_dicts(
+        self, rows: Iterable[Sequence[Any]], fields: Iterable[str] | str | None = None
+    ) -> list[dict[str, Any]]:
+        """将 :meth:`_select_rows` 的结果行转换为字典列表，``fields`` 须与查询时一致。"""
+        serializer = self._serializer()
+        names = None if fields is None else serializer.projection(fields)[0]
+        return serializer.rows_to_dicts(rows, names)
+
     # ------------------------------------------------------------------
-    # CRUD
+    # Statement builders（同步与异步方法共用）
     # ------------------------------------------------------------------
 
-    def find_by_uuid(self, uuid: str) -> dict[str, Any] | None:
-        """根据 uuid 查询单条记录，不存在时返回 None。"""
+    def _select_rows(self, fields: Iterable[str] | str | None = None) -> Select:
+        """按列查询（结果为 Core 行而非 ORM 实例），用 :meth:`_rows_to_dicts` 转换。
+
+        只读方法返回的是字典，不需要 ORM 实例：跳过实例构建与 identity map，
+        每行的开销约为 ``select(model)`` + :meth:`_to_dict` 的一半以下。
+        ``fields`` 只查询指定的列（见 :meth:`_ModelSerializer.projection`）。
+        """
+        return select(*self._serializer().projection(fields)[1])
+
+    def _select_by_uuid(self, uuid: str, fields: Iterable[str] | str | None = None) -> Select:
         model = self._get_model()
-        with get_session() as session:
-            obj = session.scalars(
-                select(model).where(model.uuid == uuid)
-            ).first()
-            return self._to_dict(obj) if obj else None
+        return self._select_rows(fields).where(model.uuid == uuid)
 
-    def find_all(self, limit: int = 100, offset: int = 0) -> list[dict[str, Any]]:
-        """分页查询所有记录，默认返回前 100 条。"""
+    def _select_page(
+        self, limit: int, offset: int, fields: Iterable[str] | str | None = None
+    ) -> Select:
         model = self._get_model()
-        with get_session() as session:
-            objs = session.scalars(
-                select(model).order_by(model.id).limit(limit).offset(offset)
+        return self._select_rows(fields).order_by(model.id).limit(limit).offset(offset)
+
+    def _resolve_column(self, name: str) -> Column:
+        """按列名或 ORM 属性名查找列，不存在时抛出 ValueError。"""
+        model = self._get_model()
+        table = model.__table__
+        if name in table.c:
+            return table.c[name]
+        prop = model.__mapper__.column_attrs.get(name)
+        if prop is None:
+            raise ValueError(f"{table.name} 表不存在字段: {name}")
+        return prop.columns[0]
+
+    def _order_keys(self, order_by: Sequence[str]) -> list[tuple[Column, bool]]:
+        """解析排序字段（``"-"`` 前缀表示降序），末尾补上 id 保证顺序唯一。"""
+        keys = []
+        for spec in order_by:
+            descending = spec.startswith("-")
+            keys.append((self._resolve_column(spec.lstrip("-")), descending))
+        table = self._get_model().__table__
+        if not any(col is table.c.id for col, _ in keys):
+            keys.append((table.c.id, keys[-1][1] if keys else False))
+        return keys
+
+    def _filter_clauses(self, filters: dict[str, Any] | None) -> list[ColumnElement]:
+        """等值过滤：列表 / 元组为 IN，None 为 IS NULL。"""
+        clauses = []
+        for name, value in (filters or {}).items():
+            col = self._resolve_column(name)
+            if isinstance(value, (list, tuple, set, frozenset)):
+                clauses.append(col.in_(list(value)))
+            elif value is None:
+                clauses.append(col.is_(None))
+            else:
+                clauses.append(col == value)
+        return clauses
+
+    @staticmethod
+    def _after(col: Column, descending: bool, value: Any) -> ColumnElement:
+        """排在 ``value`` 之后的行（PostgreSQL 默认升序 NULLS LAST、降序 NULLS FIRST）。"""
+        if value is None:
+            return false() if not descending else col.is_not(None)
+        if descending:
+            return col < value
+        return or_(col > value, col.is_(None)) if col.nullable else col > value
+
+    def _keyset_condition(self, keys: list[tuple[Column, bool]], after: list[Any]) -> ColumnElement:
+        """游标之后的行：``(k1, k2, ...) > (v1, v2, ...)``，方向不一致或涉及 NULL 时展开为 OR。"""
+        directions = {descending for _, descending in keys}
+        if (
+            len(directions) == 1
+            and None not in after
+            and (True in directions or not any(col.nullable for col, _ in keys))
+        ):
+            # 行值比较可以直接利用 (k1, k2, ...) 上的索引
+            left = tuple_(*(col for col, _ in keys))
+            right = tuple_(*(literal(v, col.type) for (col, _), v in zip(keys, after)))
+            return left < right if True in directions else left > right
+        branches = []
+        for i, (col, descending) in enumerate(keys):
+            equal = [
+                prev.is_(None) if v is None else prev == v
+                for (prev, _), v in zip(keys[:i], after[:i])
+            ]
+            branches.append(and_(*equal, self._after(col, descending, after[i])))
+        return or_(*branches) if branches else true()
+
+    def _select_keyset(
+        self,
+        keys: list[tuple[Column, bool]],
+        after: list[Any] | None,
+        limit: int,
+        filters: dict[str, Any] | None,
+        fields: Iterable[str] | str | None = None,
+    ) -> Select:
+        stmt = (
+            self._select_rows(fields)
+            .where(*self._filter_clauses(filters))
+            .order_by(*(col.desc() if descending else col.asc() for col, descending in keys))
+            .limit(limit + 1)
+        )
+        if after is not None:
+            stmt = stmt.where(self._keyset_condition(keys, after))
+        return stmt
+
+    def _select_stream(
+        self,
+        order_by: Sequence[str],
+        filters: dict[str, Any] | None,
+        batch_size: int,
+        fields: Iterable[str] | str | None = None,
+    ) -> Select:
+        """全表流式读取：按列读取（不经 ORM 实例与 identity map），以服务端游标分批取回。"""
+        keys = self._order_keys(order_by)
+        return (
+            self._select_rows(fields)
+            .where(*self._filter_clauses(filters))
+            .order_by(*(col.desc() if descending else col.asc() for col, descending in keys))
+            .execution_options(yield_per=batch_size)
+        )
+
+    def _page_query(
+        self,
+        after: str | None,
+        limit: int,
+        order_by: Sequence[str],
+        filters: dict[str, Any] | None,
+        fields: Iterable[str] | str | None = None,
+    ) -> tuple[Select, list[tuple[Column, bool]], str, tuple[str, ...], tuple[str, ...]]:
+        """构造游标分页语句，返回 (语句, 排序键, 游标作用域, 查询的列, 仅用于游标的列)。
+
+        ``fields`` 未包含的排序键也会查询（用于生成下一页游标），返回前由
+        :meth:`_page_result` 去掉。
+        """
+        keys = self._order_keys(order_by)
+        names = self._serializer().projection(fields)[0]
+        extra = tuple(col.name for col, _ in keys if col.name not in names)
+        table = self._get_model().__table__
+        scope = table.name + ":" + ",".join(
+            ("-" if descending else "") + col.name for col, descending in keys
+        )
+        values_after = None
+        if after is not None:
+            values_after = get_page_cursor().decode(after, scope)
+            if len(values_after) != len(keys):
+                raise ValueError("无效的分页游标")
+        stmt = self._select_keyset(keys, values_after, limit, filters, names + extra)
+        return stmt, keys, scope, names + extra, extra
+
+    @staticmethod
+    def _page_result(
+        rows: list[dict[str, Any]],
+        keys: list[tuple[Column, bool]],
+        scope: str,
+        limit: int,
+        extra: tuple[str, ...] = (),
+    ) -> dict[str, Any]:
+        items = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = get_page_cursor().encode(scope, [last[col.name] for col, _ in keys])
+        for item in items if extra else ():
+            for name in extra:
+                del item[name]
+        return {"items": items, "next_cursor": next_cursor}
+
+    def _new_instance(self, data: dict[str, Any]) -> Base:
+        return self._get_model()(**self._data_to_kwargs(data))
+
+    def _column_values(self, data: dict[str, Any]) -> dict[str, Any]:
+        """将数据字典（键为列名或 ORM 属性名）转换为以列名为键的字典，忽略不存在的字段。"""
+        serializer = self._serializer()
+        columns, attr_to_col = serializer.column_set, serializer.attr_to_col
+        result = {}
+        for k, v in data.items():
+            name = k if k in columns else attr_to_col.get(k)
+            if name is not None:
+                result[name] = v
+        return result
+
+    def _update_returning(self, key: str, value: Any, data: dict[str, Any]) -> Executable:
+        """``UPDATE ... WHERE key = :value RETURNING *``，一次往返完成更新并取回整行。
+
+        没有可更新的字段时退化为按键查询当前行（与逐字段赋值后 refresh 的结果一致）。
+        """
+        table = self._get_model().__table__
+        changes = self._column_values(data)
+        if not changes:
+            return select(*table.c).where(table.c[key] == value)
+        return update(table).where(table.c[key] == value).values(changes).returning(*table.c)
+
+    def _delete_returning(self, key: str, value: Any) -> Executable:
+        """``DELETE ... WHERE key = :value RETURNING id``，据返回行判断是否删除成功。"""
+        table = self._get_model().__table__
+        return delete(table).where(table.c[key] == value).returning(table.c.id)
+
+    # ------------------------------------------------------------------
+    # Bulk statement builders（同步与异步方法共用）
+    #
+    # 每个批次为 (indices, stmt, params)：indices 为该批次各行在输入中的位置，
+    # params 为 executemany 参数（None 表示语句已内联参数）。
+    # ------------------------------------------------------------------
+
+    def _bulk_groups(
+        self, rows: Iterable[dict[str, Any]], chunk_size: int
+    ) -> Iterator[tuple[tuple[str, ...], list[int], list[dict[str, Any]]]]:
+        """按 ``chunk_size`` 分块，块内再按字段集合分组（同一条语句的各行字段必须一致）。
+
+        行的键可以是列名或 ORM 属性名（如 ``class_``），分组前统一转换为列名。
+        """
+        table = self._get_model().__table__
+        serializer = self._serializer()
+        iterator = iter(rows)
+        offset = 0
+        while chunk := list(islice(iterator, chunk_size)):
+            groups: dict[tuple[str, ...], tuple[list[int], list[dict[str, Any]]]] = {}
+            for i, row in enumerate(chunk, start=offset):
+                if not row.keys() <= serializer.column_set:
+                    row = self._bulk_row(table, serializer, row)
+                indices, group = groups.setdefault(tuple(sorted(row)), ([], []))
+                indices.append(i)
+                group.append(row)
+            offset += len(chunk)
+            for keys, (indices, group) in groups.items():
+                yield keys, indices, group
+
+    @staticmethod
+    def _bulk_row(table, serializer: _ModelSerializer, row: dict[str, Any]) -> dict[str, Any]:
+        """把行中的 ORM 属性名转换为列名，存在无法识别的字段时抛出 ValueError。"""
+        result: dict[str, Any] = {}
+        unknown = []
+        for k, v in row.items():
+            name = k if k in serializer.column_set else serializer.attr_to_col.get(k)
+            if name is None:
+                unknown.append(k)
+            elif name in result:
+                raise ValueError(f"{table.name} 表的字段 {name} 在同一行中重复出现")
+            else:
+                result[name] = v
+        if unknown:
+            raise ValueError(f"{table.name} 表不存在字段: {', '.join(sorted(unknown))}")
+        return result
+
+    @staticmethod
+    def _dedupe(
+        key: str, indices: list[int], group: list[dict[str, Any]]
+    ) -> tuple[list[int], list[dict[str, Any]]]:
+        """同一批次内键重复的行只保留最后一行。"""
+        latest = {row[key]: (i, row) for i, row in zip(indices, group)}
+        return [i for i, _ in latest.values()], [row for _, row in latest.values()]
+
+    def _require_key(self, keys: tuple[str, ...]) -> str:
+        key = self.KEY_COLUMN
+        if key not in keys:
+            raise ValueError(f"批量更新的每一行都必须包含 {key} 字段")
+        return key
+
+    def _returning(self, stmt, returning: bool):
+        """INSERT 语句以 executemany 方式执行，``rowcount`` 只反映最后一页，不能用于计数；
+        不需要返回行时只 RETURNING 主键，由 :meth:`_count_rows` 逐行计数。"""
+        table = self._get_model().__table__
+        if returning:
+            return stmt.returning(*table.c, sort_by_parameter_order=True)
+        return stmt.returning(*table.primary_key.columns)
+
+    @staticmethod
+    def _count_rows(result) -> int:
+        return sum(1 for _ in result) if result.returns_rows else result.rowcount
+
+    def _insert_batches(
+        self, rows: Iterable[dict[str, Any]], chunk_size: int, returning: bool
+    ) -> Iterator[tuple[list[int], Executable, list[dict[str, Any]]]]:
+        table = self._get_model().__table__
+        stmt = self._returning(insert(table), returning)
+        for _, indices, group in self._bulk_groups(rows, chunk_size):
+            yield indices, stmt, group
+
+    def _upsert_batches(
+        self, rows: Iterable[dict[str, Any]], chunk_size: int, returning: bool
+    ) -> Iterator[tuple[list[int], Executable, list[dict[str, Any]]]]:
+        table = self._get_model().__table__
+        for keys, indices, group in self._bulk_groups(rows, chunk_size):
+            key = self._require_key(keys)
+            # 同一条 INSERT ... ON CONFLICT 不能两次更新同一行
+            indices, group = self._dedupe(key, indices, group)
+            stmt = pg_insert(table)
+            updates = {k: stmt.excluded[k] for k in keys if k != key}
+            if updates:
+                stmt = stmt.on_conflict_do_update(index_elements=[key], set_=updates)
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=[key])
+            yield indices, self._returning(stmt, returning), group
+
+    def _update_batches(
+        self, rows: Iterable[dict[str, Any]], chunk_size: int, returning: bool
+    ) -> Iterator[tuple[list[tuple[int, Any]], Executable, None]]:
+        """``UPDATE t SET ... FROM (VALUES ...) AS v WHERE t.key = v.key``，每组一条语句。
+
+        UPDATE 的 RETURNING 不保证顺序且不返回未命中的行，批次位置信息为
+        ``(输入位置, 键值)``，由 :meth:`_order_rows` 按键值对应。
+
+        VALUES 中每行每列各绑定一个参数，分块大小不超过 ``_MAX_BIND_PARAMS // 列数``。
+        """
+        table = self._get_model().__table__
+        chunk_size = min(chunk_size, max(1, _MAX_BIND_PARAMS // len(table.c)))
+        for keys, indices, group in self._bulk_groups(rows, chunk_size):
+            key = self._require_key(keys)
+            if len(keys) == 1:
+                continue
+            indices, group = self._dedupe(key, indices, group)
+            v = values(*(column(k, table.c[k].type) for k in keys), name="v").data(
+                [tuple(row[k] for k in keys) for row in group]
+            )
+            # VALUES 中的参数类型由 PostgreSQL 推断（JSON 会被当作 text），显式转换为列类型
+            stmt = (
+                update(table)
+                .where(table.c[key] == cast(v.c[key], table.c[key].type))
+                .values({k: cast(v.c[k], table.c[k].type) for k in keys if k != key})
             )
-            return [self._to_dict(o) for o in objs]
+            if returning:
+                stmt = stmt.returning(*table.c)
+            yield [(i, row[key]) for i, row in zip(indices, group)], stmt, None
+
+    def _delete_batches(
+        self, keys: Iterable[Any], chunk_size: int
+    ) -> Iterator[Executable]:
+        """``DELETE FROM t WHERE key = ANY(:keys)``，每块一条语句。"""
+        table = self._get_model().__table__
+        key = table.c[self.KEY_COLUMN]
+        iterator = iter(keys)
+        while chunk := list(islice(iterator, chunk_size)):
+            yield delete(table).where(
+                key == any_(bindparam("keys", chunk, type_=ARRAY(key.type)))
+            )
+
+    def _order_rows(self, batches: list[tuple[list, list[dict[str, Any]]]], by_key: bool) -> list[dict[str, Any]]:
+        """把各批次返回的行按输入顺序排列。
+
+        ``by_key`` 为 False 时批次位置信息与返回行一一对应；为 True 时位置信息
+        为 ``(输入位置, 键值)``，按 :attr:`KEY_COLUMN` 与返回行对应。
+        """
+        ordered: list[tuple[int, dict[str, Any]]] = []
+        key = self.KEY_COLUMN
+        for indices, rows in batches:
+            if by_key:
+                by_value = {row[key]: row for row in rows}
+                ordered.extend(
+                    (i, by_value[value]) for i, value in indices if value in by_value
+                )
+            else:
+                ordered.extend(zip(indices, rows))
+        ordered.sort(key=lambda item: item[0])
+        return [row for _, row in ordered]
+
+    # ------------------------------------------------------------------
+    # 字段
+    # ------------------------------------------------------------------
+
+    def validate_fields(self, fields: Iterable[str] | str | None = None) -> tuple[str, ...]:
+        """校验 ``fields`` 并返回对应的列名，顺序与 ``fields`` 一致；None 表示全部列。
+
+        写法与只读方法的 ``fields`` 参数相同，供需要在查询之前校验字段的调用方使用
+        （如流式导出在响应开始前校验）。字段不存在或为空时抛出 ValueError。
+        """
+        return self._serializer().projection(fields)[0]
+
+    # ------------------------------------------------------------------
+    # CRUD
+    # ------------------------------------------------------------------
+
+    def find_by_uuid(self, uuid: str, fields: Iterable[str] | str | None = None) -> dict[str, Any] | None:
+        """根据 uuid 查询单条记录，不存在时返回 None。
+
+        所有 ``find_*`` / 流式读取方法都接受 ``fields``：只查询并返回指定的列（列名或
+        ORM 属性名，如 ``("uuid", "nickname")``），字段不存在时抛出 ValueError。
+        """
+        with get_session(readonly=True) as session:
+            rows = self._rows_to_dicts(session.execute(self._select_by_uuid(uuid, fields)), fields)
+            return rows[0] if rows else None
+
+    def find_all(
+        self, limit: int = 100, offset: int = 0, fields: Iterable[str] | str | None = None
+    ) -> list[dict[str, Any]]:
+        """分页查询所有记录，默认返回前 100 条。
+
+        OFFSET 越大越慢（数据库需要扫描并丢弃前 offset 行），大表翻页请使用 :meth:`find_page`。
+        """
+        with get_session(readonly=True) as session:
+            stmt = self._select_page(limit, offset, fields)
+            return self._rows_to_dicts(session.execute(stmt), fields)
+
+    def find_page(
+        self,
+        after: str | None = None,
+        limit: int = 100,
+        order_by: Sequence[str] = ("id",),
+        filters: dict[str, Any] | None = None,
+        fields: Iterable[str] | str | None = None,
+    ) -> dict[str, Any]:
+        """游标（keyset）分页查询，翻到任意深度的耗时都与第一页相同。
+
+        Args:
+            after: 上一页返回的 ``next_cursor``，None 表示第一页。
+            limit: 每页条数。
+            order_by: 排序字段（列名或 ORM 属性名），``"-"`` 前缀表示降序，
+                如 ``("-sent_at", "-id")``；未包含 id 时自动追加。
+            filters: 等值过滤条件 ``{字段: 值}``，值为列表时为 IN，为 None 时为 IS NULL。
+            fields: 只返回指定的列，None 为全部列。
+
+        Returns:
+            ``{"items": [...], "next_cursor": str | None}``；``next_cursor`` 为签名的
+            不透明字符串，None 表示没有下一页。
+
+        Raises:
+            InvalidCursorError: 游标被篡改，或与本次查询的表 / 排序方式不一致。
+            ValueError: 排序、过滤或返回字段不存在。
+            TypeError: 排序字段的类型无法编码进游标（支持字符串、数值、Decimal、
+                UUID、日期时间）。
+        """
+        stmt, keys, scope, names, extra = self._page_query(after, limit, order_by, filters, fields)
+        with get_session(readonly=True) as session:
+            rows = self._rows_to_dicts(session.execute(stmt), names)
+        return self._page_result(rows, keys, scope, limit, extra)
 
     def create(self, data: dict[str, Any]) -> dict[str, Any]:
         """插入新记录并返回完整行（含数据库生成的字段）。"""
-        model = self._get_model()
-        obj = model(**self._data_to_kwargs(data))
+        obj = self._new_instance(data)
         with get_session() as session:
             session.add(obj)
             session.flush()
@@ -86,30 +627,265 @@ class BaseDAO:
 
     def update(self, uuid: str, data: dict[str, Any]) -> dict[str, Any] | None:
         """根据 uuid 更新字段，返回更新后的行，若记录不存在则返回 None。"""
-        model = self._get_model()
         with get_session() as session:
-            obj = session.scalars(
-                select(model).where(model.uuid == uuid)
-            ).first()
-            if obj is None:
-                return None
-            for k, v in self._data_to_kwargs(data).items():
-                setattr(obj, k, v)
-            session.flush()
-            session.refresh(obj)
-            return self._to_dict(obj)
+            row = session.execute(self._update_returning("uuid", uuid, data)).mappings().first()
+            return dict(row) if row else None
 
     def delete(self, uuid: str) -> bool:
         """根据 uuid 删除记录，成功删除返回 True，记录不存在返回 False。"""
-        model = self._get_model()
         with get_session() as session:
-            obj = session.scalars(
-                select(model).where(model.uuid == uuid)
-            ).first()
-            if obj is None:
-                return False
-            session.delete(obj)
-            return True
+            return session.execute(self._delete_returning("uuid", uuid)).first() is not None
+
+    # ------------------------------------------------------------------
+    # CRUD（异步）
+    # ------------------------------------------------------------------
+
+    async def find_by_uuid_async(self, uuid: str, fields: Iterable[str] | str | None = None) -> dict[str, Any] | None:
+        """:meth:`find_by_uuid` 的异步版本。"""
+        async with get_async_session(readonly=True) as session:
+            result = await session.execute(self._select_by_uuid(uuid, fields))
+            rows = self._rows_to_dicts(result, fields)
+            return rows[0] if rows else None
+
+    async def find_all_async(
+        self, limit: int = 100, offset: int = 0, fields: Iterable[str] | str | None = None
+    ) -> list[dict[str, Any]]:
+        """:meth:`find_all` 的异步版本。"""
+        async with get_async_session(readonly=True) as session:
+            result = await session.execute(self._select_page(limit, offset, fields))
+            return self._rows_to_dicts(result, fields)
+
+    async def find_page_async(
+        self,
+        after: str | None = None,
+        limit: int = 100,
+        order_by: Sequence[str] = ("id",),
+        filters: dict[str, Any] | None = None,
+        fields: Iterable[str] | str | None = None,
+    ) -> dict[str, Any]:
+        """:meth:`find_page` 的异步版本。"""
+        stmt, keys, scope, names, extra = self._page_query(after, limit, order_by, filters, fields)
+        async with get_async_session(readonly=True) as session:
+            rows = self._rows_to_dicts(await session.execute(stmt), names)
+        return self._page_result(rows, keys, scope, limit, extra)
+
+    async def create_async(self, data: dict[str, Any]) -> dict[str, Any]:
+        """:meth:`create` 的异步版本。"""
+        obj = self._new_instance(data)
+        async with get_async_session() as session:
+            session.add(obj)
+            await session.flush()
+            await session.refresh(obj)
+            return self._to_dict(obj)
+
+    async def update_async(self, uuid: str, data: dict[str, Any]) -> dict[str, Any] | None:
+        """:meth:`update` 的异步版本。"""
+        async with get_async_session() as session:
+            result = await session.execute(self._update_returning("uuid", uuid, data))
+            row = result.mappings().first()
+            return dict(row) if row else None
+
+    async def delete_async(self, uuid: str) -> bool:
+        """:meth:`delete` 的异步版本。"""
+        async with get_async_session() as session:
+            return (await session.execute(self._delete_returning("uuid", uuid))).first() is not None
+
+    # ------------------------------------------------------------------
+    # 批量 CRUD
+    # ------------------------------------------------------------------
+
+    def _run_batches(self, batches, returning: bool, by_key: bool = False) -> list[dict[str, Any]] | int:
+        """在同一个事务中依次执行各批次语句，返回按输入顺序排列的行或受影响行数。
+
+        受影响行数按 RETURNING 的行逐批累加（INSERT）或取单条语句的 ``rowcount``
+        （UPDATE / DELETE 每批只有一条语句），跨批次、跨 executemany 分页都准确。
+        """
+        collected = []
+        count = 0
+        with get_session() as session:
+            for indices, stmt, params in batches:
+                result = session.execute(stmt, params) if params is not None else session.execute(stmt)
+                if returning:
+                    collected.append((indices, [dict(row) for row in result.mappings()]))
+                else:
+                    count += self._count_rows(result)
+        return self._order_rows(collected, by_key) if returning else count
+
+    def create_many(
+        self,
+        rows: Iterable[dict[str, Any]],
+        chunk_size: int | None = None,
+        returning: bool = True,
+    ) -> list[dict[str, Any]] | int:
+        """在一个事务中批量插入（多行 ``INSERT ... RETURNING``）。
+
+        Args:
+            rows: 待插入的行（以数据库列名为键），可以是生成器，按块读取。
+            chunk_size: 每条语句插入的行数，默认 :attr:`BULK_CHUNK_SIZE`。
+            returning: 为 True 时按输入顺序返回插入后的完整行；为 False 时只返回
+                插入行数（只 RETURNING 主键计数），内存占用与总行数无关。
+        """
+        batches = self._insert_batches(rows, chunk_size or self.BULK_CHUNK_SIZE, returning)
+        return self._run_batches(batches, returning)
+
+    def update_many(
+        self,
+        rows: Iterable[dict[str, Any]],
+        chunk_size: int | None = None,
+        returning: bool = True,
+    ) -> list[dict[str, Any]] | int:
+        """在一个事务中批量更新（``UPDATE ... FROM (VALUES ...)``）。
+
+        每行须包含 :attr:`KEY_COLUMN`，其余字段为要更新的值，各行字段可以不同。
+        不存在的记录被忽略；同一块内键重复时以最后一行为准。
+
+        Returns:
+            ``returning`` 为 True 时按输入顺序返回更新后的行（不含未命中的记录），
+            否则返回更新行数。
+        """
+        batches = self._update_batches(rows, chunk_size or self.BULK_CHUNK_SIZE, returning)
+        return self._run_batches(batches, returning, by_key=True)
+
+    def upsert_many(
+        self,
+        rows: Iterable[dict[str, Any]],
+        chunk_size: int | None = None,
+        returning: bool = True,
+    ) -> list[dict[str, Any]] | int:
+        """在一个事务中批量插入或更新（``INSERT ... ON CONFLICT (key) DO UPDATE``）。
+
+        每行须包含 :attr:`KEY_COLUMN`（须有唯一约束）；已存在的记录用该行的其余
+        字段覆盖。同一块内键重复时以最后一行为准。返回值同 :meth:`create_many`；
+        行中只有键列时（``DO NOTHING``）已存在的记录不计入行数。
+        """
+        batches = self._upsert_batches(rows, chunk_size or self.BULK_CHUNK_SIZE, returning)
+        return self._run_batches(batches, returning)
+
+    def delete_many(self, keys: Iterable[Any], chunk_size: int | None = None) -> int:
+        """在一个事务中按 :attr:`KEY_COLUMN` 批量删除（``DELETE ... WHERE key = ANY(:keys)``），返回删除行数。"""
+        count = 0
+        with get_session() as session:
+            for stmt in self._delete_batches(keys, chunk_size or self.BULK_CHUNK_SIZE):
+                count += session.execute(stmt).rowcount
+        return count
+
+    # ------------------------------------------------------------------
+    # 批量 CRUD（异步）
+    # ------------------------------------------------------------------
+
+    async def _run_batches_async(self, batches, returning: bool, by_key: bool = False) -> list[dict[str, Any]] | int:
+        """:meth:`_run_batches` 的异步版本。"""
+        collected = []
+        count = 0
+        async with get_async_session() as session:
+            for indices, stmt, params in batches:
+                if params is not None:
+                    result = await session.execute(stmt, params)
+                else:
+                    result = await session.execute(stmt)
+                if returning:
+                    collected.append((indices, [dict(row) for row in result.mappings()]))
+                else:
+                    count += self._count_rows(result)
+        return self._order_rows(collected, by_key) if returning else count
+
+    async def create_many_async(
+        self,
+        rows: Iterable[dict[str, Any]],
+        chunk_size: int | None = None,
+        returning: bool = True,
+    ) -> list[dict[str, Any]] | int:
+        """:meth:`create_many` 的异步版本。"""
+        batches = self._insert_batches(rows, chunk_size or self.BULK_CHUNK_SIZE, returning)
+        return await self._run_batches_async(batches, returning)
+
+    async def update_many_async(
+        self,
+        rows: Iterable[dict[str, Any]],
+        chunk_size: int | None = None,
+        returning: bool = True,
+    ) -> list[dict[str, Any]] | int:
+        """:meth:`update_many` 的异步版本。"""
+        batches = self._update_batches(rows, chunk_size or self.BULK_CHUNK_SIZE, returning)
+        return await self._run_batches_async(batches, returning, by_key=True)
+
+    async def upsert_many_async(
+        self,
+        rows: Iterable[dict[str, Any]],
+        chunk_size: int | None = None,
+        returning: bool = True,
+    ) -> list[dict[str, Any]] | int:
+        """:meth:`upsert_many` 的异步版本。"""
+        batches = self._upsert_batches(rows, chunk_size or self.BULK_CHUNK_SIZE, returning)
+        return await self._run_batches_async(batches, returning)
+
+    async def delete_many_async(self, keys: Iterable[Any], chunk_size: int | None = None) -> int:
+        """:meth:`delete_many` 的异步版本。"""
+        count = 0
+        async with get_async_session() as session:
+            for stmt in self._delete_batches(keys, chunk_size or self.BULK_CHUNK_SIZE):
+                count += (await session.execute(stmt)).rowcount
+        return count
+
+    # ------------------------------------------------------------------
+    # 流式读取
+    # ------------------------------------------------------------------
+
+    def stream(
+        self,
+        batch_size: int | None = None,
+        order_by: Sequence[str] = ("id",),
+        filters: dict[str, Any] | None = None,
+        fields: Iterable[str] | str | None = None,
+    ) -> Iterator[list[dict[str, Any]]]:
+        """以服务端游标分批读取所有匹配的记录，每次产出一批（至多 ``batch_size`` 行）。
+
+        整个迭代过程占用一个数据库连接与一个只读事务，内存占用与总行数无关；
+        ``order_by`` / ``filters`` / ``fields`` 的写法与 :meth:`find_page` 相同。提前结束迭代
+        （``break`` 或关闭生成器）时立即释放连接。
+        """
+        stmt = self._select_stream(order_by, filters, batch_size or self.STREAM_BATCH_SIZE, fields)
+        serializer = self._serializer()
+        names = serializer.projection(fields)[0]
+        with get_session(readonly=True) as session:
+            for partition in session.execute(stmt).partitions():
+                yield serializer.rows_to_dicts(partition, names)
 
+    def iter_all(
+        self,
+        batch_size: int | None = None,
+        order_by: Sequence[str] = ("id",),
+        filters: dict[str, Any] | None = None,
+        fields: Iterable[str] | str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """逐行产出所有匹配的记录，参数与内存占用同 :meth:`stream`。"""
+        for batch in self.stream(batch_size, order_by, filters, fields):
+            yield from batch
 
+    async def stream_async(
+        self,
+        batch_size: int | None = None,
+        order_by: Sequence[str] = ("id",),
+        filters: dict[str, Any] | None = None,
+        fields: Iterable[str] | str | None = None,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """:meth:`stream` 的异步版本。"""
+        stmt = self._select_stream(order_by, filters, batch_size or self.STREAM_BATCH_SIZE, fields)
+        serializer = self._serializer()
+        names = serializer.projection(fields)[0]
+        async with get_async_session(readonly=True) as session:
+            result = await session.stream(stmt)
+            async for partition in result.partitions():
+                yield serializer.rows_to_dicts(partition, names)
 
+    async def iter_all_async(
+        self,
+        batch_size: int | None = None,
+        order_by: Sequence[str] = ("id",),
+        filters: dict[str, Any] | None = None,
+        fields: Iterable[str] | str | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """:meth:`iter_all` 的异步版本。"""
+        async for batch in self.stream_async(batch_size, order_by, filters, fields):
+            for row in batch:
+                yield row
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from sqlalchemy import Integer, Text, func
+from sqlalchemy import Index, Integer, Text, func
 from sqlalchemy.dialects.postgresql import TIMESTAMP
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -28,6 +28,10 @@ class Comment(Base):
     content: Mapped[str | None] = mapped_column(Text)
     created_at: Mapped[datetime | None] = mapped_column(TIMESTAMP, server_default=func.now())
 
+    __table_args__ = (
+        Index("idx_comments_comment_place_uuid", "comment_place_uuid"),
+    )
+
 
 class CommentsDAO(BaseDAO):
     """comments 表的数据访问对象。"""
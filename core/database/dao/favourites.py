@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from sqlalchemy import Integer, Text, func
+from sqlalchemy import Index, Integer, Text, func
 from sqlalchemy.dialects.postgresql import TIMESTAMP
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -21,6 +21,10 @@ class Favourite(Base):
     types: Mapped[str | None] = mapped_column(Text)
     created_at: Mapped[datetime | None] = mapped_column(TIMESTAMP, server_default=func.now())
 
+    __table_args__ = (
+        Index("idx_favourites_user_uuid", "user_uuid"),
+    )
+
 
 class FavouritesDAO(BaseDAO):
     """favourites 表的数据访问对象。"""
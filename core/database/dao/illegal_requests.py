@@ -1,9 +1,9 @@
 """illegal_requests 表的数据访问对象（含 ORM 模型定义）。"""
 
 from datetime import datetime
-from typing import Any
+from typing import Any, Iterable
 
-from sqlalchemy import Index, Integer, Text, func, select
+from sqlalchemy import Index, Integer, Text, func
 from sqlalchemy.dialects.postgresql import TIMESTAMP
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -29,6 +29,7 @@ class IllegalRequest(Base):
     __table_args__ = (
         Index("idx_illegal_requests_ip", "ip"),
         Index("idx_illegal_requests_happened_at", "happened_at"),
+        Index("idx_illegal_requests_user_happened_at", "user", "happened_at"),
     )
 
 
@@ -37,26 +38,34 @@ class IllegalRequestsDAO(BaseDAO):
 
     MODEL = IllegalRequest
 
-    def find_by_ip(self, ip: str, limit: int = 100) -> list[dict[str, Any]]:
+    def find_by_ip(
+        self, ip: str, limit: int = 100, fields: Iterable[str] | str | None = None
+    ) -> list[dict[str, Any]]:
         """查询指定 IP 的所有违规记录。"""
-        with get_session() as session:
-            objs = session.scalars(
-                select(IllegalRequest)
-                .where(IllegalRequest.ip == ip)
-                .order_by(IllegalRequest.happened_at.desc())
-                .limit(limit)
+        with get_session(readonly=True) as session:
+            return self._rows_to_dicts(
+                session.execute(
+                    self._select_rows(fields)
+                    .where(IllegalRequest.ip == ip)
+                    .order_by(IllegalRequest.happened_at.desc())
+                    .limit(limit)
+                ),
+                fields,
             )
-            return [self._to_dict(o) for o in objs]
 
-    def find_by_user(self, user: str, limit: int = 100) -> list[dict[str, Any]]:
+    def find_by_user(
+        self, user: str, limit: int = 100, fields: Iterable[str] | str | None = None
+    ) -> list[dict[str, Any]]:
         """查询指定用户的所有违规记录。"""
-        with get_session() as session:
-            objs = session.scalars(
-                select(IllegalRequest)
-                .where(IllegalRequest.user == user)
-                .order_by(IllegalRequest.happened_at.desc())
-                .limit(limit)
+        with get_session(readonly=True) as session:
+            return self._rows_to_dicts(
+                session.execute(
+                    self._select_rows(fields)
+                    .where(IllegalRequest.user == user)
+                    .order_by(IllegalRequest.happened_at.desc())
+                    .limit(limit)
+                ),
+                fields,
             )
-            return [self._to_dict(o) for o in objs]
 
 
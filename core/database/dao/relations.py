@@ -4,9 +4,9 @@ relations 表没有独立的 uuid 主键，使用自增 id 作为主键。
 """
 
 from datetime import datetime
-from typing import Any
+from typing import Any, Iterable
 
-from sqlalchemy import Integer, Text, func, select
+from sqlalchemy import Index, Integer, Text, func
 from sqlalchemy.dialects.postgresql import TIMESTAMP
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -25,6 +25,11 @@ class Relation(Base):
     relation_type: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[datetime | None] = mapped_column(TIMESTAMP, server_default=func.now())
 
+    __table_args__ = (
+        Index("idx_relations_tags_uuid", "tags_uuid"),
+        Index("idx_relations_related_uuid", "related_uuid"),
+    )
+
 
 class RelationsDAO(BaseDAO):
     """relations 表的数据访问对象。
@@ -33,8 +38,11 @@ class RelationsDAO(BaseDAO):
     """
 
     MODEL = Relation
+    KEY_COLUMN = "id"
 
-    def find_by_uuid(self, uuid: str) -> dict[str, Any] | None:
+    def find_by_uuid(
+        self, uuid: str, fields: Iterable[str] | str | None = None
+    ) -> dict[str, Any] | None:
         raise NotImplementedError("relations 表不包含 uuid 字段，请使用 find_by_id")
 
     def update(self, uuid: str, data: dict[str, Any]) -> dict[str, Any] | None:
@@ -43,41 +51,41 @@ class RelationsDAO(BaseDAO):
     def delete(self, uuid: str) -> bool:
         raise NotImplementedError("relations 表不包含 uuid 字段，请使用 delete_by_id")
 
-    def find_by_id(self, record_id: int) -> dict[str, Any] | None:
-        with get_session() as session:
-            obj = session.scalars(
-                select(Relation).where(Relation.id == record_id)
-            ).first()
-            return self._to_dict(obj) if obj else None
+    async def find_by_uuid_async(
+        self, uuid: str, fields: Iterable[str] | str | None = None
+    ) -> dict[str, Any] | None:
+        raise NotImplementedError("relations 表不包含 uuid 字段，请使用 find_by_id")
 
-    def find_by_tags_uuid(self, tags_uuid: str) -> list[dict[str, Any]]:
-        with get_session() as session:
-            objs = session.scalars(
-                select(Relation).where(Relation.tags_uuid == tags_uuid)
+    async def update_async(self, uuid: str, data: dict[str, Any]) -> dict[str, Any] | None:
+        raise NotImplementedError("relations 表不包含 uuid 字段，请使用 update_by_id")
+
+    async def delete_async(self, uuid: str) -> bool:
+        raise NotImplementedError("relations 表不包含 uuid 字段，请使用 delete_by_id")
+
+    def find_by_id(
+        self, record_id: int, fields: Iterable[str] | str | None = None
+    ) -> dict[str, Any] | None:
+        with get_session(readonly=True) as session:
+            rows = self._rows_to_dicts(
+                session.execute(self._select_rows(fields).where(Relation.id == record_id)),
+                fields,
+            )
+            return rows[0] if rows else None
+
+    def find_by_tags_uuid(
+        self, tags_uuid: str, fields: Iterable[str] | str | None = None
+    ) -> list[dict[str, Any]]:
+        with get_session(readonly=True) as session:
+            return self._rows_to_dicts(
+                session.execute(self._select_rows(fields).where(Relation.tags_uuid == tags_uuid)),
+                fields,
             )
-            return [self._to_dict(o) for o in objs]
 
     def update_by_id(self, record_id: int, data: dict[str, Any]) -> dict[str, Any] | None:
         with get_session() as session:
-            obj = session.scalars(
-                select(Relation).where(Relation.id == record_id)
-            ).first()
-            if obj is None:
-                return None
-            for k, v in self._data_to_kwargs(data).items():
-                setattr(obj, k, v)
-            session.flush()
-            session.refresh(obj)
-            return self._to_dict(obj)
+            row = session.execute(self._update_returning("id", record_id, data)).mappings().first()
+            return dict(row) if row else None
 
     def delete_by_id(self, record_id: int) -> bool:
         with get_session() as session:
-            obj = session.scalars(
-                select(Relation).where(Relation.id == record_id)
-            ).first()
-            if obj is None:
-                return False
-            session.delete(obj)
-            return True
-
-
+            return session.execute(self._delete_returning("id", record_id)).first() is not None
@@ -1,15 +1,32 @@
-"""request_logs 表的数据访问对象（含 ORM 模型定义）。
+"""request_logs 表与请求指标表的数据访问对象（含 ORM 模型定义）。
 
-request_logs 表使用 request_path 作为唯一键（无 uuid 字段）。
+request_logs 表使用 request_path 作为唯一键（无 uuid 字段），记录各路径的累计访问次数。
+
+request_metrics 按路径、按分钟记录请求次数、5xx 次数与延迟直方图，按 bucket
+范围分区（每天一个分区 ``request_metrics_pYYYYMMDD``）；request_metrics_hourly /
+request_metrics_daily 为按小时 / 按天的汇总，由 :meth:`RequestLogsDAO.run_metrics_maintenance`
+定期重算，并按保留期删除过期分区与汇总行。
 """
 
-from datetime import datetime
-from typing import Any
+import bisect
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import Any, Iterable, Mapping
 
-from sqlalchemy import Integer, Text, UniqueConstraint, func, select
+from sqlalchemy import (
+    Double,
+    Integer,
+    PrimaryKeyConstraint,
+    Table,
+    Text,
+    UniqueConstraint,
+    func,
+    select,
+    text,
+)
 from sqlalchemy.dialects.postgresql import TIMESTAMP
 from sqlalchemy.dialects.postgresql import insert as pg_insert
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, Session, mapped_column
 
 from core.database.connection.db import Base, get_session
 from core.database.dao.base import BaseDAO
@@ -28,6 +45,86 @@ class RequestLog(Base):
     __table_args__ = (UniqueConstraint("request_path"),)
 
 
+# 延迟直方图各桶的上界（毫秒）；超过最大上界的请求计入 latency_le_inf
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500)
+LATENCY_COLUMNS = tuple(f"latency_le_{bound}" for bound in LATENCY_BUCKETS_MS) + ("latency_le_inf",)
+
+# 可累加的指标列（合并同一 bucket 的多次写入、汇总时求和）
+_SUM_COLUMNS = ("request_count", "error_count", "latency_sum_ms") + LATENCY_COLUMNS
+
+# 保证同一时刻只有一个 worker 执行指标表维护（pg_try_advisory_xact_lock 的键）
+_METRICS_MAINTENANCE_LOCK = 0x52514D54
+
+_PARTITION_PREFIX = "request_metrics_p"
+
+
+class _RequestMetricColumns:
+    """请求指标表的公共列：按 (bucket, request_path) 唯一。"""
+
+    bucket: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=False)
+    request_path: Mapped[str] = mapped_column(Text, nullable=False)
+    request_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    latency_sum_ms: Mapped[float] = mapped_column(Double, nullable=False, default=0)
+    latency_max_ms: Mapped[float] = mapped_column(Double, nullable=False, default=0)
+    latency_le_10: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    latency_le_25: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    latency_le_50: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    latency_le_100: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    latency_le_250: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    latency_le_500: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    latency_le_1000: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    latency_le_2500: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    latency_le_inf: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class RequestMetric(_RequestMetricColumns, Base):
+    """request_metrics 表（按分钟，按天分区）的 ORM 模型。"""
+
+    __tablename__ = "request_metrics"
+    __table_args__ = (
+        PrimaryKeyConstraint("bucket", "request_path"),
+        {"postgresql_partition_by": "RANGE (bucket)"},
+    )
+
+
+class RequestMetricHourly(_RequestMetricColumns, Base):
+    """request_metrics_hourly 表（按小时汇总）的 ORM 模型。"""
+
+    __tablename__ = "request_metrics_hourly"
+    __table_args__ = (PrimaryKeyConstraint("bucket", "request_path"),)
+
+
+class RequestMetricDaily(_RequestMetricColumns, Base):
+    """request_metrics_daily 表（按天汇总）的 ORM 模型。"""
+
+    __tablename__ = "request_metrics_daily"
+    __table_args__ = (PrimaryKeyConstraint("bucket", "request_path"),)
+
+
+def latency_bucket(latency_ms: float) -> int:
+    """返回延迟所在直方图桶在 :data:`LATENCY_COLUMNS` 中的序号。"""
+    return bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)
+
+
+def latency_percentile(row: Mapping[str, Any], q: float) -> float | None:
+    """按直方图估算延迟分位数，返回所在桶的上界（毫秒）；落在最后一个桶时返回最大延迟。"""
+    total = sum(row[name] for name in LATENCY_COLUMNS)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for bound, name in zip(LATENCY_BUCKETS_MS, LATENCY_COLUMNS):
+        seen += row[name]
+        if seen >= rank:
+            return float(bound)
+    return float(row["latency_max_ms"])
+
+
+def _partition_name(day: date) -> str:
+    return f"{_PARTITION_PREFIX}{day:%Y%m%d}"
+
+
 class RequestLogsDAO(BaseDAO):
     """request_logs 表的数据访问对象。
 
@@ -36,8 +133,11 @@ class RequestLogsDAO(BaseDAO):
     """
 
     MODEL = RequestLog
+    KEY_COLUMN = "request_path"
 
-    def find_by_uuid(self, uuid: str) -> dict[str, Any] | None:
+    def find_by_uuid(
+        self, uuid: str, fields: Iterable[str] | str | None = None
+    ) -> dict[str, Any] | None:
         raise NotImplementedError(
             "request_logs 表不包含 uuid 字段，请使用 find_by_path"
         )
@@ -52,39 +152,245 @@ class RequestLogsDAO(BaseDAO):
             "request_logs 表不包含 uuid 字段，请使用 delete_by_path"
         )
 
-    def find_by_path(self, request_path: str) -> dict[str, Any] | None:
-        with get_session() as session:
-            obj = session.scalars(
-                select(RequestLog).where(RequestLog.request_path == request_path)
-            ).first()
-            return self._to_dict(obj) if obj else None
+    async def find_by_uuid_async(
+        self, uuid: str, fields: Iterable[str] | str | None = None
+    ) -> dict[str, Any] | None:
+        raise NotImplementedError(
+            "request_logs 表不包含 uuid 字段，请使用 find_by_path"
+        )
+
+    async def update_async(self, uuid: str, data: dict[str, Any]) -> dict[str, Any] | None:
+        raise NotImplementedError(
+            "request_logs 表不包含 uuid 字段，请使用 upsert_by_path"
+        )
+
+    async def delete_async(self, uuid: str) -> bool:
+        raise NotImplementedError(
+            "request_logs 表不包含 uuid 字段，请使用 delete_by_path"
+        )
+
+    def find_by_path(
+        self, request_path: str, fields: Iterable[str] | str | None = None
+    ) -> dict[str, Any] | None:
+        with get_session(readonly=True) as session:
+            rows = self._rows_to_dicts(
+                session.execute(
+                    self._select_rows(fields).where(RequestLog.request_path == request_path)
+                ),
+                fields,
+            )
+            return rows[0] if rows else None
 
     def upsert_by_path(self, request_path: str) -> dict[str, Any]:
-        """若记录不存在则插入，存在则将 frequency 加一。"""
+        """若记录不存在则插入，存在则将 frequency 加一。
+
+        每次调用都对该路径的行加锁，不适合在每个请求中调用；请求路径上的计数
+        请使用 ``core.middleware.analytics`` 的聚合器（批量调用 :meth:`increment_paths`）。
+        """
+        table = RequestLog.__table__
         with get_session() as session:
             stmt = (
-                pg_insert(RequestLog)
+                pg_insert(table)
                 .values(request_path=request_path, frequency=1)
                 .on_conflict_do_update(
                     index_elements=["request_path"],
-                    set_={"frequency": RequestLog.__table__.c.frequency + 1},
+                    set_={"frequency": table.c.frequency + 1},
                 )
+                .returning(*table.c)
             )
-            session.execute(stmt)
-            session.flush()
-            obj = session.scalars(
-                select(RequestLog).where(RequestLog.request_path == request_path)
-            ).first()
-            return self._to_dict(obj)
+            return dict(session.execute(stmt).mappings().one())
+
+    def increment_paths(self, counts: Mapping[str, int], chunk_size: int | None = None) -> int:
+        """在一个事务中把各路径的访问次数累加到 frequency，返回写入行数。
+
+        每块一条多行 ``INSERT ... ON CONFLICT (request_path) DO UPDATE SET
+        frequency = frequency + excluded.frequency``。路径按字典序写入：多个进程
+        同时刷写时按相同顺序加行锁，不会互相死锁。
+        """
+        table = RequestLog.__table__
+        paths = iter(sorted(path for path, count in counts.items() if count))
+        written = 0
+        with get_session() as session:
+            while chunk := list(islice(paths, chunk_size or self.BULK_CHUNK_SIZE)):
+                stmt = pg_insert(table).values(
+                    [{"request_path": path, "frequency": counts[path]} for path in chunk]
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["request_path"],
+                    set_={
+                        "frequency": func.coalesce(table.c.frequency, 0)
+                        + stmt.excluded.frequency
+                    },
+                )
+                written += session.execute(stmt).rowcount
+        return written
 
     def delete_by_path(self, request_path: str) -> bool:
         with get_session() as session:
-            obj = session.scalars(
-                select(RequestLog).where(RequestLog.request_path == request_path)
-            ).first()
-            if obj is None:
-                return False
-            session.delete(obj)
-            return True
+            stmt = self._delete_returning("request_path", request_path)
+            return session.execute(stmt).first() is not None
+
+    # ------------------------------------------------------------------
+    # 请求指标（request_metrics / _hourly / _daily）
+    # ------------------------------------------------------------------
+
+    def add_metrics(self, rows: Iterable[dict[str, Any]], chunk_size: int | None = None) -> int:
+        """把按分钟聚合的指标累加到 request_metrics，返回写入行数。
+
+        每行包含 ``bucket``、``request_path`` 及各指标列；同一 (bucket, request_path)
+        已存在时各计数相加、最大延迟取较大值。缺少的当天分区在同一事务中创建。
+        """
+        table = RequestMetric.__table__
+        rows = sorted(rows, key=lambda row: (row["bucket"], row["request_path"]))
+        written = 0
+        with get_session() as session:
+            for day in sorted({row["bucket"].date() for row in rows}):
+                self._ensure_partition(session, day)
+            iterator = iter(rows)
+            while chunk := list(islice(iterator, chunk_size or self.BULK_CHUNK_SIZE)):
+                stmt = pg_insert(table).values(chunk)
+                updates = {name: table.c[name] + stmt.excluded[name] for name in _SUM_COLUMNS}
+                updates["latency_max_ms"] = func.greatest(
+                    table.c.latency_max_ms, stmt.excluded.latency_max_ms
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["bucket", "request_path"], set_=updates
+                )
+                written += session.execute(stmt).rowcount
+        return written
+
+    def hot_paths(self, since: datetime, limit: int = 10) -> list[dict[str, Any]]:
+        """返回 ``since`` 以来请求次数最多的路径及其错误数、平均 / p95 / 最大延迟。"""
+        table = RequestMetric.__table__
+        stmt = (
+            select(
+                table.c.request_path,
+                *(func.sum(table.c[name]).label(name) for name in _SUM_COLUMNS),
+                func.max(table.c.latency_max_ms).label("latency_max_ms"),
+            )
+            .where(table.c.bucket >= since)
+            .group_by(table.c.request_path)
+            .order_by(func.sum(table.c.request_count).desc(), table.c.request_path)
+            .limit(limit)
+        )
+        with get_session(readonly=True) as session:
+            rows = [dict(row) for row in session.execute(stmt).mappings()]
+        return [
+            {
+                "request_path": row["request_path"],
+                "request_count": row["request_count"],
+                "error_count": row["error_count"],
+                "latency_avg_ms": row["latency_sum_ms"] / row["request_count"] if row["request_count"] else None,
+                "latency_p95_ms": latency_percentile(row, 0.95),
+                "latency_max_ms": row["latency_max_ms"],
+            }
+            for row in rows
+        ]
+
+    def run_metrics_maintenance(
+        self,
+        now: datetime,
+        rollup_lookback: timedelta,
+        partitions_ahead: int,
+        raw_retention_days: int,
+        hourly_retention_days: int,
+        daily_retention_days: int,
+    ) -> dict[str, Any] | None:
+        """指标表维护：预建分区、重算汇总、按保留期清理。
+
+        1. 创建今天起 ``partitions_ahead`` 天内缺少的分区；
+        2. 用 ``now - rollup_lookback`` 所在小时之后的分钟数据重算小时汇总，再用其所在
+           日期之后的小时汇总重算天汇总（覆盖写入，重复执行结果不变；未结束的小时 / 天
+           同样写入，下次维护时更新）；
+        3. 删除早于 ``raw_retention_days`` 天的分区，以及超出保留期的汇总行。
+
+        在一个事务中执行并持有 advisory 锁：其他 worker 正在维护时直接返回 None。
+        """
+        today = now.date()
+        hour_start = (now - rollup_lookback).replace(minute=0, second=0, microsecond=0)
+        day_start = datetime.combine(hour_start.date(), datetime.min.time())
+        with get_session() as session:
+            locked = session.execute(
+                select(func.pg_try_advisory_xact_lock(_METRICS_MAINTENANCE_LOCK))
+            ).scalar()
+            if not locked:
+                return None
+            created = [
+                name
+                for offset in range(partitions_ahead + 1)
+                if (name := self._ensure_partition(session, today + timedelta(days=offset)))
+            ]
+            hourly = self._rollup(
+                session, RequestMetric.__table__, RequestMetricHourly.__table__, "hour", hour_start
+            )
+            daily = self._rollup(
+                session, RequestMetricHourly.__table__, RequestMetricDaily.__table__, "day", day_start
+            )
+            dropped = self._drop_partitions_before(session, today - timedelta(days=raw_retention_days))
+            deleted = 0
+            for table, days in (
+                (RequestMetricHourly.__table__, hourly_retention_days),
+                (RequestMetricDaily.__table__, daily_retention_days),
+            ):
+                cutoff = datetime.combine(today - timedelta(days=days), datetime.min.time())
+                deleted += session.execute(table.delete().where(table.c.bucket < cutoff)).rowcount
+        return {
+            "created_partitions": created,
+            "dropped_partitions": dropped,
+            "hourly_rows": hourly,
+            "daily_rows": daily,
+            "deleted_rollup_rows": deleted,
+        }
 
+    @staticmethod
+    def _ensure_partition(session: Session, day: date) -> str | None:
+        """创建 ``day`` 当天的分区（已存在时跳过），返回新建的分区名。"""
+        name = _partition_name(day)
+        exists = session.execute(select(func.to_regclass(name))).scalar()
+        if exists is not None:
+            return None
+        session.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF request_metrics "
+            f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+        ))
+        return name
+
+    @staticmethod
+    def _rollup(session: Session, source: Table, target: Table, unit: str, since: datetime) -> int:
+        """把 ``since`` 之后的 ``source`` 行按 ``unit``（hour / day）汇总后覆盖写入 ``target``。"""
+        bucket = func.date_trunc(unit, source.c.bucket)
+        query = (
+            select(
+                bucket,
+                source.c.request_path,
+                *(func.sum(source.c[name]) for name in _SUM_COLUMNS),
+                func.max(source.c.latency_max_ms),
+            )
+            .where(source.c.bucket >= since)
+            .group_by(bucket, source.c.request_path)
+        )
+        columns = ["bucket", "request_path", *_SUM_COLUMNS, "latency_max_ms"]
+        stmt = pg_insert(target).from_select(columns, query)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["bucket", "request_path"],
+            set_={name: stmt.excluded[name] for name in columns[2:]},
+        )
+        return session.execute(stmt).rowcount
 
+    @staticmethod
+    def _drop_partitions_before(session: Session, cutoff: date) -> list[str]:
+        """删除日期早于 ``cutoff`` 的分区，返回删除的分区名。"""
+        names = session.execute(text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'request_metrics'::regclass"
+        )).scalars().all()
+        dropped = []
+        for name in sorted(names):
+            try:
+                day = datetime.strptime(name.removeprefix(_PARTITION_PREFIX), "%Y%m%d").date()
+            except ValueError:
+                continue
+            if day < cutoff:
+                session.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                dropped.append(name)
+        return dropped
@@ -1,14 +1,15 @@
 """tokens 表的数据访问对象（含 ORM 模型定义）。"""
 
 from datetime import datetime
-from typing import Any
+from typing import Any, Iterable, Iterator
 
-from sqlalchemy import Index, Integer, Text, func, or_, select
+from sqlalchemy import Index, Integer, Text, func, or_
 from sqlalchemy.dialects.postgresql import TIMESTAMP
 from sqlalchemy.orm import Mapped, mapped_column
 
 from core.database.connection.db import Base, get_session
 from core.database.dao.base import BaseDAO
+from core.helper.TokenCache.index import token_cache
 
 
 class Token(Base):
@@ -32,28 +33,135 @@ class Token(Base):
 
 
 class TokensDAO(BaseDAO):
-    """tokens 表的数据访问对象。"""
+    """tokens 表的数据访问对象。
+
+    修改、删除或吊销 token 后会使 token → 用户缓存失效。
+    """
 
     MODEL = Token
 
-    def find_by_belong_to(self, belong_to: str) -> list[dict[str, Any]]:
+    def update(self, uuid: str, data: dict[str, Any]) -> dict[str, Any] | None:
+        """根据 uuid 更新 token，并使其解析缓存失效。"""
+        result = super().update(uuid, data)
+        token_cache.invalidate(uuid)
+        return result
+
+    def delete(self, uuid: str) -> bool:
+        """根据 uuid 删除 token，并使其解析缓存失效。"""
+        deleted = super().delete(uuid)
+        token_cache.invalidate(uuid)
+        return deleted
+
+    def revoke(self, uuid: str) -> dict[str, Any] | None:
+        """吊销 token（current_status 置为 revoked），返回更新后的行，不存在时返回 None。"""
+        return self.update(uuid, {"current_status": "revoked"})
+
+    async def update_async(self, uuid: str, data: dict[str, Any]) -> dict[str, Any] | None:
+        """:meth:`update` 的异步版本。"""
+        result = await super().update_async(uuid, data)
+        await token_cache.invalidate_async(uuid)
+        return result
+
+    async def delete_async(self, uuid: str) -> bool:
+        """:meth:`delete` 的异步版本。"""
+        deleted = await super().delete_async(uuid)
+        await token_cache.invalidate_async(uuid)
+        return deleted
+
+    async def revoke_async(self, uuid: str) -> dict[str, Any] | None:
+        """:meth:`revoke` 的异步版本。"""
+        return await self.update_async(uuid, {"current_status": "revoked"})
+
+    def update_many(
+        self,
+        rows: Iterable[dict[str, Any]],
+        chunk_size: int | None = None,
+        returning: bool = True,
+    ) -> list[dict[str, Any]] | int:
+        """批量更新 token，并使其解析缓存失效。"""
+        uuids: list[str] = []
+        result = super().update_many(_collect_uuids(rows, uuids), chunk_size, returning)
+        token_cache.invalidate_many(uuids)
+        return result
+
+    def upsert_many(
+        self,
+        rows: Iterable[dict[str, Any]],
+        chunk_size: int | None = None,
+        returning: bool = True,
+    ) -> list[dict[str, Any]] | int:
+        """批量插入或更新 token，并使其解析缓存失效。"""
+        uuids: list[str] = []
+        result = super().upsert_many(_collect_uuids(rows, uuids), chunk_size, returning)
+        token_cache.invalidate_many(uuids)
+        return result
+
+    def delete_many(self, keys: Iterable[str], chunk_size: int | None = None) -> int:
+        """批量删除 token，并使其解析缓存失效。"""
+        keys = list(keys)
+        deleted = super().delete_many(keys, chunk_size)
+        token_cache.invalidate_many(keys)
+        return deleted
+
+    async def update_many_async(
+        self,
+        rows: Iterable[dict[str, Any]],
+        chunk_size: int | None = None,
+        returning: bool = True,
+    ) -> list[dict[str, Any]] | int:
+        """:meth:`update_many` 的异步版本。"""
+        uuids: list[str] = []
+        result = await super().update_many_async(_collect_uuids(rows, uuids), chunk_size, returning)
+        await token_cache.invalidate_many_async(uuids)
+        return result
+
+    async def upsert_many_async(
+        self,
+        rows: Iterable[dict[str, Any]],
+        chunk_size: int | None = None,
+        returning: bool = True,
+    ) -> list[dict[str, Any]] | int:
+        """:meth:`upsert_many` 的异步版本。"""
+        uuids: list[str] = []
+        result = await super().upsert_many_async(_collect_uuids(rows, uuids), chunk_size, returning)
+        await token_cache.invalidate_many_async(uuids)
+        return result
+
+    async def delete_many_async(self, keys: Iterable[str], chunk_size: int | None = None) -> int:
+        """:meth:`delete_many` 的异步版本。"""
+        keys = list(keys)
+        deleted = await super().delete_many_async(keys, chunk_size)
+        await token_cache.invalidate_many_async(keys)
+        return deleted
+
+    def find_by_belong_to(self, belong_to: str, fields: Iterable[str] | str | None = None) -> list[dict[str, Any]]:
         """查询指定用户的所有 token。"""
-        with get_session() as session:
-            objs = session.scalars(
-                select(Token).where(Token.belong_to == belong_to)
+        with get_session(readonly=True) as session:
+            return self._rows_to_dicts(
+                session.execute(self._select_rows(fields).where(Token.belong_to == belong_to)),
+                fields,
             )
-            return [self._to_dict(o) for o in objs]
 
-    def find_active_by_belong_to(self, belong_to: str) -> list[dict[str, Any]]:
+    def find_active_by_belong_to(
+        self, belong_to: str, fields: Iterable[str] | str | None = None
+    ) -> list[dict[str, Any]]:
         """查询指定用户的所有未过期 token。"""
-        with get_session() as session:
-            objs = session.scalars(
-                select(Token).where(
-                    Token.belong_to == belong_to,
-                    or_(Token.expired_at.is_(None), Token.expired_at > func.now()),
-                    Token.current_status != "revoked",
-                )
+        with get_session(readonly=True) as session:
+            return self._rows_to_dicts(
+                session.execute(
+                    self._select_rows(fields).where(
+                        Token.belong_to == belong_to,
+                        or_(Token.expired_at.is_(None), Token.expired_at > func.now()),
+                        Token.current_status != "revoked",
+                    )
+                ),
+                fields,
             )
-            return [self._to_dict(o) for o in objs]
 
 
+def _collect_uuids(rows: Iterable[dict[str, Any]], uuids: list[str]) -> Iterator[dict[str, Any]]:
+    """逐行透传，同时记下每行的 uuid（批量方法按块读取，不必先把输入全部读入内存）。"""
+    for row in rows:
+        if "uuid" in row:
+            uuids.append(row["uuid"])
+        yield row
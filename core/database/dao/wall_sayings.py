@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import Integer, Text, func
+from sqlalchemy import Index, Integer, Text, func
 from sqlalchemy.dialects.postgresql import JSONB, TIMESTAMP
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -29,6 +29,8 @@ class WallSaying(Base):
     share_count: Mapped[int | None] = mapped_column(Integer, default=0)
     views: Mapped[int | None] = mapped_column(Integer, default=0)
 
+    __table_args__ = (Index("idx_wall_sayings_author_uuid", "author_uuid"),)
+
 
 class WallSayingsDAO(BaseDAO):
     """wall_sayings 表的数据访问对象。"""
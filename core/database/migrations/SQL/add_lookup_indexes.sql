@@ -0,0 +1,12 @@
+-- migrate: no-transaction
+-- DAO 按外键列查询（RelationsDAO.find_by_tags_uuid、IllegalRequestsDAO.find_by_user 等）所需的索引。
+-- CREATE INDEX CONCURRENTLY 建索引期间不阻塞写入，但不能在事务中执行：
+-- 带 no-transaction 标记的脚本由 db_migrate.py 逐条语句自动提交执行。
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_relations_tags_uuid ON relations (tags_uuid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_relations_related_uuid ON relations (related_uuid);
+-- find_by_user 按 happened_at 倒序取最近的记录，复合索引可直接按序读取
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_illegal_requests_user_happened_at ON illegal_requests ("user", happened_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_comments_comment_place_uuid ON comments (comment_place_uuid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_wall_sayings_author_uuid ON wall_sayings (author_uuid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_favourites_user_uuid ON favourites (user_uuid);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_personal_logs_user_uuid ON personal_logs (user_uuid);
@@ -0,0 +1,60 @@
+-- 按路径、按分钟的请求指标（次数、5xx 次数、延迟直方图），以及按小时 / 按天的汇总表。
+-- request_metrics 按 bucket 范围分区，每天一个分区（request_metrics_pYYYYMMDD），
+-- 分区由应用（RequestLogsDAO.add_metrics / run_metrics_maintenance）提前创建，
+-- 过期分区整体删除。latency_le_<n> 为延迟落在 (上一桶上界, n] 毫秒内的请求数。
+CREATE TABLE IF NOT EXISTS request_metrics (
+    bucket TIMESTAMP NOT NULL,
+    request_path TEXT NOT NULL,
+    request_count INTEGER NOT NULL DEFAULT 0,
+    error_count INTEGER NOT NULL DEFAULT 0,
+    latency_sum_ms DOUBLE PRECISION NOT NULL DEFAULT 0,
+    latency_max_ms DOUBLE PRECISION NOT NULL DEFAULT 0,
+    latency_le_10 INTEGER NOT NULL DEFAULT 0,
+    latency_le_25 INTEGER NOT NULL DEFAULT 0,
+    latency_le_50 INTEGER NOT NULL DEFAULT 0,
+    latency_le_100 INTEGER NOT NULL DEFAULT 0,
+    latency_le_250 INTEGER NOT NULL DEFAULT 0,
+    latency_le_500 INTEGER NOT NULL DEFAULT 0,
+    latency_le_1000 INTEGER NOT NULL DEFAULT 0,
+    latency_le_2500 INTEGER NOT NULL DEFAULT 0,
+    latency_le_inf INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, request_path)
+) PARTITION BY RANGE (bucket);
+
+CREATE TABLE IF NOT EXISTS request_metrics_hourly (
+    bucket TIMESTAMP NOT NULL,
+    request_path TEXT NOT NULL,
+    request_count INTEGER NOT NULL DEFAULT 0,
+    error_count INTEGER NOT NULL DEFAULT 0,
+    latency_sum_ms DOUBLE PRECISION NOT NULL DEFAULT 0,
+    latency_max_ms DOUBLE PRECISION NOT NULL DEFAULT 0,
+    latency_le_10 INTEGER NOT NULL DEFAULT 0,
+    latency_le_25 INTEGER NOT NULL DEFAULT 0,
+    latency_le_50 INTEGER NOT NULL DEFAULT 0,
+    latency_le_100 INTEGER NOT NULL DEFAULT 0,
+    latency_le_250 INTEGER NOT NULL DEFAULT 0,
+    latency_le_500 INTEGER NOT NULL DEFAULT 0,
+    latency_le_1000 INTEGER NOT NULL DEFAULT 0,
+    latency_le_2500 INTEGER NOT NULL DEFAULT 0,
+    latency_le_inf INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, request_path)
+);
+
+CREATE TABLE IF NOT EXISTS request_metrics_daily (
+    bucket TIMESTAMP NOT NULL,
+    request_path TEXT NOT NULL,
+    request_count INTEGER NOT NULL DEFAULT 0,
+    error_count INTEGER NOT NULL DEFAULT 0,
+    latency_sum_ms DOUBLE PRECISION NOT NULL DEFAULT 0,
+    latency_max_ms DOUBLE PRECISION NOT NULL DEFAULT 0,
+    latency_le_10 INTEGER NOT NULL DEFAULT 0,
+    latency_le_25 INTEGER NOT NULL DEFAULT 0,
+    latency_le_50 INTEGER NOT NULL DEFAULT 0,
+    latency_le_100 INTEGER NOT NULL DEFAULT 0,
+    latency_le_250 INTEGER NOT NULL DEFAULT 0,
+    latency_le_500 INTEGER NOT NULL DEFAULT 0,
+    latency_le_1000 INTEGER NOT NULL DEFAULT 0,
+    latency_le_2500 INTEGER NOT NULL DEFAULT 0,
+    latency_le_inf INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, request_path)
+);
@@ -17,5 +17,7 @@ migration_history =[
     "initial_tasks.sql",
     "initial_tokens.sql",
     "initial_illegal_requests.sql",
-    "alter_users_add_password.sql"
+    "alter_users_add_password.sql",
+    "add_lookup_indexes.sql",
+    "add_request_metrics.sql"
 ]
\ No newline at end of file
@@ -0,0 +1,119 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+
+from core.helper.ContainerCustomLog.index import custom_log
+
+# 游标签名密钥的环境变量；多 worker / 多实例部署时必须设置为相同的值，
+# 否则一个 worker 签发的游标在另一个 worker 上无法验证
+_SECRET_ENV = "PAGE_CURSOR_SECRET"
+
+# HMAC-SHA256 截断后的签名长度（字节）
+_SIGNATURE_BYTES = 16
+
+
+class InvalidCursorError(ValueError):
+    """分页游标格式错误、签名不匹配或与当前查询不符。"""
+
+
+def _encode_value(value: Any) -> Any:
+    """JSON 不支持的排序键类型（日期时间、Decimal、UUID）带上类型标记。
+
+    Raises:
+        TypeError: 排序键的类型无法编码进游标。
+    """
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, time):
+        return {"$t": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"$dec": str(value)}
+    if isinstance(value, uuid.UUID):
+        return {"$uuid": str(value)}
+    raise TypeError(f"排序键类型 {type(value).__name__} 无法编码进分页游标")
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "$dt" in value:
+            return datetime.fromisoformat(value["$dt"])
+        if "$d" in value:
+            return date.fromisoformat(value["$d"])
+        if "$t" in value:
+            return time.fromisoformat(value["$t"])
+        if "$dec" in value:
+            return Decimal(value["$dec"])
+        if "$uuid" in value:
+            return uuid.UUID(value["$uuid"])
+    return value
+
+
+class PageCursor:
+    """分页游标的编码与签名。
+
+    游标内容为 JSON（排序键的取值及其绑定的查询范围），以 HMAC-SHA256 签名后
+    做 URL 安全的 base64 编码，对调用方不透明，且无法被篡改为任意取值。
+
+    Args:
+        secret: 签名密钥，默认读取环境变量 ``PAGE_CURSOR_SECRET``；未设置时
+            使用进程内随机密钥（游标在进程重启或跨 worker 后失效）。
+    """
+
+    def __init__(self, secret: str | bytes | None = None) -> None:
+        if secret is None:
+            secret = os.environ.get(_SECRET_ENV)
+        if not secret:
+            custom_log("WARNING", f"[PageCursor] 未设置 {_SECRET_ENV}，分页游标仅在当前进程内有效")
+            secret = secrets.token_bytes(32)
+        self._key = secret.encode() if isinstance(secret, str) else secret
+
+    def _sign(self, payload: bytes) -> bytes:
+        return hmac.new(self._key, payload, hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+
+    def encode(self, scope: str, values: list[Any]) -> str:
+        """把排序键取值编码为游标，``scope`` 标识游标所属的查询（表与排序方式）。"""
+        payload = json.dumps(
+            {"s": scope, "v": [_encode_value(v) for v in values]},
+            separators=(",", ":"),
+            ensure_ascii=False,
+        ).encode()
+        token = self._sign(payload) + payload
+        return base64.urlsafe_b64encode(token).rstrip(b"=").decode()
+
+    def decode(self, cursor: str, scope: str) -> list[Any]:
+        """校验签名与查询范围，返回排序键取值；无效时抛出 InvalidCursorError。"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        except (binascii.Error, ValueError):
+            raise InvalidCursorError("无效的分页游标") from None
+        signature, payload = raw[:_SIGNATURE_BYTES], raw[_SIGNATURE_BYTES:]
+        if not hmac.compare_digest(signature, self._sign(payload)):
+            raise InvalidCursorError("无效的分页游标")
+        data = json.loads(payload)
+        if data.get("s") != scope:
+            raise InvalidCursorError("分页游标与当前查询的表或排序方式不一致")
+        return [_decode_value(v) for v in data["v"]]
+
+
+# 全局单例（延迟创建，便于测试中设置环境变量）
+_page_cursor: PageCursor | None = None
+
+
+def get_page_cursor() -> PageCursor:
+    """返回全局 :class:`PageCursor`。"""
+    global _page_cursor
+    if _page_cursor is None:
+        _page_cursor = PageCursor()
+    return _page_cursor
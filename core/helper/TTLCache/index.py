@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+# 未命中时的哨兵值（区分「缓存了 None」与「不存在」）
+_MISSING = object()
+
+
+class TTLCache:
+    """线程安全、容量有界的 LRU 缓存，每个条目可单独设置过期时间。
+
+    超出 ``maxsize`` 时淘汰最久未使用的条目；过期条目在访问时惰性删除。
+    同时统计命中 / 未命中次数，便于观察缓存效果。
+
+    Args:
+        maxsize: 最大条目数。
+        default_ttl: 默认过期时间（秒），None 表示不过期。
+    """
+
+    def __init__(self, maxsize: int, default_ttl: float | None = None) -> None:
+        self._maxsize = maxsize
+        self._default_ttl = default_ttl
+        # key -> (过期时刻（monotonic，None 为不过期）, value)
+        self._data: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """返回未过期的缓存值，不存在或已过期时返回 ``default``。"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """写入缓存，``ttl`` 为 None 时使用默认过期时间。"""
+        ttl = self._default_ttl if ttl is None else ttl
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def ttl(self, key: Hashable) -> float | None:
+        """返回条目剩余存活秒数；不存在或已过期时返回 None，不过期时返回 ``inf``。"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at = entry[0]
+            if expires_at is None:
+                return float("inf")
+            remaining = expires_at - time.monotonic()
+            return remaining if remaining > 0 else None
+
+    def delete(self, key: Hashable) -> None:
+        """删除条目（不存在时忽略）。"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """清空所有条目（不重置命中统计）。"""
+        with self._lock:
+            self._data.clear()
+
+    def items(self) -> list[tuple[Hashable, Any, float | None]]:
+        """返回所有未过期条目的 ``(key, value, 剩余秒数)`` 快照。"""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                (key, value, None if expires_at is None else expires_at - now)
+                for key, (expires_at, value) in self._data.items()
+                if expires_at is None or expires_at > now
+            ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def stats(self) -> dict[str, Any]:
+        """返回容量与命中率统计。"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self._maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
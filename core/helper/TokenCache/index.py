@@ -0,0 +1,219 @@
+import hashlib
+import math
+from typing import Iterable
+
+from core.helper.ContainerCustomLog.index import custom_log
+from core.helper.TTLCache.index import TTLCache
+
+# 进程内缓存容量与有效期（秒）；进程内条目无法被其他 worker 主动失效，
+# 因此有效期较短，决定了吊销在其他 worker 上生效的最长延迟
+_LOCAL_MAXSIZE = 50_000
+_LOCAL_TTL = 30
+
+# Redis 共享缓存的有效期（秒）与 key 前缀；key 中只保存 token 的 SHA-256
+_REDIS_TTL = 300
+_REDIS_KEY = "auth:token:"
+
+# 不存在 / 已过期 / 已吊销 token 的负缓存有效期（秒）
+_NEGATIVE_TTL = 30
+
+# token 无效时的返回值（与防火墙记录中的用户字段保持一致）
+UNKNOWN_USER = "unknown"
+
+
+class TokenCache:
+    """token → 所属用户 uuid 的两级缓存（进程内 LRU + 可选的 Redis）。
+
+    缓存有效期不超过 token 的 ``expired_at``；token 被吊销或删除时应调用
+    :meth:`invalidate`（``TokensDAO`` 已自动调用）。数据库查询失败时不缓存。
+    """
+
+    def __init__(
+        self,
+        local_maxsize: int = _LOCAL_MAXSIZE,
+        local_ttl: float = _LOCAL_TTL,
+        redis_ttl: int = _REDIS_TTL,
+        negative_ttl: int = _NEGATIVE_TTL,
+        use_redis: bool = True,
+    ) -> None:
+        self._local = TTLCache(local_maxsize)
+        self._local_ttl = local_ttl
+        self._redis_ttl = redis_ttl
+        self._negative_ttl = negative_ttl
+        self._use_redis = use_redis
+        self._counters = {"lookups": 0, "local_hits": 0, "redis_hits": 0, "misses": 0}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def resolve(self, token: str) -> str:
+        """返回 token 所属用户 uuid，token 无效或查询失败时返回 ``"unknown"``。"""
+        self._counters["lookups"] += 1
+        key = self._hash(token)
+
+        user = self._local.get(key)
+        if user is not None:
+            self._counters["local_hits"] += 1
+            return user or UNKNOWN_USER
+
+        cached = self._redis_get(key)
+        if cached is not None:
+            user, ttl = cached
+            self._counters["redis_hits"] += 1
+            self._local.set(key, user, min(self._local_ttl, ttl))
+            return user or UNKNOWN_USER
+
+        self._counters["misses"] += 1
+        try:
+            user, remaining = self._load(token)
+        except Exception as exc:
+            custom_log("WARNING", f"[TokenCache] 查询 token 失败: {exc}")
+            return UNKNOWN_USER
+        ttl = self._negative_ttl if not user else remaining
+        if ttl > 0:
+            self._local.set(key, user, min(self._local_ttl, ttl))
+            self._redis_set(key, user, min(self._redis_ttl, ttl) if user else ttl)
+        return user or UNKNOWN_USER
+
+    def peek(self, token: str) -> str | None:
+        """只查进程内缓存，未命中时返回 None（供异步路径跳过线程池调度）。"""
+        user = self._local.get(self._hash(token))
+        if user is None:
+            return None
+        self._counters["lookups"] += 1
+        self._counters["local_hits"] += 1
+        return user or UNKNOWN_USER
+
+    def invalidate(self, token: str) -> None:
+        """使 token 的缓存失效（吊销、删除或修改 token 后调用）。"""
+        self.invalidate_many([token])
+
+    def invalidate_many(self, tokens: Iterable[str]) -> None:
+        """批量使 token 的缓存失效，Redis 中的条目用一条 DEL 删除。
+
+        集群模式下各 token 的 key 分布在不同的槽，redis-py 按槽拆分为多条 DEL。
+        """
+        keys = self._drop_local(tokens)
+        client = self._redis_client()
+        if client is None or not keys:
+            return
+        try:
+            client.delete(*keys)
+        except Exception as exc:
+            custom_log("WARNING", f"[TokenCache] 删除 Redis 缓存失败: {exc}")
+
+    async def invalidate_async(self, token: str) -> None:
+        """:meth:`invalidate` 的异步版本（``async def`` 中使用，不阻塞事件循环）。"""
+        await self.invalidate_many_async([token])
+
+    async def invalidate_many_async(self, tokens: Iterable[str]) -> None:
+        """:meth:`invalidate_many` 的异步版本。"""
+        keys = self._drop_local(tokens)
+        if not self._use_redis or not keys:
+            return
+        from core.database.connection.redis import redis_conn
+
+        client = redis_conn.get_async_client()
+        if client is None:
+            return
+        try:
+            await client.delete(*keys)
+        except Exception as exc:
+            custom_log("WARNING", f"[TokenCache] 删除 Redis 缓存失败: {exc}")
+
+    def clear(self) -> None:
+        """清空进程内缓存。"""
+        self._local.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        """返回查询次数、各级命中次数、未命中（查库）次数与总命中率。"""
+        lookups = self._counters["lookups"]
+        hits = self._counters["local_hits"] + self._counters["redis_hits"]
+        return {
+            **self._counters,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._local),
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _hash(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def _drop_local(self, tokens: Iterable[str]) -> list[str]:
+        """删除进程内条目，返回对应的 Redis key。"""
+        keys = []
+        for token in tokens:
+            key = self._hash(token)
+            self._local.delete(key)
+            keys.append(_REDIS_KEY + key)
+        return keys
+
+    @staticmethod
+    def _load(token: str) -> tuple[str, float]:
+        """查询数据库，返回 (用户 uuid，距过期的秒数)；token 无效时用户为空字符串。"""
+        from sqlalchemy import extract, func, or_, select
+
+        from core.database.connection.db import get_session
+        from core.database.dao.tokens import Token
+
+        # 不走只读副本：副本延迟可能让刚签发的 token 被判无效并写入负缓存
+        with get_session() as session:
+            # 剩余有效期以数据库时钟计算，避免应用与数据库时区不一致
+            row = session.execute(
+                select(
+                    Token.belong_to,
+                    extract("epoch", Token.expired_at - func.now()),
+                ).where(
+                    Token.uuid == token,
+                    or_(Token.expired_at.is_(None), Token.expired_at > func.now()),
+                    Token.current_status != "revoked",
+                )
+            ).first()
+        if row is None:
+            return "", 0
+        belong_to, remaining = row
+        return belong_to, math.inf if remaining is None else float(remaining)
+
+    def _redis_client(self):
+        if not self._use_redis:
+            return None
+        from core.database.connection.redis import redis_conn
+
+        return redis_conn.get_client()
+
+    def _redis_get(self, key: str) -> tuple[str, float] | None:
+        """读取 Redis 缓存，返回 (用户 uuid，剩余秒数)；未命中或不可用时返回 None。"""
+        client = self._redis_client()
+        if client is None:
+            return None
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.get(_REDIS_KEY + key)
+            pipe.ttl(_REDIS_KEY + key)
+            user, ttl = pipe.execute()
+        except Exception:
+            return None
+        if user is None or ttl <= 0:
+            return None
+        return user, ttl
+
+    def _redis_set(self, key: str, user: str, ttl: float) -> None:
+        client = self._redis_client()
+        if client is None:
+            return
+        # 向下取整，保证 Redis 中的条目不晚于 token 过期
+        if int(ttl) < 1:
+            return
+        try:
+            client.set(_REDIS_KEY + key, user, ex=int(ttl))
+        except Exception:
+            pass
+
+
+# 全局单例（防火墙与鉴权共用）
+token_cache = TokenCache()
@@ -0,0 +1,125 @@
+"""请求路径访问次数的进程内聚合。
+
+请求路径上只在内存中累加计数，后台线程每隔 ``flush_interval`` 秒把增量
+以一条多行 upsert（``frequency = frequency + excluded.frequency``）写入
+``request_logs``：热点路径每个刷写周期每个 worker 只加一次行锁，而不是
+每个请求一次。
+
+路径按路由模板计数（``/songs/{song_id}``，取自路由匹配后的 ``scope["route"]``），
+参数取值不会让路径数量无限增长；未匹配任何路由的请求统一计入 ``_UNMATCHED_PATH``。
+"""
+
+import threading
+from collections import Counter
+from typing import Callable, Mapping
+
+from starlette.types import Scope
+
+from core.helper.ContainerCustomLog.index import custom_log
+from core.middleware.analytics.config import _PATH_HITS_FLUSH_INTERVAL, _UNMATCHED_PATH
+
+
+def route_path(scope: Scope) -> str:
+    """返回请求匹配的路由模板；未匹配时返回 ``_UNMATCHED_PATH``。
+
+    须在路由匹配之后（下游应用处理完请求后）调用。
+    """
+    route = scope.get("route")
+    path = getattr(route, "path_format", None) or getattr(route, "path", None)
+    return path or _UNMATCHED_PATH
+
+
+def _write_to_request_logs(counts: Mapping[str, int]) -> int:
+    from core.database.dao.request_logs import RequestLogsDAO
+
+    return RequestLogsDAO().increment_paths(counts)
+
+
+class PathHitAggregator:
+    """按路径累加访问次数并定期批量写入。
+
+    Args:
+        flush_interval: 刷写间隔（秒）。
+        writer: 写入一批 ``{路径: 增量}`` 的函数，默认写入 request_logs。
+    """
+
+    def __init__(
+        self,
+        flush_interval: float,
+        writer: Callable[[Mapping[str, int]], int] = _write_to_request_logs,
+    ) -> None:
+        self._flush_interval = flush_interval
+        self._writer = writer
+        self._counts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._worker_thread: threading.Thread | None = None
+        self._counters = {"recorded": 0, "flushed": 0, "flushes": 0, "failed": 0}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def record(self, path: str, count: int = 1) -> None:
+        """累加一次访问（只操作内存，可在事件循环中直接调用）。"""
+        with self._lock:
+            self._counts[path] += count
+        self._counters["recorded"] += count
+
+    def start(self) -> None:
+        """启动后台刷写线程。"""
+        self._stop_event.clear()
+        self._worker_thread = threading.Thread(
+            target=self._worker_loop, daemon=True, name="analytics-path-hits"
+        )
+        self._worker_thread.start()
+
+    def stop(self) -> None:
+        """停止后台线程并写入剩余的增量。在应用停止时调用。"""
+        self._stop_event.set()
+        if self._worker_thread is not None:
+            self._worker_thread.join(timeout=10)
+            self._worker_thread = None
+        self.flush()
+
+    def flush(self) -> int:
+        """立即写入当前累计的全部增量，返回写入的路径数。
+
+        写入失败时增量放回内存，下次刷写时重试。
+        """
+        with self._write_lock:
+            with self._lock:
+                counts, self._counts = self._counts, Counter()
+            if not counts:
+                return 0
+            try:
+                written = self._writer(counts)
+            except Exception as exc:
+                with self._lock:
+                    self._counts.update(counts)
+                self._counters["failed"] += 1
+                custom_log("ERROR", f"[Analytics] 写入 request_logs 失败: {exc}")
+                return 0
+            self._counters["flushed"] += sum(counts.values())
+            self._counters["flushes"] += 1
+            return written
+
+    def stats(self) -> dict[str, int]:
+        """返回累计访问次数、已写入次数、刷写 / 失败次数及当前待写入的路径数。"""
+        with self._lock:
+            pending = len(self._counts)
+        return {**self._counters, "pending_paths": pending}
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _worker_loop(self) -> None:
+        """后台线程：每隔 ``flush_interval`` 秒刷写一次。"""
+        while not self._stop_event.wait(timeout=self._flush_interval):
+            self.flush()
+
+
+# 全局单例
+path_hits = PathHitAggregator(flush_interval=_PATH_HITS_FLUSH_INTERVAL)
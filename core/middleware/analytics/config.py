@@ -0,0 +1,27 @@
+# ---------------------------------------------------------------------------
+# 配置常量
+# ---------------------------------------------------------------------------
+
+# 路径访问次数的刷写间隔（秒）：各 worker 每隔该时间把内存中的增量写入 request_logs
+_PATH_HITS_FLUSH_INTERVAL = 5.0
+
+# 未匹配任何路由的请求（404、扫描流量）统一计入该路径，避免任意路径写入 request_logs
+_UNMATCHED_PATH = "<unmatched>"
+
+# 按分钟的请求指标（request_metrics）的刷写间隔（秒）
+_METRICS_FLUSH_INTERVAL = 10.0
+
+# 指标表维护（预建分区、重算小时 / 天汇总、清理过期数据）的执行间隔（秒），
+# 多个 worker 同时到期时只有一个实际执行
+_METRICS_MAINTENANCE_INTERVAL = 300.0
+
+# 每次维护重算最近多少小时的汇总（需大于维护间隔与刷写间隔之和）
+_METRICS_ROLLUP_LOOKBACK_HOURS = 3
+
+# 提前创建的分区天数（今天之外）
+_METRICS_PARTITIONS_AHEAD = 2
+
+# 保留期（天）：按分钟的分区整体删除；小时 / 天汇总按行删除
+_METRICS_RAW_RETENTION_DAYS = 7
+_METRICS_HOURLY_RETENTION_DAYS = 90
+_METRICS_DAILY_RETENTION_DAYS = 730
@@ -0,0 +1,5 @@
+from core.middleware.analytics.aggregator import path_hits
+from core.middleware.analytics.metrics import request_metrics
+from core.middleware.analytics.middleware import RequestAnalyticsMiddleware
+
+__all__ = ["RequestAnalyticsMiddleware", "path_hits", "request_metrics"]
@@ -0,0 +1,213 @@
+"""按路径、按分钟的请求指标的进程内聚合。
+
+请求路径上只在内存中按 (路由模板, 分钟) 累加请求次数、5xx 次数与延迟直方图，
+后台线程每 ``flush_interval`` 秒以多行 upsert 写入按天分区的 request_metrics，
+每 ``maintenance_interval`` 秒执行一次指标表维护（预建分区、重算小时 / 天汇总、
+删除过期分区），见 :meth:`RequestLogsDAO.run_metrics_maintenance`。
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterable
+
+from core.database.dao.request_logs import LATENCY_COLUMNS, latency_bucket
+from core.helper.ContainerCustomLog.index import custom_log
+from core.middleware.analytics.config import (
+    _METRICS_DAILY_RETENTION_DAYS,
+    _METRICS_FLUSH_INTERVAL,
+    _METRICS_HOURLY_RETENTION_DAYS,
+    _METRICS_MAINTENANCE_INTERVAL,
+    _METRICS_PARTITIONS_AHEAD,
+    _METRICS_RAW_RETENTION_DAYS,
+    _METRICS_ROLLUP_LOOKBACK_HOURS,
+)
+
+# 聚合条目的字段位置：[请求数, 5xx 次数, 延迟总和, 最大延迟, 各直方图桶...]
+_COUNT, _ERRORS, _SUM, _MAX, _HISTOGRAM = 0, 1, 2, 3, 4
+
+
+def _write_metrics(rows: list[dict[str, Any]]) -> int:
+    from core.database.dao.request_logs import RequestLogsDAO
+
+    return RequestLogsDAO().add_metrics(rows)
+
+
+def _run_maintenance() -> dict[str, Any] | None:
+    from core.database.dao.request_logs import RequestLogsDAO
+
+    return RequestLogsDAO().run_metrics_maintenance(
+        now=datetime.now(),
+        rollup_lookback=timedelta(hours=_METRICS_ROLLUP_LOOKBACK_HOURS),
+        partitions_ahead=_METRICS_PARTITIONS_AHEAD,
+        raw_retention_days=_METRICS_RAW_RETENTION_DAYS,
+        hourly_retention_days=_METRICS_HOURLY_RETENTION_DAYS,
+        daily_retention_days=_METRICS_DAILY_RETENTION_DAYS,
+    )
+
+
+class RequestMetricsRecorder:
+    """按 (路径, 分钟) 聚合请求指标并定期批量写入。
+
+    Args:
+        flush_interval: 刷写间隔（秒）。
+        maintenance_interval: 指标表维护间隔（秒）。
+        writer: 写入一批指标行的函数，默认写入 request_metrics。
+        maintainer: 执行一次指标表维护的函数。
+    """
+
+    def __init__(
+        self,
+        flush_interval: float,
+        maintenance_interval: float,
+        writer: Callable[[list[dict[str, Any]]], int] = _write_metrics,
+        maintainer: Callable[[], dict[str, Any] | None] = _run_maintenance,
+    ) -> None:
+        self._flush_interval = flush_interval
+        self._maintenance_interval = maintenance_interval
+        self._writer = writer
+        self._maintainer = maintainer
+        # (路径, 分钟序号) -> 聚合条目
+        self._buckets: dict[tuple[str, int], list] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._worker_thread: threading.Thread | None = None
+        self._counters = {
+            "recorded": 0,
+            "flushed_rows": 0,
+            "flushes": 0,
+            "failed": 0,
+            "maintenance_runs": 0,
+            "maintenance_failed": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def record(self, path: str, status: int, latency_ms: float, now: float | None = None) -> None:
+        """累加一次请求（只操作内存，可在事件循环中直接调用）。
+
+        Args:
+            path: 路由模板。
+            status: 响应状态码，>= 500 计为错误。
+            latency_ms: 请求耗时（毫秒）。
+            now: 请求完成时刻（Unix 时间戳），默认取当前时间，便于测试注入。
+        """
+        minute = int((time.time() if now is None else now) // 60)
+        with self._lock:
+            entry = self._buckets.get((path, minute))
+            if entry is None:
+                entry = self._buckets[(path, minute)] = [0, 0, 0.0, 0.0] + [0] * len(LATENCY_COLUMNS)
+            entry[_COUNT] += 1
+            if status >= 500:
+                entry[_ERRORS] += 1
+            entry[_SUM] += latency_ms
+            if latency_ms > entry[_MAX]:
+                entry[_MAX] = latency_ms
+            entry[_HISTOGRAM + latency_bucket(latency_ms)] += 1
+            self._counters["recorded"] += 1
+
+    def start(self) -> None:
+        """启动后台刷写 / 维护线程。"""
+        self._stop_event.clear()
+        self._worker_thread = threading.Thread(
+            target=self._worker_loop, daemon=True, name="analytics-metrics"
+        )
+        self._worker_thread.start()
+
+    def stop(self) -> None:
+        """停止后台线程并写入剩余的指标。在应用停止时调用。"""
+        self._stop_event.set()
+        if self._worker_thread is not None:
+            self._worker_thread.join(timeout=10)
+            self._worker_thread = None
+        self.flush()
+
+    def flush(self) -> int:
+        """立即写入当前聚合的全部指标，返回写入行数；失败时放回内存，下次合并重试。"""
+        with self._write_lock:
+            with self._lock:
+                buckets, self._buckets = self._buckets, {}
+            if not buckets:
+                return 0
+            try:
+                written = self._writer(list(self._rows(buckets)))
+            except Exception as exc:
+                self._merge_back(buckets)
+                self._counters["failed"] += 1
+                custom_log("ERROR", f"[Analytics] 写入 request_metrics 失败: {exc}")
+                return 0
+            self._counters["flushed_rows"] += written
+            self._counters["flushes"] += 1
+            return written
+
+    def maintain(self) -> dict[str, Any] | None:
+        """执行一次指标表维护，失败时只记录日志。"""
+        try:
+            result = self._maintainer()
+        except Exception as exc:
+            self._counters["maintenance_failed"] += 1
+            custom_log("ERROR", f"[Analytics] 指标表维护失败: {exc}")
+            return None
+        self._counters["maintenance_runs"] += 1
+        if result and (result["created_partitions"] or result["dropped_partitions"]):
+            custom_log(
+                "SUCCESS",
+                f"[Analytics] 指标表维护：新建分区 {result['created_partitions']}，"
+                f"删除分区 {result['dropped_partitions']}",
+            )
+        return result
+
+    def stats(self) -> dict[str, int]:
+        """返回记录 / 写入 / 维护计数及当前待写入的 (路径, 分钟) 数。"""
+        with self._lock:
+            pending = len(self._buckets)
+        return {**self._counters, "pending_buckets": pending}
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _rows(buckets: dict[tuple[str, int], list]) -> Iterable[dict[str, Any]]:
+        for (path, minute), entry in buckets.items():
+            row = {
+                "bucket": datetime.fromtimestamp(minute * 60),
+                "request_path": path,
+                "request_count": entry[_COUNT],
+                "error_count": entry[_ERRORS],
+                "latency_sum_ms": entry[_SUM],
+                "latency_max_ms": entry[_MAX],
+            }
+            row.update(zip(LATENCY_COLUMNS, entry[_HISTOGRAM:]))
+            yield row
+
+    def _merge_back(self, buckets: dict[tuple[str, int], list]) -> None:
+        """把写入失败的条目合并回当前聚合。"""
+        with self._lock:
+            for key, entry in buckets.items():
+                current = self._buckets.get(key)
+                if current is None:
+                    self._buckets[key] = entry
+                    continue
+                for i, value in enumerate(entry):
+                    current[i] = max(current[i], value) if i == _MAX else current[i] + value
+
+    def _worker_loop(self) -> None:
+        """后台线程：启动时先维护一次（预建分区），之后按间隔刷写与维护。"""
+        self.maintain()
+        next_maintenance = time.monotonic() + self._maintenance_interval
+        while not self._stop_event.wait(timeout=self._flush_interval):
+            self.flush()
+            if time.monotonic() >= next_maintenance:
+                self.maintain()
+                next_maintenance = time.monotonic() + self._maintenance_interval
+
+
+# 全局单例
+request_metrics = RequestMetricsRecorder(
+    flush_interval=_METRICS_FLUSH_INTERVAL,
+    maintenance_interval=_METRICS_MAINTENANCE_INTERVAL,
+)
@@ -0,0 +1,40 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.middleware.analytics.aggregator import path_hits, route_path
+from core.middleware.analytics.metrics import request_metrics
+
+
+class RequestAnalyticsMiddleware:
+    """请求路径访问统计中间件（纯 ASGI 实现）。
+
+    下游应用处理完请求后，按匹配的路由模板累加一次访问，并记录响应状态码与耗时；
+    计数只写入内存，由 :data:`path_hits` 与 :data:`request_metrics` 的后台线程批量写入
+    request_logs / request_metrics，不在请求路径上访问数据库。
+    注册在防火墙之内（先于 ``FirewallMiddleware`` 添加），被拦截的请求不计数。
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # 未发送响应头就抛出异常的请求按 500 计
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            path = route_path(scope)
+            path_hits.record(path)
+            request_metrics.record(path, status, (time.perf_counter() - start) * 1000)
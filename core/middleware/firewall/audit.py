@@ -0,0 +1,205 @@
+"""违规请求审计记录的异步批量写入。
+
+拦截请求时只把记录放入有界内存队列，由后台线程按「满 N 条或每 M 毫秒」
+批量写入 ``illegal_requests``（一条多行 INSERT），攻击流量不再逐条占用
+数据库事务。队列积压时按比例采样，队列满时直接丢弃，并分别计数。
+"""
+
+import queue
+import threading
+import time
+import uuid as uuid_lib
+from datetime import datetime
+from typing import Any
+
+from core.helper.ContainerCustomLog.index import custom_log
+from core.middleware.firewall.config import (
+    _AUDIT_BATCH_SIZE,
+    _AUDIT_FLUSH_INTERVAL,
+    _AUDIT_QUEUE_SIZE,
+    _AUDIT_SAMPLE_RATE,
+    _AUDIT_SAMPLE_THRESHOLD,
+)
+
+
+class AuditSink:
+    """违规记录的后台批量写入器。
+
+    Args:
+        max_queue: 队列容量，队列满时新记录被丢弃。
+        batch_size: 单次批量写入的最大行数。
+        flush_interval: 最长攒批时间（秒）。
+        sample_threshold: 队列占用率超过该比例后开始采样。
+        sample_rate: 采样时每 ``sample_rate`` 条保留 1 条。
+    """
+
+    def __init__(
+        self,
+        max_queue: int,
+        batch_size: int,
+        flush_interval: float,
+        sample_threshold: float,
+        sample_rate: int,
+    ) -> None:
+        self._queue: queue.Queue[dict[str, Any]] = queue.Queue(maxsize=max_queue)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._sample_above = int(max_queue * sample_threshold)
+        self._sample_rate = max(sample_rate, 1)
+        self._sample_counter = 0
+        self._stop_event = threading.Event()
+        self._worker_thread: threading.Thread | None = None
+        self._write_lock = threading.Lock()
+        self._counters = {
+            "submitted": 0,
+            "written": 0,
+            "sampled_out": 0,
+            "dropped": 0,
+            "batches": 0,
+            "failed": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit(
+        self,
+        attack_type: str,
+        path: str,
+        ip: str,
+        ua: str,
+        user: str | None = None,
+        token: str | None = None,
+    ) -> bool:
+        """非阻塞地提交一条违规记录，返回是否被接收。
+
+        ``user`` 未知时可只传 ``token``，由后台线程在写入前批量解析。
+        """
+        self._counters["submitted"] += 1
+        if self._queue.qsize() >= self._sample_above:
+            self._sample_counter += 1
+            if self._sample_counter % self._sample_rate:
+                self._counters["sampled_out"] += 1
+                return False
+        record = {
+            "uuid": str(uuid_lib.uuid4()),
+            "user": user,
+            "token": token,
+            "happened_at": datetime.now(),
+            "type": attack_type,
+            "path": path,
+            "ip": ip,
+            "ua": ua,
+        }
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self._counters["dropped"] += 1
+            return False
+
+    def start(self) -> None:
+        """启动后台写入线程。"""
+        self._stop_event.clear()
+        self._worker_thread = threading.Thread(
+            target=self._worker_loop, daemon=True, name="firewall-audit"
+        )
+        self._worker_thread.start()
+
+    def stop(self) -> None:
+        """停止后台线程，并把队列中剩余的记录全部写入。在应用停止时调用。"""
+        self._stop_event.set()
+        if self._worker_thread is not None:
+            self._worker_thread.join(timeout=10)
+            self._worker_thread = None
+        self.flush()
+
+    def flush(self) -> int:
+        """同步写入队列中当前的全部记录，返回写入行数。
+
+        会等待后台线程正在写入的批次完成，返回后已提交的记录均已落库。
+        """
+        written = 0
+        with self._write_lock:
+            while True:
+                batch = self._drain(self._batch_size)
+                if not batch:
+                    return written
+                written += self._write(batch)
+
+    def stats(self) -> dict[str, int]:
+        """返回提交、写入、采样丢弃、溢出丢弃等计数及当前队列长度。"""
+        return {**self._counters, "queued": self._queue.qsize()}
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _drain(self, limit: int) -> list[dict[str, Any]]:
+        """非阻塞地取出最多 ``limit`` 条记录。"""
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker_loop(self) -> None:
+        """后台线程：攒满一批或等待超时后批量写入。"""
+        while not self._stop_event.is_set():
+            try:
+                first = self._queue.get(timeout=self._flush_interval)
+            except queue.Empty:
+                continue
+            with self._write_lock:
+                batch = [first]
+                deadline = time.monotonic() + self._flush_interval
+                while len(batch) < self._batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                self._write(batch)
+
+    def _write(self, batch: list[dict[str, Any]]) -> int:
+        """解析 token 对应的用户后，以一条多行 INSERT 写入整批记录。"""
+        try:
+            from sqlalchemy import insert
+
+            from core.database.connection.db import get_session
+            from core.database.dao.illegal_requests import IllegalRequest
+            from core.middleware.firewall.helpers import resolve_user_from_token
+
+            users: dict[str, str] = {}
+            rows = []
+            for record in batch:
+                token = record.pop("token")
+                if record["user"] is None:
+                    if token and token not in users:
+                        users[token] = resolve_user_from_token(token)
+                    record["user"] = users[token] if token else "unknown"
+                rows.append(record)
+            with get_session() as session:
+                session.execute(insert(IllegalRequest.__table__), rows)
+            self._counters["written"] += len(rows)
+            self._counters["batches"] += 1
+            return len(rows)
+        except Exception as exc:
+            self._counters["failed"] += len(batch)
+            custom_log("ERROR", f"[Firewall] 批量写入 illegal_requests 失败: {exc}")
+            return 0
+
+
+# 全局单例
+audit_sink = AuditSink(
+    max_queue=_AUDIT_QUEUE_SIZE,
+    batch_size=_AUDIT_BATCH_SIZE,
+    flush_interval=_AUDIT_FLUSH_INTERVAL,
+    sample_threshold=_AUDIT_SAMPLE_THRESHOLD,
+    sample_rate=_AUDIT_SAMPLE_RATE,
+)
@@ -0,0 +1,147 @@
+"""进程内 IP 封禁缓存。
+
+每个 worker 维护两级缓存：
+
+* 封禁缓存：已确认封禁的 IP，条目存活到封禁到期为止；
+* 负缓存：最近确认未封禁的 IP，短 TTL 兜底。
+
+封禁 / 解封事件通过 Redis pub/sub 频道广播，所有 worker 与节点收到后立即
+更新本地缓存，因此正常流量的封禁检查无需访问 Redis。
+"""
+
+import threading
+
+from core.database.connection.redis import redis_conn
+from core.helper.ContainerCustomLog.index import custom_log
+from core.helper.TTLCache.index import TTLCache
+from core.middleware.firewall.config import (
+    _BAN_CACHE_NEGATIVE_TTL,
+    _BAN_CACHE_SIZE,
+    _BAN_CHANNEL,
+    _BAN_DURATION,
+)
+
+
+def format_ban_event(action: str, ip: str, ttl: int = 0) -> str:
+    """构造封禁事件消息：``"<action> <ttl 秒> <ip>"``。"""
+    return f"{action} {ttl} {ip}"
+
+
+class BanCache:
+    """带 pub/sub 失效通知的封禁缓存。
+
+    Args:
+        maxsize: 封禁缓存与负缓存各自的最大条目数。
+        negative_ttl: 负缓存条目的存活时间（秒），限制错过事件时的最长不一致窗口。
+    """
+
+    def __init__(self, maxsize: int, negative_ttl: float) -> None:
+        self._banned = TTLCache(maxsize)
+        self._clean = TTLCache(maxsize, default_ttl=negative_ttl)
+        self._lookups = 0
+        self._answered = 0
+        self._stop_event = threading.Event()
+        self._listener_thread: threading.Thread | None = None
+
+    # ------------------------------------------------------------------
+    # 缓存读写
+    # ------------------------------------------------------------------
+
+    def lookup(self, ip: str) -> bool | None:
+        """查询本地缓存：True 为已封禁，False 为确认未封禁，None 为未知。"""
+        self._lookups += 1
+        if self._banned.get(ip) is not None:
+            self._answered += 1
+            return True
+        if self._clean.get(ip) is not None:
+            self._answered += 1
+            return False
+        return None
+
+    def mark_banned(self, ip: str, ttl: float = _BAN_DURATION) -> None:
+        """记录 IP 已封禁，``ttl`` 为封禁剩余秒数。"""
+        self._clean.delete(ip)
+        self._banned.set(ip, True, ttl=ttl)
+
+    def mark_clean(self, ip: str) -> None:
+        """记录 IP 当前未封禁（负缓存）。"""
+        self._clean.set(ip, True)
+
+    def unban(self, ip: str) -> None:
+        """移除 IP 的封禁缓存。"""
+        self._banned.delete(ip)
+        self._clean.delete(ip)
+
+    def apply_event(self, message: str) -> None:
+        """应用一条 pub/sub 封禁事件，格式错误时忽略。"""
+        try:
+            action, ttl, ip = message.split(" ", 2)
+            if action == "ban":
+                self.mark_banned(ip, float(ttl) or _BAN_DURATION)
+            elif action == "unban":
+                self.unban(ip)
+        except ValueError:
+            custom_log("WARNING", f"[Firewall] 无法解析封禁事件: {message!r}")
+
+    def clear(self) -> None:
+        """清空两级缓存（不重置统计）。"""
+        self._banned.clear()
+        self._clean.clear()
+
+    def stats(self) -> dict:
+        """返回命中率统计：``hit_rate`` 为无需访问 Redis 即得出结论的比例。"""
+        return {
+            "lookups": self._lookups,
+            "hits": self._answered,
+            "hit_rate": self._answered / self._lookups if self._lookups else 0.0,
+            "banned": self._banned.stats(),
+            "clean": self._clean.stats(),
+        }
+
+    # ------------------------------------------------------------------
+    # pub/sub 监听
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """启动后台线程订阅封禁事件频道。"""
+        self._stop_event.clear()
+        self._listener_thread = threading.Thread(
+            target=self._listen_loop, daemon=True, name="firewall-ban-events"
+        )
+        self._listener_thread.start()
+
+    def stop(self) -> None:
+        """停止订阅线程。"""
+        self._stop_event.set()
+        if self._listener_thread is not None:
+            self._listener_thread.join(timeout=5)
+            self._listener_thread = None
+
+    def _listen_loop(self) -> None:
+        """后台线程：订阅频道并应用事件；断线期间可能错过事件，因此重连时清空负缓存。"""
+        while not self._stop_event.is_set():
+            client = redis_conn.get_client()
+            if client is None:
+                self._stop_event.wait(timeout=1)
+                continue
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(_BAN_CHANNEL)
+                self._clean.clear()
+                while not self._stop_event.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self.apply_event(message["data"])
+            except Exception as exc:
+                custom_log("WARNING", f"[Firewall] 封禁事件订阅中断: {exc}")
+                self._clean.clear()
+                self._stop_event.wait(timeout=1)
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+
+# 全局单例
+ban_cache = BanCache(_BAN_CACHE_SIZE, _BAN_CACHE_NEGATIVE_TTL)
@@ -0,0 +1,276 @@
+"""请求体的流式 XSS / SQL 注入检测。
+
+按块读取请求体，边接收边解析 ``application/json``、
+``application/x-www-form-urlencoded`` 与 ``multipart/form-data``，对其中的
+文本值（JSON 字符串、表单字段、multipart 非文件字段及文件名）逐个检测。
+读取到的 ASGI 消息对象原样保存，检测通过后按顺序重放给下游应用，请求体
+不会被拼接或复制；超过检测上限的部分不再读取，由下游应用直接接收。
+"""
+
+import codecs
+import json
+import re
+from collections import deque
+from typing import Callable, Iterable
+from urllib.parse import unquote_plus
+
+from python_multipart.multipart import MultipartParser, QuerystringParser, parse_options_header
+from starlette.types import Message, Receive
+
+# 检测函数：输入文本，返回攻击类型或 None
+Detector = Callable[[str], str | None]
+
+# JSON 字符串内需要特殊处理的字符（结束引号与转义符）
+_JSON_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class BodyInspectionRule:
+    """请求体检测规则：对匹配的请求检测请求体中的文本内容。
+
+    Args:
+        path_prefix: 匹配的路径前缀。
+        methods: 匹配的请求方法。
+        max_bytes: 最多检测的请求体字节数，超出部分不检测。
+    """
+
+    def __init__(
+        self,
+        path_prefix: str,
+        methods: Iterable[str] = ("POST", "PUT", "PATCH"),
+        max_bytes: int = 64 * 1024,
+    ) -> None:
+        self.path_prefix = path_prefix
+        self.methods = frozenset(m.upper() for m in methods)
+        self.max_bytes = max_bytes
+
+    def matches(self, method: str, path: str) -> bool:
+        """判断规则是否适用于该请求。"""
+        return method.upper() in self.methods and path.startswith(self.path_prefix)
+
+
+def find_body_rule(
+    rules: Iterable[BodyInspectionRule], method: str, path: str
+) -> BodyInspectionRule | None:
+    """返回第一条适用于该请求的规则，没有则返回 None。"""
+    for rule in rules:
+        if rule.matches(method, path):
+            return rule
+    return None
+
+
+# ---------------------------------------------------------------------------
+# 各内容类型的增量扫描器：feed() 接收原始字节块，返回首个检测到的攻击类型
+# ---------------------------------------------------------------------------
+
+class _JSONScanner:
+    """逐块提取 JSON 字符串（键与值），解码转义后检测。"""
+
+    def __init__(self, detect: Detector) -> None:
+        self._detect = detect
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._in_string = False
+        self._escape = False
+        self._raw: list[str] = []
+
+    def feed(self, chunk: bytes) -> str | None:
+        text = self._decoder.decode(chunk)
+        pos, end = 0, len(text)
+        while pos < end:
+            if not self._in_string:
+                start = text.find('"', pos)
+                if start < 0:
+                    return None
+                self._in_string, self._raw, pos = True, [], start + 1
+                continue
+            if self._escape:
+                self._raw.append(text[pos])
+                self._escape, pos = False, pos + 1
+                continue
+            match = _JSON_STRING_SPECIAL.search(text, pos)
+            if match is None:
+                self._raw.append(text[pos:])
+                return None
+            self._raw.append(text[pos:match.start()])
+            pos = match.end()
+            if match.group() == "\\":
+                self._raw.append("\\")
+                self._escape = True
+                continue
+            self._in_string = False
+            offense = self._detect(self._decode("".join(self._raw)))
+            if offense:
+                return offense
+        return None
+
+    def close(self) -> str | None:
+        return None
+
+    @staticmethod
+    def _decode(raw: str) -> str:
+        try:
+            return json.loads(f'"{raw}"', strict=False)
+        except ValueError:
+            return raw
+
+
+class _FormScanner:
+    """基于 python-multipart 的 urlencoded 表单流式解析，逐字段检测。"""
+
+    def __init__(self, detect: Detector) -> None:
+        self._detect = detect
+        self._name = bytearray()
+        self._value = bytearray()
+        self._offense: str | None = None
+        self._parser = QuerystringParser(callbacks={
+            "on_field_start": self._on_field_start,
+            "on_field_name": self._on_field_name,
+            "on_field_data": self._on_field_data,
+            "on_field_end": self._on_field_end,
+        })
+
+    def _on_field_start(self) -> None:
+        self._name.clear()
+        self._value.clear()
+
+    def _on_field_name(self, data: bytes, start: int, end: int) -> None:
+        self._name += data[start:end]
+
+    def _on_field_data(self, data: bytes, start: int, end: int) -> None:
+        self._value += data[start:end]
+
+    def _on_field_end(self) -> None:
+        if self._offense is None:
+            field = bytes(self._name + b"=" + self._value).decode("latin-1")
+            self._offense = self._detect(unquote_plus(field, "utf-8"))
+
+    def feed(self, chunk: bytes) -> str | None:
+        self._parser.write(chunk)
+        return self._offense
+
+    def close(self) -> str | None:
+        self._parser.finalize()
+        return self._offense
+
+
+class _MultipartScanner:
+    """基于 python-multipart 的 multipart 流式解析，检测非文件字段与文件名。"""
+
+    def __init__(self, detect: Detector, boundary: bytes) -> None:
+        self._detect = detect
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._data = bytearray()
+        self._is_file = False
+        self._offense: str | None = None
+        self._parser = MultipartParser(boundary, callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+        })
+
+    def _on_part_begin(self) -> None:
+        self._data.clear()
+        self._is_file = False
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if self._header_field.lower() == b"content-disposition":
+            _, options = parse_options_header(bytes(self._header_value))
+            filename = options.get(b"filename")
+            if filename is not None:
+                self._is_file = True
+                self._check(filename.decode("utf-8", "replace"))
+        self._header_field.clear()
+        self._header_value.clear()
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if not self._is_file:
+            self._data += data[start:end]
+
+    def _on_part_end(self) -> None:
+        if not self._is_file:
+            self._check(self._data.decode("utf-8", "replace"))
+
+    def _check(self, text: str) -> None:
+        if self._offense is None:
+            self._offense = self._detect(text)
+
+    def feed(self, chunk: bytes) -> str | None:
+        self._parser.write(chunk)
+        return self._offense
+
+    def close(self) -> str | None:
+        self._parser.finalize()
+        return self._offense
+
+
+def _make_scanner(content_type: str, detect: Detector):
+    """按 Content-Type 构造扫描器，不支持的类型返回 None。"""
+    media_type, options = parse_options_header(content_type)
+    if media_type == b"application/json" or media_type.endswith(b"+json"):
+        return _JSONScanner(detect)
+    if media_type == b"application/x-www-form-urlencoded":
+        return _FormScanner(detect)
+    if media_type == b"multipart/form-data" and options.get(b"boundary"):
+        return _MultipartScanner(detect, options[b"boundary"])
+    return None
+
+
+def _replay(messages: deque[Message], receive: Receive) -> Receive:
+    """先按顺序返回已读取的消息，之后再从原始 ``receive`` 读取。"""
+
+    async def replay_receive() -> Message:
+        if messages:
+            return messages.popleft()
+        return await receive()
+
+    return replay_receive
+
+
+async def inspect_body(
+    receive: Receive,
+    content_type: str,
+    rule: BodyInspectionRule,
+    detect: Detector,
+) -> tuple[str | None, Receive]:
+    """流式检测请求体。
+
+    Returns:
+        ``(offense, receive)``：offense 为检测到的攻击类型或 None；receive 为
+        供下游应用使用的 ASGI receive，会先重放已读取的消息。不支持的内容
+        类型不读取请求体，直接返回原始 receive。
+    """
+    scanner = _make_scanner(content_type, detect)
+    if scanner is None:
+        return None, receive
+
+    messages: deque[Message] = deque()
+    remaining = rule.max_bytes
+    offense = None
+    try:
+        while remaining > 0:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            body = message.get("body", b"")
+            if body:
+                offense = scanner.feed(body if len(body) <= remaining else body[:remaining])
+                remaining -= len(body)
+                if offense:
+                    break
+            if not message.get("more_body", False):
+                offense = scanner.close()
+                break
+    except Exception:
+        # 请求体格式错误时停止检测，交由下游应用处理
+        offense = None
+    return offense, _replay(messages, receive)
@@ -1,5 +1,8 @@
 import re
 
+from core.middleware.firewall.body import BodyInspectionRule
+from core.middleware.firewall.ratelimit import RateLimit, RateLimitRule
+
 # ---------------------------------------------------------------------------
 # 配置常量
 # ---------------------------------------------------------------------------
@@ -7,14 +10,59 @@ import re
 # 每秒最大请求次数（超过则视为高频攻击）
 _MAX_REQUESTS_PER_SECOND = 20
 
+# 全局每 IP 限额（固定 1 秒窗口），计数 key 为 fw:rate:<ip>
+_GLOBAL_RATE_LIMIT = RateLimit(_MAX_REQUESTS_PER_SECOND, 1, algorithm="fixed_window")
+
+# 附加限流规则（按路由前缀 / 请求方法，以 IP、token 或用户为维度），例如：
+#   RateLimitRule(
+#       "songs-write",
+#       RateLimit.parse("300/minute", algorithm="gcra", burst=40),
+#       path_prefix="/songs", methods=["POST"], key_by="user",
+#   ),
+# 按 IP 计数的规则与全局限额在同一次 Redis 调用中完成；按 token / 用户计数的
+# 规则需额外一次调用，超限时拒绝请求，但不累加 IP 违规次数。
+_RATE_LIMIT_RULES: tuple[RateLimitRule, ...] = ()
+
+# 请求体检测规则（按路由前缀 / 请求方法）：流式检测 JSON、urlencoded 表单与
+# multipart 非文件字段中的 XSS / SQL 注入特征，每个请求最多检测 max_bytes 字节
+_BODY_INSPECTION_RULES: tuple[BodyInspectionRule, ...] = (
+    BodyInspectionRule("/wall_sayings"),
+    BodyInspectionRule("/comments"),
+    BodyInspectionRule("/songs"),
+)
+
 # IP 违规次数上限（达到后封禁）
 _BAN_THRESHOLD = 10
 
 # IP 封禁时长（秒）：24 小时
 _BAN_DURATION = 86400
 
+# 进程内封禁缓存：封禁缓存 / 负缓存各自的最大条目数
+_BAN_CACHE_SIZE = 100_000
+
+# 负缓存（确认未封禁的 IP）存活时间（秒）：pub/sub 事件丢失时的最长不一致窗口
+_BAN_CACHE_NEGATIVE_TTL = 30
+
+# Redis 不可用时的进程内降级状态：限流计数、违规计数、封禁集合各自的最大条目数
+_FALLBACK_STORE_SIZE = 100_000
+
+# 封禁 / 解封事件广播频道，消息格式 "<ban|unban> <ttl 秒> <ip>"
+_BAN_CHANNEL = "fw:ban-events"
+
+# 防火墙同步数据库调用（解析 token）的线程池大小
+_BLOCKING_EXECUTOR_WORKERS = 4
+
+# illegal_requests 审计记录的批量写入：队列容量、单批最大行数、最长攒批时间（秒）
+_AUDIT_QUEUE_SIZE = 10_000
+_AUDIT_BATCH_SIZE = 500
+_AUDIT_FLUSH_INTERVAL = 0.5
+
+# 队列占用率超过该比例后开始采样，每 _AUDIT_SAMPLE_RATE 条保留 1 条
+_AUDIT_SAMPLE_THRESHOLD = 0.5
+_AUDIT_SAMPLE_RATE = 10
+
 # Redis key 前缀
-_KEY_RATE = "fw:rate:"       # 速率计数  fw:rate:<ip> -> count (TTL 1s)
+_KEY_RATE = "fw:rate:"       # 速率计数  fw:rate:<ip> -> count (TTL 1s)；附加规则为 fw:rate:<维度>:<标识>:<规则名>
 _KEY_VIOL = "fw:viol:"       # 违规计数  fw:viol:<ip> -> count (TTL 24h)
 _KEY_BAN = "fw:ban:"         # 封禁标记  fw:ban:<ip>  -> "1"  (TTL 24h)
 
@@ -29,7 +77,12 @@ _CRAWLER_UA_PATTERNS = re.compile(
 )
 
 # ---------------------------------------------------------------------------
-# XSS 检测模式
+# XSS / SQL 注入检测模式
+#
+# 重复量词不设上限，检测语义与最初的模式一致。检测耗时由检测长度上限
+# （_DETECT_MAX_LENGTH / _DETECT_REQUEST_BUDGET）与 RE2 引擎约束，见 detector.py。
+# 注释截断分支写作 '[^']*?-- ：最近的单引号离 -- 最近，与 '[\s\S]*?-- 命中
+# 结果相同，但每个单引号只扫描到下一个单引号为止。
 # ---------------------------------------------------------------------------
 _XSS_PATTERNS = re.compile(
     r"(<\s*script[\s\S]*?>|<\s*/\s*script\s*>|javascript\s*:|vbscript\s*:"
@@ -38,16 +91,27 @@ _XSS_PATTERNS = re.compile(
     re.IGNORECASE,
 )
 
-# ---------------------------------------------------------------------------
-# SQL 注入检测模式
-# ---------------------------------------------------------------------------
 _SQLI_PATTERNS = re.compile(
     r"(\b(select|insert|update|delete|drop|truncate|alter|create|replace"
     r"|union|exec|execute|xp_|sp_)\b.*\b(from|into|table|where|set)\b"
-    r"|'[\s\S]*?--"
+    r"|'[^']*?--"
     r"|;\s*(drop|delete|update|insert|select)"
     r"|\bor\b\s+[\w'\"]+\s*=\s*[\w'\"]+"
     r"|\band\b\s+[\w'\"]+\s*=\s*[\w'\"]+"
     r"|\/\*[\s\S]*?\*\/)",
     re.IGNORECASE,
 )
+
+# 检测正则的执行引擎："auto" 在安装了 google-re2 时使用线性时间的 RE2，否则使用 re；
+# 也可指定 "re2"（未安装时启动报错）或 "re"
+_DETECT_ENGINE = "auto"
+
+# 单次攻击特征检测的最大字符数（路径 + 查询串、Referer、请求体中的每个文本值分别计算）
+_DETECT_MAX_LENGTH = 8192
+
+# 单个请求累计最多检测的字符数（以上各项合计）
+_DETECT_REQUEST_BUDGET = 128 * 1024
+
+# 输入超出上述检测上限时的处理方式：False 只检测上限以内的部分并放行剩余内容
+# （fail open）；True 直接拒绝请求（fail closed）
+_DETECT_FAIL_CLOSED = False
@@ -0,0 +1,152 @@
+"""XSS / SQL 注入特征检测。
+
+完整的检测正则（``_XSS_PATTERNS`` / ``_SQLI_PATTERNS``）是包含 ``.*``、
+``[\\s\\S]*?`` 等无上限重复的大型分支，对每个请求直接运行开销较大。这里先做一遍只用
+``str`` 子串查找的预筛：预筛条件是两组正则各分支能够命中的 **必要条件**，
+未通过预筛的输入一定不会被正则命中，可以直接放行；只有候选输入才运行完整正则，
+因此检测结果与直接运行正则完全一致。
+
+正则的重复量词不设上限（限制跨度会漏掉长列名列表、长注释等真实载荷），
+检测耗时的上限由两部分保证：单次检测与单个请求累计检测的字符数有上限（超出时
+按配置放行或拒绝）；安装了 google-re2 时使用线性时间的 RE2 引擎执行正则。
+只使用 re 引擎时，针对回溯构造的输入在单次上限内仍可能耗时上百毫秒，生产环境
+应安装 google-re2。
+"""
+
+import re
+
+from core.middleware.firewall.config import (
+    _DETECT_ENGINE,
+    _DETECT_FAIL_CLOSED,
+    _DETECT_MAX_LENGTH,
+    _DETECT_REQUEST_BUDGET,
+    _SQLI_PATTERNS,
+    _XSS_PATTERNS,
+)
+
+try:
+    import re2
+except ImportError:  # 可选依赖：google-re2
+    re2 = None
+
+# 输入超出检测上限且配置为 fail closed 时返回的违规类型
+OVERSIZED = "oversized"
+
+# 任一出现即需完整检测的片段（已小写）：
+#   <          各类标签（script / iframe / object / embed / link / img）
+#   ' "        on*= 事件属性、'...-- 注释截断
+#   (          eval( / expression(
+#   ; /*       堆叠语句、块注释
+#   script     javascript: / vbscript:
+#   cookie     document.cookie
+_TRIGGER_FRAGMENTS = ("<", "'", '"', "(", ";", "/*", "script", "cookie")
+
+# SELECT ... FROM 类分支需要同时出现两组关键字
+_SQL_VERBS = (
+    "select", "insert", "update", "delete", "drop", "truncate", "alter",
+    "create", "replace", "union", "exec", "xp_", "sp_",
+)
+_SQL_CLAUSES = ("from", "into", "table", "where", "set")
+
+
+def _is_candidate(text: str) -> bool:
+    """预筛：返回 False 时输入一定不会被检测正则命中。"""
+    # IGNORECASE 下部分非 ASCII 字符（如 ſ、K）与 ASCII 字母等价，
+    # 子串查找无法覆盖，直接交给正则
+    if not text.isascii():
+        return True
+    lowered = text.lower()
+    for fragment in _TRIGGER_FRAGMENTS:
+        if fragment in lowered:
+            return True
+    # OR / AND 恒真式：or|and 之后需有空白和 "="
+    if "=" in lowered and ("or" in lowered or "and" in lowered):
+        if len(lowered.split(maxsplit=1)) > 1:
+            return True
+    return any(verb in lowered for verb in _SQL_VERBS) and any(
+        clause in lowered for clause in _SQL_CLAUSES
+    )
+
+
+def compile_pattern(pattern: re.Pattern, engine: str):
+    """按配置的引擎编译检测正则：``"re"``、``"re2"`` 或 ``"auto"``。"""
+    if engine == "re" or (engine == "auto" and re2 is None):
+        return pattern
+    if re2 is None:
+        raise RuntimeError("检测引擎配置为 re2，但未安装 google-re2")
+    flags = "(?i)" if pattern.flags & re.IGNORECASE else ""
+    return re2.compile(flags + pattern.pattern)
+
+
+class ScanBudget:
+    """单个请求剩余可检测的字符数。"""
+
+    __slots__ = ("remaining",)
+
+    def __init__(self, chars: int) -> None:
+        self.remaining = chars
+
+
+class AttackDetector:
+    """带预筛的 XSS / SQL 注入检测器。
+
+    Args:
+        xss: XSS 检测正则（``re`` 或 ``re2`` 编译结果）。
+        sqli: SQL 注入检测正则。
+        max_length: 单次最多检测的字符数。
+        request_budget: 单个请求累计最多检测的字符数。
+        fail_closed: 输入超出检测上限时是否直接判定为违规（``"oversized"``），
+            否则只检测上限以内的部分。
+    """
+
+    def __init__(
+        self,
+        xss,
+        sqli,
+        max_length: int,
+        request_budget: int = _DETECT_REQUEST_BUDGET,
+        fail_closed: bool = False,
+    ) -> None:
+        self._xss = xss
+        self._sqli = sqli
+        self._max_length = max_length
+        self._request_budget = request_budget
+        self._fail_closed = fail_closed
+
+    def new_budget(self) -> ScanBudget:
+        """为一个请求创建检测预算。"""
+        return ScanBudget(self._request_budget)
+
+    def detect(self, text: str, budget: ScanBudget | None = None) -> str | None:
+        """检测文本中的 XSS / SQL 注入特征，返回攻击类型字符串或 None。
+
+        传入 ``budget`` 时从中扣除本次检测的字符数。
+        """
+        if not text:
+            return None
+        limit = self._max_length
+        if budget is not None:
+            limit = min(limit, budget.remaining)
+        if len(text) > limit:
+            if self._fail_closed:
+                return OVERSIZED
+            text = text[:limit]
+        if budget is not None:
+            budget.remaining -= len(text)
+        if not _is_candidate(text):
+            return None
+        if self._xss.search(text):
+            return "xss"
+        if self._sqli.search(text):
+            return "sql_injection"
+        return None
+
+
+# 全局单例
+attack_detector = AttackDetector(
+    compile_pattern(_XSS_PATTERNS, _DETECT_ENGINE),
+    compile_pattern(_SQLI_PATTERNS, _DETECT_ENGINE),
+    _DETECT_MAX_LENGTH,
+    _DETECT_REQUEST_BUDGET,
+    _DETECT_FAIL_CLOSED,
+)
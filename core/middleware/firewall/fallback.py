@@ -0,0 +1,195 @@
+"""Redis 不可用时的进程内防火墙状态（降级模式）。
+
+Redis 断开、``redis_conn`` 正在重连期间（:attr:`RedisConnectionManager.degraded`），
+防火墙改用本模块维护的进程内状态，语义与 Redis 中的 Lua 脚本一致：
+
+* 限流计数：:class:`MemoryRateLimiter`；
+* 违规计数与封禁集合：容量有界的 :class:`TTLCache`，过期时间与对应的 Redis key 相同。
+
+降级期间新增的违规、封禁与解封会保留到 Redis 恢复，由 :meth:`FallbackStore.reconcile`
+写回（违规次数累加、封禁只延长不缩短）并广播封禁事件；限流计数的窗口很短，不写回。
+
+状态按 worker 进程各自维护：降级期间违规次数按单个 worker 累计，写回后再合并。
+"""
+
+import threading
+from typing import Callable
+
+from core.helper.ContainerCustomLog.index import custom_log
+from core.helper.TTLCache.index import TTLCache
+from core.middleware.firewall.config import (
+    _BAN_CHANNEL,
+    _BAN_DURATION,
+    _BAN_THRESHOLD,
+    _FALLBACK_STORE_SIZE,
+    _KEY_BAN,
+    _KEY_VIOL,
+)
+from core.middleware.firewall.ratelimit import MemoryRateLimiter, RateLimit
+from core.middleware.firewall.scripts import FALLBACK_RECONCILE_SCRIPT
+
+
+class FallbackStore:
+    """降级模式下的限流计数、违规计数与封禁集合。
+
+    封禁与解封以令牌对象记录：写回 Redis 期间同一 IP 再次被封禁 / 解封时，
+    令牌不同，新的记录不会被写回成功的旧记录清除。
+
+    Args:
+        maxsize: 限流计数、违规计数、封禁集合各自的最大条目数，超出后淘汰最久未使用的条目。
+        ban_threshold: 违规次数达到该值时封禁。
+        ban_duration: 封禁时长与违规计数的存活时间（秒）。
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ban_threshold: int = _BAN_THRESHOLD,
+        ban_duration: int = _BAN_DURATION,
+    ) -> None:
+        self._ban_threshold = ban_threshold
+        self._ban_duration = ban_duration
+        self._maxsize = maxsize
+        self._limiter = MemoryRateLimiter(maxsize)
+        # ip -> 降级期间累计的违规次数
+        self._violations = TTLCache(maxsize, default_ttl=ban_duration)
+        # ip -> 令牌；封禁 / 解封均待写回 Redis
+        self._bans = TTLCache(maxsize)
+        self._unbans = TTLCache(maxsize, default_ttl=ban_duration)
+        self._lock = threading.Lock()
+        self._script = None
+        self._counters = {"checks": 0, "bans": 0, "reconciled": 0}
+
+    # ------------------------------------------------------------------
+    # 与 Redis 实现对应的检查
+    # ------------------------------------------------------------------
+
+    def check(
+        self, ip: str, offense: str | None, limits: list[tuple[str, RateLimit]]
+    ) -> tuple[str | None, int, int]:
+        """封禁检查 + 限流 + 违规升级，语义同 ``FIREWALL_CHECK_SCRIPT``。
+
+        Returns:
+            ``(verdict, violations, ban_ttl)``：ban_ttl 为封禁剩余毫秒数，未封禁时为 0。
+        """
+        with self._lock:
+            self._counters["checks"] += 1
+            ban_ttl = self._bans.ttl(ip)
+            if ban_ttl is not None:
+                return "banned", 0, int(ban_ttl * 1000)
+            verdict = offense
+            if self._limiter.hit(limits):
+                verdict = "rate_limit"
+            if not verdict:
+                return None, 0, 0
+            violations = self._violations.get(ip, 0) + 1
+            self._violations.set(ip, violations)
+            if violations >= self._ban_threshold:
+                self._ban(ip, self._ban_duration)
+                return verdict, violations, self._ban_duration * 1000
+            return verdict, violations, 0
+
+    def hit(self, limits: list[tuple[str, RateLimit]]) -> int:
+        """附加限额计数，语义同 :meth:`RedisRateLimiter.hit`。"""
+        return self._limiter.hit(limits)
+
+    def ban(self, ip: str, duration: float) -> None:
+        """记录封禁 ``duration`` 秒，Redis 恢复后写回。"""
+        with self._lock:
+            self._ban(ip, duration)
+
+    def unban(self, ip: str) -> None:
+        """清除本地封禁与违规计数，Redis 恢复后在 Redis 中同样解封。"""
+        with self._lock:
+            self._bans.delete(ip)
+            self._violations.delete(ip)
+            self._unbans.set(ip, object())
+
+    def ban_ttl(self, ip: str) -> float | None:
+        """返回封禁剩余秒数，未封禁时返回 None。"""
+        return self._bans.ttl(ip)
+
+    def _ban(self, ip: str, duration: float) -> None:
+        # 调用方持有 self._lock
+        self._counters["bans"] += 1
+        self._bans.set(ip, object(), ttl=duration)
+
+    # ------------------------------------------------------------------
+    # 写回 Redis
+    # ------------------------------------------------------------------
+
+    def reconcile(self, client, key_for: Callable[[str, str], str]) -> int:
+        """把降级期间的违规、封禁与解封写回 Redis，返回写回的 IP 数。
+
+        每个 IP 一次脚本调用，写回成功后才从本地移除；中途出错时剩余记录保留，
+        异常向上抛出，下次恢复时重试。
+
+        Args:
+            client: 同步 Redis 客户端（由 ``redis_conn`` 的恢复回调传入）。
+            key_for: ``(前缀, ip) -> key``，即 ``helpers.ip_key``。
+        """
+        with self._lock:
+            unbans = {ip: token for ip, token, _ in self._unbans.items()}
+            violations = {ip: count for ip, count, _ in self._violations.items()}
+            bans = {ip: (token, ttl) for ip, token, ttl in self._bans.items()}
+        if self._script is None:
+            self._script = client.register_script(FALLBACK_RECONCILE_SCRIPT)
+        done = 0
+        for ip in unbans.keys() | violations.keys() | bans.keys():
+            ban_token, ban_ttl = bans.get(ip, (None, None))
+            self._script(
+                keys=[key_for(_KEY_BAN, ip), key_for(_KEY_VIOL, ip)],
+                args=[
+                    "1" if ip in unbans else "0",
+                    violations.get(ip, 0),
+                    int(ban_ttl * 1000) if ban_ttl else 0,
+                    self._ban_threshold,
+                    self._ban_duration,
+                    _BAN_CHANNEL,
+                    ip,
+                ],
+                client=client,
+            )
+            self._acknowledge(ip, unbans.get(ip), violations.get(ip, 0), ban_token)
+            done += 1
+        if done:
+            self._counters["reconciled"] += done
+            custom_log("SUCCESS", f"[Firewall] 降级期间的 {done} 个 IP 状态已写回 Redis")
+        return done
+
+    def _acknowledge(self, ip: str, unban_token, violations: int, ban_token) -> None:
+        """移除已写回的记录；写回期间新增的违规与封禁 / 解封保留。"""
+        with self._lock:
+            if unban_token is not None and self._unbans.get(ip) is unban_token:
+                self._unbans.delete(ip)
+            remaining = self._violations.get(ip, 0) - violations
+            if remaining > 0:
+                self._violations.set(ip, remaining)
+            else:
+                self._violations.delete(ip)
+            if ban_token is not None and self._bans.get(ip) is ban_token:
+                self._bans.delete(ip)
+
+    # ------------------------------------------------------------------
+    # 维护
+    # ------------------------------------------------------------------
+
+    def clear(self) -> None:
+        """清空全部本地状态（不重置统计）。"""
+        with self._lock:
+            self._limiter = MemoryRateLimiter(self._maxsize)
+            self._violations.clear()
+            self._bans.clear()
+            self._unbans.clear()
+
+    def stats(self) -> dict:
+        """返回降级检查次数、待写回的记录数与累计写回的 IP 数。"""
+        return {
+            **self._counters,
+            "violations": len(self._violations),
+            "banned": len(self._bans),
+            "pending_unbans": len(self._unbans),
+        }
+
+
+fallback_store = FallbackStore(_FALLBACK_STORE_SIZE)
@@ -1,54 +1,119 @@
-import uuid as uuid_lib
-from datetime import datetime
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
 
 from fastapi import Request
 from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.types import Scope
 
 from core.database.connection.redis import redis_conn
 from core.helper.ContainerCustomLog.index import custom_log
+from core.helper.TokenCache.index import token_cache
 from core.middleware.firewall.config import (
+    _BAN_CHANNEL,
     _BAN_DURATION,
     _BAN_THRESHOLD,
+    _BLOCKING_EXECUTOR_WORKERS,
     _KEY_BAN,
     _KEY_RATE,
     _KEY_VIOL,
-    _MAX_REQUESTS_PER_SECOND,
-    _SQLI_PATTERNS,
-    _XSS_PATTERNS,
 )
+from core.middleware.firewall.bancache import ban_cache, format_ban_event
+from core.middleware.firewall.detector import ScanBudget, attack_detector
+from core.middleware.firewall.fallback import fallback_store
+from core.middleware.firewall.ratelimit import RateLimit, RateLimitRule, RedisRateLimiter
+from core.middleware.firewall.scripts import FIREWALL_CHECK_SCRIPT
 
+# 同步数据库调用（SQLAlchemy Session）专用的有界线程池，避免阻塞事件循环，
+# 同时防止攻击流量占满默认线程池影响正常业务。首次使用时创建，应用停止时关闭，
+# 同一进程中再次启动应用（测试、热重载）时重新创建。
+_blocking_executor: ThreadPoolExecutor | None = None
+_blocking_executor_lock = threading.Lock()
 
-def get_client_ip(request: Request) -> str:
-    """从请求中提取客户端真实 IP（兼容反向代理）。"""
-    forwarded_for = request.headers.get("X-Forwarded-For")
+# 防火墙检查脚本对象（首次使用时注册，SHA 由脚本对象缓存供 EVALSHA 复用）
+_check_script = None
+
+# 按 token / 用户维度的附加限流
+_rate_limiter = RedisRateLimiter()
+
+
+def _get_blocking_executor() -> ThreadPoolExecutor:
+    global _blocking_executor
+    executor = _blocking_executor
+    if executor is None:
+        with _blocking_executor_lock:
+            executor = _blocking_executor
+            if executor is None:
+                executor = _blocking_executor = ThreadPoolExecutor(
+                    max_workers=_BLOCKING_EXECUTOR_WORKERS, thread_name_prefix="firewall-db"
+                )
+    return executor
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any) -> Any:
+    """在防火墙专用线程池中执行阻塞调用并等待结果。"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_blocking_executor(), func, *args)
+
+
+def shutdown_blocking_executor() -> None:
+    """等待已提交的阻塞任务完成并关闭线程池。在应用停止时调用，之后的调用会重新创建线程池。"""
+    global _blocking_executor
+    with _blocking_executor_lock:
+        executor, _blocking_executor = _blocking_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def _pick_client_ip(headers, client_host: str | None) -> str:
+    """按 X-Forwarded-For > X-Real-IP > 连接地址 的优先级选取客户端 IP。"""
+    forwarded_for = headers.get("X-Forwarded-For")
     if forwarded_for:
         return forwarded_for.split(",")[0].strip()
-    real_ip = request.headers.get("X-Real-IP")
+    real_ip = headers.get("X-Real-IP")
     if real_ip:
         return real_ip.strip()
-    if request.client:
-        return request.client.host
+    if client_host:
+        return client_host
     return "unknown"
 
 
-def resolve_user_from_token(token: str) -> str:
-    """通过 token 查询其所有者 uuid，失败时返回 'unknown'。"""
-    try:
-        from sqlalchemy import func, or_, select
+def get_client_ip(request: Request) -> str:
+    """从请求中提取客户端真实 IP（兼容反向代理）。"""
+    return _pick_client_ip(
+        request.headers, request.client.host if request.client else None
+    )
+
+
+def get_scope_client_ip(scope: Scope, headers: Headers) -> str:
+    """从 ASGI scope 中提取客户端真实 IP，无需构建 Request 对象。"""
+    client = scope.get("client")
+    return _pick_client_ip(headers, client[0] if client else None)
+
+
+def ip_key(prefix: str, ip: str) -> str:
+    """按 IP 的 Redis key（封禁、违规、全局限流）；集群模式下 IP 作为哈希标签。"""
+    return prefix + redis_conn.hash_tag(ip)
+
 
-        from core.database.connection.db import get_session
-        from core.database.dao.tokens import Token
+def rule_key(rule: RateLimitRule, scope: str, identity: str) -> str:
+    """附加限流规则的计数 key；集群模式下标识作为哈希标签。"""
+    return rule.key_for(_KEY_RATE, scope, identity, hash_tag=redis_conn.cluster)
 
-        with get_session() as session:
-            stmt = select(Token.belong_to).where(
-                Token.uuid == token,
-                or_(Token.expired_at.is_(None), Token.expired_at > func.now()),
-                Token.current_status != "revoked",
-            )
-            result = session.scalars(stmt).first()
-            return result if result else "unknown"
-    except Exception:
-        return "unknown"
+
+def _reconcile_fallback(client) -> None:
+    """Redis 恢复后把降级期间的进程内状态写回 Redis（在 redis_conn 监控线程中执行）。"""
+    fallback_store.reconcile(client, ip_key)
+
+
+redis_conn.add_recovery_callback(_reconcile_fallback)
+
+
+def resolve_user_from_token(token: str) -> str:
+    """通过 token 查询其所有者 uuid（经 token 缓存），失败时返回 'unknown'。"""
+    return token_cache.resolve(token)
 
 
 def extract_token(request: Request) -> str | None:
@@ -59,85 +124,174 @@ def extract_token(request: Request) -> str | None:
     return request.query_params.get("token") or None
 
 
-def record_illegal_request(
-    user: str,
-    attack_type: str,
-    path: str,
-    ip: str,
-    ua: str,
-) -> None:
-    """将违规请求写入 illegal_requests 表，失败时仅打印日志不中断流程。"""
+async def ban_ip(ip: str) -> None:
+    """在 Redis 中标记 IP 为封禁状态，有效期 24 小时，并广播封禁事件（供内部接口手动封禁）。
+
+    Redis 不可用时记录到进程内降级状态，恢复后写回。
+    """
+    ban_cache.mark_banned(ip, _BAN_DURATION)
+    if redis_conn.degraded:
+        fallback_store.ban(ip, _BAN_DURATION)
+        custom_log("WARNING", f"[Firewall] IP 已封禁 24h（降级模式）: {ip}")
+        return
     try:
-        from core.database.connection.db import get_session
-        from core.database.dao.illegal_requests import IllegalRequest
-
-        record = IllegalRequest(
-            uuid=str(uuid_lib.uuid4()),
-            user=user,
-            happened_at=datetime.now(),
-            type=attack_type,
-            path=path,
-            ip=ip,
-            ua=ua,
-        )
-        with get_session() as session:
-            session.add(record)
+        client = redis_conn.get_async_client()
+        if client is None:
+            return
+        await client.set(ip_key(_KEY_BAN, ip), "1", ex=_BAN_DURATION)
+        await client.publish(_BAN_CHANNEL, format_ban_event("ban", ip, _BAN_DURATION))
+        custom_log("WARNING", f"[Firewall] IP 已封禁 24h: {ip}")
     except Exception as exc:
-        custom_log("ERROR", f"[Firewall] 写入 illegal_requests 失败: {exc}")
+        custom_log("ERROR", f"[Firewall] Redis 封禁 IP 失败: {exc}")
+        redis_conn.report_failure(exc)
+        fallback_store.ban(ip, _BAN_DURATION)
 
 
-def increment_violation(ip: str) -> int:
-    """在 Redis 中累加 IP 违规计数，返回当前计数值。"""
+async def unban_ip(ip: str) -> None:
+    """解除 IP 封禁并清零违规计数，同时广播解封事件（供内部接口手动解封）。
+
+    Redis 不可用时先解除本地封禁，恢复后在 Redis 中解封。
+    """
+    ban_cache.unban(ip)
+    if redis_conn.degraded:
+        fallback_store.unban(ip)
+        custom_log("SUCCESS", f"[Firewall] IP 已解封（降级模式）: {ip}")
+        return
     try:
-        client = redis_conn.get_client()
+        client = redis_conn.get_async_client()
         if client is None:
-            return 0
-        key = f"{_KEY_VIOL}{ip}"
-        count = client.incr(key)
-        # 每次递增时刷新过期时间为 24h，保证封禁窗口滑动
-        client.expire(key, _BAN_DURATION)
-        return count
+            return
+        await client.delete(ip_key(_KEY_BAN, ip), ip_key(_KEY_VIOL, ip))
+        await client.publish(_BAN_CHANNEL, format_ban_event("unban", ip))
+        custom_log("SUCCESS", f"[Firewall] IP 已解封: {ip}")
     except Exception as exc:
-        custom_log("ERROR", f"[Firewall] Redis 违规计数失败: {exc}")
-        return 0
+        custom_log("ERROR", f"[Firewall] Redis 解封 IP 失败: {exc}")
+        redis_conn.report_failure(exc)
+        fallback_store.unban(ip)
 
 
-def ban_ip(ip: str) -> None:
-    """在 Redis 中标记 IP 为封禁状态，有效期 24 小时。"""
+async def is_banned(ip: str) -> bool:
+    """检查 IP 是否被封禁，优先使用进程内缓存，未知时查询 Redis（不可用时查降级状态）。"""
+    cached = ban_cache.lookup(ip)
+    if cached is not None:
+        return cached
+    if redis_conn.degraded:
+        return fallback_store.ban_ttl(ip) is not None
     try:
-        client = redis_conn.get_client()
+        client = redis_conn.get_async_client()
         if client is None:
-            return
-        client.set(f"{_KEY_BAN}{ip}", "1", ex=_BAN_DURATION)
-        custom_log("WARNING", f"[Firewall] IP 已封禁 24h: {ip}")
+            return False
+        ban_ttl = await client.pttl(ip_key(_KEY_BAN, ip))
     except Exception as exc:
-        custom_log("ERROR", f"[Firewall] Redis 封禁 IP 失败: {exc}")
+        redis_conn.report_failure(exc)
+        return fallback_store.ban_ttl(ip) is not None
+    _remember_ban_state(ip, ban_ttl)
+    return ban_ttl != -2
+
 
+def _remember_ban_state(ip: str, ban_ttl: int) -> None:
+    """根据封禁标记的 PTTL（-2 不存在，-1 永久）更新本地封禁缓存。"""
+    if ban_ttl == -2:
+        ban_cache.mark_clean(ip)
+    elif ban_ttl == -1:
+        ban_cache.mark_banned(ip, _BAN_DURATION)
+    else:
+        ban_cache.mark_banned(ip, ban_ttl / 1000)
 
-def is_banned(ip: str) -> bool:
-    """检查 IP 是否在 Redis 封禁名单中。"""
+
+async def check_request(
+    ip: str,
+    offense: str | None,
+    limits: list[tuple[str, RateLimit]],
+) -> tuple[str | None, int]:
+    """一次 Redis 往返完成封禁检查、限流计数与违规升级。
+
+    封禁状态优先查进程内缓存：已知封禁时直接返回，不访问 Redis；已知未封禁
+    时脚本跳过封禁标记检查。
+
+    Args:
+        ip: 客户端 IP。
+        offense: 本地已检测到的违规类型（crawler / xss / sql_injection），无则为 None。
+        limits: 按 IP 计数的限额 ``[(key, limit), ...]``，通常为全局限额加
+            匹配的路由级规则；key 须由 :func:`ip_key` / :func:`rule_key` 生成，
+            集群模式下才与封禁、违规 key 落在同一个槽。
+
+    Returns:
+        ``(verdict, violations)``：verdict 为 ``"banned"``、``"rate_limit"``、
+        ``offense`` 或 None（放行）；violations 为累加后的违规次数。
+        Redis 断开（正在重连）或本次调用出错时改用进程内降级状态
+        （:data:`fallback_store`）；未配置 Redis 时跳过封禁与限流，仅按本地
+        检测结果返回 ``(offense, 0)``。
+    """
+    global _check_script
+    cached_ban = ban_cache.lookup(ip)
+    if cached_ban:
+        return "banned", 0
+    if redis_conn.degraded:
+        return _check_fallback(ip, offense, limits)
     try:
-        client = redis_conn.get_client()
+        client = redis_conn.get_async_client()
         if client is None:
-            return False
-        return bool(client.exists(f"{_KEY_BAN}{ip}"))
-    except Exception:
-        return False
+            return offense, 0
+        if _check_script is None:
+            _check_script = client.register_script(FIREWALL_CHECK_SCRIPT)
+        args: list = [
+            offense or "",
+            _BAN_THRESHOLD,
+            _BAN_DURATION,
+            "1" if cached_ban is None else "0",
+            _BAN_CHANNEL,
+            ip,
+        ]
+        for _, limit in limits:
+            args.extend(limit.script_args())
+        verdict, violations, ban_ttl = await _check_script(
+            keys=[ip_key(_KEY_BAN, ip), ip_key(_KEY_VIOL, ip), *(key for key, _ in limits)],
+            args=args,
+            client=client,
+        )
+    except Exception as exc:
+        custom_log("ERROR", f"[Firewall] Redis 检查失败: {exc}")
+        redis_conn.report_failure(exc)
+        return _check_fallback(ip, offense, limits)
+    if ban_ttl:
+        _remember_ban_state(ip, ban_ttl)
+        # 只有本次调用写入封禁时（而非查到已有封禁）才记录，避免同一次封禁重复记录
+        if verdict != "banned":
+            custom_log("WARNING", f"[Firewall] IP 已封禁 24h: {ip}")
+    elif cached_ban is None:
+        ban_cache.mark_clean(ip)
+    return verdict or None, violations
+
+
+def _check_fallback(
+    ip: str, offense: str | None, limits: list[tuple[str, RateLimit]]
+) -> tuple[str | None, int]:
+    """降级模式下的 :func:`check_request`：封禁同步写入进程内封禁缓存。"""
+    verdict, violations, ban_ttl = fallback_store.check(ip, offense, limits)
+    if ban_ttl:
+        ban_cache.mark_banned(ip, ban_ttl / 1000)
+        if verdict != "banned":
+            custom_log("WARNING", f"[Firewall] IP 已封禁 24h（降级模式）: {ip}")
+    return verdict, violations
 
 
-def is_rate_exceeded(ip: str) -> bool:
-    """检查 IP 是否超过每秒 20 次的请求速率限制。"""
+async def is_limit_exceeded(limits: list[tuple[str, RateLimit]]) -> bool:
+    """检查按 token / 用户维度的附加限额。
+
+    Redis 不可用时按进程内降级状态计数；未配置 Redis 时视为未超限。
+    """
+    if redis_conn.degraded:
+        return fallback_store.hit(limits) > 0
     try:
-        client = redis_conn.get_client()
+        client = redis_conn.get_async_client()
         if client is None:
             return False
-        key = f"{_KEY_RATE}{ip}"
-        count = client.incr(key)
-        if count == 1:
-            client.expire(key, 1)  # 1 秒窗口
-        return count > _MAX_REQUESTS_PER_SECOND
-    except Exception:
-        return False
+        return await _rate_limiter.hit(client, limits) > 0
+    except Exception as exc:
+        custom_log("ERROR", f"[Firewall] Redis 限流检查失败: {exc}")
+        redis_conn.report_failure(exc)
+        return fallback_store.hit(limits) > 0
 
 
 def build_reject_response(reason: str) -> JSONResponse:
@@ -148,12 +302,9 @@ def build_reject_response(reason: str) -> JSONResponse:
     )
 
 
-def detect_attack(text: str) -> str | None:
-    """检测文本中的 XSS / SQL 注入特征，返回攻击类型字符串或 None。"""
-    if not text:
-        return None
-    if _XSS_PATTERNS.search(text):
-        return "xss"
-    if _SQLI_PATTERNS.search(text):
-        return "sql_injection"
-    return None
+def detect_attack(text: str, budget: ScanBudget | None = None) -> str | None:
+    """检测文本中的 XSS / SQL 注入特征，返回攻击类型字符串或 None。
+
+    ``budget`` 为当前请求的检测预算（见 ``attack_detector.new_budget()``）。
+    """
+    return attack_detector.detect(text, budget)
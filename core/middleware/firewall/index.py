@@ -1,3 +1,6 @@
+from core.middleware.firewall.audit import audit_sink
+from core.middleware.firewall.bancache import ban_cache
+from core.middleware.firewall.helpers import shutdown_blocking_executor
 from core.middleware.firewall.middleware import FirewallMiddleware
 
-__all__ = ["FirewallMiddleware"]
+__all__ = ["FirewallMiddleware", "audit_sink", "ban_cache", "shutdown_blocking_executor"]
@@ -1,105 +1,175 @@
-from typing import Callable
-
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from core.helper.ContainerCustomLog.index import custom_log
-from core.middleware.firewall.config import _BAN_THRESHOLD, _CRAWLER_UA_PATTERNS
+from core.helper.TokenCache.index import token_cache
+from core.middleware.firewall.body import find_body_rule, inspect_body
+from core.middleware.firewall.config import (
+    _BODY_INSPECTION_RULES,
+    _CRAWLER_UA_PATTERNS,
+    _GLOBAL_RATE_LIMIT,
+    _KEY_RATE,
+    _RATE_LIMIT_RULES,
+)
+from core.middleware.firewall.audit import audit_sink
+from core.middleware.firewall.detector import OVERSIZED, ScanBudget, attack_detector
 from core.middleware.firewall.helpers import (
-    ban_ip,
     build_reject_response,
+    check_request,
     detect_attack,
     extract_token,
-    get_client_ip,
-    increment_violation,
-    is_banned,
-    is_rate_exceeded,
-    record_illegal_request,
+    get_scope_client_ip,
+    ip_key,
+    is_limit_exceeded,
     resolve_user_from_token,
+    rule_key,
+    run_blocking,
 )
+from core.middleware.firewall.ratelimit import RateLimit, RateLimitRule, match_rules
+
+# 各判定结果对应的拒绝原因
+_REJECT_REASONS = {
+    "banned": "您的 IP 已被封禁，请 24 小时后重试。",
+    "rate_limit": "请求过于频繁，请稍后再试。",
+    "crawler": "禁止爬虫访问。",
+    OVERSIZED: "请求内容过长，无法完成安全检查。",
+}
+_DEFAULT_REJECT_REASON = "请求包含非法内容，已被拦截。"
+
 
+class FirewallMiddleware:
+    """应用层防火墙中间件（纯 ASGI 实现）。
 
-class FirewallMiddleware(BaseHTTPMiddleware):
-    """应用层防火墙中间件。
+    直接基于 ASGI ``scope`` 做检查，不经过 ``BaseHTTPMiddleware`` 的
+    任务与响应流包装；仅在需要解析 token 时才构建 ``Request`` 对象。
+    Redis 检查全部使用 ``redis.asyncio``，同步数据库调用交给防火墙专用的
+    有界线程池，单次慢查询不会阻塞同一 worker 上的其他请求。
 
-    检测顺序：
-    1. IP 封禁检查
+    先在本地完成不依赖状态的检测（爬虫 UA、XSS、SQL 注入），再通过一次
+    Redis 脚本调用完成封禁检查、按 IP 的限流计数与违规升级；命中按 token /
+    用户计数的附加限流规则时再额外检查一次。判定优先级：
+    1. IP 封禁
     2. 高频访问（速率限制）
     3. 常见爬虫 User-Agent
     4. XSS 攻击特征
     5. SQL 注入特征
+    6. 请求体中的 XSS / SQL 注入特征（仅限配置了请求体检测规则的路由，
+       流式读取并在放行时原样重放给下游应用）
     """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        ip = get_client_ip(request)
-        ua = request.headers.get("User-Agent", "")
-        path = request.url.path
-        query = str(request.url.query)
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
-        # ------------------------------------------------------------------ #
-        # 1. IP 封禁检查                                                       #
-        # ------------------------------------------------------------------ #
-        if is_banned(ip):
-            return build_reject_response("您的 IP 已被封禁，请 24 小时后重试。")
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # 仅处理 HTTP 请求，lifespan / websocket 直接放行
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        ip = get_scope_client_ip(scope, headers)
+        ua = headers.get("User-Agent", "")
+        path = scope["path"]
+        query = scope.get("query_string", b"").decode()
+
+        budget = attack_detector.new_budget()
+        offense = self._detect_offense(headers, ua, path, query, budget)
+        rules = match_rules(_RATE_LIMIT_RULES, scope["method"], path)
+        ip_limits = [(ip_key(_KEY_RATE, ip), _GLOBAL_RATE_LIMIT)] + [
+            (rule_key(rule, "ip", ip), rule.limit)
+            for rule in rules
+            if rule.key_by == "ip"
+        ]
+        verdict, _ = await check_request(ip, offense, ip_limits)
+        if verdict is None:
+            identity_rules = [rule for rule in rules if rule.key_by != "ip"]
+            if identity_rules and await self._identity_limited(scope, ip, identity_rules):
+                verdict = "rate_limit"
+        if verdict is None:
+            body_rule = find_body_rule(_BODY_INSPECTION_RULES, scope["method"], path)
+            if body_rule is not None:
+                body_offense, receive = await inspect_body(
+                    receive,
+                    headers.get("Content-Type", ""),
+                    body_rule,
+                    lambda text: detect_attack(text, budget),
+                )
+                if body_offense is not None:
+                    # 本次请求已计入限流，这里只累加违规次数
+                    verdict, _ = await check_request(ip, body_offense, [])
+        if verdict is not None:
+            if verdict != "banned":
+                self._record(scope, verdict, path, ip, ua)
+            response = build_reject_response(
+                _REJECT_REASONS.get(verdict, _DEFAULT_REJECT_REASON)
+            )
+            await response(scope, receive, send)
+            return
 
         # ------------------------------------------------------------------ #
-        # 2. 速率限制（超高频访问 > 20次/s）                                    #
+        # 正常请求，放行                                                        #
         # ------------------------------------------------------------------ #
-        if is_rate_exceeded(ip):
-            attack_type = "rate_limit"
-            user = self._resolve_user(request)
-            record_illegal_request(user, attack_type, path, ip, ua)
-            viol_count = increment_violation(ip)
-            if viol_count >= _BAN_THRESHOLD:
-                ban_ip(ip)
-            custom_log("WARNING", f"[Firewall] 速率超限 ip={ip} path={path}")
-            return build_reject_response("请求过于频繁，请稍后再试。")
+        await self.app(scope, receive, send)
+
+    # ------------------------------------------------------------------
+    # 内部辅助
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _detect_offense(
+        headers: Headers, ua: str, path: str, query: str, budget: ScanBudget
+    ) -> str | None:
+        """执行不依赖 Redis 的本地检测，返回违规类型或 None。"""
 
         # ------------------------------------------------------------------ #
-        # 3. 爬虫 User-Agent 检测                                               #
+        # 爬虫 User-Agent 检测                                                  #
         # ------------------------------------------------------------------ #
         if ua and _CRAWLER_UA_PATTERNS.search(ua):
-            attack_type = "crawler"
-            user = self._resolve_user(request)
-            record_illegal_request(user, attack_type, path, ip, ua)
-            viol_count = increment_violation(ip)
-            if viol_count >= _BAN_THRESHOLD:
-                ban_ip(ip)
-            custom_log("WARNING", f"[Firewall] 爬虫 UA 检测 ip={ip} ua={ua}")
-            return build_reject_response("禁止爬虫访问。")
+            return "crawler"
 
         # ------------------------------------------------------------------ #
-        # 4 & 5. XSS / SQL 注入检测（检查 URL 路径和查询参数）                  #
+        # XSS / SQL 注入检测（检查 URL 路径和查询参数）                         #
         # ------------------------------------------------------------------ #
         combined = path + "?" + query if query else path
-        attack_type = detect_attack(combined)
+        attack_type = detect_attack(combined, budget)
         if attack_type is None:
             # 也检查常用请求头中的注入
-            referer = request.headers.get("Referer", "")
-            attack_type = detect_attack(referer)
-
-        if attack_type:
-            user = self._resolve_user(request)
-            record_illegal_request(user, attack_type, path, ip, ua)
-            viol_count = increment_violation(ip)
-            if viol_count >= _BAN_THRESHOLD:
-                ban_ip(ip)
-            custom_log("WARNING", f"[Firewall] {attack_type} 攻击检测 ip={ip} path={path}")
-            return build_reject_response("请求包含非法内容，已被拦截。")
-
-        # ------------------------------------------------------------------ #
-        # 正常请求，放行                                                        #
-        # ------------------------------------------------------------------ #
-        return await call_next(request)
+            attack_type = detect_attack(headers.get("Referer", ""), budget)
+        return attack_type
 
-    # ------------------------------------------------------------------
-    # 内部辅助
-    # ------------------------------------------------------------------
+    @staticmethod
+    async def _identity_limited(scope: Scope, ip: str, rules: list[RateLimitRule]) -> bool:
+        """检查按 token / 用户计数的附加规则；无 token 或 token 无效时按 IP 计数。"""
+        token = extract_token(Request(scope))
+        user = None
+        limits: list[tuple[str, RateLimit]] = []
+        for rule in rules:
+            scope_name, identity = "ip", ip
+            if token and rule.key_by == "token":
+                scope_name, identity = "token", token
+            elif token and rule.key_by == "user":
+                if user is None:
+                    user = token_cache.peek(token) or await run_blocking(
+                        resolve_user_from_token, token
+                    )
+                if user != "unknown":
+                    scope_name, identity = "user", user
+            limits.append((rule_key(rule, scope_name, identity), rule.limit))
+        return await is_limit_exceeded(limits)
 
     @staticmethod
-    def _resolve_user(request: Request) -> str:
-        """尝试从请求中解析 token 并返回对应用户，失败时返回 'unknown'。"""
-        token = extract_token(request)
-        if not token:
-            return "unknown"
-        return resolve_user_from_token(token)
+    def _record(scope: Scope, attack_type: str, path: str, ip: str, ua: str) -> None:
+        """记录违规请求（违规计数与封禁已在 Redis 脚本中完成）。
+
+        只入队不落库，token 对应的用户由审计线程在批量写入前解析。
+        """
+        if attack_type == "rate_limit":
+            custom_log("WARNING", f"[Firewall] 速率超限 ip={ip} path={path}")
+        elif attack_type == "crawler":
+            custom_log("WARNING", f"[Firewall] 爬虫 UA 检测 ip={ip} ua={ua}")
+        else:
+            custom_log("WARNING", f"[Firewall] {attack_type} 攻击检测 ip={ip} path={path}")
+        # 只有命中拦截规则时才会调用，因此在这里才按需构建 ``Request``
+        token = extract_token(Request(scope))
+        audit_sink.submit(attack_type, path, ip, ua, token=token)
@@ -0,0 +1,262 @@
+"""可插拔的限流引擎。
+
+支持四种算法，均提供 Redis（Lua 脚本，原子执行）与进程内两种实现：
+
+* ``fixed_window``    固定窗口计数，开销最小，窗口边界处最多放行 2 倍请求
+* ``sliding_log``     滑动窗口日志，精确但每个请求占用一条记录
+* ``sliding_counter`` 滑动窗口计数，用上一窗口加权估算，内存恒定
+* ``gcra``            令牌桶（GCRA），可表达「300 次/分钟，突发 40 次」
+
+限额可按 IP、token 或用户维度，并可限定路由前缀与请求方法，见
+:class:`RateLimitRule`。
+"""
+
+import hashlib
+import re
+import time
+from typing import Iterable
+
+from redis.asyncio import RedisCluster
+from redis.crc import key_slot
+
+from core.helper.TTLCache.index import TTLCache
+from core.middleware.firewall.scripts import RATE_LIMIT_SCRIPT
+
+ALGORITHMS = ("fixed_window", "sliding_log", "sliding_counter", "gcra")
+
+KEY_SCOPES = ("ip", "token", "user")
+
+_PERIOD_UNITS = {
+    "s": 1, "sec": 1, "second": 1,
+    "m": 60, "min": 60, "minute": 60,
+    "h": 3600, "hour": 3600,
+    "d": 86400, "day": 86400,
+}
+_RATE_PATTERN = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*([a-z]+?)s?\s*$", re.IGNORECASE)
+
+
+class RateLimit:
+    """限额定义：``period`` 秒内最多 ``limit`` 次请求。
+
+    Args:
+        limit: 周期内允许的请求数。
+        period: 周期长度（秒）。
+        algorithm: 限流算法，见 :data:`ALGORITHMS`。
+        burst: 允许的最大突发请求数（仅 ``gcra`` 使用），默认等于 ``limit``。
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        period: float,
+        algorithm: str = "fixed_window",
+        burst: int | None = None,
+    ) -> None:
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"未知的限流算法: {algorithm}")
+        if limit <= 0 or period <= 0:
+            raise ValueError("limit 与 period 必须为正数")
+        self.limit = limit
+        self.period = period
+        self.algorithm = algorithm
+        self.burst = burst if burst is not None else limit
+
+    @classmethod
+    def parse(cls, rate: str, algorithm: str = "fixed_window", burst: int | None = None) -> "RateLimit":
+        """从 ``"300/minute"``、``"20/s"``、``"5/10s"`` 形式的字符串构造限额。"""
+        match = _RATE_PATTERN.match(rate)
+        if not match or match.group(3).lower() not in _PERIOD_UNITS:
+            raise ValueError(f"无法解析限额: {rate!r}")
+        count, multiplier, unit = match.groups()
+        period = int(multiplier or 1) * _PERIOD_UNITS[unit.lower()]
+        return cls(int(count), period, algorithm=algorithm, burst=burst)
+
+    def script_args(self) -> list:
+        """返回 Lua 限流脚本中该限额对应的 4 个参数。"""
+        return [self.algorithm, self.limit, int(self.period * 1000), self.burst]
+
+    def __repr__(self) -> str:
+        return (
+            f"RateLimit({self.limit}/{self.period}s, algorithm={self.algorithm!r}, "
+            f"burst={self.burst})"
+        )
+
+
+class RateLimitRule:
+    """附加限流规则：对匹配的请求按指定维度计数。
+
+    Args:
+        name: 规则名，作为 Redis key 的一部分，需唯一。
+        limit: 限额。
+        path_prefix: 匹配的路径前缀，默认匹配所有路径。
+        methods: 匹配的请求方法，None 表示全部方法。
+        key_by: 计数维度：``"ip"``、``"token"`` 或 ``"user"``。请求未携带
+            token 时，``token`` / ``user`` 维度退化为按 IP 计数。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: RateLimit,
+        path_prefix: str = "/",
+        methods: Iterable[str] | None = None,
+        key_by: str = "ip",
+    ) -> None:
+        if key_by not in KEY_SCOPES:
+            raise ValueError(f"未知的计数维度: {key_by}")
+        self.name = name
+        self.limit = limit
+        self.path_prefix = path_prefix
+        self.methods = frozenset(m.upper() for m in methods) if methods else None
+        self.key_by = key_by
+
+    def matches(self, method: str, path: str) -> bool:
+        """判断规则是否适用于该请求。"""
+        if self.methods is not None and method.upper() not in self.methods:
+            return False
+        return path.startswith(self.path_prefix)
+
+    def key_for(self, key_prefix: str, scope: str, identity: str, hash_tag: bool = False) -> str:
+        """生成规则的计数 key；token 以摘要形式出现，避免明文写入 Redis。
+
+        ``hash_tag`` 为 True 时（Redis 集群）标识写作 ``{identity}``，同一标识的
+        key 落在同一个槽。
+        """
+        if scope == "token":
+            identity = hashlib.sha256(identity.encode()).hexdigest()[:32]
+        if hash_tag:
+            identity = f"{{{identity}}}"
+        return f"{key_prefix}{scope}:{identity}:{self.name}"
+
+
+def match_rules(rules: Iterable[RateLimitRule], method: str, path: str) -> list[RateLimitRule]:
+    """返回适用于该请求的规则列表（保持配置顺序）。"""
+    return [rule for rule in rules if rule.matches(method, path)]
+
+
+# ---------------------------------------------------------------------------
+# Redis 实现
+# ---------------------------------------------------------------------------
+
+def _slot_groups(limits: list[tuple[str, RateLimit]]) -> list[list[tuple[str, RateLimit]]]:
+    """按集群槽位把相邻的限额分组，保持原有顺序。"""
+    groups: list[list[tuple[str, RateLimit]]] = []
+    last_slot = None
+    for key, limit in limits:
+        slot = key_slot(key.encode())
+        if slot != last_slot:
+            groups.append([])
+            last_slot = slot
+        groups[-1].append((key, limit))
+    return groups
+
+
+class RedisRateLimiter:
+    """基于 Lua 脚本的 Redis 限流器（``redis.asyncio``），一次往返检查多个限额。
+
+    Redis 集群中脚本只能操作同一个槽的 key：限额按槽位分组，每组一次往返，
+    依次检查，遇到超限的组即停止（与单节点时「超限后不再消耗后续限额」一致）。
+    """
+
+    def __init__(self) -> None:
+        self._script = None
+
+    async def hit(self, client, limits: list[tuple[str, RateLimit]]) -> int:
+        """对 ``[(key, limit), ...]`` 依次计数。
+
+        Returns:
+            首个超限项的序号（从 1 开始），全部放行时返回 0。
+        """
+        if not limits:
+            return 0
+        if self._script is None:
+            self._script = client.register_script(RATE_LIMIT_SCRIPT)
+        groups = _slot_groups(limits) if isinstance(client, RedisCluster) else [limits]
+        offset = 0
+        for group in groups:
+            args: list = []
+            for _, limit in group:
+                args.extend(limit.script_args())
+            exceeded = await self._script(
+                keys=[key for key, _ in group], args=args, client=client
+            )
+            if exceeded:
+                return offset + exceeded
+            offset += len(group)
+        return 0
+
+
+# ---------------------------------------------------------------------------
+# 进程内实现
+# ---------------------------------------------------------------------------
+
+class MemoryRateLimiter:
+    """进程内限流器，与 Redis 实现的算法语义一致。
+
+    状态保存在容量有界的 :class:`TTLCache` 中，适用于单进程部署、测试，
+    以及 Redis 不可用时的降级。
+
+    Args:
+        maxsize: 最多跟踪的 key 数量，超出后淘汰最久未使用的 key。
+    """
+
+    def __init__(self, maxsize: int = 100_000) -> None:
+        self._states = TTLCache(maxsize)
+
+    def hit(self, limits: list[tuple[str, RateLimit]], now: float | None = None) -> int:
+        """对 ``[(key, limit), ...]`` 依次计数，语义同 :meth:`RedisRateLimiter.hit`。
+
+        Args:
+            now: 当前时间（毫秒），默认取单调时钟，便于测试注入。
+        """
+        if now is None:
+            now = time.monotonic() * 1000
+        for index, (key, limit) in enumerate(limits, start=1):
+            if not self._hit_one(key, limit, now):
+                return index
+        return 0
+
+    def _hit_one(self, key: str, limit: RateLimit, now: float) -> bool:
+        period = limit.period * 1000
+        state = self._states.get(key)
+        algorithm = limit.algorithm
+
+        if algorithm == "fixed_window":
+            # state: [窗口结束时刻, 计数]
+            if state is None or state[0] <= now:
+                state = [now + period, 0]
+            state[1] += 1
+            self._states.set(key, state, ttl=(state[0] - now) / 1000)
+            return state[1] <= limit.limit
+
+        if algorithm == "sliding_log":
+            # state: 窗口内各请求时间戳（升序）
+            log = [t for t in (state or ()) if t > now - period]
+            if len(log) >= limit.limit:
+                self._states.set(key, log, ttl=period / 1000)
+                return False
+            log.append(now)
+            self._states.set(key, log, ttl=period / 1000)
+            return True
+
+        if algorithm == "sliding_counter":
+            # state: [窗口序号, 当前窗口计数, 上一窗口计数]
+            window = now // period
+            last, current, previous = state if state is not None else (None, 0, 0)
+            if last != window:
+                previous = current if last == window - 1 else 0
+                current = 0
+            weight = 1 - (now - window * period) / period
+            if previous * weight + current >= limit.limit:
+                return False
+            self._states.set(key, (window, current + 1, previous), ttl=2 * period / 1000)
+            return True
+
+        # gcra — state: 理论到达时间 TAT
+        interval = period / limit.limit
+        tat = max(state if state is not None else now, now)
+        new_tat = tat + interval
+        if new_tat - now > limit.burst * interval:
+            return False
+        self._states.set(key, new_tat, ttl=(new_tat - now) / 1000)
+        return True
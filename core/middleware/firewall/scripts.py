@@ -0,0 +1,213 @@
+"""防火墙使用的 Redis Lua 脚本。
+
+脚本在 Redis 服务端原子执行，通过 EVALSHA 调用（SHA 由 redis-py 缓存，
+服务端缺失时自动 SCRIPT LOAD），一次网络往返即可完成全部状态读写。
+"""
+
+# ---------------------------------------------------------------------------
+# 限流算法库（被下面两个脚本拼接复用）
+#
+# 每个算法函数签名均为 (key, limit, period, burst, now)：
+#   limit   周期内允许的请求数
+#   period  周期长度（毫秒）
+#   burst   令牌桶容量（仅 GCRA 使用）
+#   now     当前时间（毫秒，来自 Redis TIME，保证多实例时钟一致）
+# 返回 true 表示放行。
+#
+# check_limits(first_key, first_arg) 依次检查 KEYS[first_key..]，每个 key
+# 对应 ARGV 中连续 4 个参数：算法名、limit、period、burst。返回首个超限
+# key 的序号（从 1 开始），全部放行返回 0；超限后不再消耗后续限额。
+# ---------------------------------------------------------------------------
+RATE_LIMIT_LIBRARY = """
+local function clock()
+    local t = redis.call('TIME')
+    return tonumber(t[1]) * 1000 + tonumber(t[2]) / 1000
+end
+
+-- 固定窗口：INCR 计数，窗口内首个请求设置过期时间
+local function fixed_window(key, limit, period, burst, now)
+    local count = redis.call('INCR', key)
+    if count == 1 then
+        redis.call('PEXPIRE', key, period)
+    elseif count > limit and redis.call('PTTL', key) == -1 then
+        -- 兜底：旧版本 INCR 与 EXPIRE 非原子，可能遗留无过期时间的计数
+        redis.call('PEXPIRE', key, period)
+    end
+    return count <= limit
+end
+
+-- 滑动窗口日志：有序集合记录每个请求的时间戳
+local function sliding_log(key, limit, period, burst, now)
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - period)
+    local count = redis.call('ZCARD', key)
+    if count >= limit then
+        return false
+    end
+    redis.call('ZADD', key, now, string.format('%.3f:%d', now, count))
+    redis.call('PEXPIRE', key, math.ceil(period))
+    return true
+end
+
+-- 滑动窗口计数：按上一窗口剩余比例加权估算
+local function sliding_counter(key, limit, period, burst, now)
+    local window = math.floor(now / period)
+    local state = redis.call('HMGET', key, 'window', 'current', 'previous')
+    local last = tonumber(state[1])
+    local current = tonumber(state[2]) or 0
+    local previous = tonumber(state[3]) or 0
+    if last ~= window then
+        if last == window - 1 then
+            previous = current
+        else
+            previous = 0
+        end
+        current = 0
+    end
+    local weight = 1 - (now - window * period) / period
+    if previous * weight + current >= limit then
+        return false
+    end
+    redis.call('HSET', key, 'window', window, 'current', current + 1, 'previous', previous)
+    redis.call('PEXPIRE', key, math.ceil(period * 2))
+    return true
+end
+
+-- 令牌桶（GCRA）：只保存理论到达时间 TAT
+local function gcra(key, limit, period, burst, now)
+    local interval = period / limit
+    local tat = tonumber(redis.call('GET', key)) or now
+    if tat < now then
+        tat = now
+    end
+    local new_tat = tat + interval
+    if new_tat - now > burst * interval then
+        return false
+    end
+    redis.call('SET', key, string.format('%.3f', new_tat), 'PX', math.ceil(new_tat - now))
+    return true
+end
+
+local ALGORITHMS = {
+    fixed_window = fixed_window,
+    sliding_log = sliding_log,
+    sliding_counter = sliding_counter,
+    gcra = gcra,
+}
+
+local function check_limits(first_key, first_arg)
+    local now = clock()
+    for i = first_key, #KEYS do
+        local a = first_arg + (i - first_key) * 4
+        local algorithm = ALGORITHMS[ARGV[a]]
+        if not algorithm(KEYS[i], tonumber(ARGV[a + 1]), tonumber(ARGV[a + 2]),
+                         tonumber(ARGV[a + 3]), now) then
+            return i - first_key + 1
+        end
+    end
+    return 0
+end
+"""
+
+# ---------------------------------------------------------------------------
+# 独立限流检查
+#
+# KEYS[1..n]  限流计数 key
+# ARGV        每个 key 对应 4 个参数：算法名、limit、period（毫秒）、burst
+#
+# 返回首个超限 key 的序号（从 1 开始），全部放行返回 0。
+# ---------------------------------------------------------------------------
+RATE_LIMIT_SCRIPT = RATE_LIMIT_LIBRARY + """
+return check_limits(1, 1)
+"""
+
+# ---------------------------------------------------------------------------
+# 单次往返的防火墙检查：封禁检查 + 限流 + 违规升级
+#
+# KEYS[1]     封禁标记  fw:ban:<ip>
+# KEYS[2]     违规计数  fw:viol:<ip>
+# KEYS[3..n]  按 IP 统计的限流计数（全局 fw:rate:<ip> 及路由级规则）
+# ARGV[1]     本地已检测到的违规类型（crawler / xss / sql_injection），无则为空串
+# ARGV[2]     封禁阈值
+# ARGV[3]     封禁时长（秒）
+# ARGV[4]     是否检查封禁标记：'1' 检查；'0' 跳过（本地负缓存已确认未封禁）
+# ARGV[5]     封禁事件广播频道
+# ARGV[6]     客户端 IP（用于封禁事件消息）
+# ARGV[7..]   每个限流 key 对应 4 个参数：算法名、limit、period（毫秒）、burst
+#
+# 返回 {verdict, violations, ban_ttl}：
+#   verdict 为 'banned'（已封禁）、'rate_limit'、ARGV[1] 或空串（放行）；
+#   violations 为本次累加后的违规次数（未违规时为 0）；
+#   ban_ttl 为封禁剩余毫秒数（-1 表示永久封禁），未封禁时为 0。
+# 本次调用触发封禁时向 ARGV[5] 发布 "ban <ttl 秒> <ip>"。
+# ---------------------------------------------------------------------------
+FIREWALL_CHECK_SCRIPT = RATE_LIMIT_LIBRARY + """
+if ARGV[4] == '1' then
+    local ban_ttl = redis.call('PTTL', KEYS[1])
+    if ban_ttl ~= -2 then
+        return {'banned', 0, ban_ttl}
+    end
+end
+
+local verdict = ARGV[1]
+if check_limits(3, 7) > 0 then
+    verdict = 'rate_limit'
+end
+
+if verdict == '' then
+    return {'', 0, 0}
+end
+
+local violations = redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+if violations >= tonumber(ARGV[2]) then
+    redis.call('SET', KEYS[1], '1', 'EX', ARGV[3])
+    redis.call('PUBLISH', ARGV[5], 'ban ' .. ARGV[3] .. ' ' .. ARGV[6])
+    return {verdict, violations, tonumber(ARGV[3]) * 1000}
+end
+return {verdict, violations, 0}
+"""
+
+# ---------------------------------------------------------------------------
+# 降级状态写回：Redis 恢复后合并一个 IP 在降级期间的违规、封禁与解封
+#
+# KEYS[1]     封禁标记  fw:ban:<ip>
+# KEYS[2]     违规计数  fw:viol:<ip>
+# ARGV[1]     是否先解封：'1' 删除封禁标记与违规计数（降级期间执行过解封）
+# ARGV[2]     降级期间新增的违规次数
+# ARGV[3]     降级期间封禁的剩余毫秒数，未封禁为 0
+# ARGV[4]     封禁阈值
+# ARGV[5]     封禁时长（秒）
+# ARGV[6]     封禁事件广播频道
+# ARGV[7]     客户端 IP（用于封禁事件消息）
+#
+# 违规次数累加到 Redis 中已有的计数上，合并后达到阈值时同样触发封禁；封禁
+# 只延长、不缩短已有的封禁（永久封禁保持不变）。返回 {violations, ban_ttl}：
+# 合并后的违规次数与本次写入的封禁毫秒数（未写入为 0）。
+# ---------------------------------------------------------------------------
+FALLBACK_RECONCILE_SCRIPT = """
+if ARGV[1] == '1' then
+    redis.call('DEL', KEYS[1], KEYS[2])
+    redis.call('PUBLISH', ARGV[6], 'unban 0 ' .. ARGV[7])
+end
+
+local violations = 0
+local delta = tonumber(ARGV[2])
+if delta > 0 then
+    violations = redis.call('INCRBY', KEYS[2], delta)
+    redis.call('EXPIRE', KEYS[2], ARGV[5])
+end
+
+local ban_ttl = tonumber(ARGV[3])
+if violations >= tonumber(ARGV[4]) then
+    ban_ttl = math.max(ban_ttl, tonumber(ARGV[5]) * 1000)
+end
+if ban_ttl > 0 then
+    local current = redis.call('PTTL', KEYS[1])
+    if current ~= -1 and current < ban_ttl then
+        redis.call('SET', KEYS[1], '1', 'PX', ban_ttl)
+        redis.call('PUBLISH', ARGV[6], 'ban ' .. math.ceil(ban_ttl / 1000) .. ' ' .. ARGV[7])
+        return {violations, ban_ttl}
+    end
+end
+return {violations, 0}
+"""
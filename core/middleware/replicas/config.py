@@ -0,0 +1,2 @@
+# 携带最近一次写入主库时刻（Unix 时间戳）的 cookie 名
+_LAST_WRITE_COOKIE = "db_last_write"
@@ -0,0 +1,3 @@
+from core.middleware.replicas.middleware import ReadYourWritesMiddleware
+
+__all__ = ["ReadYourWritesMiddleware"]
@@ -0,0 +1,54 @@
+import math
+import time
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.database.connection.db import read_your_writes_window
+from core.database.connection.replicas import track_writes
+from core.middleware.replicas.config import _LAST_WRITE_COOKIE
+
+
+def _carried_write(scope: Scope, window: float) -> float | None:
+    """读取客户端带回的写入时刻；缺失、格式错误或不在窗口内（含未来时刻）时返回 None。"""
+    cookie = Headers(scope=scope).get("cookie")
+    if not cookie:
+        return None
+    try:
+        last_write = float(cookie_parser(cookie).get(_LAST_WRITE_COOKIE, ""))
+    except ValueError:
+        return None
+    return last_write if 0 <= time.time() - last_write < window else None
+
+
+class ReadYourWritesMiddleware:
+    """跨请求的读己之写（纯 ASGI 实现）。
+
+    请求内写入主库时，在响应头中设置 ``db_last_write`` cookie（有效期为读己之写窗口）；
+    客户端下一个请求带回后，窗口期内的只读 Session 仍走主库，例如 POST 之后重定向到
+    GET 时不会读到尚未同步的副本。未配置只读副本时直接透传。
+
+    写入时刻在响应头发出时确定：响应开始之后（流式响应体中）的写入不会带给客户端。
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        window = read_your_writes_window() if scope["type"] == "http" else None
+        if not window:
+            await self.app(scope, receive, send)
+            return
+        with track_writes(_carried_write(scope, window)) as record:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start" and record.last_write is not None:
+                    MutableHeaders(scope=message).append(
+                        "set-cookie",
+                        f"{_LAST_WRITE_COOKIE}={record.last_write:.3f}; Max-Age={math.ceil(window)}; "
+                        "Path=/; HttpOnly; SameSite=Lax",
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
@@ -2,6 +2,7 @@
 import psycopg2
 from psycopg2 import sql
 import os
+import re
 from datetime import datetime
 import dotenv
 from core.helper.ContainerCustomLog.index import custom_log
@@ -55,6 +56,62 @@ def create_migration_history_table(conn):
         cursor.close()
 
 
+# 以此注释开头的迁移脚本不在事务中执行（如 CREATE INDEX CONCURRENTLY），
+# 按分号拆分后逐条语句自动提交；此类脚本的字符串常量中不应包含分号
+NO_TRANSACTION_MARKER = "-- migrate: no-transaction"
+
+_CONCURRENT_INDEX_RE = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)",
+    re.IGNORECASE,
+)
+
+
+def split_sql_statements(sql_script):
+    """去掉 -- 注释行后按分号拆分为单条语句"""
+    lines = [line for line in sql_script.splitlines() if not line.strip().startswith("--")]
+    return [stmt.strip() for stmt in "\n".join(lines).split(";") if stmt.strip()]
+
+
+def drop_invalid_indexes(conn, sql_script):
+    """删除本脚本中 CREATE INDEX CONCURRENTLY 失败后遗留的无效索引
+
+    并发建索引失败时索引仍然存在但被标记为 INVALID，IF NOT EXISTS 会跳过它，
+    必须先删除才能重新执行迁移。
+    """
+    names = _CONCURRENT_INDEX_RE.findall(sql_script)
+    if not names:
+        return
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE NOT i.indisvalid AND c.relname = ANY(%s);",
+            (names,),
+        )
+        for (name,) in cursor.fetchall():
+            cursor.execute(sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {};").format(sql.Identifier(name)))
+            custom_log("WARNING", f"已删除建立失败的无效索引: {name}")
+    finally:
+        cursor.close()
+
+
+def execute_without_transaction(conn, sql_script):
+    """逐条语句自动提交执行迁移脚本，失败时清理遗留的无效索引后抛出异常"""
+    # 结束检查迁移历史时开启的事务，autocommit 只能在事务外切换
+    conn.commit()
+    conn.autocommit = True
+    cursor = conn.cursor()
+    try:
+        for statement in split_sql_statements(sql_script):
+            cursor.execute(statement)
+    except psycopg2.Error:
+        drop_invalid_indexes(conn, sql_script)
+        raise
+    finally:
+        cursor.close()
+        conn.autocommit = False
+
+
 def execute_migrations(conn):
     # 导入migration列表
     from core.database.migrations.migration_history import migration_history
@@ -73,7 +130,10 @@ def execute_migrations(conn):
                 # 执行迁移脚本
                 with open(f'core/database/migrations/SQL/{migration}', 'r') as f:
                     sql_script = f.read()
-                cursor.execute(sql_script)
+                if sql_script.lstrip().startswith(NO_TRANSACTION_MARKER):
+                    execute_without_transaction(conn, sql_script)
+                else:
+                    cursor.execute(sql_script)
                 # 记录迁移历史
                 insert_sql = "INSERT INTO migration_history (migration_name, status, executed_at) VALUES (%s, %s, CURRENT_TIMESTAMP AT TIME ZONE 'Asia/Shanghai');"
                 cursor.execute(insert_sql, (migration, 'success'))
@@ -0,0 +1,175 @@
+import csv
+import hmac
+import io
+import json
+import os
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from core.database.connection.db import pool_stats, replica_stats
+from core.database.connection.redis import redis_conn
+from core.database.dao.base import BaseDAO
+from core.database.dao.illegal_requests import IllegalRequestsDAO
+from core.database.dao.request_logs import RequestLogsDAO
+from core.helper.TokenCache.index import token_cache
+from core.middleware.analytics.aggregator import path_hits
+from core.middleware.analytics.metrics import request_metrics
+from core.middleware.firewall.audit import audit_sink
+from core.middleware.firewall.bancache import ban_cache
+from core.middleware.firewall.fallback import fallback_store
+from core.middleware.firewall.helpers import ban_ip, is_banned, unban_ip
+
+
+# 内部接口鉴权：请求头 X-Internal-Token 需与环境变量 INTERNAL_STATS_TOKEN 一致，
+# 未配置该变量时内部接口整体不可用（返回 404）
+def require_internal_token(x_internal_token: str = Header(default="")) -> None:
+    """校验内部接口访问令牌"""
+    expected = os.getenv("INTERNAL_STATS_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=404)
+    if not hmac.compare_digest(x_internal_token, expected):
+        raise HTTPException(status_code=403, detail="invalid internal token")
+
+
+# 获取运行时统计
+def get_runtime_stats() -> Dict[str, Any]:
+    """汇总当前 worker 的运行时统计"""
+    return {
+        "firewall": {
+            "ban_cache": ban_cache.stats(),
+            "audit_sink": audit_sink.stats(),
+            "fallback": {"degraded": redis_conn.degraded, **fallback_store.stats()},
+        },
+        "analytics": {
+            "path_hits": path_hits.stats(),
+            "request_metrics": request_metrics.stats(),
+        },
+        "token_cache": token_cache.stats(),
+        "database": {
+            "pool": pool_stats(),
+            "replicas": replica_stats(),
+        },
+    }
+
+
+# 可导出的表：仅日志类表，用户 / 令牌等含敏感字段的表不开放导出
+_EXPORTABLE: Dict[str, type[BaseDAO]] = {
+    "illegal_requests": IllegalRequestsDAO,
+    "request_logs": RequestLogsDAO,
+}
+
+_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=_json_default)
+    return value
+
+
+async def _export_chunks(
+    dao: BaseDAO, fmt: str, batch_size: int, columns: tuple[str, ...]
+) -> AsyncIterator[str]:
+    """按批序列化为 NDJSON / CSV，每批一个响应块，内存占用与总行数无关。"""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        yield buffer.getvalue()
+    async for batch in dao.stream_async(batch_size, fields=columns):
+        if fmt == "ndjson":
+            yield "".join(
+                json.dumps(row, ensure_ascii=False, default=_json_default) + "\n" for row in batch
+            )
+        else:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerows([_csv_value(row[name]) for name in columns] for row in batch)
+            yield buffer.getvalue()
+
+
+# 内部路由
+app = APIRouter(prefix="/internal", dependencies=[Depends(require_internal_token)])
+@app.get("/stats")
+async def stats():
+    """返回当前 worker 的运行时统计（缓存命中率、连接池占用等）"""
+    return get_runtime_stats()
+
+
+def _require_redis() -> None:
+    """封禁状态保存在 Redis 中，未配置 Redis 时防火墙不做封禁检查，手动封禁没有意义"""
+    if redis_conn.get_client() is None and not redis_conn.degraded:
+        raise HTTPException(status_code=503, detail="redis is not configured")
+
+
+@app.get("/firewall/bans/{ip}")
+async def get_ban(ip: str):
+    """查询 IP 是否被封禁"""
+    _require_redis()
+    return {"ip": ip, "banned": await is_banned(ip)}
+
+
+@app.put("/firewall/bans/{ip}")
+async def ban(ip: str):
+    """手动封禁 IP 24 小时（Redis 不可用时记录到降级状态，恢复后写回）"""
+    _require_redis()
+    await ban_ip(ip)
+    return {"ip": ip, "banned": True}
+
+
+@app.delete("/firewall/bans/{ip}")
+async def unban(ip: str):
+    """解除 IP 封禁并清零违规计数（Redis 不可用时先解除本地封禁，恢复后写回）"""
+    _require_redis()
+    await unban_ip(ip)
+    return {"ip": ip, "banned": False}
+
+
+@app.get("/metrics/hot")
+def hot_paths(
+    minutes: int = Query(default=5, ge=1, le=1440),
+    limit: int = Query(default=10, ge=1, le=100),
+):
+    """最近 ``minutes`` 分钟请求次数最多的路径及其错误数与延迟（读取 request_metrics）"""
+    since = datetime.now() - timedelta(minutes=minutes)
+    return {"since": since.isoformat(), "paths": RequestLogsDAO().hot_paths(since, limit)}
+
+
+@app.get("/export/{table}")
+async def export(
+    table: str,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    batch_size: int = Query(default=1000, ge=1, le=10000),
+    fields: Optional[str] = Query(default=None, description="逗号分隔的列名，默认导出全部列"),
+):
+    """以 NDJSON / CSV 流式导出整张日志表（服务端游标分批读取，按 id 升序）"""
+    dao_class = _EXPORTABLE.get(table)
+    if dao_class is None:
+        raise HTTPException(status_code=404, detail=f"table {table!r} is not exportable")
+    dao = dao_class()
+    # 响应开始后无法再返回错误状态码，字段须在此之前校验
+    try:
+        columns = dao.validate_fields(fields)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+    return StreamingResponse(
+        _export_chunks(dao, format, batch_size, columns),
+        media_type=_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'},
+    )
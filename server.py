@@ -8,9 +8,20 @@ from datetime import datetime
 import platform
 from typing import Dict, Any
 from core.helper.ContainerCustomLog.index import custom_log
-from core.middleware.firewall.index import FirewallMiddleware
+from core.middleware.firewall.index import (
+    FirewallMiddleware,
+    audit_sink,
+    ban_cache,
+    shutdown_blocking_executor,
+)
+from core.middleware.analytics.index import (
+    RequestAnalyticsMiddleware,
+    path_hits,
+    request_metrics,
+)
+from core.middleware.replicas.index import ReadYourWritesMiddleware
 from core.database.connection.redis import redis_conn
-from core.database.connection.db import dispose_engine, get_session
+from core.database.connection.db import dispose_async_engine, dispose_engine, get_session
 
 # 加载环境变量
 load_dotenv()
@@ -33,9 +44,20 @@ async def lifespan(app: FastAPI):
     except Exception as exc:
         custom_log("ERROR", f"PostgreSQL 连接失败: {exc}")
     redis_conn.start()
+    ban_cache.start()
+    audit_sink.start()
+    path_hits.start()
+    request_metrics.start()
     yield
+    request_metrics.stop()
+    path_hits.stop()
+    audit_sink.stop()
+    shutdown_blocking_executor()
     dispose_engine()
+    await dispose_async_engine()
     custom_log("SUCCESS", "PostgreSQL 连接已关闭")
+    ban_cache.stop()
+    await redis_conn.close_async_client()
     redis_conn.stop()
 
 
@@ -50,12 +72,18 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# 注册读己之写中间件（写入后经 cookie 让同一客户端的后续读取在窗口期内仍走主库）
+app.add_middleware(ReadYourWritesMiddleware)
+# 注册请求统计中间件（在防火墙之内，被拦截的请求不计数）
+app.add_middleware(RequestAnalyticsMiddleware)
 # 注册防火墙中间件（在 CORS 之后，路由之前）
 app.add_middleware(FirewallMiddleware)
 # 导入模块
 from modules.index.index import app as index_router
+from modules.internal.index import app as internal_router
 # 导入路由
 app.include_router(index_router)
+app.include_router(internal_router)
 
 
 # 尝试启动服务器
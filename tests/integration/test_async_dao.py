@@ -0,0 +1,80 @@
+"""Integration tests — async DAO methods (get_async_session + asyncpg) against real PostgreSQL.
+
+Covers:
+  * create_async / find_by_uuid_async / update_async / delete_async round trip
+  * Async and sync methods see each other's committed writes
+  * Rollback on exception inside get_async_session
+"""
+
+import asyncio
+import uuid as uuid_lib
+
+import pytest
+
+
+def _run(coro):
+    """在新的事件循环中执行协程，结束后释放异步引擎（asyncpg 连接与事件循环绑定）。"""
+    from core.database.connection.db import dispose_async_engine
+
+    async def wrapper():
+        try:
+            return await coro
+        finally:
+            await dispose_async_engine()
+
+    return asyncio.run(wrapper())
+
+
+@pytest.fixture
+def users_dao(integration_app):
+    from core.database.dao.users import UsersDAO
+
+    return UsersDAO()
+
+
+def test_async_crud_round_trip(users_dao):
+    print("\n[TEST] BaseDAO *_async → 增删改查结果与同步方法一致")
+    user_uuid = str(uuid_lib.uuid4())
+
+    async def scenario():
+        created = await users_dao.create_async(
+            {"uuid": user_uuid, "nickname": "async", "user_role": "user"}
+        )
+        found = await users_dao.find_by_uuid_async(user_uuid)
+        updated = await users_dao.update_async(user_uuid, {"nickname": "renamed"})
+        deleted = await users_dao.delete_async(user_uuid)
+        missing = await users_dao.find_by_uuid_async(user_uuid)
+        return created, found, updated, deleted, missing
+
+    created, found, updated, deleted, missing = _run(scenario())
+    assert created["id"] is not None
+    assert found == created
+    assert updated["nickname"] == "renamed"
+    assert deleted is True
+    assert missing is None
+
+
+def test_async_write_visible_to_sync_read(users_dao):
+    print("\n[TEST] create_async 提交后，同步 find_by_uuid 可读到")
+    user_uuid = str(uuid_lib.uuid4())
+    _run(users_dao.create_async({"uuid": user_uuid, "nickname": "x", "user_role": "user"}))
+    assert users_dao.find_by_uuid(user_uuid)["nickname"] == "x"
+    users_dao.delete(user_uuid)
+
+
+def test_async_session_rolls_back_on_error(users_dao):
+    print("\n[TEST] get_async_session → 异常时回滚，不写入数据")
+    from core.database.connection.db import get_async_session
+    from core.database.dao.users import User
+
+    user_uuid = str(uuid_lib.uuid4())
+
+    async def scenario():
+        async with get_async_session() as session:
+            session.add(User(uuid=user_uuid, nickname="rollback", user_role="user"))
+            await session.flush()
+            raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        _run(scenario())
+    assert users_dao.find_by_uuid(user_uuid) is None
@@ -0,0 +1,157 @@
+"""Integration tests — BaseDAO 批量方法（create_many / update_many / upsert_many / delete_many）.
+
+Covers:
+  * 批量插入按输入顺序返回完整行（含数据库默认值），分块后结果一致
+  * 批量更新只更新给定字段，未命中的键被忽略，JSONB 字段正确写入
+  * 批量 upsert 插入新行并覆盖已有行
+  * 批量删除返回删除行数；整体在一个事务中，出错时全部回滚
+  * returning=False 时多批次（含 executemany 分页）返回的行数准确
+  * 行的键可以是 ORM 属性名（class_），与 create / update 一致
+  * TokensDAO 批量修改后 token 缓存失效
+"""
+
+import asyncio
+import uuid as uuid_lib
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+
+@pytest.fixture
+def users_dao(integration_app):
+    from core.database.dao.users import UsersDAO
+
+    return UsersDAO()
+
+
+def _rows(n: int) -> list[dict]:
+    return [
+        {"uuid": str(uuid_lib.uuid4()), "nickname": f"bulk-{i}", "user_role": "user"}
+        for i in range(n)
+    ]
+
+
+def test_create_many_returns_rows_in_input_order(users_dao):
+    print("\n[TEST] create_many → 分块插入，按输入顺序返回完整行")
+    rows = _rows(7)
+    rows[3]["other_info"] = {"source": "import"}
+    created = users_dao.create_many(iter(rows), chunk_size=3)
+    assert [r["uuid"] for r in created] == [r["uuid"] for r in rows]
+    assert created[3]["other_info"] == {"source": "import"}
+    assert created[0]["score"] == 0 and created[0]["joined_at"] is not None
+    assert users_dao.find_by_uuid(rows[6]["uuid"]) == created[6]
+    assert users_dao.delete_many(r["uuid"] for r in rows) == 7
+
+
+def test_create_many_without_returning_counts_rows(users_dao):
+    print("\n[TEST] create_many(returning=False) → 返回插入行数")
+    rows = _rows(5)
+    assert users_dao.create_many(rows, chunk_size=2, returning=False) == 5
+    assert users_dao.delete_many([r["uuid"] for r in rows], chunk_size=2) == 5
+
+
+def test_bulk_counts_across_batches(users_dao):
+    print("\n[TEST] returning=False → 多批次、超过 executemany 单页的行数准确")
+    rows = _rows(2500)
+    # 每块 1200 行，超过 insertmanyvalues 单页上限（1000），rowcount 只反映最后一页
+    assert users_dao.create_many(rows, chunk_size=1200, returning=False) == 2500
+    renamed = [{"uuid": r["uuid"], "nickname": "renamed"} for r in rows[:1500]]
+    assert users_dao.update_many(renamed, chunk_size=700, returning=False) == 1500
+    fresh = _rows(300)
+    upserts = [{"uuid": r["uuid"], "nickname": "upserted"} for r in rows[:1300]] + fresh
+    assert users_dao.upsert_many(upserts, chunk_size=1200, returning=False) == 1600
+    keys_only = [{"uuid": r["uuid"]} for r in rows[:200] + _rows(100)]
+    assert users_dao.upsert_many(keys_only, chunk_size=1200, returning=False) == 100
+    extra = keys_only[200:]
+    keys = [r["uuid"] for r in rows + fresh + extra]
+    assert users_dao.delete_many(keys, chunk_size=1200) == 2900
+
+
+def test_bulk_counts_across_batches_async(users_dao):
+    print("\n[TEST] 异步 returning=False → 多批次行数准确")
+    from core.database.connection.db import dispose_async_engine
+
+    rows = _rows(2100)
+
+    async def scenario():
+        try:
+            created = await users_dao.create_many_async(rows, chunk_size=1100, returning=False)
+            updated = await users_dao.update_many_async(
+                ({"uuid": r["uuid"], "nickname": "renamed"} for r in rows), chunk_size=800, returning=False
+            )
+            upserted = await users_dao.upsert_many_async(
+                ({"uuid": r["uuid"], "nickname": "upserted"} for r in rows), chunk_size=1100, returning=False
+            )
+            deleted = await users_dao.delete_many_async((r["uuid"] for r in rows), chunk_size=800)
+            return created, updated, upserted, deleted
+        finally:
+            await dispose_async_engine()
+
+    assert asyncio.run(scenario()) == (2100, 2100, 2100, 2100)
+
+
+def test_bulk_accepts_attribute_names(users_dao):
+    print("\n[TEST] create_many / update_many → 接受 ORM 属性名 class_")
+    rows = [dict(row, class_="class-a") for row in _rows(2)]
+    created = users_dao.create_many(rows)
+    assert [r["class"] for r in created] == ["class-a", "class-a"]
+    updated = users_dao.update_many([{"uuid": rows[1]["uuid"], "class_": "class-b"}])
+    assert updated[0]["class"] == "class-b"
+    assert users_dao.delete_many(r["uuid"] for r in rows) == 2
+
+
+def test_update_many_updates_given_fields(users_dao):
+    print("\n[TEST] update_many → 只更新给定字段，忽略不存在的键")
+    rows = _rows(3)
+    users_dao.create_many(rows)
+    updated = users_dao.update_many([
+        {"uuid": rows[2]["uuid"], "nickname": "renamed", "other_info": {"a": 1}},
+        {"uuid": "missing", "nickname": "x"},
+        {"uuid": rows[0]["uuid"], "class": "class-1"},
+    ])
+    assert [r["uuid"] for r in updated] == [rows[2]["uuid"], rows[0]["uuid"]]
+    assert updated[0]["nickname"] == "renamed" and updated[0]["other_info"] == {"a": 1}
+    assert updated[1]["class"] == "class-1" and updated[1]["nickname"] == "bulk-0"
+    assert users_dao.find_by_uuid(rows[1]["uuid"])["nickname"] == "bulk-1"
+    users_dao.delete_many(r["uuid"] for r in rows)
+
+
+def test_upsert_many_inserts_and_overwrites(users_dao):
+    print("\n[TEST] upsert_many → 新键插入，已有键覆盖")
+    existing = _rows(1)
+    users_dao.create_many(existing)
+    new_uuid = str(uuid_lib.uuid4())
+    result = users_dao.upsert_many([
+        {"uuid": existing[0]["uuid"], "nickname": "overwritten"},
+        {"uuid": new_uuid, "nickname": "inserted"},
+    ])
+    assert [r["nickname"] for r in result] == ["overwritten", "inserted"]
+    assert result[0]["id"] == users_dao.find_by_uuid(existing[0]["uuid"])["id"]
+    users_dao.delete_many([existing[0]["uuid"], new_uuid])
+
+
+def test_bulk_write_is_one_transaction(users_dao):
+    print("\n[TEST] create_many → 任一块失败时整体回滚")
+    rows = _rows(4)
+    rows[3]["uuid"] = rows[0]["uuid"]  # 第二块违反唯一约束
+    with pytest.raises(IntegrityError):
+        users_dao.create_many(rows, chunk_size=2)
+    assert users_dao.find_by_uuid(rows[0]["uuid"]) is None
+
+
+def test_tokens_bulk_update_invalidates_cache(integration_app, redis_client):
+    print("\n[TEST] TokensDAO.update_many / delete_many → token 缓存失效")
+    from core.database.dao.tokens import TokensDAO
+    from core.helper.TokenCache.index import token_cache
+
+    dao = TokensDAO()
+    tokens = [str(uuid_lib.uuid4()) for _ in range(3)]
+    dao.create_many(
+        {"uuid": t, "belong_to": "bulk-owner", "permission": "user", "current_status": "active"}
+        for t in tokens
+    )
+    assert all(token_cache.resolve(t) == "bulk-owner" for t in tokens)
+    dao.update_many(({"uuid": t, "current_status": "revoked"} for t in tokens[:2]), returning=False)
+    assert [token_cache.resolve(t) for t in tokens] == ["unknown", "unknown", "bulk-owner"]
+    assert dao.delete_many(tokens) == 3
+    assert redis_client.get("auth:token:" + token_cache._hash(tokens[2])) is None
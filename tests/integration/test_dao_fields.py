@@ -0,0 +1,75 @@
+"""Integration tests — DAO 读取方法的 fields 列投影.
+
+Covers:
+  * find_by_uuid / find_all / find_page / iter_all 及异步版本只返回指定的列
+  * User.class_ 属性名与 class 列名均可用于 fields，返回键为列名
+  * fields 未包含排序键时 find_page 仍能正确翻页
+"""
+
+import asyncio
+import uuid as uuid_lib
+
+import pytest
+
+
+@pytest.fixture
+def users(integration_app):
+    from core.database.dao.users import UsersDAO
+
+    dao = UsersDAO()
+    tag = f"fields-{uuid_lib.uuid4().hex[:8]}"
+    created = dao.create_many(
+        {"uuid": str(uuid_lib.uuid4()), "nickname": tag, "class": f"c{i}", "score": i}
+        for i in range(5)
+    )
+    yield dao, tag, created
+    dao.delete_many([row["uuid"] for row in created])
+
+
+def test_find_by_uuid_projection(users):
+    print("\n[TEST] find_by_uuid(fields=(uuid, class_)) → 只返回这两列，键为列名")
+    dao, _, created = users
+    row = dao.find_by_uuid(created[0]["uuid"], fields=("uuid", "class_"))
+    assert row == {"uuid": created[0]["uuid"], "class": "c0"}
+    assert dao.find_by_uuid("missing", fields=("uuid",)) is None
+    with pytest.raises(ValueError):
+        dao.find_by_uuid(created[0]["uuid"], fields=("password",))
+
+
+def test_find_page_projection_without_sort_keys(users):
+    print("\n[TEST] find_page(order_by=-score, fields=nickname,class) → 逐页翻完，结果不含排序键")
+    dao, tag, created = users
+    items, cursor = [], None
+    while True:
+        page = dao.find_page(
+            cursor, 2, ("-score",), {"nickname": tag}, fields="nickname,class"
+        )
+        items.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert items == [{"nickname": tag, "class": f"c{i}"} for i in range(4, -1, -1)]
+
+
+def test_stream_and_async_projection(users):
+    print("\n[TEST] iter_all / find_all_async / stream_async(fields=...) → 只返回指定的列")
+    from core.database.connection.db import dispose_async_engine
+
+    dao, tag, created = users
+    rows = list(dao.iter_all(filters={"nickname": tag}, fields=("score",)))
+    assert rows == [{"score": i} for i in range(5)]
+
+    async def scenario():
+        try:
+            found = await dao.find_by_uuid_async(created[1]["uuid"], fields=("class_",))
+            batches = [
+                b async for b in dao.stream_async(2, filters={"nickname": tag}, fields=("uuid",))
+            ]
+            return found, batches
+        finally:
+            await dispose_async_engine()
+
+    found, batches = asyncio.run(scenario())
+    assert found == {"class": "c1"}
+    assert [r["uuid"] for b in batches for r in b] == [r["uuid"] for r in created]
+    assert all(set(r) == {"uuid"} for b in batches for r in b)
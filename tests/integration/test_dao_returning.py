@@ -0,0 +1,97 @@
+"""Integration tests — 单语句 update / delete（RETURNING）的返回值契约.
+
+Covers:
+  * BaseDAO.update / update_async 返回更新后的整行，不存在时返回 None
+  * BaseDAO.delete / delete_async 返回 True / False
+  * RelationsDAO.update_by_id / delete_by_id、RequestLogsDAO.upsert_by_path / delete_by_path
+"""
+
+import asyncio
+import uuid as uuid_lib
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def extra_tables(db_engine):
+    """relations / request_logs 表（conftest 默认只建 users / tokens / illegal_requests）。"""
+    from core.database.dao.relations import Relation
+    from core.database.dao.request_logs import RequestLog
+
+    tables = [Relation.__table__, RequestLog.__table__]
+    for table in tables:
+        table.create(db_engine, checkfirst=True)
+    yield
+    for table in tables:
+        table.drop(db_engine, checkfirst=True)
+
+
+@pytest.fixture
+def users_dao(integration_app):
+    from core.database.dao.users import UsersDAO
+
+    return UsersDAO()
+
+
+def _new_user(dao) -> dict:
+    return dao.create({"uuid": str(uuid_lib.uuid4()), "nickname": "returning", "user_role": "user"})
+
+
+def test_update_returns_full_row(users_dao):
+    print("\n[TEST] update → 返回更新后的整行，未知字段忽略")
+    user = _new_user(users_dao)
+    updated = users_dao.update(user["uuid"], {"nickname": "renamed", "class_": "c1", "bogus": 1})
+    assert updated == {**user, "nickname": "renamed", "class": "c1"}
+    assert users_dao.update(user["uuid"], {}) == updated
+    assert users_dao.update("missing", {"nickname": "x"}) is None
+    assert users_dao.delete(user["uuid"]) is True
+    assert users_dao.delete(user["uuid"]) is False
+
+
+def test_async_update_and_delete(users_dao):
+    print("\n[TEST] update_async / delete_async → 返回值与同步版本一致")
+    from core.database.connection.db import dispose_async_engine
+
+    user = _new_user(users_dao)
+
+    async def scenario():
+        try:
+            updated = await users_dao.update_async(user["uuid"], {"score": 5})
+            missing = await users_dao.update_async("missing", {"score": 5})
+            deleted = await users_dao.delete_async(user["uuid"])
+            again = await users_dao.delete_async(user["uuid"])
+            return updated, missing, deleted, again
+        finally:
+            await dispose_async_engine()
+
+    updated, missing, deleted, again = asyncio.run(scenario())
+    assert updated["score"] == 5 and updated["uuid"] == user["uuid"]
+    assert missing is None
+    assert (deleted, again) == (True, False)
+
+
+def test_relations_by_id(integration_app, extra_tables):
+    print("\n[TEST] RelationsDAO.update_by_id / delete_by_id → 单语句更新 / 删除")
+    from core.database.dao.relations import RelationsDAO
+
+    dao = RelationsDAO()
+    rel = dao.create({"tags_uuid": "t", "related_uuid": "r", "relation_type": "song"})
+    assert dao.update_by_id(rel["id"], {"relation_type": "user"})["relation_type"] == "user"
+    assert dao.update_by_id(-1, {"relation_type": "user"}) is None
+    assert dao.delete_by_id(rel["id"]) is True
+    assert dao.delete_by_id(rel["id"]) is False
+
+
+def test_request_logs_by_path(integration_app, extra_tables):
+    print("\n[TEST] RequestLogsDAO.upsert_by_path / delete_by_path → 计数递增，删除返回布尔值")
+    from core.database.dao.request_logs import RequestLogsDAO
+
+    dao = RequestLogsDAO()
+    path = f"/returning/{uuid_lib.uuid4()}"
+    first = dao.upsert_by_path(path)
+    second = dao.upsert_by_path(path)
+    assert (first["frequency"], second["frequency"]) == (1, 2)
+    assert second["id"] == first["id"]
+    assert dao.find_by_path(path) == second
+    assert dao.delete_by_path(path) is True
+    assert dao.delete_by_path(path) is False
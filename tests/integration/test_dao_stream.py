@@ -0,0 +1,125 @@
+"""Integration tests — BaseDAO.stream / iter_all 服务端游标读取与 /internal/export 流式导出.
+
+Covers:
+  * stream / iter_all / stream_async 按批返回全部匹配行，与 find_all 结果一致
+  * 提前结束迭代时立即归还连接
+  * 导出过程中 RSS 保持平稳（行数由 EXPORT_MEMORY_TEST_ROWS 控制，默认 20 万行；
+    设为 10000000 即为 1000 万行的完整验证）
+"""
+
+import asyncio
+import os
+import uuid as uuid_lib
+
+import pytest
+from sqlalchemy import delete, text
+
+_MEMORY_TEST_ROWS = int(os.environ.get("EXPORT_MEMORY_TEST_ROWS", "200000"))
+
+
+@pytest.fixture
+def illegal_dao(integration_app):
+    from core.database.dao.illegal_requests import IllegalRequestsDAO
+
+    return IllegalRequestsDAO()
+
+
+@pytest.fixture
+def seeded(illegal_dao):
+    tag = f"stream-{uuid_lib.uuid4().hex[:8]}"
+    rows = [
+        {"uuid": str(uuid_lib.uuid4()), "type": tag, "path": f"/p{i}", "ip": "10.0.0.1"}
+        for i in range(25)
+    ]
+    created = illegal_dao.create_many(rows)
+    yield tag, created
+    illegal_dao.delete_many([row["uuid"] for row in created])
+
+
+def test_stream_yields_batches(illegal_dao, seeded):
+    print("\n[TEST] stream(batch_size=10) → 10 / 10 / 5 三批，按 id 升序")
+    tag, created = seeded
+    batches = list(illegal_dao.stream(batch_size=10, filters={"type": tag}))
+    assert [len(b) for b in batches] == [10, 10, 5]
+    assert [r for b in batches for r in b] == sorted(created, key=lambda r: r["id"])
+    rows = list(illegal_dao.iter_all(batch_size=7, order_by=("-id",), filters={"type": tag}))
+    assert [r["id"] for r in rows] == sorted((r["id"] for r in created), reverse=True)
+
+
+def test_stream_async_matches_sync(illegal_dao, seeded):
+    print("\n[TEST] stream_async / iter_all_async → 与同步版本结果一致")
+    from core.database.connection.db import dispose_async_engine
+
+    tag, created = seeded
+
+    async def scenario():
+        try:
+            batches = [b async for b in illegal_dao.stream_async(10, filters={"type": tag})]
+            rows = [r async for r in illegal_dao.iter_all_async(10, filters={"type": tag})]
+            return batches, rows
+        finally:
+            await dispose_async_engine()
+
+    batches, rows = asyncio.run(scenario())
+    assert [len(b) for b in batches] == [10, 10, 5]
+    assert rows == [r for b in batches for r in b] == sorted(created, key=lambda r: r["id"])
+
+
+def test_early_break_releases_connection(illegal_dao, seeded, db_engine):
+    print("\n[TEST] 提前结束迭代 → 服务端游标关闭，连接立即归还连接池")
+    tag, _ = seeded
+    before = db_engine.pool.checkedout()
+    rows = illegal_dao.iter_all(batch_size=5, filters={"type": tag})
+    next(rows)
+    assert db_engine.pool.checkedout() == before + 1
+    rows.close()
+    assert db_engine.pool.checkedout() == before
+
+
+def _rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="需要 /proc 读取 RSS")
+def test_export_memory_is_flat(integration_app, db_engine):
+    print(f"\n[TEST] 导出 {_MEMORY_TEST_ROWS} 行 NDJSON → RSS 不随行数增长")
+    from core.database.connection.db import dispose_async_engine
+    from core.database.dao.illegal_requests import IllegalRequest, IllegalRequestsDAO
+    from modules.internal.index import _export_chunks
+
+    tag = f"export-memory-{uuid_lib.uuid4().hex[:8]}"
+    with db_engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO illegal_requests (uuid, type, path, ip, ua) "
+                "SELECT :tag || '-' || g, :tag, '/export/' || g, '10.0.0.1', repeat('x', 100) "
+                "FROM generate_series(1, :rows) AS g"
+            ),
+            {"tag": tag, "rows": _MEMORY_TEST_ROWS},
+        )
+
+    async def scenario():
+        exported, samples = 0, []
+        try:
+            dao = IllegalRequestsDAO()
+            columns = dao.validate_fields()
+            async for chunk in _export_chunks(dao, "ndjson", 1000, columns):
+                exported += chunk.count("\n")
+                samples.append(_rss_bytes())
+        finally:
+            await dispose_async_engine()
+        return exported, samples
+
+    try:
+        exported, samples = asyncio.run(scenario())
+    finally:
+        with db_engine.begin() as conn:
+            conn.execute(delete(IllegalRequest).where(IllegalRequest.type == tag))
+
+    assert exported >= _MEMORY_TEST_ROWS
+    # 前 10% 的批次用于预热（连接池、序列化缓存等），之后 RSS 增长应远小于数据总量
+    baseline = max(samples[: max(len(samples) // 10, 1)])
+    growth = max(samples) - baseline
+    print(f"  batches={len(samples)} baseline={baseline >> 20}MB growth={growth >> 20}MB")
+    assert growth < 32 * 1024 * 1024
@@ -0,0 +1,60 @@
+"""Integration tests — db_migrate 无事务迁移脚本（CREATE INDEX CONCURRENTLY）.
+
+Covers:
+  * 带 no-transaction 标记的脚本在检查迁移历史之后仍可执行（先结束已开启的事务）
+  * 并发建索引失败时清理遗留的 INVALID 索引，修复数据后可重新执行
+"""
+
+import os
+
+import psycopg2
+import pytest
+
+import db_migrate
+
+_SCRIPT = """-- migrate: no-transaction
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_migrate_probe_value ON migrate_probe (value);
+"""
+
+
+@pytest.fixture
+def conn():
+    conn = psycopg2.connect(os.environ["DATABASE_URL"])
+    with conn.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS migrate_probe;")
+        cursor.execute("CREATE TABLE migrate_probe (id SERIAL PRIMARY KEY, value TEXT);")
+        cursor.execute("INSERT INTO migrate_probe (value) VALUES ('a'), ('a');")
+    conn.commit()
+    yield conn
+    conn.rollback()
+    with conn.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS migrate_probe;")
+    conn.commit()
+    conn.close()
+
+
+def _index_state(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = 'idx_migrate_probe_value';"
+        )
+        row = cursor.fetchone()
+    conn.commit()
+    return None if row is None else row[0]
+
+
+def test_failed_concurrent_index_is_dropped_and_retry_succeeds(conn):
+    print("\n[TEST] CREATE UNIQUE INDEX CONCURRENTLY 失败 → 无效索引被删除；修复数据后重试成功")
+    # 模拟 execute_migrations：先在事务中查询迁移历史
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1;")
+    with pytest.raises(psycopg2.errors.UniqueViolation):
+        db_migrate.execute_without_transaction(conn, _SCRIPT)
+    assert conn.autocommit is False
+    assert _index_state(conn) is None
+
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM migrate_probe WHERE id = (SELECT max(id) FROM migrate_probe);")
+    db_migrate.execute_without_transaction(conn, _SCRIPT)
+    assert _index_state(conn) is True
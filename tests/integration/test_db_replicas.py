@@ -0,0 +1,145 @@
+"""Integration tests — 只读副本路由，使用两个独立的 PostgreSQL 实例。
+
+DATABASE_REPLICA_TEST_URL 指向第二个实例（不与主库建立复制，仅用于观察路由：
+写入主库的数据在「副本」上查不到），未设置时跳过。
+
+Covers:
+  * 只读 DAO 方法（同步与异步）路由到副本，写方法使用主库
+  * 写入后读己之写窗口内的读取回到主库
+  * 副本不可用时回退到主库
+"""
+
+import asyncio
+import contextvars
+import os
+import uuid as uuid_lib
+
+import pytest
+from sqlalchemy import create_engine
+
+REPLICA_URL = os.environ.get("DATABASE_REPLICA_TEST_URL")
+
+pytestmark = pytest.mark.skipif(
+    not REPLICA_URL, reason="需要第二个 PostgreSQL 实例（DATABASE_REPLICA_TEST_URL）"
+)
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(scope="module")
+def replica_schema():
+    """在副本实例上建表（与主库相同的 ORM 元数据），结束时删除。"""
+    import core.database.dao.users  # noqa: F401
+    from core.database.connection.db import Base
+
+    engine = create_engine(REPLICA_URL.replace("postgresql://", "postgresql+psycopg2://", 1))
+    Base.metadata.create_all(engine)
+    yield
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def routed(integration_app, replica_schema, monkeypatch):
+    """启用副本路由，返回一个修改副本地址的函数；结束时恢复为单主库。"""
+    from core.database.connection import db, replicas
+
+    def configure(url: str = REPLICA_URL, **env) -> None:
+        monkeypatch.setenv("DATABASE_REPLICA_URLS", url)
+        for name, value in env.items():
+            monkeypatch.setenv(name, str(value))
+        db.dispose_engine()
+        db._router = None
+
+    replicas._last_write.set(None)
+    configure()
+    yield configure
+    monkeypatch.delenv("DATABASE_REPLICA_URLS")
+    db.dispose_engine()
+    asyncio.run(db.dispose_async_engine())
+    db._router = None
+
+
+@pytest.fixture
+def users_dao():
+    from core.database.dao.users import UsersDAO
+
+    return UsersDAO()
+
+
+def _new_user(dao) -> str:
+    user_uuid = str(uuid_lib.uuid4())
+    dao.create({"uuid": user_uuid, "nickname": "replica-test", "user_role": "user"})
+    return user_uuid
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+def test_reads_go_to_replica_writes_to_primary(routed, users_dao):
+    print("\n[TEST] 副本路由: find_by_uuid 读副本，create 写主库")
+    from core.database.connection.db import replica_stats
+
+    user_uuid = contextvars.copy_context().run(_new_user, users_dao)
+    # 新的上下文不在读己之写窗口内：读副本，副本上没有这条数据
+    assert contextvars.copy_context().run(users_dao.find_by_uuid, user_uuid) is None
+    assert replica_stats()["replicas"][0]["reads"] == 1
+    users_dao.delete(user_uuid)
+
+
+def test_read_your_writes_window(routed, users_dao):
+    print("\n[TEST] 副本路由: 写入后同一上下文的读取回到主库")
+
+    def flow():
+        user_uuid = _new_user(users_dao)
+        return user_uuid, users_dao.find_by_uuid(user_uuid)
+
+    user_uuid, found = contextvars.copy_context().run(flow)
+    assert found["uuid"] == user_uuid
+    users_dao.delete(user_uuid)
+
+
+def test_async_reads_go_to_replica(routed, users_dao):
+    print("\n[TEST] 副本路由: find_by_uuid_async 读副本，窗口内回到主库")
+    from core.database.connection.db import dispose_async_engine
+
+    async def scenario():
+        try:
+            user_uuid = str(uuid_lib.uuid4())
+            await users_dao.create_async(
+                {"uuid": user_uuid, "nickname": "replica-test", "user_role": "user"}
+            )
+            in_window = await users_dao.find_by_uuid_async(user_uuid)
+            await users_dao.delete_async(user_uuid)
+            return in_window
+        finally:
+            await dispose_async_engine()
+
+    in_window = asyncio.run(scenario())
+    assert in_window is not None
+
+    async def outside_window():
+        try:
+            return await users_dao.find_all_async(limit=5)
+        finally:
+            await dispose_async_engine()
+
+    # 新的事件循环 / 上下文：读副本（副本上的 users 表为空）
+    assert contextvars.copy_context().run(asyncio.run, outside_window()) == []
+
+
+def test_unreachable_replica_falls_back_to_primary(routed, users_dao):
+    print("\n[TEST] 副本路由: 副本不可达时回退到主库")
+    from core.database.connection.db import replica_stats
+
+    routed("postgresql://postgres@127.0.0.1:1/unreachable", DB_POOL_TIMEOUT=2)
+    user_uuid = contextvars.copy_context().run(_new_user, users_dao)
+    found = contextvars.copy_context().run(users_dao.find_by_uuid, user_uuid)
+    assert found["uuid"] == user_uuid
+    stats = replica_stats()
+    assert stats["fallback_reads"] == 1
+    assert stats["replicas"][0]["healthy"] is False
+    users_dao.delete(user_uuid)
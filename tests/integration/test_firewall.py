@@ -6,6 +6,7 @@ Covers:
   * SQL injection pattern in Referer header -> HTTP 403
   * Crawler User-Agent -> HTTP 403
   * Banned IP -> HTTP 403
+  * Manual ban / unban through /internal/firewall/bans/{ip}
   * Rate-limit (> 20 req/s from same IP) -> HTTP 403
 """
 
@@ -127,6 +128,34 @@ def test_banned_ip_is_rejected(integration_app, redis_client):
     redis_client.delete(f"fw:ban:{banned_ip}")
 
 
+def test_manual_ban_and_unban(integration_app, redis_client, monkeypatch):
+    print("\n[TEST][Firewall] 内部接口手动封禁 -> HTTP 403，解封后恢复访问并清零违规计数")
+    from fastapi import FastAPI
+
+    from modules.internal.index import app as internal_router
+
+    ip = "10.55.55.55"
+    _flush_firewall_keys(ip, redis_client)
+    redis_client.set(f"fw:viol:{ip}", 3, ex=60)
+    monkeypatch.setenv("INTERNAL_STATS_TOKEN", "secret")
+    admin_app = FastAPI()
+    admin_app.include_router(internal_router)
+    admin = TestClient(admin_app)
+    headers = {"X-Internal-Token": "secret"}
+    client = TestClient(integration_app, raise_server_exceptions=False)
+
+    assert admin.put(f"/internal/firewall/bans/{ip}", headers=headers).status_code == 200
+    assert 0 < redis_client.ttl(f"fw:ban:{ip}") <= 86400
+    assert client.get("/", headers={"X-Forwarded-For": ip}).status_code == 403
+    assert admin.get(f"/internal/firewall/bans/{ip}", headers=headers).json()["banned"] is True
+
+    assert admin.delete(f"/internal/firewall/bans/{ip}", headers=headers).status_code == 200
+    assert redis_client.exists(f"fw:ban:{ip}", f"fw:viol:{ip}") == 0
+    assert client.get("/", headers={"X-Forwarded-For": ip}).status_code == 200
+
+    _flush_firewall_keys(ip, redis_client)
+
+
 # ---------------------------------------------------------------------------
 # Rate limiting
 # ---------------------------------------------------------------------------
@@ -148,3 +177,39 @@ def test_rate_limit_triggers_after_threshold(integration_app, redis_client):
 
     # Clean up
     _flush_firewall_keys(rate_ip, redis_client)
+
+
+# ---------------------------------------------------------------------------
+# Single-round-trip script semantics
+# ---------------------------------------------------------------------------
+
+def test_rate_counter_always_has_ttl(integration_app, redis_client):
+    print("\n[TEST][Firewall] 速率计数键在同一脚本内原子设置过期时间")
+    ip = "10.77.77.77"
+    _flush_firewall_keys(ip, redis_client)
+
+    client = TestClient(integration_app, raise_server_exceptions=False)
+    assert client.get("/", headers={"X-Forwarded-For": ip}).status_code == 200
+    assert redis_client.ttl(f"fw:rate:{ip}") > 0
+
+    _flush_firewall_keys(ip, redis_client)
+
+
+def test_violation_threshold_bans_ip(integration_app, redis_client):
+    print("\n[TEST][Firewall] 违规次数达到阈值 -> 同一次脚本调用内写入封禁标记")
+    ip = "10.66.66.66"
+    _flush_firewall_keys(ip, redis_client)
+    redis_client.set(f"fw:viol:{ip}", 9, ex=60)  # 阈值为 10
+
+    client = TestClient(integration_app, raise_server_exceptions=False)
+    response = client.get(
+        "/", headers={"X-Forwarded-For": ip, "User-Agent": "curl/8.0"}
+    )
+    assert response.status_code == 403
+    assert redis_client.exists(f"fw:ban:{ip}")
+
+    # 封禁后即使是正常请求也会被拒绝
+    response = client.get("/", headers={"X-Forwarded-For": ip})
+    assert response.status_code == 403
+
+    _flush_firewall_keys(ip, redis_client)
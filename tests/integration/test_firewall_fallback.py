@@ -0,0 +1,120 @@
+"""Integration tests — Redis 宕机期间的防火墙降级状态与恢复后的写回（需要真实 Redis）.
+
+宕机用指向未监听端口的客户端模拟：命令真实地抛出连接错误；恢复时换回
+可用的客户端，由 redis_conn 的监控线程检测到并执行写回。
+"""
+
+import asyncio
+import os
+import threading
+
+import pytest
+import redis as redis_lib
+import redis.asyncio as redis_asyncio
+
+from core.database.connection.redis import redis_conn
+from core.middleware.firewall import helpers
+from core.middleware.firewall.bancache import ban_cache
+from core.middleware.firewall.config import _BAN_CHANNEL, _BAN_DURATION, _BAN_THRESHOLD
+from core.middleware.firewall.fallback import fallback_store
+
+_DOWN_URL = "redis://127.0.0.1:1/0"
+
+
+def _flush(redis_client, *ips: str) -> None:
+    for ip in ips:
+        redis_client.delete(f"fw:ban:{ip}", f"fw:viol:{ip}", f"fw:rate:{ip}")
+
+
+@pytest.fixture
+def outage(monkeypatch):
+    """Redis 宕机：同步 / 异步客户端都连接到未监听的端口。"""
+    down = redis_lib.from_url(_DOWN_URL, socket_connect_timeout=0.2)
+    monkeypatch.setattr(redis_conn, "_client", down)
+    monkeypatch.setattr(
+        redis_conn,
+        "get_async_client",
+        lambda: redis_asyncio.from_url(_DOWN_URL, socket_connect_timeout=0.2),
+    )
+    monkeypatch.setattr(helpers, "_check_script", None)
+    yield
+    redis_conn._degraded = False
+    fallback_store.clear()
+    ban_cache.clear()
+
+
+def _recover(monkeypatch) -> None:
+    """换回可用的客户端，唤醒监控线程：PING 成功后退出降级并写回。"""
+    healthy = redis_lib.from_url(os.environ["REDIS_URL"], decode_responses=True)
+    monkeypatch.setattr(redis_conn, "_client", healthy)
+    monitor = threading.Thread(target=redis_conn._monitor_loop, daemon=True)
+    monitor.start()
+    redis_conn.report_failure(RuntimeError("check"))
+    try:
+        for _ in range(100):
+            stats = fallback_store.stats()
+            pending = stats["violations"] + stats["banned"] + stats["pending_unbans"]
+            if not redis_conn.degraded and pending == 0:
+                break
+            threading.Event().wait(0.05)
+    finally:
+        redis_conn._stop_event.set()
+        redis_conn._wake.set()
+        monitor.join(timeout=5)
+        redis_conn._stop_event.clear()
+        healthy.close()
+
+
+def test_outage_bans_locally_and_reconciles(outage, monkeypatch, redis_client):
+    print("\n[TEST][Fallback] Redis 宕机期间仍按违规次数封禁，恢复后封禁与违规计数写回 Redis")
+    ip = "203.0.113.10"
+    _flush(redis_client, ip)
+    for _ in range(_BAN_THRESHOLD):
+        verdict, _ = asyncio.run(helpers.check_request(ip, "xss", []))
+        assert verdict == "xss"
+    assert redis_conn.degraded is True
+    assert asyncio.run(helpers.check_request(ip, None, [])) == ("banned", 0)
+
+    pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(_BAN_CHANNEL)
+    _recover(monkeypatch)
+
+    assert redis_conn.degraded is False
+    assert redis_client.get(f"fw:viol:{ip}") == str(_BAN_THRESHOLD)
+    assert 0 < redis_client.ttl(f"fw:ban:{ip}") <= _BAN_DURATION
+    # 第一次读取消费的是订阅确认（ignore_subscribe_messages 时返回 None）
+    messages = [pubsub.get_message(timeout=1) for _ in range(2)]
+    assert any(m is not None and m["data"].startswith("ban ") and m["data"].endswith(f" {ip}")
+               for m in messages)
+    pubsub.close()
+    _flush(redis_client, ip)
+
+
+def test_reconcile_merges_with_existing_state(outage, monkeypatch, redis_client):
+    print("\n[TEST][Fallback] 写回时违规次数与 Redis 中已有计数累加，合并后达到阈值同样封禁")
+    ip = "203.0.113.20"
+    _flush(redis_client, ip)
+    redis_client.set(f"fw:viol:{ip}", _BAN_THRESHOLD - 2, ex=_BAN_DURATION)
+    asyncio.run(helpers.check_request(ip, "crawler", []))
+    asyncio.run(helpers.check_request(ip, "crawler", []))
+    assert asyncio.run(helpers.check_request(ip, None, [])) == (None, 0)
+
+    _recover(monkeypatch)
+
+    assert redis_client.get(f"fw:viol:{ip}") == str(_BAN_THRESHOLD)
+    assert redis_client.exists(f"fw:ban:{ip}") == 1
+    _flush(redis_client, ip)
+
+
+def test_unban_during_outage_is_reconciled(outage, monkeypatch, redis_client):
+    print("\n[TEST][Fallback] 宕机期间的解封在恢复后删除 Redis 中的封禁与违规计数")
+    ip = "203.0.113.30"
+    redis_client.set(f"fw:ban:{ip}", "1", ex=_BAN_DURATION)
+    redis_client.set(f"fw:viol:{ip}", _BAN_THRESHOLD, ex=_BAN_DURATION)
+    asyncio.run(helpers.unban_ip(ip))
+    assert redis_conn.degraded is True
+    assert asyncio.run(helpers.is_banned(ip)) is False
+
+    _recover(monkeypatch)
+
+    assert redis_client.exists(f"fw:ban:{ip}", f"fw:viol:{ip}") == 0
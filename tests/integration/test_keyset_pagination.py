@@ -0,0 +1,131 @@
+"""Integration tests — BaseDAO.find_page 游标分页.
+
+Covers:
+  * 按 ("-joined_at", "-id") 翻页，结果与一次性 ORDER BY 查询一致，无重复、无遗漏
+  * 排序键含 NULL、方向不一致时仍按 PostgreSQL 的 NULL 排序规则翻页
+  * filters 等值 / IN 过滤，find_page_async 与同步版本结果一致
+  * Numeric（Decimal）排序键可以编码进游标并翻页
+"""
+
+import asyncio
+import functools
+import uuid as uuid_lib
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+
+@pytest.fixture
+def seeded_users(integration_app):
+    """插入一批 nickname 唯一标记的用户，joined_at 有重复值与 NULL。"""
+    from core.database.dao.users import UsersDAO
+
+    dao = UsersDAO()
+    tag = f"keyset-{uuid_lib.uuid4().hex[:8]}"
+    base = datetime(2024, 1, 1)
+    rows = [
+        {
+            "uuid": str(uuid_lib.uuid4()),
+            "nickname": tag,
+            "user_role": "admin" if i % 3 == 0 else "user",
+            "class": None if i % 4 == 0 else f"c{i % 5}",
+            # 每 3 个用户同一时刻，另有部分为 NULL，检验 id 兜底排序与 NULL 处理
+            "joined_at": None if i % 7 == 0 else base + timedelta(minutes=i // 3),
+        }
+        for i in range(40)
+    ]
+    created = dao.create_many(rows)
+    yield dao, tag, created
+    dao.delete_many([row["uuid"] for row in created])
+
+
+def _walk(dao, limit, order_by, filters):
+    items, cursor, pages = [], None, 0
+    while True:
+        page = dao.find_page(after=cursor, limit=limit, order_by=order_by, filters=filters)
+        items.extend(page["items"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items, pages
+
+
+def _expected(created, order_by):
+    """按 PostgreSQL 规则在 Python 中排序：升序 NULLS LAST，降序 NULLS FIRST。"""
+
+    def compare(a, b):
+        for spec in order_by:
+            name = spec.lstrip("-")
+            x, y = a[name], b[name]
+            if x == y:
+                continue
+            # NULL 视为最大值，降序时整体取反
+            if x is None or y is None:
+                result = 1 if x is None else -1
+            else:
+                result = 1 if x > y else -1
+            return -result if spec.startswith("-") else result
+        return 0
+
+    return [r["id"] for r in sorted(created, key=functools.cmp_to_key(compare))]
+
+
+def test_descending_time_order(seeded_users):
+    print("\n[TEST] find_page(-joined_at, -id) → 逐页拼接结果与整体排序一致")
+    dao, tag, created = seeded_users
+    items, pages = _walk(dao, 7, ("-joined_at", "-id"), {"nickname": tag})
+    assert pages == 6
+    assert [r["id"] for r in items] == _expected(created, ("-joined_at", "-id"))
+
+
+@pytest.mark.parametrize("order_by", [("joined_at",), ("-joined_at", "class_"), ("class_", "-id")])
+def test_nulls_and_mixed_directions(seeded_users, order_by):
+    print(f"\n[TEST] find_page{order_by} → 含 NULL / 方向不一致时无重复、无遗漏")
+    dao, tag, created = seeded_users
+    items, _ = _walk(dao, 6, order_by, {"nickname": tag})
+    names = tuple(spec.replace("class_", "class") for spec in order_by)
+    if names[-1].lstrip("-") != "id":
+        names += (("-" if names[-1].startswith("-") else "") + "id",)
+    assert [r["id"] for r in items] == _expected(created, names)
+
+
+def test_filters_and_async(seeded_users):
+    print("\n[TEST] find_page(filters=IN) 与 find_page_async 结果一致")
+    from core.database.connection.db import dispose_async_engine
+
+    dao, tag, created = seeded_users
+    filters = {"nickname": tag, "user_role": ["admin"]}
+    page = dao.find_page(limit=5, order_by=("-id",), filters=filters)
+    admins = sorted((r["id"] for r in created if r["user_role"] == "admin"), reverse=True)
+    assert [r["id"] for r in page["items"]] == admins[:5]
+
+    async def scenario():
+        try:
+            return await dao.find_page_async(
+                after=page["next_cursor"], limit=5, order_by=("-id",), filters=filters
+            )
+        finally:
+            await dispose_async_engine()
+
+    second = asyncio.run(scenario())
+    assert [r["id"] for r in second["items"]] == admins[5:10]
+    assert (second["next_cursor"] is None) == (len(admins) <= 10)
+
+
+def test_decimal_sort_key():
+    print("\n[TEST] find_page(-ratings) → Decimal 排序键编码进游标，逐页翻完")
+    from core.database.dao.stores_and_restaurants import StoresAndRestaurantsDAO
+
+    dao = StoresAndRestaurantsDAO()
+    tag = f"keyset-{uuid_lib.uuid4().hex[:8]}"
+    created = dao.create_many(
+        {"uuid": str(uuid_lib.uuid4()), "name": tag, "ratings": Decimal(i % 4) + Decimal("0.25")}
+        for i in range(10)
+    )
+    try:
+        items, pages = _walk(dao, 3, ("-ratings",), {"name": tag})
+        assert pages == 4
+        assert [r["id"] for r in items] == _expected(created, ("-ratings", "-id"))
+    finally:
+        dao.delete_many(r["uuid"] for r in created)
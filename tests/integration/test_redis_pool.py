@@ -0,0 +1,119 @@
+"""Integration tests — RedisConnectionManager 的有界连接池（需要真实 Redis）."""
+
+import asyncio
+import gc
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import redis as redis_lib
+
+from core.database.connection.redis import RedisConnectionManager, RedisPoolSettings
+
+
+@pytest.fixture
+def manager():
+    manager = RedisConnectionManager(RedisPoolSettings(max_connections=2, pool_timeout=1))
+    assert manager._connect()
+    yield manager
+    manager._close()
+
+
+def test_concurrent_commands_share_bounded_pool(manager):
+    print("\n[TEST] 16 个线程并发执行命令，连接数不超过 REDIS_MAX_CONNECTIONS")
+    client = manager.get_client()
+
+    def work(i: int) -> None:
+        for n in range(50):
+            client.set(f"test:pool:{i}", n)
+
+    with ThreadPoolExecutor(16) as pool:
+        for future in [pool.submit(work, i) for i in range(16)]:
+            future.result()
+    assert len(client.connection_pool._connections) <= 2
+    assert client.get("test:pool:0") == "49"
+    client.delete(*[f"test:pool:{i}" for i in range(16)])
+
+
+def test_exhausted_pool_times_out(manager):
+    print("\n[TEST] 连接全部被占用时，等待 REDIS_POOL_TIMEOUT 后抛出 ConnectionError")
+    pool = manager.get_client().connection_pool
+    held = [pool.get_connection(), pool.get_connection()]
+    try:
+        with pytest.raises(redis_lib.ConnectionError):
+            manager.get_client().ping()
+    finally:
+        for connection in held:
+            pool.release(connection)
+    assert manager.get_client().ping() is True
+
+
+def test_reconnect_replaces_client(manager):
+    print("\n[TEST] _connect 替换客户端后，旧客户端的连接池被关闭")
+    previous = manager.get_client()
+    previous.ping()
+    assert manager._connect()
+    assert manager.get_client() is not previous
+    assert manager.get_client().ping() is True
+    assert all(c._sock is None for c in previous.connection_pool._connections)
+
+
+def _settled_clients(redis_client) -> int:
+    """回收之前测试遗留的客户端（socket 在回收时关闭），等服务端连接数稳定后返回。"""
+    gc.collect()
+    count = len(redis_client.client_list())
+    for _ in range(50):
+        time.sleep(0.02)
+        current = len(redis_client.client_list())
+        if current == count:
+            break
+        count = current
+    return count
+
+
+def _wait_for_clients(redis_client, expected: int) -> int:
+    for _ in range(50):
+        count = len(redis_client.client_list())
+        if count == expected:
+            break
+        time.sleep(0.02)
+    return count
+
+
+def test_async_client_per_loop_disconnects_closed_loops(manager, redis_client):
+    print("\n[TEST] get_async_client: 每个事件循环一个客户端，循环关闭后遗留的客户端在下次创建时释放")
+    baseline = _settled_clients(redis_client)
+
+    async def ping():
+        client = manager.get_async_client()
+        assert manager.get_async_client() is client
+        await client.ping()
+        return client
+
+    first = id(asyncio.run(ping()))
+    assert _wait_for_clients(redis_client, baseline + 1) == baseline + 1
+    second = id(asyncio.run(ping()))
+    assert second != first
+    assert [id(c) for c in manager._async_clients.values()] == [second]
+    # 已关闭循环的客户端只被丢弃引用，socket 在回收时关闭
+    gc.collect()
+    assert _wait_for_clients(redis_client, baseline + 1) == baseline + 1
+
+    manager.stop()
+    assert manager._async_clients == {}
+    gc.collect()
+    # stop 同时关闭了管理器自身的同步连接（计入 baseline）
+    assert _wait_for_clients(redis_client, baseline - 1) == baseline - 1
+
+
+def test_close_async_client_in_loop(manager, redis_client):
+    print("\n[TEST] close_async_client: 在所属事件循环中关闭客户端并移出缓存")
+    baseline = _settled_clients(redis_client)
+
+    async def scenario():
+        await manager.get_async_client().ping()
+        await manager.close_async_client()
+
+    asyncio.run(scenario())
+    assert manager._async_clients == {}
+    assert _wait_for_clients(redis_client, baseline) == baseline
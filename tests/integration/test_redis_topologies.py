@@ -0,0 +1,365 @@
+"""Integration tests — Redis 哨兵 / 集群模式（在本地启动 redis-server 进程）.
+
+需要 redis-server 可执行文件：位于 PATH 中，或由环境变量 REDIS_SERVER_BIN 指定；
+未找到时跳过本文件。每个模块级 fixture 在临时目录中启动一组进程，结束时全部终止。
+"""
+
+import asyncio
+import os
+import random
+import shutil
+import socket
+import subprocess
+import threading
+import time
+import uuid
+
+import pytest
+import redis as redis_lib
+
+from core.database.connection.redis import (
+    RedisConnectionManager,
+    RedisPoolSettings,
+    RedisTopology,
+)
+from core.helper.TokenCache.index import TokenCache
+from core.middleware.firewall import helpers
+from core.middleware.firewall.bancache import ban_cache
+from core.middleware.firewall.config import _BAN_THRESHOLD, _KEY_BAN, _KEY_RATE, _KEY_VIOL
+from core.middleware.firewall.ratelimit import RateLimit, RateLimitRule, RedisRateLimiter
+
+REDIS_SERVER = os.environ.get("REDIS_SERVER_BIN") or shutil.which("redis-server")
+
+pytestmark = pytest.mark.skipif(REDIS_SERVER is None, reason="需要 redis-server（PATH 或 REDIS_SERVER_BIN）")
+
+_CLUSTER_SLOTS = 16384
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _free_port() -> int:
+    """空闲端口，且集群总线端口（+10000）同样空闲。"""
+    while True:
+        port = random.randint(20000, 50000)
+        try:
+            for candidate in (port, port + 10000):
+                with socket.socket() as sock:
+                    sock.bind(("127.0.0.1", candidate))
+        except OSError:
+            continue
+        return port
+
+
+def _wait_until(predicate, timeout: float = 30, interval: float = 0.1):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            result = predicate()
+        except redis_lib.RedisError:
+            result = None
+        if result:
+            return result
+        time.sleep(interval)
+    raise TimeoutError("等待 Redis 状态超时")
+
+
+class _Servers:
+    """在临时目录中启动 redis-server 进程。"""
+
+    def __init__(self, directory) -> None:
+        self.directory = directory
+        self.processes: list[subprocess.Popen] = []
+
+    def start(self, *args: str, config: str | None = None) -> int:
+        port = _free_port()
+        command = [REDIS_SERVER]
+        if config is not None:
+            path = self.directory / f"{port}.conf"
+            path.write_text(f"port {port}\n{config}")
+            command.append(str(path))
+        else:
+            command += ["--port", str(port)]
+        command += ["--bind", "127.0.0.1", "--save", "", "--appendonly", "no",
+                    "--dir", str(self.directory), *args]
+        self.processes.append(
+            subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        )
+        _wait_until(lambda: redis_lib.Redis(port=port).ping())
+        return port
+
+    def stop(self) -> None:
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.wait(timeout=10)
+
+
+def _manager(topology: RedisTopology) -> RedisConnectionManager:
+    manager = RedisConnectionManager(RedisPoolSettings(max_connections=8), topology)
+    assert manager._connect()
+    return manager
+
+
+# ---------------------------------------------------------------------------
+# Sentinel
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(scope="module")
+def sentinel_topology(tmp_path_factory):
+    servers = _Servers(tmp_path_factory.mktemp("sentinel"))
+    try:
+        master = servers.start()
+        replica = servers.start("--replicaof", "127.0.0.1", str(master))
+        _wait_until(lambda: redis_lib.Redis(port=replica).info("replication")["master_link_status"] == "up")
+        sentinels = tuple(
+            (
+                "127.0.0.1",
+                servers.start(
+                    "--sentinel",
+                    config=(
+                        f"sentinel monitor mymaster 127.0.0.1 {master} 2\n"
+                        "sentinel down-after-milliseconds mymaster 1000\n"
+                        "sentinel failover-timeout mymaster 5000\n"
+                    ),
+                ),
+            )
+            for _ in range(3)
+        )
+        # 等待哨兵互相发现并认识副本
+        _wait_until(
+            lambda: all(
+                redis_lib.Redis(port=port).sentinel_master("mymaster")["num-other-sentinels"] == 2
+                and redis_lib.Redis(port=port).sentinel_master("mymaster")["num-slaves"] == 1
+                for _, port in sentinels
+            )
+        )
+        yield RedisTopology(mode="sentinel", sentinels=sentinels)
+    finally:
+        servers.stop()
+
+
+def _master_port(topology: RedisTopology) -> int:
+    return int(redis_lib.Redis(port=topology.sentinels[0][1]).sentinel_get_master_addr_by_name("mymaster")[1])
+
+
+def test_sentinel_resolves_master(sentinel_topology):
+    print("\n[TEST] 哨兵模式：客户端连接哨兵报告的主节点")
+    manager = _manager(sentinel_topology)
+    try:
+        client = manager.get_client()
+        assert client.set("test:sentinel", "1")
+        assert client.connection_pool.get_master_address()[1] == _master_port(sentinel_topology)
+        assert manager.hash_tag("1.2.3.4") == "1.2.3.4"
+    finally:
+        manager._close()
+
+
+def test_sentinel_failover_without_blind_window(sentinel_topology):
+    print("\n[TEST] 哨兵模式：主从切换期间同一客户端的读写持续成功")
+    manager = _manager(sentinel_topology)
+    client = manager.get_client()
+    old_master = _master_port(sentinel_topology)
+    errors: list[Exception] = []
+    writes = 0
+    stop = threading.Event()
+
+    def writer() -> None:
+        nonlocal writes
+        while not stop.is_set():
+            try:
+                client.incr("test:sentinel:writes")
+                writes += 1
+            except Exception as exc:
+                errors.append(exc)
+            time.sleep(0.01)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        time.sleep(0.2)
+        redis_lib.Redis(port=sentinel_topology.sentinels[0][1]).sentinel_failover("mymaster")
+        _wait_until(lambda: _master_port(sentinel_topology) != old_master)
+        # 新主节点接管后再写一段时间
+        _wait_until(lambda: client.connection_pool.get_master_address()[1] != old_master)
+        time.sleep(1)
+    finally:
+        stop.set()
+        thread.join()
+    try:
+        assert manager.get_client() is client
+        assert errors == []
+        assert writes > 0
+        new_master = client.connection_pool.get_master_address()[1]
+        assert new_master == _master_port(sentinel_topology) != old_master
+        assert redis_lib.Redis(port=new_master).info("replication")["role"] == "master"
+    finally:
+        manager._close()
+
+
+def test_sentinel_async_client_runs_firewall_script(sentinel_topology, monkeypatch):
+    print("\n[TEST] 哨兵模式：异步客户端执行防火墙检查脚本")
+    manager = _manager(sentinel_topology)
+    monkeypatch.setattr(helpers, "redis_conn", manager)
+    ip = f"10.70.{uuid.uuid4().int % 250}.1"
+
+    async def run():
+        try:
+            return await helpers.check_request(ip, "xss", [(helpers.ip_key(_KEY_RATE, ip), RateLimit(20, 1))])
+        finally:
+            await manager.close_async_client()
+
+    try:
+        assert asyncio.run(run()) == ("xss", 1)
+        assert manager.get_client().get(f"{_KEY_VIOL}{ip}") == "1"
+    finally:
+        manager._close()
+
+
+# ---------------------------------------------------------------------------
+# Cluster
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(scope="module")
+def cluster_topology(tmp_path_factory):
+    servers = _Servers(tmp_path_factory.mktemp("cluster"))
+    try:
+        ports = [
+            servers.start("--cluster-enabled", "yes", "--cluster-config-file", f"nodes-{i}.conf",
+                          "--cluster-node-timeout", "2000")
+            for i in range(6)
+        ]
+        nodes = [redis_lib.Redis(port=port, decode_responses=True) for port in ports]
+        for node in nodes[1:]:
+            node.execute_command("CLUSTER MEET", "127.0.0.1", ports[0])
+        masters, replicas = nodes[:3], nodes[3:]
+        step = _CLUSTER_SLOTS // len(masters)
+        for i, node in enumerate(masters):
+            end = _CLUSTER_SLOTS if i == len(masters) - 1 else (i + 1) * step
+            node.execute_command("CLUSTER ADDSLOTS", *range(i * step, end))
+        _wait_until(lambda: all(len(node.execute_command("CLUSTER NODES")) == 6 for node in nodes))
+        for master, replica in zip(masters, replicas):
+            replica.execute_command("CLUSTER REPLICATE", master.execute_command("CLUSTER MYID"))
+        _wait_until(lambda: all(node.cluster("info")["cluster_state"] == "ok" for node in nodes))
+        _wait_until(
+            lambda: all(r.info("replication")["master_link_status"] == "up" for r in replicas)
+        )
+        yield RedisTopology(mode="cluster", url=f"redis://127.0.0.1:{ports[0]}/0")
+    finally:
+        servers.stop()
+
+
+def test_cluster_firewall_keys_share_slot(cluster_topology, monkeypatch):
+    print("\n[TEST] 集群模式：同一 IP 的封禁 / 违规 / 限流 key 落在同一个槽，检查脚本可执行")
+    manager = _manager(cluster_topology)
+    monkeypatch.setattr(helpers, "redis_conn", manager)
+    ip = f"10.80.{uuid.uuid4().int % 250}.1"
+    rule = RateLimitRule("api", RateLimit(2, 60))
+    keys = [helpers.ip_key(_KEY_BAN, ip), helpers.ip_key(_KEY_VIOL, ip),
+            helpers.ip_key(_KEY_RATE, ip), helpers.rule_key(rule, "ip", ip)]
+    assert keys[0] == f"{_KEY_BAN}{{{ip}}}"
+    assert len({redis_lib.RedisCluster.keyslot(manager.get_client(), key) for key in keys}) == 1
+
+    async def run():
+        limits = [(keys[2], RateLimit(20, 1)), (keys[3], rule.limit)]
+        try:
+            return [await helpers.check_request(ip, None, limits) for _ in range(3)]
+        finally:
+            await manager.close_async_client()
+
+    try:
+        assert asyncio.run(run()) == [(None, 0), (None, 0), ("rate_limit", 1)]
+        assert manager.get_client().get(keys[1]) == "1"
+    finally:
+        manager._close()
+
+
+def test_cluster_ban_and_unban(cluster_topology, monkeypatch):
+    print("\n[TEST] 集群模式：违规达到阈值后封禁，is_banned / unban_ip 使用带标签的 key")
+    manager = _manager(cluster_topology)
+    monkeypatch.setattr(helpers, "redis_conn", manager)
+    ip = f"10.81.{uuid.uuid4().int % 250}.1"
+    manager.get_client().set(helpers.ip_key(_KEY_VIOL, ip), _BAN_THRESHOLD - 1, ex=60)
+
+    async def run():
+        try:
+            verdict = await helpers.check_request(ip, "crawler", [])
+            ban_cache.unban(ip)
+            banned = await helpers.is_banned(ip)
+            await helpers.unban_ip(ip)
+            ban_cache.unban(ip)
+            return verdict, banned, await helpers.is_banned(ip)
+        finally:
+            await manager.close_async_client()
+
+    try:
+        assert asyncio.run(run()) == (("crawler", _BAN_THRESHOLD), True, False)
+    finally:
+        manager._close()
+
+
+def test_cluster_rate_limits_across_slots(cluster_topology):
+    print("\n[TEST] 集群模式：不同标识的附加限额分槽检查，返回首个超限项的序号")
+    manager = _manager(cluster_topology)
+    token_rule = RateLimitRule("t", RateLimit(5, 60), key_by="token")
+    user_rule = RateLimitRule("u", RateLimit(1, 60), key_by="user")
+    suffix = uuid.uuid4().hex
+    limits = [
+        (token_rule.key_for(_KEY_RATE, "token", f"tok-{suffix}", hash_tag=True), token_rule.limit),
+        (user_rule.key_for(_KEY_RATE, "user", f"user-{suffix}", hash_tag=True), user_rule.limit),
+    ]
+
+    async def run():
+        client = manager.get_async_client()
+        limiter = RedisRateLimiter()
+        try:
+            return [await limiter.hit(client, limits) for _ in range(2)]
+        finally:
+            await manager.close_async_client()
+
+    try:
+        assert asyncio.run(run()) == [0, 2]
+    finally:
+        manager._close()
+
+
+def test_cluster_token_cache_invalidate_many(cluster_topology, monkeypatch):
+    print("\n[TEST] 集群模式：TokenCache.invalidate_many 删除分布在多个槽的 key")
+    manager = _manager(cluster_topology)
+    cache = TokenCache()
+    monkeypatch.setattr(cache, "_redis_client", manager.get_client)
+    tokens = [f"token-{uuid.uuid4().hex}" for _ in range(20)]
+    try:
+        for token in tokens:
+            cache._redis_set(cache._hash(token), "user", 60)
+        assert all(cache._redis_get(cache._hash(token)) for token in tokens)
+        cache.invalidate_many(tokens)
+        assert not any(cache._redis_get(cache._hash(token)) for token in tokens)
+    finally:
+        manager._close()
+
+
+def test_cluster_failover_without_blind_window(cluster_topology):
+    print("\n[TEST] 集群模式：副本接管主节点后同一客户端继续读写")
+    manager = _manager(cluster_topology)
+    client = manager.get_client()
+    key = "fw:rate:{failover}"
+    try:
+        client.set(key, "1")
+        node = client.get_node_from_key(key)
+        replica = next(
+            n for n in client.get_replicas()
+            if redis_lib.Redis(host=n.host, port=n.port).info("replication")["master_port"] == node.port
+        )
+        redis_lib.Redis(host=replica.host, port=replica.port).execute_command("CLUSTER FAILOVER")
+        _wait_until(
+            lambda: redis_lib.Redis(host=replica.host, port=replica.port).info("replication")["role"] == "master"
+        )
+        for _ in range(50):
+            client.incr(key)
+        assert manager.get_client() is client
+        assert client.get(key) == "51"
+        assert client.get_node_from_key(key).port == replica.port
+    finally:
+        manager._close()
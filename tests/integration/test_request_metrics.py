@@ -0,0 +1,171 @@
+"""Integration tests — RequestLogsDAO 请求指标（按天分区、汇总与保留期，需要真实 PostgreSQL）.
+
+Covers:
+  * add_metrics 按需创建当天分区，同一 (bucket, request_path) 的多次写入累加
+  * hot_paths 按请求次数排序并由直方图估算 p95
+  * run_metrics_maintenance 预建分区、重算小时 / 天汇总（重复执行结果不变）、按保留期删除
+  * 维护期间持有 advisory 锁，其他 worker 直接跳过
+"""
+
+import uuid as uuid_lib
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+_NOW = datetime(2026, 3, 10, 12, 30)
+
+
+@pytest.fixture(scope="module")
+def metric_tables(db_engine):
+    """request_metrics 及汇总表（conftest 默认不创建）；分区随父表一起删除。"""
+    from core.database.dao.request_logs import RequestMetric, RequestMetricDaily, RequestMetricHourly
+
+    tables = [RequestMetric.__table__, RequestMetricHourly.__table__, RequestMetricDaily.__table__]
+    for table in tables:
+        table.create(db_engine, checkfirst=True)
+    yield
+    for table in reversed(tables):
+        table.drop(db_engine, checkfirst=True)
+
+
+@pytest.fixture
+def dao(integration_app, metric_tables):
+    from core.database.dao.request_logs import RequestLogsDAO
+
+    return RequestLogsDAO()
+
+
+def _path() -> str:
+    return f"/metrics/{uuid_lib.uuid4().hex[:8]}"
+
+
+def _row(path: str, bucket: datetime, count: int = 1, errors: int = 0, latency: float = 5.0) -> dict:
+    from core.database.dao.request_logs import LATENCY_COLUMNS, latency_bucket
+
+    row = {
+        "bucket": bucket,
+        "request_path": path,
+        "request_count": count,
+        "error_count": errors,
+        "latency_sum_ms": latency * count,
+        "latency_max_ms": latency,
+        **dict.fromkeys(LATENCY_COLUMNS, 0),
+    }
+    row[LATENCY_COLUMNS[latency_bucket(latency)]] = count
+    return row
+
+
+def _partitions(db_engine) -> set[str]:
+    with db_engine.connect() as conn:
+        return set(conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'request_metrics'::regclass"
+        )).scalars())
+
+
+def _rollup_row(db_engine, table: str, path: str) -> dict:
+    with db_engine.connect() as conn:
+        return dict(conn.execute(
+            text(f"SELECT * FROM {table} WHERE request_path = :path"), {"path": path}
+        ).mappings().one())
+
+
+def _maintain(dao, now=_NOW, **overrides):
+    return dao.run_metrics_maintenance(**{
+        "now": now,
+        "rollup_lookback": timedelta(hours=3),
+        "partitions_ahead": 2,
+        "raw_retention_days": 7,
+        "hourly_retention_days": 90,
+        "daily_retention_days": 730,
+        **overrides,
+    })
+
+
+def test_add_metrics_creates_partition_and_accumulates(dao, db_engine):
+    print("\n[TEST] add_metrics → 自动创建当天分区，同一分钟的多次写入累加、最大延迟取较大值")
+    path = _path()
+    bucket = _NOW.replace(minute=0)
+    assert dao.add_metrics([_row(path, bucket, count=2, errors=1, latency=30)]) == 1
+    assert dao.add_metrics([_row(path, bucket, count=3, latency=400)]) == 1
+    assert "request_metrics_p20260310" in _partitions(db_engine)
+    with db_engine.connect() as conn:
+        row = conn.execute(
+            text("SELECT * FROM request_metrics_p20260310 WHERE request_path = :path"), {"path": path}
+        ).mappings().one()
+    assert (row["request_count"], row["error_count"]) == (5, 1)
+    assert (row["latency_sum_ms"], row["latency_max_ms"]) == (1260, 400)
+    assert (row["latency_le_50"], row["latency_le_500"]) == (2, 3)
+    assert dao.add_metrics([]) == 0
+
+
+def test_hot_paths_orders_by_count(dao):
+    print("\n[TEST] hot_paths → 按请求次数降序，返回平均延迟与直方图 p95")
+    hot, cold = _path(), _path()
+    since = datetime.now().replace(second=0, microsecond=0)
+    dao.add_metrics([
+        _row(hot, since, count=95, latency=8),
+        _row(hot, since + timedelta(minutes=1), count=5, errors=5, latency=900),
+        _row(cold, since, count=1, latency=20),
+    ])
+    rows = {row["request_path"]: row for row in dao.hot_paths(since, limit=100)}
+    assert rows[hot]["request_count"] == 100 and rows[hot]["error_count"] == 5
+    assert rows[hot]["latency_avg_ms"] == pytest.approx((95 * 8 + 5 * 900) / 100)
+    assert rows[hot]["latency_p95_ms"] == 10.0
+    assert rows[hot]["latency_max_ms"] == 900
+    ordered = [row["request_path"] for row in dao.hot_paths(since, limit=100)]
+    assert ordered.index(hot) < ordered.index(cold)
+
+
+def test_maintenance_rolls_up_idempotently(dao, db_engine):
+    print("\n[TEST] run_metrics_maintenance → 预建分区并重算小时 / 天汇总，重复执行结果不变")
+    path = _path()
+    dao.add_metrics([
+        _row(path, datetime(2026, 3, 10, 11, 5), count=2, latency=5),
+        _row(path, datetime(2026, 3, 10, 11, 40), count=1, errors=1, latency=3000),
+    ])
+    result = _maintain(dao)
+    assert {"request_metrics_p20260311", "request_metrics_p20260312"} <= _partitions(db_engine)
+    assert result["hourly_rows"] >= 1 and result["daily_rows"] >= 1
+    assert _maintain(dao)["created_partitions"] == []
+
+    hourly = _rollup_row(db_engine, "request_metrics_hourly", path)
+    assert hourly["bucket"] == datetime(2026, 3, 10, 11)
+    assert (hourly["request_count"], hourly["error_count"]) == (3, 1)
+    assert (hourly["latency_le_10"], hourly["latency_le_inf"], hourly["latency_max_ms"]) == (2, 1, 3000)
+    daily = _rollup_row(db_engine, "request_metrics_daily", path)
+    assert daily["bucket"] == datetime(2026, 3, 10)
+    assert daily["request_count"] == 3
+
+
+def test_maintenance_drops_expired_partitions(dao, db_engine):
+    print("\n[TEST] run_metrics_maintenance → 删除超出保留期的分区与汇总行，保留期内的不动")
+    path = _path()
+    dao.add_metrics([_row(path, datetime(2026, 3, 1, 9, 0))])
+    _maintain(dao, now=datetime(2026, 3, 1, 10, 0))
+    assert "request_metrics_p20260301" in _partitions(db_engine)
+
+    result = _maintain(dao, now=datetime(2026, 3, 10, 12, 0), hourly_retention_days=5)
+    assert "request_metrics_p20260301" in result["dropped_partitions"]
+    assert "request_metrics_p20260301" not in _partitions(db_engine)
+    assert "request_metrics_p20260310" in _partitions(db_engine)
+    assert result["deleted_rollup_rows"] >= 1
+    with db_engine.connect() as conn:
+        remaining = conn.execute(
+            text("SELECT count(*) FROM request_metrics_daily WHERE request_path = :path"), {"path": path}
+        ).scalar()
+    assert remaining == 1
+
+
+def test_maintenance_skips_when_locked(dao, db_engine):
+    print("\n[TEST] run_metrics_maintenance → 其他 worker 持有 advisory 锁时直接返回 None")
+    from core.database.dao.request_logs import _METRICS_MAINTENANCE_LOCK
+
+    with db_engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _METRICS_MAINTENANCE_LOCK})
+        try:
+            assert _maintain(dao) is None
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _METRICS_MAINTENANCE_LOCK})
+    assert _maintain(dao) is not None
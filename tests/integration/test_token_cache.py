@@ -0,0 +1,63 @@
+"""Integration tests — token → user cache against real Redis + PostgreSQL.
+
+Covers:
+  * Valid token resolves to its owner and is cached in Redis
+  * TokensDAO.revoke invalidates both cache tiers
+  * Expired tokens resolve to "unknown"
+"""
+
+import uuid as uuid_lib
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def tokens_dao(integration_app):
+    from core.database.dao.tokens import TokensDAO
+    from core.helper.TokenCache.index import token_cache
+
+    token_cache.clear()
+    return TokensDAO()
+
+
+def _create_token(dao, expired_at=None) -> str:
+    token = str(uuid_lib.uuid4())
+    dao.create({
+        "uuid": token,
+        "belong_to": "user-cache-test",
+        "permission": "user",
+        "expired_at": expired_at,
+        "current_status": "active",
+    })
+    return token
+
+
+def test_token_resolves_and_is_cached_in_redis(tokens_dao, redis_client):
+    print("\n[TEST] TokenCache → 有效 token 解析为所属用户并写入 Redis")
+    from core.helper.TokenCache.index import token_cache
+
+    token = _create_token(tokens_dao)
+    assert token_cache.resolve(token) == "user-cache-test"
+    key = "auth:token:" + token_cache._hash(token)
+    assert redis_client.get(key) == "user-cache-test"
+    assert 0 < redis_client.ttl(key) <= 300
+
+
+def test_revoke_invalidates_cache(tokens_dao, redis_client):
+    print("\n[TEST] TokensDAO.revoke → 缓存失效，token 解析为 unknown")
+    from core.helper.TokenCache.index import token_cache
+
+    token = _create_token(tokens_dao)
+    assert token_cache.resolve(token) == "user-cache-test"
+    tokens_dao.revoke(token)
+    assert redis_client.get("auth:token:" + token_cache._hash(token)) is None
+    assert token_cache.resolve(token) == "unknown"
+
+
+def test_expired_token_resolves_to_unknown(tokens_dao):
+    print("\n[TEST] TokenCache → 已过期 token 解析为 unknown")
+    from core.helper.TokenCache.index import token_cache
+
+    token = _create_token(tokens_dao, expired_at=datetime.now() - timedelta(days=1))
+    assert token_cache.resolve(token) == "unknown"
@@ -0,0 +1,148 @@
+"""Unit tests — core.middleware.analytics（路径访问次数聚合，无需数据库）."""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+import core.middleware.analytics.middleware as analytics_middleware
+from core.middleware.analytics.aggregator import PathHitAggregator, route_path
+from core.middleware.analytics.config import _UNMATCHED_PATH
+from core.middleware.analytics.middleware import RequestAnalyticsMiddleware
+
+
+def _aggregator(**overrides) -> PathHitAggregator:
+    writes: list[dict] = []
+
+    def writer(counts):
+        writes.append(dict(counts))
+        return len(counts)
+
+    aggregator = PathHitAggregator(**{"flush_interval": 60, "writer": writer, **overrides})
+    aggregator.writes = writes
+    return aggregator
+
+
+@pytest.fixture
+def aggregator(monkeypatch):
+    aggregator = _aggregator()
+    monkeypatch.setattr(analytics_middleware, "path_hits", aggregator)
+    return aggregator
+
+
+@pytest.fixture
+def client():
+    router = APIRouter(prefix="/songs")
+
+    @router.get("/{song_id}")
+    def get_song(song_id: int):
+        return {"id": song_id}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(RequestAnalyticsMiddleware)
+    return TestClient(app)
+
+
+# ---------------------------------------------------------------------------
+# PathHitAggregator
+# ---------------------------------------------------------------------------
+
+def test_flush_writes_coalesced_counts():
+    print("\n[TEST] PathHitAggregator.flush: 同一路径的多次访问合并为一个增量写入")
+    aggregator = _aggregator()
+    for _ in range(3):
+        aggregator.record("/songs/{song_id}")
+    aggregator.record("/")
+    assert aggregator.flush() == 2
+    assert aggregator.writes == [{"/songs/{song_id}": 3, "/": 1}]
+    assert aggregator.flush() == 0
+    stats = aggregator.stats()
+    assert (stats["recorded"], stats["flushed"], stats["flushes"]) == (4, 4, 1)
+
+
+def test_failed_flush_keeps_counts():
+    print("\n[TEST] PathHitAggregator.flush: 写入失败时增量放回内存，下次刷写时合并重试")
+    fail = [True]
+
+    def writer(counts):
+        if fail[0]:
+            raise RuntimeError("database unavailable")
+        return len(counts)
+
+    aggregator = PathHitAggregator(flush_interval=60, writer=writer)
+    aggregator.record("/", 2)
+    assert aggregator.flush() == 0
+    aggregator.record("/")
+    assert aggregator.stats()["failed"] == 1 and aggregator.stats()["pending_paths"] == 1
+    fail[0] = False
+    assert aggregator.flush() == 1
+    assert aggregator.stats()["flushed"] == 3
+
+
+def test_background_thread_flushes_periodically():
+    print("\n[TEST] PathHitAggregator.start: 后台线程按间隔刷写，stop 时写入剩余增量")
+    flushed = threading.Event()
+    aggregator = PathHitAggregator(
+        flush_interval=0.05, writer=lambda counts: flushed.set() or len(counts)
+    )
+    aggregator.start()
+    try:
+        aggregator.record("/")
+        assert flushed.wait(timeout=2)
+    finally:
+        aggregator.stop()
+    aggregator.record("/")
+    assert aggregator.stats()["pending_paths"] == 1
+
+
+def test_concurrent_records_are_not_lost():
+    print("\n[TEST] PathHitAggregator.record: 多线程并发累加与刷写，总数不丢失")
+    totals: list[int] = []
+    aggregator = PathHitAggregator(
+        flush_interval=60, writer=lambda counts: totals.append(sum(counts.values())) or 1
+    )
+
+    def work():
+        for _ in range(1000):
+            aggregator.record("/hot")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        aggregator.flush()
+    aggregator.flush()
+    assert sum(totals) == 8000
+
+
+# ---------------------------------------------------------------------------
+# RequestAnalyticsMiddleware / route_path
+# ---------------------------------------------------------------------------
+
+def test_middleware_counts_route_templates(aggregator, client):
+    print("\n[TEST] RequestAnalyticsMiddleware: 按路由模板计数，参数取值不增加路径数量")
+    for song_id in (1, 2, 3):
+        assert client.get(f"/songs/{song_id}").status_code == 200
+    client.get("/songs/not-a-number")
+    client.get("/wp-admin/setup.php")
+    client.get("/.env")
+    aggregator.flush()
+    assert aggregator.writes == [{"/songs/{song_id}": 4, _UNMATCHED_PATH: 2}]
+
+
+def test_non_http_scope_is_ignored(aggregator):
+    print("\n[TEST] RequestAnalyticsMiddleware: lifespan 等非 HTTP 请求不计数")
+
+    async def app(scope, receive, send):
+        pass
+
+    asyncio.run(RequestAnalyticsMiddleware(app)({"type": "lifespan"}, None, None))
+    assert aggregator.stats()["recorded"] == 0
+
+
+def test_route_path_without_route():
+    print("\n[TEST] route_path: scope 中没有路由时返回未匹配路径")
+    assert route_path({"type": "http", "path": "/x"}) == _UNMATCHED_PATH
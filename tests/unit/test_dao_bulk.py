@@ -0,0 +1,117 @@
+"""Unit tests — BaseDAO 批量语句构造（编译为 PostgreSQL SQL，无需数据库）."""
+
+import pytest
+from sqlalchemy import Integer, Text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import DeclarativeBase, mapped_column
+
+from core.database.dao.base import _MAX_BIND_PARAMS, BaseDAO
+from core.database.dao.relations import RelationsDAO
+from core.database.dao.users import UsersDAO
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_groups_rows_by_field_set_and_chunk():
+    print("\n[TEST] 批量构造: 按 chunk_size 分块，块内按字段集合分组")
+    rows = [{"uuid": "a"}, {"uuid": "b", "nickname": "x"}, {"uuid": "c"}, {"uuid": "d"}]
+    groups = list(UsersDAO()._bulk_groups(iter(rows), chunk_size=3))
+    assert [(keys, indices) for keys, indices, _ in groups] == [
+        (("uuid",), [0, 2]),
+        (("nickname", "uuid"), [1]),
+        (("uuid",), [3]),
+    ]
+
+
+def test_unknown_field_rejected():
+    print("\n[TEST] 批量构造: 不存在的字段抛出 ValueError")
+    with pytest.raises(ValueError, match="no_such_column"):
+        list(UsersDAO()._insert_batches([{"uuid": "a", "no_such_column": 1}], 10, True))
+
+
+def test_attribute_names_map_to_columns():
+    print("\n[TEST] 批量构造: 行中的 ORM 属性名（class_）按列名分组与写入")
+    rows = [{"uuid": "a", "class_": "c1"}, {"uuid": "b", "class": "c2"}]
+    [(keys, indices, group)] = list(UsersDAO()._bulk_groups(rows, chunk_size=10))
+    assert keys == ("class", "uuid") and indices == [0, 1]
+    assert group == [{"uuid": "a", "class": "c1"}, {"uuid": "b", "class": "c2"}]
+    [(_, stmt, _)] = list(UsersDAO()._update_batches(rows, 10, False))
+    assert "SET class=CAST(v.class AS TEXT)" in _sql(stmt)
+    with pytest.raises(ValueError, match="重复"):
+        list(UsersDAO()._bulk_groups([{"uuid": "a", "class": "x", "class_": "y"}], chunk_size=10))
+
+
+def test_update_chunk_respects_bind_parameter_limit():
+    print("\n[TEST] 批量构造: update_many 的分块大小按列数收缩，单条语句参数不超过上限")
+
+    class _Base(DeclarativeBase):
+        pass
+
+    attrs = {f"c{i}": mapped_column(Text) for i in range(48)}
+    Wide = type("Wide", (_Base,), {
+        "__tablename__": "wide",
+        "id": mapped_column(Integer, primary_key=True),
+        "uuid": mapped_column(Text, unique=True),
+        **attrs,
+    })
+
+    class WideDAO(BaseDAO):
+        MODEL = Wide
+
+    columns = [c for c in Wide.__table__.c.keys() if c != "id"]
+    rows = ({c: f"{c}-{n}" for c in columns} | {"uuid": str(n)} for n in range(700))
+    batches = list(WideDAO()._update_batches(rows, 1000, False))
+    assert len(batches) == 2
+    for _, stmt, _ in batches:
+        assert len(stmt.compile(dialect=postgresql.dialect()).params) <= _MAX_BIND_PARAMS
+
+
+def test_update_uses_values_list_and_casts():
+    print("\n[TEST] 批量构造: update_many 生成 UPDATE ... FROM (VALUES ...) 并显式转换类型")
+    rows = [{"uuid": "a", "other_info": {"k": 1}}, {"uuid": "b", "other_info": None}]
+    [(positions, stmt, params)] = list(UsersDAO()._update_batches(rows, 10, True))
+    sql = _sql(stmt)
+    assert "FROM (VALUES" in sql
+    assert "CAST(v.other_info AS JSONB)" in sql
+    assert "RETURNING" in sql
+    assert positions == [(0, "a"), (1, "b")]
+    assert params is None
+
+
+def test_update_requires_key_and_dedupes():
+    print("\n[TEST] 批量构造: update_many 每行须含键，块内重复键保留最后一行")
+    dao = UsersDAO()
+    with pytest.raises(ValueError, match="uuid"):
+        list(dao._update_batches([{"nickname": "x"}], 10, True))
+    [(positions, _, _)] = list(
+        dao._update_batches([{"uuid": "a", "score": 1}, {"uuid": "a", "score": 2}], 10, True)
+    )
+    assert positions == [(1, "a")]
+
+
+def test_upsert_on_conflict_key():
+    print("\n[TEST] 批量构造: upsert_many 以 KEY_COLUMN 为冲突目标，只有键时 DO NOTHING")
+    [(_, stmt, _)] = list(UsersDAO()._upsert_batches([{"uuid": "a", "nickname": "x"}], 10, False))
+    assert "ON CONFLICT (uuid) DO UPDATE SET nickname = excluded.nickname" in _sql(stmt)
+    [(_, stmt, _)] = list(UsersDAO()._upsert_batches([{"uuid": "a"}], 10, False))
+    assert "ON CONFLICT (uuid) DO NOTHING" in _sql(stmt)
+
+
+def test_delete_uses_any_array_per_chunk():
+    print("\n[TEST] 批量构造: delete_many 每块一条 DELETE ... = ANY(:keys)，键列随 DAO 变化")
+    stmts = list(RelationsDAO()._delete_batches(range(5), chunk_size=2))
+    assert len(stmts) == 3
+    assert "relations.id = ANY (%(keys)s::INTEGER[])" in _sql(stmts[0])
+
+
+def test_order_rows_restores_input_order():
+    print("\n[TEST] 批量构造: 返回行按输入顺序排列，按键对应时跳过未命中的行")
+    dao = UsersDAO()
+    rows = dao._order_rows([([2, 0], [{"n": 2}, {"n": 0}]), ([1], [{"n": 1}])], by_key=False)
+    assert [r["n"] for r in rows] == [0, 1, 2]
+    rows = dao._order_rows(
+        [([(0, "a"), (1, "missing"), (2, "b")], [{"uuid": "b"}, {"uuid": "a"}])], by_key=True
+    )
+    assert [r["uuid"] for r in rows] == ["a", "b"]
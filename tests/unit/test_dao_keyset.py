@@ -0,0 +1,84 @@
+"""Unit tests — BaseDAO.find_page 的游标分页语句构造（编译为 PostgreSQL SQL，无需数据库）."""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from core.database.dao.illegal_requests import IllegalRequestsDAO
+from core.database.dao.users import UsersDAO
+from core.helper.PageCursor.index import InvalidCursorError, get_page_cursor
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_order_keys_append_id_tiebreaker():
+    print("\n[TEST] _order_keys: 支持 ORM 属性名与 '-' 降序前缀，末尾按最后一个键的方向补 id")
+    keys = UsersDAO()._order_keys(("-joined_at", "class_"))
+    assert [(col.name, desc) for col, desc in keys] == [
+        ("joined_at", True),
+        ("class", False),
+        ("id", False),
+    ]
+    keys = UsersDAO()._order_keys(("-joined_at",))
+    assert [(col.name, desc) for col, desc in keys] == [("joined_at", True), ("id", True)]
+
+
+def test_unknown_fields_raise():
+    print("\n[TEST] find_page: 排序或过滤字段不存在时抛出 ValueError")
+    with pytest.raises(ValueError):
+        UsersDAO()._order_keys(("bogus",))
+    with pytest.raises(ValueError):
+        UsersDAO()._filter_clauses({"bogus": 1})
+
+
+def test_first_page_fetches_one_extra_row():
+    print("\n[TEST] _select_keyset: 第一页无游标条件，多取一行用于判断是否有下一页")
+    dao = IllegalRequestsDAO()
+    sql = _sql(dao._select_keyset(dao._order_keys(("-happened_at", "-id")), None, 20, None))
+    assert "WHERE" not in sql
+    assert sql.endswith(
+        "ORDER BY illegal_requests.happened_at DESC, illegal_requests.id DESC \n LIMIT 21"
+    )
+
+
+def test_same_direction_uses_row_comparison():
+    print("\n[TEST] _select_keyset: 同向排序使用行值比较，可直接利用复合索引")
+    dao = IllegalRequestsDAO()
+    keys = dao._order_keys(("-happened_at", "-id"))
+    after = [datetime(2024, 1, 1), 100]
+    sql = _sql(dao._select_keyset(keys, after, 20, {"ip": "1.2.3.4"}))
+    assert "illegal_requests.ip = '1.2.3.4'" in sql
+    assert "(illegal_requests.happened_at, illegal_requests.id) < ('2024-01-01 00:00:00', 100)" in sql
+
+
+def test_mixed_directions_and_nulls_expand_to_or():
+    print("\n[TEST] _keyset_condition: 方向不一致或游标值为 NULL 时展开为 OR（NULL 排序与 PostgreSQL 一致）")
+    dao = UsersDAO()
+    keys = dao._order_keys(("-joined_at", "nickname"))
+    sql = _sql(dao._keyset_condition(keys, [None, "bob", 7]))
+    assert sql == (
+        "users.joined_at IS NOT NULL"
+        " OR users.joined_at IS NULL AND (users.nickname > 'bob' OR users.nickname IS NULL)"
+        " OR users.joined_at IS NULL AND users.nickname = 'bob' AND users.id > 7"
+    )
+
+
+def test_filters_support_in_and_null():
+    print("\n[TEST] _filter_clauses: 列表为 IN，None 为 IS NULL")
+    clauses = UsersDAO()._filter_clauses({"user_role": ["admin", "user"], "class_": None})
+    sql = [_sql(c) for c in clauses]
+    assert sql == ["users.user_role IN ('admin', 'user')", 'users.class IS NULL']
+
+
+def test_cursor_is_bound_to_order():
+    print("\n[TEST] _page_query: 按其他排序方式签发的游标被拒绝")
+    dao = UsersDAO()
+    cursor = get_page_cursor().encode("users:id", [5])
+    dao._page_query(cursor, 10, ("id",), None)
+    with pytest.raises(InvalidCursorError):
+        dao._page_query(cursor, 10, ("-id",), None)
+    with pytest.raises(InvalidCursorError):
+        IllegalRequestsDAO()._page_query(cursor, 10, ("id",), None)
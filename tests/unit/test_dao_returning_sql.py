@@ -0,0 +1,37 @@
+"""Unit tests — BaseDAO 单语句 update / delete 的语句构造（编译为 PostgreSQL SQL，无需数据库）."""
+
+from sqlalchemy.dialects import postgresql
+
+from core.database.dao.relations import RelationsDAO
+from core.database.dao.users import UsersDAO
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_column_values_accepts_column_and_attribute_names():
+    print("\n[TEST] _column_values: 列名与 ORM 属性名都转换为列名，未知字段忽略")
+    values = UsersDAO()._column_values({"class": "a", "class_": "b", "nickname": "n", "bogus": 1})
+    assert values == {"class": "b", "nickname": "n"}
+
+
+def test_update_is_single_statement_with_returning():
+    print("\n[TEST] _update_returning: UPDATE ... WHERE uuid = :u RETURNING 全部列")
+    sql = _sql(UsersDAO()._update_returning("uuid", "u", {"nickname": "n"}))
+    assert sql.startswith("UPDATE users SET nickname=")
+    assert "WHERE users.uuid = " in sql
+    assert "RETURNING users.id, users.uuid" in sql
+
+
+def test_update_without_changes_selects_current_row():
+    print("\n[TEST] _update_returning: 没有可更新字段时按键查询当前行")
+    sql = _sql(UsersDAO()._update_returning("uuid", "u", {"bogus": 1}))
+    assert sql.startswith("SELECT users.id")
+
+
+def test_delete_returns_id():
+    print("\n[TEST] _delete_returning: DELETE ... WHERE key = :v RETURNING id")
+    sql = _sql(RelationsDAO()._delete_returning("id", 1))
+    assert sql.startswith("DELETE FROM relations WHERE relations.id = ")
+    assert sql.endswith("RETURNING relations.id")
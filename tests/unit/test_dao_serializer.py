@@ -0,0 +1,120 @@
+"""Unit tests — BaseDAO 预编译的行序列化（_ModelSerializer，无需数据库）."""
+
+import pytest
+from sqlalchemy import Integer
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from core.database.dao.base import _ModelSerializer, _serializer_for
+from core.database.dao.users import User, UsersDAO
+
+
+def test_serializer_is_cached_per_model():
+    print("\n[TEST] _serializer_for: 每个模型只构建一次")
+    assert _serializer_for(User) is _serializer_for(User)
+    assert UsersDAO()._serializer() is _serializer_for(User)
+
+
+def test_to_dict_uses_column_names():
+    print("\n[TEST] _to_dict: 以数据库列名为键（User.class_ → class），与 mapper 遍历结果一致")
+    user = User(uuid="u", nickname="n", class_="c")
+    expected = {
+        p.columns[0].name: getattr(user, p.key) for p in User.__mapper__.column_attrs
+    }
+    assert UsersDAO._to_dict(user) == expected
+    assert expected["class"] == "c"
+    assert UsersDAO._to_dict(None) == {}
+
+
+def test_to_dict_reads_loaded_columns_from_instance_dict():
+    print("\n[TEST] _to_dict: 所有列已加载时直接读取实例 __dict__，结果不变")
+    serializer = _serializer_for(User)
+    user = User(**{attr: None for attr in serializer.attrs})
+    user.class_ = "c"
+    assert all(attr in user.__dict__ for attr in serializer.attrs)
+    result = UsersDAO._to_dict(user)
+    assert result["class"] == "c"
+    assert set(result) == set(serializer.columns)
+
+
+def test_rows_to_dicts_matches_select_columns():
+    print("\n[TEST] _rows_to_dicts: select(*select_columns) 的结果行按位置转换为字典")
+    dao = UsersDAO()
+    selected = [c.name for c in dao._select_rows().selected_columns]
+    assert tuple(selected) == dao._serializer().columns
+    row = tuple(range(len(selected)))
+    assert dao._rows_to_dicts([row]) == [dict(zip(selected, row))]
+
+
+def test_data_to_kwargs_maps_attribute_names():
+    print("\n[TEST] _data_to_kwargs: 列名转换为 ORM 属性名，其余键原样保留")
+    assert UsersDAO._data_to_kwargs({"class": "c", "nickname": "n", "x": 1}) == {
+        "class_": "c",
+        "nickname": "n",
+        "x": 1,
+    }
+
+
+def test_single_column_model():
+    print("\n[TEST] _ModelSerializer: 只有一列的模型同样返回字典")
+
+    class _Base(DeclarativeBase):
+        pass
+
+    class Single(_Base):
+        __tablename__ = "single"
+        id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    assert _ModelSerializer(Single).to_dict(Single(id=3)) == {"id": 3}
+
+
+# ---------------------------------------------------------------------------
+# fields 投影
+# ---------------------------------------------------------------------------
+
+def test_projection_accepts_column_and_attribute_names():
+    print("\n[TEST] projection: 列名与 ORM 属性名均可（class / class_），按给定顺序去重")
+    names, columns = _serializer_for(User).projection(["nickname", "class_", "class", "uuid"])
+    assert names == ("nickname", "class", "uuid")
+    assert [c.name for c in columns] == list(names)
+    assert _serializer_for(User).projection("uuid, class_")[0] == ("uuid", "class")
+    assert _serializer_for(User).projection(None)[0] == _serializer_for(User).columns
+
+
+def test_projection_rejects_unknown_or_empty_fields():
+    print("\n[TEST] projection: 字段不存在或为空时抛出 ValueError")
+    with pytest.raises(ValueError, match="bogus"):
+        _serializer_for(User).projection(["uuid", "bogus"])
+    with pytest.raises(ValueError):
+        _serializer_for(User).projection([])
+    with pytest.raises(ValueError):
+        _serializer_for(User).projection(" , ")
+
+
+def test_validate_fields_returns_column_names():
+    print("\n[TEST] BaseDAO.validate_fields: 返回列名（属性名转换为列名），字段不存在时抛出 ValueError")
+    dao = UsersDAO()
+    assert dao.validate_fields("uuid, class_") == ("uuid", "class")
+    assert dao.validate_fields() == _serializer_for(User).columns
+    with pytest.raises(ValueError):
+        dao.validate_fields(["bogus"])
+
+
+def test_select_rows_only_selects_requested_columns():
+    print("\n[TEST] _select_rows(fields): 只查询指定的列")
+    sql = str(UsersDAO()._select_by_uuid("u", ("uuid", "class_")).compile(dialect=postgresql.dialect()))
+    assert sql.startswith('SELECT users.uuid, users.class \nFROM users')
+    rows = UsersDAO()._rows_to_dicts([("u", "c")], ("uuid", "class_"))
+    assert rows == [{"uuid": "u", "class": "c"}]
+
+
+def test_page_query_selects_sort_keys_for_cursor():
+    print("\n[TEST] _page_query(fields): 额外查询未包含的排序键用于生成游标，返回前去掉")
+    dao = UsersDAO()
+    stmt, keys, scope, names, extra = dao._page_query(None, 2, ("-joined_at",), None, ("nickname",))
+    assert names == ("nickname", "joined_at", "id")
+    assert extra == ("joined_at", "id")
+    rows = dao._rows_to_dicts([("a", None, 3), ("b", None, 2), ("c", None, 1)], names)
+    page = dao._page_result(rows, keys, scope, 2, extra)
+    assert page["items"] == [{"nickname": "a"}, {"nickname": "b"}]
+    assert page["next_cursor"] is not None
@@ -0,0 +1,63 @@
+"""Unit tests — db_migrate 的无事务迁移脚本解析，以及迁移索引与 ORM 模型的一致性（无需数据库）."""
+
+import re
+from pathlib import Path
+
+import pytest
+
+import db_migrate
+from core.database.migrations.migration_history import migration_history
+
+_SQL_DIR = Path(__file__).resolve().parents[2] / "core" / "database" / "migrations" / "SQL"
+
+
+def test_split_sql_statements_skips_comments():
+    print("\n[TEST] split_sql_statements: 去掉 -- 注释行，按分号拆分并去掉空语句")
+    script = "-- migrate: no-transaction\n-- 说明\nCREATE INDEX a ON t (x);\n\nCREATE INDEX b\n  ON t (y);\n"
+    assert db_migrate.split_sql_statements(script) == [
+        "CREATE INDEX a ON t (x)",
+        "CREATE INDEX b\n  ON t (y)",
+    ]
+
+
+def test_concurrent_index_names_are_parsed():
+    print("\n[TEST] 无效索引清理: 从脚本中解析 CREATE [UNIQUE] INDEX CONCURRENTLY 的索引名")
+    script = (
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_a ON t (x);\n"
+        "create unique index concurrently idx_b on t (y);\n"
+        "CREATE INDEX idx_c ON t (z);\n"
+    )
+    assert db_migrate._CONCURRENT_INDEX_RE.findall(script) == ["idx_a", "idx_b"]
+
+
+def test_migrations_are_registered():
+    print("\n[TEST] migration_history: SQL 目录中的每个脚本都已登记")
+    assert sorted(migration_history) == sorted(p.name for p in _SQL_DIR.glob("*.sql"))
+
+
+@pytest.mark.parametrize("migration", ["add_lookup_indexes.sql"])
+def test_migration_indexes_match_orm_models(migration):
+    print(f"\n[TEST] {migration}: 每个索引都在 ORM 模型中声明了同名、同列的 Index")
+    import core.database.dao.comments  # noqa: F401
+    import core.database.dao.favourites  # noqa: F401
+    import core.database.dao.illegal_requests  # noqa: F401
+    import core.database.dao.personal_logs  # noqa: F401
+    import core.database.dao.relations  # noqa: F401
+    import core.database.dao.wall_sayings  # noqa: F401
+    from core.database.connection.db import Base
+
+    orm_indexes = {
+        index.name: (table.name, [col.name for col in index.columns])
+        for table in Base.metadata.tables.values()
+        for index in table.indexes
+    }
+    pattern = re.compile(
+        r"CREATE INDEX CONCURRENTLY IF NOT EXISTS (\w+) ON (\w+) \(([^)]*)\)", re.IGNORECASE
+    )
+    script = (_SQL_DIR / migration).read_text()
+    assert script.startswith(db_migrate.NO_TRANSACTION_MARKER)
+    found = pattern.findall(script)
+    assert found
+    for name, table, columns in found:
+        expected = [c.strip().strip('"') for c in columns.split(",")]
+        assert orm_indexes.get(name) == (table, expected), name
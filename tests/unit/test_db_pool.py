@@ -0,0 +1,143 @@
+"""Unit tests — core.database.connection.pool (SQLite，无需 PostgreSQL)."""
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from core.database.connection.pool import PoolMetrics, PoolSettings, install_idle_pre_ping
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _engine(tmp_path, metrics: PoolMetrics, **kwargs):
+    return create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=metrics.pool_class(QueuePool),
+        **kwargs,
+    )
+
+
+# ---------------------------------------------------------------------------
+# PoolSettings
+# ---------------------------------------------------------------------------
+
+def test_settings_defaults(monkeypatch):
+    print("\n[TEST] PoolSettings: 未设置环境变量时使用默认值")
+    for name in ("DB_POOL_SIZE", "DB_MAX_OVERFLOW", "DB_POOL_TIMEOUT", "DB_POOL_RECYCLE",
+                 "DB_POOL_PRE_PING", "DB_POOL_PRE_PING_IDLE"):
+        monkeypatch.delenv(name, raising=False)
+    settings = PoolSettings.from_env()
+    assert settings == PoolSettings()
+    assert settings.engine_kwargs()["pool_pre_ping"] is False
+
+
+def test_settings_from_env(monkeypatch):
+    print("\n[TEST] PoolSettings: 从环境变量读取连接池参数")
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "2.5")
+    monkeypatch.setenv("DB_POOL_RECYCLE", "1800")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "ALWAYS")
+    kwargs = PoolSettings.from_env().engine_kwargs()
+    assert kwargs == {
+        "pool_size": 20,
+        "max_overflow": 0,
+        "pool_timeout": 2.5,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+    }
+
+
+@pytest.mark.parametrize("name, value", [("DB_POOL_SIZE", "many"), ("DB_POOL_PRE_PING", "sometimes")])
+def test_settings_reject_invalid_values(monkeypatch, name, value):
+    print(f"\n[TEST] PoolSettings: {name}={value} 非法时抛出 EnvironmentError")
+    monkeypatch.setenv(name, value)
+    with pytest.raises(EnvironmentError):
+        PoolSettings.from_env()
+
+
+# ---------------------------------------------------------------------------
+# PoolMetrics
+# ---------------------------------------------------------------------------
+
+def test_metrics_report_occupancy_and_wait_histogram(tmp_path):
+    print("\n[TEST] PoolMetrics: 统计已取出连接数与取用耗时")
+    metrics = PoolMetrics("test")
+    engine = _engine(tmp_path, metrics, pool_size=2, max_overflow=1)
+    with engine.connect(), engine.connect(), engine.connect():
+        stats = metrics.stats()
+        assert stats["checked_out"] == 3
+        assert stats["overflow"] == 1
+    stats = metrics.stats()
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] == 3
+    assert sum(stats["wait_ms"]["histogram"].values()) == 3
+
+
+def test_metrics_count_checkout_timeouts(tmp_path):
+    print("\n[TEST] PoolMetrics: 连接池耗尽超时计入 checkout_timeouts")
+    metrics = PoolMetrics("test")
+    engine = _engine(tmp_path, metrics, pool_size=1, max_overflow=0, pool_timeout=0.01)
+    with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+    assert metrics.stats()["checkout_timeouts"] == 1
+
+
+def test_metrics_survive_engine_dispose(tmp_path):
+    print("\n[TEST] PoolMetrics: engine.dispose() 重建连接池后继续统计")
+    metrics = PoolMetrics("test")
+    engine = _engine(tmp_path, metrics)
+    with engine.connect():
+        pass
+    engine.dispose()
+    with engine.connect():
+        assert metrics.stats()["checked_out"] == 1
+    assert metrics.stats()["checkouts"] == 2
+
+
+def test_metrics_before_pool_created():
+    print("\n[TEST] PoolMetrics: 连接池未创建时占用项为 None")
+    stats = PoolMetrics("test").stats()
+    assert stats["checked_out"] is None
+    assert stats["checkouts"] == 0
+
+
+# ---------------------------------------------------------------------------
+# idle 探活
+# ---------------------------------------------------------------------------
+
+def test_idle_pre_ping_skips_recent_connections(tmp_path):
+    print("\n[TEST] idle 探活: 刚归还的连接取用时不探活")
+    metrics = PoolMetrics("test")
+    engine = _engine(tmp_path, metrics, pool_size=1)
+    install_idle_pre_ping(engine.pool, engine.dialect, 60, metrics)
+    for _ in range(3):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    assert metrics.stats()["pings"] == 0
+
+
+def test_idle_pre_ping_replaces_dead_connection(tmp_path, monkeypatch):
+    print("\n[TEST] idle 探活: 空闲连接探活失败时换一条新连接")
+    metrics = PoolMetrics("test")
+    engine = _engine(tmp_path, metrics, pool_size=1)
+    install_idle_pre_ping(engine.pool, engine.dialect, 0, metrics)
+    with engine.connect() as conn:
+        first = conn.connection.dbapi_connection
+
+    def broken_ping(dbapi_connection):
+        if dbapi_connection is first:
+            raise RuntimeError("server closed the connection")
+        return True
+
+    monkeypatch.setattr(engine.dialect, "do_ping", broken_ping)
+    with engine.connect() as conn:
+        assert conn.connection.dbapi_connection is not first
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+    stats = metrics.stats()
+    assert stats["ping_failures"] == 1
+    assert stats["checkout_errors"] == 0
@@ -0,0 +1,229 @@
+"""Unit tests — 只读副本路由（core.database.connection.db / replicas，SQLite 代替 PostgreSQL）."""
+
+import contextvars
+import time
+
+import pytest
+from sqlalchemy import text
+
+from core.database.connection import db, replicas
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+def _make_db(path, name: str) -> str:
+    """创建一个带 marker 表的 SQLite 数据库，返回连接字符串。"""
+    url = f"sqlite:///{path / name}.db"
+    from sqlalchemy import create_engine
+
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE marker (name TEXT)"))
+        conn.execute(text("INSERT INTO marker VALUES (:name)"), {"name": name})
+    engine.dispose()
+    return url
+
+
+@pytest.fixture
+def databases(tmp_path, monkeypatch):
+    """主库 + 两个副本；返回一个按需设置副本相关环境变量的函数。"""
+    monkeypatch.setenv("DATABASE_URL", _make_db(tmp_path, "primary"))
+    urls = [_make_db(tmp_path, "replica0"), _make_db(tmp_path, "replica1")]
+
+    replicas._last_write.set(None)
+
+    def configure(replica_urls=None, **env):
+        monkeypatch.setenv("DATABASE_REPLICA_URLS", ",".join(replica_urls or urls))
+        for name, value in env.items():
+            monkeypatch.setenv(name, str(value))
+        db.dispose_engine()
+        db._router = None
+
+    yield configure
+    monkeypatch.delenv("DATABASE_REPLICA_URLS", raising=False)
+    db.dispose_engine()
+    db._router = None
+
+
+def _read(readonly: bool = True) -> str:
+    with db.get_session(readonly=readonly) as session:
+        return session.execute(text("SELECT name FROM marker")).scalar()
+
+
+def _in_new_context(fn):
+    """在独立的 contextvars 上下文中执行（隔离读己之写状态）。"""
+    return contextvars.copy_context().run(fn)
+
+
+# ---------------------------------------------------------------------------
+# Routing
+# ---------------------------------------------------------------------------
+
+def test_no_replicas_reads_primary(databases):
+    print("\n[TEST] 副本路由: 未配置副本时只读 Session 使用主库")
+    databases(replica_urls=[" "])
+    assert _read() == "primary"
+    assert db.replica_stats() is None
+
+
+def test_round_robin_across_replicas(databases):
+    print("\n[TEST] 副本路由: round_robin 轮流使用各副本，写 Session 使用主库")
+    databases()
+    assert sorted(_read() for _ in range(4)) == ["replica0", "replica0", "replica1", "replica1"]
+    assert _read(readonly=False) == "primary"
+    assert [r["reads"] for r in db.replica_stats()["replicas"]] == [2, 2]
+
+
+def test_least_connections_prefers_idle_replica(databases):
+    print("\n[TEST] 副本路由: least_connections 选择进行中 Session 最少的副本")
+    databases(DB_REPLICA_STRATEGY="least_connections")
+    with db.get_session(readonly=True) as busy:
+        held = busy.execute(text("SELECT name FROM marker")).scalar()
+        for _ in range(3):
+            assert _read() != held
+
+
+# ---------------------------------------------------------------------------
+# Read-your-writes
+# ---------------------------------------------------------------------------
+
+def test_reads_stick_to_primary_after_write(databases):
+    print("\n[TEST] 副本路由: 写入后窗口期内同一上下文的读取使用主库")
+    databases()
+
+    def flow() -> list[str]:
+        before = _read()
+        with db.get_session() as session:
+            session.execute(text("INSERT INTO marker VALUES ('written')"))
+        return [before, _read()]
+
+    before, after = _in_new_context(flow)
+    assert before.startswith("replica")
+    assert after == "primary"
+    assert db.replica_stats()["sticky_reads"] == 1
+    # 其他上下文不受影响
+    assert _in_new_context(_read).startswith("replica")
+
+
+def test_read_only_primary_session_does_not_start_window(databases):
+    print("\n[TEST] 副本路由: 主库上只有查询的 Session 不触发读己之写窗口")
+    databases()
+
+    def flow() -> str:
+        with db.get_session() as session:
+            session.execute(text("SELECT 1")).all()
+        return _read()
+
+    # text() 语句无法区分读写，按写入处理；ORM select 不触发
+    from sqlalchemy import select, literal
+
+    def orm_flow() -> str:
+        with db.get_session() as session:
+            session.execute(select(literal(1))).all()
+        return _read()
+
+    assert _in_new_context(flow) == "primary"
+    assert _in_new_context(orm_flow).startswith("replica")
+
+
+def test_window_expires(databases):
+    print("\n[TEST] 副本路由: 窗口为 0 时写入后立即恢复使用副本")
+    databases(DB_READ_YOUR_WRITES_WINDOW=0)
+
+    def flow() -> str:
+        with db.get_session() as session:
+            session.execute(text("INSERT INTO marker VALUES ('written')"))
+        return _read()
+
+    assert _in_new_context(flow).startswith("replica")
+
+
+def _client():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from core.middleware.replicas.index import ReadYourWritesMiddleware
+
+    app = FastAPI()
+
+    @app.post("/marker")
+    def write():
+        with db.get_session() as session:
+            session.execute(text("INSERT INTO marker VALUES ('written')"))
+        return {}
+
+    @app.get("/marker")
+    def read():
+        return {"source": _read()}
+
+    app.add_middleware(ReadYourWritesMiddleware)
+    return TestClient(app)
+
+
+def test_next_request_after_write_reads_primary(databases):
+    print("\n[TEST] ReadYourWritesMiddleware: 写入后响应设置 cookie，同一客户端下一个请求仍读主库")
+    databases()
+    client = _client()
+    assert client.get("/marker").json()["source"].startswith("replica")
+    assert "set-cookie" not in client.get("/marker").headers
+
+    response = client.post("/marker")
+    assert "db_last_write=" in response.headers["set-cookie"]
+    assert "Max-Age=5" in response.headers["set-cookie"]
+    assert client.get("/marker").json()["source"] == "primary"
+    # 其他客户端不受影响
+    assert _client().get("/marker").json()["source"].startswith("replica")
+
+
+def test_expired_or_forged_cookie_is_ignored(databases):
+    print("\n[TEST] ReadYourWritesMiddleware: 过期、未来时刻或格式错误的 cookie 不会让读取回到主库")
+    databases()
+    for value in (time.time() - 60, time.time() + 3600, "bogus"):
+        client = _client()
+        client.cookies.set("db_last_write", str(value))
+        assert client.get("/marker").json()["source"].startswith("replica")
+
+
+def test_middleware_passes_through_without_replicas(databases, monkeypatch):
+    print("\n[TEST] ReadYourWritesMiddleware: 未配置副本时不设置 cookie")
+    databases()
+    monkeypatch.setenv("DATABASE_REPLICA_URLS", "")
+    db._router = None
+    response = _client().post("/marker")
+    assert response.status_code == 200
+    assert "set-cookie" not in response.headers
+
+
+# ---------------------------------------------------------------------------
+# Health
+# ---------------------------------------------------------------------------
+
+def test_unhealthy_replica_is_skipped(databases, tmp_path):
+    print("\n[TEST] 副本路由: 副本连接失败时改用其他副本，并在重试间隔内跳过")
+    broken = f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"
+    healthy = _make_db(tmp_path, "healthy")
+    databases(replica_urls=[broken, healthy])
+    assert [_read() for _ in range(4)] == ["healthy"] * 4
+    stats = db.replica_stats()
+    assert stats["replicas"][0]["failures"] == 1
+    assert stats["replicas"][0]["healthy"] is False
+
+
+def test_all_replicas_down_falls_back_to_primary(databases, tmp_path):
+    print("\n[TEST] 副本路由: 副本全部不可用时回退到主库")
+    broken = f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"
+    databases(replica_urls=[broken])
+    assert _read() == "primary"
+    assert _read() == "primary"
+    stats = db.replica_stats()
+    assert stats["fallback_reads"] == 2
+    assert stats["replicas"][0]["failures"] == 1
+
+
+def test_invalid_strategy_rejected(databases):
+    print("\n[TEST] 副本路由: DB_REPLICA_STRATEGY 非法时抛出 EnvironmentError")
+    databases(DB_REPLICA_STRATEGY="random")
+    with pytest.raises(EnvironmentError):
+        _read()
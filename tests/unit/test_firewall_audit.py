@@ -0,0 +1,92 @@
+"""Unit tests — core.middleware.firewall.audit.AuditSink (no database)."""
+
+import time
+
+from core.middleware.firewall.audit import AuditSink
+
+
+def _sink(**overrides) -> AuditSink:
+    options = dict(
+        max_queue=100, batch_size=10, flush_interval=0.05,
+        sample_threshold=1.0, sample_rate=10,
+    )
+    options.update(overrides)
+    sink = AuditSink(**options)
+    sink.batches = []
+
+    def write(batch):
+        sink.batches.append(batch)
+        return len(batch)
+
+    sink._write = write
+    return sink
+
+
+def test_flush_splits_into_batches():
+    print("\n[TEST] AuditSink.flush: 按 batch_size 分批写入队列中的全部记录")
+    sink = _sink()
+    for _ in range(25):
+        sink.submit("xss", "/", "1.1.1.1", "ua", user="unknown")
+    assert sink.flush() == 25
+    assert [len(batch) for batch in sink.batches] == [10, 10, 5]
+    assert sink.stats()["queued"] == 0
+
+
+def test_full_queue_drops_records():
+    print("\n[TEST] AuditSink.submit: 队列满时丢弃新记录并计数")
+    sink = _sink(max_queue=5, sample_rate=1)
+    accepted = [sink.submit("crawler", "/", "1.1.1.1", "ua") for _ in range(8)]
+    assert accepted.count(True) == 5
+    assert sink.stats()["dropped"] == 3
+
+
+def test_backlog_is_sampled():
+    print("\n[TEST] AuditSink.submit: 队列积压超过阈值后每 sample_rate 条保留 1 条")
+    sink = _sink(max_queue=100, sample_threshold=0.1, sample_rate=5)
+    for _ in range(10):
+        sink.submit("rate_limit", "/", "1.1.1.1", "ua")
+    for _ in range(50):
+        sink.submit("rate_limit", "/", "1.1.1.1", "ua")
+    stats = sink.stats()
+    assert stats["queued"] == 20
+    assert stats["sampled_out"] == 40
+
+
+def test_worker_writes_within_flush_interval():
+    print("\n[TEST] AuditSink.start: 后台线程在 flush_interval 内写入未满一批的记录")
+    sink = _sink()
+    sink.start()
+    try:
+        sink.submit("sqli", "/", "1.1.1.1", "ua", token="t")
+        deadline = time.monotonic() + 2
+        while not sink.batches and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        sink.stop()
+    assert len(sink.batches) == 1
+    assert sink.batches[0][0]["token"] == "t"
+
+
+def test_stop_flushes_remaining_records():
+    print("\n[TEST] AuditSink.stop: 停止时写入队列中剩余的记录")
+    sink = _sink(flush_interval=10)
+    sink.start()
+    sink.stop()
+    sink.submit("xss", "/", "1.1.1.1", "ua")
+    sink.stop()
+    assert sum(len(batch) for batch in sink.batches) == 1
+
+
+def test_write_failure_is_counted(monkeypatch):
+    print("\n[TEST] AuditSink._write: 数据库不可用时计入 failed 且不抛异常")
+    import core.database.connection.db as db
+
+    def unavailable():
+        raise RuntimeError("database unavailable")
+
+    # 与集成测试同一进程运行时数据库可能已连接，这里显式模拟不可用
+    monkeypatch.setattr(db, "get_session", unavailable)
+    sink = AuditSink(100, 10, 0.05, 1.0, 10)
+    sink.submit("xss", "/", "1.1.1.1", "ua", user="unknown")
+    assert sink.flush() == 0
+    assert sink.stats()["failed"] == 1
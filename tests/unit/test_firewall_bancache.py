@@ -0,0 +1,59 @@
+"""Unit tests — core.middleware.firewall.bancache.BanCache (no Redis)."""
+
+from core.middleware.firewall.bancache import BanCache, format_ban_event
+
+
+def test_unknown_ip_returns_none():
+    print("\n[TEST] BanCache.lookup: 未缓存的 IP → None（需查询 Redis）")
+    assert BanCache(100, 30).lookup("1.1.1.1") is None
+
+
+def test_banned_and_clean_entries():
+    print("\n[TEST] BanCache.lookup: 封禁缓存 → True，负缓存 → False")
+    cache = BanCache(100, 30)
+    cache.mark_banned("1.1.1.1", 60)
+    cache.mark_clean("2.2.2.2")
+    assert cache.lookup("1.1.1.1") is True
+    assert cache.lookup("2.2.2.2") is False
+
+
+def test_ban_overrides_negative_entry():
+    print("\n[TEST] BanCache.mark_banned: 覆盖同一 IP 的负缓存")
+    cache = BanCache(100, 30)
+    cache.mark_clean("1.1.1.1")
+    cache.mark_banned("1.1.1.1", 60)
+    assert cache.lookup("1.1.1.1") is True
+
+
+def test_apply_ban_and_unban_events():
+    print("\n[TEST] BanCache.apply_event: 应用 pub/sub 封禁与解封事件")
+    cache = BanCache(100, 30)
+    cache.apply_event(format_ban_event("ban", "1.1.1.1", 86400))
+    assert cache.lookup("1.1.1.1") is True
+    cache.apply_event(format_ban_event("unban", "1.1.1.1"))
+    assert cache.lookup("1.1.1.1") is None
+
+
+def test_apply_event_supports_ipv6():
+    print("\n[TEST] BanCache.apply_event: IPv6 地址可正确解析")
+    cache = BanCache(100, 30)
+    cache.apply_event(format_ban_event("ban", "2001:db8::1", 60))
+    assert cache.lookup("2001:db8::1") is True
+
+
+def test_malformed_event_is_ignored():
+    print("\n[TEST] BanCache.apply_event: 格式错误的事件被忽略")
+    cache = BanCache(100, 30)
+    cache.apply_event("garbage")
+    assert cache.lookup("garbage") is None
+
+
+def test_hit_rate():
+    print("\n[TEST] BanCache.stats: hit_rate 为无需访问 Redis 的查询比例")
+    cache = BanCache(100, 30)
+    cache.mark_clean("1.1.1.1")
+    cache.lookup("1.1.1.1")
+    cache.lookup("2.2.2.2")
+    stats = cache.stats()
+    assert stats["lookups"] == 2
+    assert stats["hit_rate"] == 0.5
@@ -0,0 +1,108 @@
+"""Unit tests — core.middleware.firewall.body（请求体流式检测，no Redis）。"""
+
+import asyncio
+
+from core.middleware.firewall.body import BodyInspectionRule, find_body_rule, inspect_body
+from core.middleware.firewall.helpers import detect_attack
+
+
+def _receive_from(chunks: list[bytes]):
+    """构造按块返回请求体的 ASGI receive，并记录被读取的消息。"""
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks)
+    ]
+    pending = list(messages)
+
+    async def receive():
+        return pending.pop(0)
+
+    return receive, messages
+
+
+def _inspect(chunks: list[bytes], content_type: str, max_bytes: int = 64 * 1024):
+    receive, messages = _receive_from(chunks)
+    rule = BodyInspectionRule("/", max_bytes=max_bytes)
+
+    async def run():
+        offense, replay = await inspect_body(receive, content_type, rule, detect_attack)
+        replayed = [await replay() for _ in messages]
+        return offense, replayed
+
+    offense, replayed = asyncio.run(run())
+    return offense, replayed, messages
+
+
+def test_rule_matching():
+    print("\n[TEST] find_body_rule: 按路径前缀与请求方法匹配规则")
+    rules = (BodyInspectionRule("/comments"), BodyInspectionRule("/songs", methods=["PUT"]))
+    assert find_body_rule(rules, "POST", "/comments/1") is rules[0]
+    assert find_body_rule(rules, "POST", "/songs") is None
+    assert find_body_rule(rules, "GET", "/comments") is None
+
+
+def test_json_string_split_across_chunks():
+    print("\n[TEST] inspect_body: JSON 字符串跨块拆分时仍能识别 XSS")
+    offense, _, _ = _inspect([b'{"text": "<scr', b'ipt>alert(1)</script>"}'], "application/json")
+    assert offense == "xss"
+
+
+def test_json_unicode_escape_is_decoded():
+    print("\n[TEST] inspect_body: JSON 转义（\\u003c）解码后再检测")
+    offense, _, _ = _inspect([b'{"text": "\\u003cscript\\u003e"}'], "application/json")
+    assert offense == "xss"
+
+
+def test_benign_json_is_replayed_unchanged():
+    print("\n[TEST] inspect_body: 正常 JSON 放行，原样重放同一批消息对象")
+    offense, replayed, messages = _inspect(
+        [b'{"text": "hello", ', b'"tags": ["a", "b"]}'], "application/json"
+    )
+    assert offense is None
+    assert all(a is b for a, b in zip(replayed, messages))
+
+
+def test_form_field_is_url_decoded():
+    print("\n[TEST] inspect_body: urlencoded 表单字段解码后检测 SQL 注入")
+    offense, _, _ = _inspect([b"name=bob&bio=1%27%20OR%20%271%27%3D%271"],
+                             "application/x-www-form-urlencoded")
+    assert offense == "sql_injection"
+
+
+def test_multipart_skips_file_content():
+    print("\n[TEST] inspect_body: multipart 检测文本字段，跳过文件内容")
+    body = (
+        b"--b\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.txt\"\r\n\r\n"
+        b"<script>in a file</script>\r\n"
+        b"--b\r\nContent-Disposition: form-data; name=\"title\"\r\n\r\nhello\r\n--b--\r\n"
+    )
+    offense, _, _ = _inspect([body], "multipart/form-data; boundary=b")
+    assert offense is None
+    attack = body.replace(b"hello", b"<iframe src=x>")
+    offense, _, _ = _inspect([attack], "multipart/form-data; boundary=b")
+    assert offense == "xss"
+
+
+def test_bytes_beyond_cap_are_not_read():
+    print("\n[TEST] inspect_body: 超过 max_bytes 后停止读取，剩余消息由下游直接接收")
+    chunks = [b'{"a": "' + b"x" * 16, b'", "b": "<script>"}']
+    receive, messages = _receive_from(chunks)
+    rule = BodyInspectionRule("/", max_bytes=8)
+
+    async def run():
+        offense, replay = await inspect_body(receive, "application/json", rule, detect_attack)
+        return offense, [await replay(), await replay()]
+
+    offense, replayed = asyncio.run(run())
+    assert offense is None
+    assert replayed[0] is messages[0] and replayed[1] is messages[1]
+
+
+def test_unsupported_content_type_is_not_read():
+    print("\n[TEST] inspect_body: 不支持的 Content-Type 不读取请求体")
+    receive, _ = _receive_from([b"<script>"])
+    offense, replay = asyncio.run(
+        inspect_body(receive, "application/octet-stream", BodyInspectionRule("/"), detect_attack)
+    )
+    assert offense is None
+    assert replay is receive
@@ -0,0 +1,150 @@
+"""Unit tests — core.middleware.firewall.detector.AttackDetector."""
+
+import random
+import re
+
+import pytest
+
+from core.middleware.firewall import detector as detector_module
+from core.middleware.firewall.config import _SQLI_PATTERNS, _XSS_PATTERNS
+from core.middleware.firewall.detector import (
+    OVERSIZED,
+    AttackDetector,
+    _is_candidate,
+    compile_pattern,
+)
+
+# 组合随机输入的片段：关键字、特殊字符、空白与非 ASCII 等价字符
+_PIECES = [
+    "select", "SELECT", "from", "where", "set", "union", "exec", "xp_", "or", "and",
+    "script", "javascript", ":", "<", ">", "'", '"', "(", ")", ";", "/*", "*/", "--",
+    "=", "1", "a", "/", "?", "&", " ", "\t", "\x1c", "onerror", "cookie", "document",
+    ".", "eval", "ſelect", "K", "%20", "users", "page",
+]
+
+
+# 改动前的检测正则：当前正则的命中结果必须与之一致
+_BASELINE_XSS = re.compile(
+    r"(<\s*script[\s\S]*?>|<\s*/\s*script\s*>|javascript\s*:|vbscript\s*:"
+    r"|on\w+\s*=\s*[\"']|<\s*iframe|<\s*object|<\s*embed|<\s*link"
+    r"|<\s*img[^>]+onerror|document\s*\.\s*cookie|eval\s*\(|expression\s*\()",
+    re.IGNORECASE,
+)
+_BASELINE_SQLI = re.compile(
+    r"(\b(select|insert|update|delete|drop|truncate|alter|create|replace"
+    r"|union|exec|execute|xp_|sp_)\b.*\b(from|into|table|where|set)\b"
+    r"|'[\s\S]*?--"
+    r"|;\s*(drop|delete|update|insert|select)"
+    r"|\bor\b\s+[\w'\"]+\s*=\s*[\w'\"]+"
+    r"|\band\b\s+[\w'\"]+\s*=\s*[\w'\"]+"
+    r"|\/\*[\s\S]*?\*\/)",
+    re.IGNORECASE,
+)
+
+# 分支之间的长间隔：超过旧版 256 字符跨度上限
+_LONG_GAP_PAYLOADS = [
+    "union select " + ",".join("a" * 300) + " from users",
+    "x' " + "a" * 300 + " --",
+    "/*" + "b" * 300 + "*/",
+    "<script " + "c" * 300 + ">",
+    "<img " + "d" * 300 + " onerror=alert(1)>",
+    "on" + "e" * 300 + "='x'",
+    "1 or " + "f" * 300 + "=1",
+    ";" + " " * 300 + "drop table users",
+    "x'" + "'" * 300 + "\n" * 300 + "--",
+]
+
+
+def _baseline(text: str) -> str | None:
+    if _BASELINE_XSS.search(text):
+        return "xss"
+    if _BASELINE_SQLI.search(text):
+        return "sql_injection"
+    return None
+
+
+def _reference(text: str) -> str | None:
+    if _XSS_PATTERNS.search(text):
+        return "xss"
+    if _SQLI_PATTERNS.search(text):
+        return "sql_injection"
+    return None
+
+
+def test_results_match_full_regexes():
+    print("\n[TEST] AttackDetector.detect: 随机输入的结果与直接运行完整正则一致")
+    detector = AttackDetector(_XSS_PATTERNS, _SQLI_PATTERNS, 8192)
+    rng = random.Random(1234)
+    for _ in range(20000):
+        text = "".join(rng.choice(_PIECES) for _ in range(rng.randint(1, 12)))
+        assert detector.detect(text) == _reference(text), text
+
+
+@pytest.mark.parametrize("engine", ["re", "re2"])
+def test_long_gap_payloads_match_baseline(engine):
+    print(f"\n[TEST] 检测正则（{engine}）: 长间隔载荷的命中结果与改动前的正则一致")
+    if engine == "re2" and detector_module.re2 is None:
+        pytest.skip("google-re2 未安装")
+    detector = AttackDetector(
+        compile_pattern(_XSS_PATTERNS, engine), compile_pattern(_SQLI_PATTERNS, engine), 8192
+    )
+    for text in _LONG_GAP_PAYLOADS:
+        expected = _baseline(text)
+        assert expected is not None, text
+        assert detector.detect(text) == expected, text
+
+
+def test_random_long_inputs_match_baseline():
+    print("\n[TEST] 检测正则: 含长间隔的随机输入与改动前的正则命中结果一致")
+    rng = random.Random(4321)
+    fillers = ["a" * 300, " " * 300, "x," * 150, "'" * 50, "\n", "-" * 3]
+    for _ in range(3000):
+        text = "".join(rng.choice(_PIECES + fillers) for _ in range(rng.randint(1, 10)))
+        assert bool(_XSS_PATTERNS.search(text)) == bool(_BASELINE_XSS.search(text)), text
+        assert bool(_SQLI_PATTERNS.search(text)) == bool(_BASELINE_SQLI.search(text)), text
+
+
+def test_benign_paths_skip_regexes():
+    print("\n[TEST] _is_candidate: 常见正常路径不需要运行完整正则")
+    for text in ("/api/v1/users", "/songs?page=2&size=20", "/wall_sayings/42?sort=created_at"):
+        assert not _is_candidate(text)
+
+
+def test_non_ascii_input_always_checked():
+    print("\n[TEST] _is_candidate: 非 ASCII 输入直接交给正则（ſ 在忽略大小写时等价于 s）")
+    assert _is_candidate("ſelect")
+    assert AttackDetector(_XSS_PATTERNS, _SQLI_PATTERNS, 8192).detect(
+        "ſelect * from users"
+    ) == "sql_injection"
+
+
+def test_scan_is_limited_to_max_length():
+    print("\n[TEST] AttackDetector.detect: 超过 max_length 的部分不检测")
+    detector = AttackDetector(_XSS_PATTERNS, _SQLI_PATTERNS, 16)
+    assert detector.detect("<script>" + "a" * 32) == "xss"
+    assert detector.detect("a" * 32 + "<script>") is None
+
+
+def test_request_budget_is_shared_across_calls():
+    print("\n[TEST] AttackDetector.detect: 同一请求的多次检测共用检测预算")
+    detector = AttackDetector(_XSS_PATTERNS, _SQLI_PATTERNS, 8192, request_budget=20)
+    budget = detector.new_budget()
+    assert detector.detect("a" * 15, budget) is None
+    assert detector.detect("<script>", budget) is None
+    assert budget.remaining == 0
+
+
+def test_fail_closed_rejects_oversized_input():
+    print("\n[TEST] AttackDetector.detect: fail closed 时超出上限的输入判定为 oversized")
+    detector = AttackDetector(_XSS_PATTERNS, _SQLI_PATTERNS, 16, fail_closed=True)
+    assert detector.detect("a" * 17) == OVERSIZED
+    assert detector.detect("a" * 16) is None
+
+
+def test_compile_pattern_engines(monkeypatch):
+    print("\n[TEST] compile_pattern: re 引擎原样返回；未安装 google-re2 时 re2 引擎报错")
+    assert compile_pattern(_XSS_PATTERNS, "re") is _XSS_PATTERNS
+    monkeypatch.setattr(detector_module, "re2", None)
+    assert compile_pattern(_XSS_PATTERNS, "auto") is _XSS_PATTERNS
+    with pytest.raises(RuntimeError):
+        compile_pattern(_XSS_PATTERNS, "re2")
@@ -0,0 +1,275 @@
+"""Unit tests — core.middleware.firewall.fallback 与 Redis 断开时的降级（无需 Redis）."""
+
+import asyncio
+
+import pytest
+import redis as redis_lib
+
+from core.database.connection.redis import RedisTopology, redis_conn
+from core.middleware.firewall import helpers
+from core.middleware.firewall.bancache import ban_cache
+from core.middleware.firewall.fallback import FallbackStore, fallback_store
+from core.middleware.firewall.ratelimit import RateLimit
+
+
+def _key(prefix: str, ip: str) -> str:
+    return prefix + ip
+
+
+class _ScriptClient:
+    """记录写回脚本调用的同步客户端，``fail_after`` 次调用后抛出连接错误。"""
+
+    def __init__(self, fail_after: int | None = None) -> None:
+        self.calls: list[tuple[list, list]] = []
+        self.fail_after = fail_after
+
+    def register_script(self, script):
+        # 与 redis-py 的 Script 一样，按调用时传入的 client 执行
+        def run(keys, args, client):
+            if client.fail_after is not None and len(client.calls) >= client.fail_after:
+                raise redis_lib.ConnectionError("Connection refused")
+            client.calls.append((keys, args))
+            return [0, 0]
+        return run
+
+
+class _DownAsyncClient:
+    """所有命令都抛出连接错误的异步客户端，模拟 Redis 宕机。"""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def register_script(self, script):
+        async def run(keys, args, client):
+            self.calls += 1
+            raise redis_lib.ConnectionError("Connection refused")
+        return run
+
+    async def pttl(self, key):
+        self.calls += 1
+        raise redis_lib.ConnectionError("Connection refused")
+
+    async def set(self, *args, **kwargs):
+        self.calls += 1
+        raise redis_lib.ConnectionError("Connection refused")
+
+
+@pytest.fixture
+def outage(monkeypatch):
+    """让全局 redis_conn 处于「已连接但 Redis 宕机」的状态，测试结束后复原。"""
+    down = _DownAsyncClient()
+    monkeypatch.setattr(redis_conn, "_client", object())
+    monkeypatch.setattr(redis_conn, "get_async_client", lambda: down)
+    monkeypatch.setattr(helpers, "_check_script", None)
+    monkeypatch.setattr(helpers._rate_limiter, "_script", None)
+    yield down
+    redis_conn._degraded = False
+    fallback_store.clear()
+    ban_cache.clear()
+
+
+# ---------------------------------------------------------------------------
+# FallbackStore
+# ---------------------------------------------------------------------------
+
+def test_check_bans_at_threshold():
+    print("\n[TEST] FallbackStore.check: 违规累计到阈值时封禁，之后直接返回 banned")
+    store = FallbackStore(100, ban_threshold=3, ban_duration=60)
+    assert store.check("1.2.3.4", None, []) == (None, 0, 0)
+    assert store.check("1.2.3.4", "xss", []) == ("xss", 1, 0)
+    assert store.check("1.2.3.4", "xss", []) == ("xss", 2, 0)
+    assert store.check("1.2.3.4", "crawler", []) == ("crawler", 3, 60_000)
+    verdict, violations, ban_ttl = store.check("1.2.3.4", None, [])
+    assert (verdict, violations) == ("banned", 0) and 0 < ban_ttl <= 60_000
+    assert store.check("5.6.7.8", None, []) == (None, 0, 0)
+
+
+def test_check_rate_limit_counts_as_violation():
+    print("\n[TEST] FallbackStore.check: 超出进程内限额时判定为 rate_limit 并累加违规")
+    store = FallbackStore(100)
+    limits = [("fw:rate:1.2.3.4", RateLimit(2, 60))]
+    assert store.check("1.2.3.4", None, limits)[0] is None
+    assert store.check("1.2.3.4", None, limits)[0] is None
+    assert store.check("1.2.3.4", None, limits) == ("rate_limit", 1, 0)
+
+
+def test_memory_is_bounded():
+    print("\n[TEST] FallbackStore: 违规计数与封禁集合超出容量时淘汰最久未使用的 IP")
+    store = FallbackStore(2, ban_threshold=1)
+    for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+        store.check(ip, "xss", [])
+    stats = store.stats()
+    assert stats["violations"] == 2 and stats["banned"] == 2
+    assert store.ban_ttl("10.0.0.1") is None
+    assert store.ban_ttl("10.0.0.3") is not None
+
+
+def test_unban_clears_local_state():
+    print("\n[TEST] FallbackStore.unban: 清除本地封禁与违规计数，记录待写回的解封")
+    store = FallbackStore(100, ban_threshold=2)
+    store.check("1.2.3.4", "xss", [])
+    store.ban("1.2.3.4", 60)
+    store.unban("1.2.3.4")
+    assert store.ban_ttl("1.2.3.4") is None
+    assert store.check("1.2.3.4", "xss", []) == ("xss", 1, 0)
+    assert store.stats()["pending_unbans"] == 1
+
+
+# ---------------------------------------------------------------------------
+# FallbackStore.reconcile
+# ---------------------------------------------------------------------------
+
+def test_reconcile_writes_back_and_clears():
+    print("\n[TEST] reconcile: 每个 IP 一次脚本调用写回违规 / 封禁 / 解封，成功后清除")
+    store = FallbackStore(100, ban_threshold=5, ban_duration=60)
+    store.check("1.1.1.1", "xss", [])
+    store.check("1.1.1.1", "xss", [])
+    store.ban("2.2.2.2", 30)
+    store.unban("3.3.3.3")
+    client = _ScriptClient()
+    assert store.reconcile(client, _key) == 3
+    calls = {keys[0]: args for keys, args in client.calls}
+    assert calls["fw:ban:1.1.1.1"][:3] == ["0", 2, 0]
+    assert calls["fw:ban:2.2.2.2"][0] == "0" and 29_000 < calls["fw:ban:2.2.2.2"][2] <= 30_000
+    assert calls["fw:ban:3.3.3.3"][:3] == ["1", 0, 0]
+    stats = store.stats()
+    assert (stats["violations"], stats["banned"], stats["pending_unbans"]) == (0, 0, 0)
+    assert stats["reconciled"] == 3
+    assert store.reconcile(client, _key) == 0
+
+
+def test_reconcile_failure_keeps_remaining():
+    print("\n[TEST] reconcile: 写回中途 Redis 再次断开时，未写回的记录保留到下次恢复")
+    store = FallbackStore(100, ban_threshold=5)
+    for ip in ("1.1.1.1", "2.2.2.2", "3.3.3.3"):
+        store.check(ip, "xss", [])
+    with pytest.raises(redis_lib.ConnectionError):
+        store.reconcile(_ScriptClient(fail_after=1), _key)
+    assert store.stats()["violations"] == 2
+    assert store.reconcile(_ScriptClient(), _key) == 2
+
+
+def test_reconcile_keeps_violations_recorded_meanwhile():
+    print("\n[TEST] reconcile: 只扣除已写回的违规次数，写回期间新增的保留")
+    store = FallbackStore(100, ban_threshold=10)
+    store.check("1.1.1.1", "xss", [])
+
+    class _Concurrent(_ScriptClient):
+        def register_script(self, script):
+            run = super().register_script(script)
+
+            def run_with_new_violation(keys, args, client):
+                store.check("1.1.1.1", "xss", [])
+                return run(keys, args, client)
+            return run_with_new_violation
+
+    store.reconcile(_Concurrent(), _key)
+    assert store.check("1.1.1.1", "xss", []) == ("xss", 2, 0)
+
+
+# ---------------------------------------------------------------------------
+# helpers — 模拟 Redis 宕机
+# ---------------------------------------------------------------------------
+
+def test_check_request_falls_back_when_redis_fails(outage):
+    print("\n[TEST] check_request: Redis 命令失败后进入降级模式，违规达到阈值时仍会封禁")
+    verdict, violations = asyncio.run(helpers.check_request("9.9.9.9", "xss", []))
+    assert (verdict, violations) == ("xss", 1)
+    assert redis_conn.degraded is True
+    assert outage.calls == 1
+
+    for _ in range(helpers._BAN_THRESHOLD - 1):
+        verdict, violations = asyncio.run(helpers.check_request("9.9.9.9", "xss", []))
+    assert violations == helpers._BAN_THRESHOLD
+    assert asyncio.run(helpers.check_request("9.9.9.9", None, [])) == ("banned", 0)
+    assert asyncio.run(helpers.is_banned("9.9.9.9")) is True
+    # 降级期间不再访问 Redis，不会每个请求都等待超时
+    assert outage.calls == 1
+
+
+def test_rate_limit_enforced_during_outage(outage):
+    print("\n[TEST] check_request / is_limit_exceeded: 降级期间按进程内计数限流")
+    limits = [("fw:rate:8.8.8.8", RateLimit(3, 60))]
+    verdicts = [asyncio.run(helpers.check_request("8.8.8.8", None, limits))[0] for _ in range(4)]
+    assert verdicts == [None, None, None, "rate_limit"]
+    rule_limits = [("fw:rate:user:u1:write", RateLimit(1, 60))]
+    assert asyncio.run(helpers.is_limit_exceeded(rule_limits)) is False
+    assert asyncio.run(helpers.is_limit_exceeded(rule_limits)) is True
+
+
+def test_ban_and_unban_during_outage(outage):
+    print("\n[TEST] ban_ip / unban_ip: Redis 宕机时记录到降级状态，待恢复后写回")
+    asyncio.run(helpers.ban_ip("7.7.7.7"))
+    assert redis_conn.degraded is True
+    ban_cache.clear()
+    assert asyncio.run(helpers.is_banned("7.7.7.7")) is True
+    asyncio.run(helpers.unban_ip("7.7.7.7"))
+    assert asyncio.run(helpers.is_banned("7.7.7.7")) is False
+    assert fallback_store.stats()["pending_unbans"] == 1
+
+
+def test_without_redis_configured_checks_are_skipped(monkeypatch):
+    print("\n[TEST] check_request: 未配置 REDIS_URL 时 start 不进入降级，检查按未启用跳过")
+    monkeypatch.setattr(redis_conn, "_client", None)
+    monkeypatch.setattr(redis_conn, "_topology", RedisTopology())
+    redis_conn.start()
+    try:
+        assert redis_conn.degraded is False
+        for _ in range(helpers._BAN_THRESHOLD + 1):
+            assert asyncio.run(helpers.check_request("6.6.6.6", "xss", [])) == ("xss", 0)
+        assert asyncio.run(helpers.is_banned("6.6.6.6")) is False
+    finally:
+        redis_conn.stop()
+    assert fallback_store.stats()["violations"] == 0
+
+
+# ---------------------------------------------------------------------------
+# 封禁日志
+# ---------------------------------------------------------------------------
+
+class _ScriptedAsyncClient:
+    """检查脚本依次返回预设结果的异步客户端。"""
+
+    def __init__(self, results: list) -> None:
+        self.results = list(results)
+
+    def register_script(self, script):
+        async def run(keys, args, client):
+            return self.results.pop(0)
+        return run
+
+
+@pytest.fixture
+def ban_logs(monkeypatch):
+    logs: list[str] = []
+    monkeypatch.setattr(
+        helpers, "custom_log",
+        lambda level, message: logs.append(message) if "已封禁" in message else None,
+    )
+    yield logs
+    ban_cache.clear()
+
+
+def test_ban_logged_once_when_script_sets_it(monkeypatch, ban_logs):
+    print("\n[TEST] check_request: 只在脚本本次写入封禁时记录日志，超过阈值的后续请求不再重复记录")
+    threshold = helpers._BAN_THRESHOLD
+    client = _ScriptedAsyncClient([
+        ["xss", threshold, helpers._BAN_DURATION * 1000],
+        ["banned", 0, 5_000],
+        ["xss", threshold + 1, 0],
+    ])
+    monkeypatch.setattr(redis_conn, "_client", object())
+    monkeypatch.setattr(redis_conn, "get_async_client", lambda: client)
+    monkeypatch.setattr(helpers, "_check_script", None)
+    for _ in range(3):
+        ban_cache.clear()
+        asyncio.run(helpers.check_request("4.4.4.4", "xss", []))
+    assert ban_logs == ["[Firewall] IP 已封禁 24h: 4.4.4.4"]
+
+
+def test_fallback_ban_logged_once(outage, ban_logs):
+    print("\n[TEST] _check_fallback: 降级模式下同一次封禁只记录一次")
+    for _ in range(helpers._BAN_THRESHOLD + 2):
+        ban_cache.clear()
+        asyncio.run(helpers.check_request("5.5.5.5", "xss", []))
+    assert ban_logs == ["[Firewall] IP 已封禁 24h（降级模式）: 5.5.5.5"]
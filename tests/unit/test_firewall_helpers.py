@@ -1,13 +1,20 @@
 """Unit tests — core.middleware.firewall.helpers (pure / stateless functions)."""
 
+import asyncio
 import json
+import threading
 from unittest.mock import MagicMock
 
+from starlette.datastructures import Headers
+
 from core.middleware.firewall.helpers import (
     build_reject_response,
     detect_attack,
     extract_token,
     get_client_ip,
+    get_scope_client_ip,
+    run_blocking,
+    shutdown_blocking_executor,
 )
 
 
@@ -152,3 +159,39 @@ def test_build_reject_response_body_detail():
     response = build_reject_response("You are banned")
     body = json.loads(response.body)
     assert body["detail"] == "You are banned"
+
+
+# ---------------------------------------------------------------------------
+# get_scope_client_ip — ASGI scope
+# ---------------------------------------------------------------------------
+
+def test_get_scope_client_ip_prefers_forwarded_header():
+    print("\n[TEST] get_scope_client_ip: scope 中 X-Forwarded-For 优先于连接地址")
+    scope = {"type": "http", "headers": [(b"x-forwarded-for", b"1.2.3.4, 5.6.7.8")],
+             "client": ("9.9.9.9", 1234)}
+    assert get_scope_client_ip(scope, Headers(scope=scope)) == "1.2.3.4"
+
+
+def test_get_scope_client_ip_client_fallback():
+    print("\n[TEST] get_scope_client_ip: 无代理头时使用 scope['client']")
+    scope = {"type": "http", "headers": [], "client": ("192.168.1.100", 1234)}
+    assert get_scope_client_ip(scope, Headers(scope=scope)) == "192.168.1.100"
+
+
+def test_get_scope_client_ip_unknown_without_client():
+    print("\n[TEST] get_scope_client_ip: scope 无 client 时返回 'unknown'")
+    scope = {"type": "http", "headers": []}
+    assert get_scope_client_ip(scope, Headers(scope=scope)) == "unknown"
+
+
+# ---------------------------------------------------------------------------
+# run_blocking / shutdown_blocking_executor
+# ---------------------------------------------------------------------------
+
+def test_run_blocking_after_shutdown_recreates_executor():
+    print("\n[TEST] run_blocking: 线程池关闭后（应用再次启动）重新创建，不报错")
+    assert asyncio.run(run_blocking(threading.current_thread)).name.startswith("firewall-db")
+    shutdown_blocking_executor()
+    shutdown_blocking_executor()  # 重复关闭无副作用
+    assert asyncio.run(run_blocking(lambda x: x + 1, 1)) == 2
+    shutdown_blocking_executor()
@@ -0,0 +1,96 @@
+"""Unit tests — core.middleware.firewall.middleware (no Redis, no database).
+
+Redis 未连接时封禁 / 速率检查短路，只验证纯 ASGI 中间件本身的行为。
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.middleware.firewall.index import FirewallMiddleware
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(scope="module")
+def client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(FirewallMiddleware)
+
+    @app.get("/echo")
+    async def echo(q: str = ""):
+        return {"q": q}
+
+    return TestClient(app)
+
+
+# ---------------------------------------------------------------------------
+# Pass-through
+# ---------------------------------------------------------------------------
+
+def test_normal_request_passes(client):
+    print("\n[TEST] 纯 ASGI 防火墙：正常请求应放行并返回下游响应")
+    response = client.get("/echo?q=hello")
+    assert response.status_code == 200
+    assert response.json() == {"q": "hello"}
+
+
+# ---------------------------------------------------------------------------
+# Blocking
+# ---------------------------------------------------------------------------
+
+def test_crawler_ua_blocked(client):
+    print("\n[TEST] 纯 ASGI 防火墙：爬虫 UA → 403")
+    response = client.get("/echo", headers={"User-Agent": "curl/8.0"})
+    assert response.status_code == 403
+    assert "detail" in response.json()
+
+
+def test_xss_in_path_blocked(client):
+    print("\n[TEST] 纯 ASGI 防火墙：URL 路径含 XSS → 403")
+    response = client.get("/<script>alert(1)</script>")
+    assert response.status_code == 403
+
+
+def test_xss_in_query_blocked(client):
+    print("\n[TEST] 纯 ASGI 防火墙：查询参数含 javascript: 协议 → 403")
+    response = client.get("/echo?q=javascript:alert(1)")
+    assert response.status_code == 403
+
+
+def test_sqli_in_referer_blocked(client):
+    print("\n[TEST] 纯 ASGI 防火墙：Referer 含 SQL 注入 → 403")
+    response = client.get("/echo", headers={"Referer": "' OR '1'='1"})
+    assert response.status_code == 403
+
+
+# ---------------------------------------------------------------------------
+# Request body inspection
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(scope="module")
+def body_client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(FirewallMiddleware)
+
+    @app.post("/comments")
+    async def create_comment(payload: dict):
+        return payload
+
+    return TestClient(app)
+
+
+def test_body_xss_blocked(body_client):
+    print("\n[TEST] 纯 ASGI 防火墙：配置了检测规则的路由，请求体含 XSS → 403")
+    response = body_client.post("/comments", json={"text": "<script>alert(1)</script>"})
+    assert response.status_code == 403
+
+
+def test_benign_body_reaches_app(body_client):
+    print("\n[TEST] 纯 ASGI 防火墙：正常请求体检测后完整传给下游应用")
+    payload = {"text": "你好", "tags": ["a", "b"]}
+    response = body_client.post("/comments", json=payload)
+    assert response.status_code == 200
+    assert response.json() == payload
@@ -0,0 +1,135 @@
+"""Unit tests — core.middleware.firewall.ratelimit (in-memory limiters, no Redis)."""
+
+import pytest
+
+from core.middleware.firewall.ratelimit import (
+    MemoryRateLimiter,
+    RateLimit,
+    RateLimitRule,
+    _slot_groups,
+    match_rules,
+)
+
+
+def _hits(limiter: MemoryRateLimiter, limit: RateLimit, times: list[float]) -> list[bool]:
+    """按给定时间（毫秒）依次请求，返回每次是否放行。"""
+    return [limiter.hit([("k", limit)], now=t) == 0 for t in times]
+
+
+# ---------------------------------------------------------------------------
+# RateLimit.parse
+# ---------------------------------------------------------------------------
+
+def test_parse_per_minute():
+    print("\n[TEST] RateLimit.parse: '300/minute' → 300 次 / 60 秒")
+    limit = RateLimit.parse("300/minute", algorithm="gcra", burst=40)
+    assert (limit.limit, limit.period, limit.algorithm, limit.burst) == (300, 60, "gcra", 40)
+
+
+def test_parse_with_multiplier():
+    print("\n[TEST] RateLimit.parse: '5/10s' → 5 次 / 10 秒")
+    limit = RateLimit.parse("5/10s")
+    assert (limit.limit, limit.period) == (5, 10)
+
+
+def test_parse_rejects_garbage():
+    print("\n[TEST] RateLimit.parse: 无法解析的字符串 → ValueError")
+    with pytest.raises(ValueError):
+        RateLimit.parse("many per fortnight")
+
+
+def test_unknown_algorithm_rejected():
+    print("\n[TEST] RateLimit: 未知算法 → ValueError")
+    with pytest.raises(ValueError):
+        RateLimit(10, 1, algorithm="leaky")
+
+
+# ---------------------------------------------------------------------------
+# Algorithms
+# ---------------------------------------------------------------------------
+
+def test_fixed_window_resets_each_window():
+    print("\n[TEST] fixed_window: 窗口内超出 limit 拒绝，新窗口重新计数")
+    limit = RateLimit(2, 1, algorithm="fixed_window")
+    assert _hits(MemoryRateLimiter(), limit, [0, 10, 20, 1000, 1010]) == [True, True, False, True, True]
+
+
+def test_fixed_window_allows_double_at_edge():
+    print("\n[TEST] fixed_window: 窗口边界处可放行 2 倍 limit（算法固有特性）")
+    limit = RateLimit(2, 1, algorithm="fixed_window")
+    assert _hits(MemoryRateLimiter(), limit, [0, 990, 995, 1001, 1002]) == [True, True, False, True, True]
+
+
+def test_sliding_log_has_no_edge_burst():
+    print("\n[TEST] sliding_log: 任意 1 秒内不超过 limit")
+    limit = RateLimit(2, 1, algorithm="sliding_log")
+    assert _hits(MemoryRateLimiter(), limit, [0, 990, 1001, 1002, 1991]) == [True, True, True, False, True]
+
+
+def test_sliding_counter_weights_previous_window():
+    print("\n[TEST] sliding_counter: 按上一窗口剩余比例加权估算")
+    limit = RateLimit(4, 1, algorithm="sliding_counter")
+    # 上一窗口 4 次；新窗口过去一半时估算值为 4 * 0.5 = 2，还可放行 2 次
+    times = [0, 1, 2, 3, 1500, 1500, 1500]
+    assert _hits(MemoryRateLimiter(), limit, times) == [True] * 6 + [False]
+
+
+def test_gcra_burst_then_steady_rate():
+    print("\n[TEST] gcra: 先放行 burst 次突发，之后按平均速率放行")
+    limit = RateLimit(10, 1, algorithm="gcra", burst=3)  # 每 100ms 一个令牌
+    assert _hits(MemoryRateLimiter(), limit, [0, 0, 0, 0, 100, 150]) == [True, True, True, False, True, False]
+
+
+def test_hit_returns_first_exceeded_index():
+    print("\n[TEST] MemoryRateLimiter.hit: 返回首个超限项序号，全部放行返回 0")
+    limiter = MemoryRateLimiter()
+    loose, tight = RateLimit(10, 1), RateLimit(1, 1)
+    assert limiter.hit([("a", loose), ("b", tight)], now=0) == 0
+    assert limiter.hit([("a", loose), ("b", tight)], now=1) == 2
+
+
+def test_keys_are_independent():
+    print("\n[TEST] MemoryRateLimiter: 不同 key 分别计数")
+    limiter = MemoryRateLimiter()
+    limit = RateLimit(1, 1)
+    assert limiter.hit([("ip-1", limit)], now=0) == 0
+    assert limiter.hit([("ip-2", limit)], now=0) == 0
+
+
+# ---------------------------------------------------------------------------
+# RateLimitRule
+# ---------------------------------------------------------------------------
+
+def test_rule_matches_prefix_and_method():
+    print("\n[TEST] RateLimitRule: 按路径前缀与请求方法匹配")
+    rule = RateLimitRule("songs", RateLimit(1, 1), path_prefix="/songs", methods=["post"])
+    assert rule.matches("POST", "/songs/123")
+    assert not rule.matches("GET", "/songs/123")
+    assert not rule.matches("POST", "/comments")
+    assert match_rules([rule], "POST", "/songs") == [rule]
+
+
+def test_rule_token_key_is_hashed():
+    print("\n[TEST] RateLimitRule.key_for: token 维度不以明文出现在 key 中")
+    rule = RateLimitRule("api", RateLimit(1, 1), key_by="token")
+    key = rule.key_for("fw:rate:", "token", "secret-token")
+    assert key.startswith("fw:rate:token:") and key.endswith(":api")
+    assert "secret-token" not in key
+
+
+def test_rule_key_hash_tag():
+    print("\n[TEST] RateLimitRule.key_for: hash_tag=True 时标识写作哈希标签")
+    rule = RateLimitRule("api", RateLimit(1, 1))
+    assert rule.key_for("fw:rate:", "ip", "1.2.3.4") == "fw:rate:ip:1.2.3.4:api"
+    assert rule.key_for("fw:rate:", "ip", "1.2.3.4", hash_tag=True) == "fw:rate:ip:{1.2.3.4}:api"
+
+
+def test_slot_groups_keep_order():
+    print("\n[TEST] _slot_groups: 相邻且同槽的限额归为一组，保持原有顺序")
+    limit = RateLimit(1, 1)
+    limits = [("fw:rate:{a}", limit), ("fw:rate:ip:{a}:x", limit), ("fw:rate:{b}", limit), ("fw:rate:{a}:y", limit)]
+    assert [[key for key, _ in group] for group in _slot_groups(limits)] == [
+        ["fw:rate:{a}", "fw:rate:ip:{a}:x"],
+        ["fw:rate:{b}"],
+        ["fw:rate:{a}:y"],
+    ]
@@ -0,0 +1,232 @@
+"""Unit tests — modules.internal.index (no database, no Redis)."""
+
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from modules.internal.index import app as internal_router
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(scope="module")
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(internal_router)
+    return TestClient(app)
+
+
+# ---------------------------------------------------------------------------
+# Access control
+# ---------------------------------------------------------------------------
+
+def test_stats_hidden_without_configured_token(client, monkeypatch):
+    print("\n[TEST] GET /internal/stats → 未配置 INTERNAL_STATS_TOKEN 时返回 404")
+    monkeypatch.delenv("INTERNAL_STATS_TOKEN", raising=False)
+    assert client.get("/internal/stats").status_code == 404
+
+
+def test_stats_rejects_wrong_token(client, monkeypatch):
+    print("\n[TEST] GET /internal/stats → 令牌错误时返回 403")
+    monkeypatch.setenv("INTERNAL_STATS_TOKEN", "secret")
+    response = client.get("/internal/stats", headers={"X-Internal-Token": "wrong"})
+    assert response.status_code == 403
+
+
+# ---------------------------------------------------------------------------
+# Payload
+# ---------------------------------------------------------------------------
+
+def test_stats_reports_ban_cache_hit_rate(client, monkeypatch):
+    print("\n[TEST] GET /internal/stats → 包含封禁缓存命中率")
+    monkeypatch.setenv("INTERNAL_STATS_TOKEN", "secret")
+    response = client.get("/internal/stats", headers={"X-Internal-Token": "secret"})
+    assert response.status_code == 200
+    assert "hit_rate" in response.json()["firewall"]["ban_cache"]
+
+
+def test_stats_reports_fallback_state(client, monkeypatch):
+    print("\n[TEST] GET /internal/stats → 包含 Redis 降级状态")
+    monkeypatch.setenv("INTERNAL_STATS_TOKEN", "secret")
+    response = client.get("/internal/stats", headers={"X-Internal-Token": "secret"})
+    fallback = response.json()["firewall"]["fallback"]
+    assert fallback["degraded"] is False
+    assert {"checks", "banned", "reconciled"} <= set(fallback)
+
+
+def test_stats_reports_database_pool(client, monkeypatch):
+    print("\n[TEST] GET /internal/stats → 包含同步 / 异步连接池统计")
+    monkeypatch.setenv("INTERNAL_STATS_TOKEN", "secret")
+    response = client.get("/internal/stats", headers={"X-Internal-Token": "secret"})
+    pool = response.json()["database"]["pool"]
+    assert set(pool) == {"sync", "async"}
+    assert "histogram" in pool["sync"]["wait_ms"]
+
+
+def test_hot_paths_reads_request_metrics(client, monkeypatch):
+    print("\n[TEST] GET /internal/metrics/hot?minutes=15 → 返回最近 15 分钟请求最多的路径")
+    from core.database.dao.request_logs import RequestLogsDAO
+
+    calls = []
+
+    def hot_paths(self, since, limit=10):
+        calls.append((since, limit))
+        return [{"request_path": "/songs/{song_id}", "request_count": 42}]
+
+    monkeypatch.setattr(RequestLogsDAO, "hot_paths", hot_paths)
+    monkeypatch.setenv("INTERNAL_STATS_TOKEN", "secret")
+    response = client.get(
+        "/internal/metrics/hot?minutes=15&limit=3", headers={"X-Internal-Token": "secret"}
+    )
+    assert response.status_code == 200
+    assert response.json()["paths"][0]["request_count"] == 42
+    since, limit = calls[0]
+    assert limit == 3
+    assert 14 * 60 < (datetime.now() - since).total_seconds() < 16 * 60
+
+
+# ---------------------------------------------------------------------------
+# Firewall bans
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def fake_bans(monkeypatch):
+    """用内存集合替代 ban_ip / unban_ip / is_banned，并让 redis_conn 视为已连接。"""
+    from core.database.connection.redis import redis_conn
+    from modules.internal import index as internal_module
+
+    banned: set[str] = set()
+
+    async def ban_ip(ip):
+        banned.add(ip)
+
+    async def unban_ip(ip):
+        banned.discard(ip)
+
+    async def is_banned(ip):
+        return ip in banned
+
+    monkeypatch.setattr(internal_module, "ban_ip", ban_ip)
+    monkeypatch.setattr(internal_module, "unban_ip", unban_ip)
+    monkeypatch.setattr(internal_module, "is_banned", is_banned)
+    monkeypatch.setattr(redis_conn, "_client", object())
+    monkeypatch.setenv("INTERNAL_STATS_TOKEN", "secret")
+    return banned
+
+
+def test_ban_and_unban_ip(client, fake_bans):
+    print("\n[TEST] PUT / GET / DELETE /internal/firewall/bans/{ip} → 手动封禁、查询、解封")
+    headers = {"X-Internal-Token": "secret"}
+    assert client.put("/internal/firewall/bans/1.2.3.4", headers=headers).json() == {
+        "ip": "1.2.3.4", "banned": True,
+    }
+    assert fake_bans == {"1.2.3.4"}
+    assert client.get("/internal/firewall/bans/1.2.3.4", headers=headers).json()["banned"] is True
+    assert client.delete("/internal/firewall/bans/1.2.3.4", headers=headers).status_code == 200
+    assert client.get("/internal/firewall/bans/1.2.3.4", headers=headers).json()["banned"] is False
+
+
+def test_bans_require_redis(client, fake_bans, monkeypatch):
+    print("\n[TEST] PUT /internal/firewall/bans/{ip} → 未配置 Redis 时返回 503")
+    from core.database.connection.redis import redis_conn
+
+    monkeypatch.setattr(redis_conn, "_client", None)
+    response = client.put("/internal/firewall/bans/1.2.3.4", headers={"X-Internal-Token": "secret"})
+    assert response.status_code == 503
+    assert fake_bans == set()
+
+
+def test_bans_require_token(client, fake_bans):
+    print("\n[TEST] DELETE /internal/firewall/bans/{ip} → 令牌错误时返回 403")
+    response = client.delete("/internal/firewall/bans/1.2.3.4", headers={"X-Internal-Token": "x"})
+    assert response.status_code == 403
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+_ROWS = [
+    {"id": 1, "request_path": "/a", "frequency": 3, "created_at": datetime(2024, 1, 1, 8, 0)},
+    {"id": 2, "request_path": "/b,c", "frequency": None, "created_at": None},
+]
+
+
+@pytest.fixture
+def fake_stream(monkeypatch):
+    """RequestLogsDAO.stream_async 分两批产出固定数据，不访问数据库。"""
+    from core.database.dao.request_logs import RequestLogsDAO
+
+    async def stream_async(self, batch_size=None, order_by=("id",), filters=None, fields=None):
+        for row in _ROWS:
+            yield [{name: row[name] for name in fields or row}]
+
+    monkeypatch.setattr(RequestLogsDAO, "stream_async", stream_async)
+    monkeypatch.setenv("INTERNAL_STATS_TOKEN", "secret")
+
+
+def test_export_ndjson(client, fake_stream):
+    print("\n[TEST] GET /internal/export/request_logs → 每行一个 JSON 对象，日期为 ISO 格式")
+    response = client.get("/internal/export/request_logs", headers={"X-Internal-Token": "secret"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"id": 1, "request_path": "/a", "frequency": 3, "created_at": "2024-01-01T08:00:00"},
+        {"id": 2, "request_path": "/b,c", "frequency": None, "created_at": None},
+    ]
+
+
+def test_export_csv(client, fake_stream):
+    print("\n[TEST] GET /internal/export/request_logs?format=csv → 表头 + 每行一条记录，NULL 为空")
+    response = client.get(
+        "/internal/export/request_logs?format=csv", headers={"X-Internal-Token": "secret"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert list(csv.reader(io.StringIO(response.text))) == [
+        ["id", "request_path", "frequency", "created_at"],
+        ["1", "/a", "3", "2024-01-01T08:00:00"],
+        ["2", "/b,c", "", ""],
+    ]
+
+
+def test_export_fields_projection(client, fake_stream):
+    print("\n[TEST] GET /internal/export/request_logs?fields=request_path,id → 只导出指定列，按指定顺序")
+    response = client.get(
+        "/internal/export/request_logs?format=csv&fields=request_path,id",
+        headers={"X-Internal-Token": "secret"},
+    )
+    assert response.status_code == 200
+    assert list(csv.reader(io.StringIO(response.text))) == [
+        ["request_path", "id"],
+        ["/a", "1"],
+        ["/b,c", "2"],
+    ]
+
+
+def test_export_rejects_unknown_fields(client, fake_stream):
+    print("\n[TEST] GET /internal/export/request_logs?fields=bogus → 400，响应开始前校验")
+    response = client.get(
+        "/internal/export/request_logs?fields=id,bogus", headers={"X-Internal-Token": "secret"}
+    )
+    assert response.status_code == 400
+    assert "bogus" in response.json()["detail"]
+
+
+def test_export_rejects_other_tables(client, monkeypatch):
+    print("\n[TEST] GET /internal/export/users → 非日志表不开放导出（404）")
+    monkeypatch.setenv("INTERNAL_STATS_TOKEN", "secret")
+    response = client.get("/internal/export/users", headers={"X-Internal-Token": "secret"})
+    assert response.status_code == 404
+    response = client.get(
+        "/internal/export/request_logs?format=xml", headers={"X-Internal-Token": "secret"}
+    )
+    assert response.status_code == 422
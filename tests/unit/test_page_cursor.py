@@ -0,0 +1,61 @@
+"""Unit tests — core.helper.PageCursor.index.PageCursor"""
+
+import uuid
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+
+import pytest
+
+from core.helper.PageCursor.index import InvalidCursorError, PageCursor
+
+
+def test_round_trip_preserves_values():
+    print("\n[TEST] PageCursor: 编码后解码得到原值（含 datetime / date / None）")
+    cursor = PageCursor("secret")
+    values = [datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc), date(2024, 5, 1), None, 42, "张三"]
+    token = cursor.encode("users:-joined_at,-id", values)
+    assert "=" not in token
+    assert cursor.decode(token, "users:-joined_at,-id") == values
+
+
+def test_round_trip_preserves_decimal_uuid_and_time():
+    print("\n[TEST] PageCursor: Decimal / UUID / time 排序键编码后解码得到原值")
+    cursor = PageCursor("secret")
+    values = [Decimal("4.50"), Decimal("-0.01"), uuid.UUID(int=7), time(8, 30, 15), 3.5]
+    token = cursor.encode("stores_and_restaurants:-ratings,-id", values)
+    decoded = cursor.decode(token, "stores_and_restaurants:-ratings,-id")
+    assert decoded == values
+    assert [type(v) for v in decoded] == [type(v) for v in values]
+    assert str(decoded[0]) == "4.50"
+
+
+def test_unsupported_value_type_is_rejected():
+    print("\n[TEST] PageCursor: 无法编码的排序键类型抛出明确的 TypeError")
+    with pytest.raises(TypeError, match="bytes"):
+        PageCursor("secret").encode("files:content", [b"raw"])
+
+
+def test_tampered_cursor_is_rejected():
+    print("\n[TEST] PageCursor: 篡改内容或用其他密钥签发的游标被拒绝")
+    cursor = PageCursor("secret")
+    token = cursor.encode("users:id", [10])
+    tampered = token[:-2] + ("A" if token[-2] != "A" else "B") + token[-1]
+    with pytest.raises(InvalidCursorError):
+        cursor.decode(tampered, "users:id")
+    with pytest.raises(InvalidCursorError):
+        PageCursor("other").decode(token, "users:id")
+    with pytest.raises(InvalidCursorError):
+        cursor.decode("!!not-base64!!", "users:id")
+
+
+def test_scope_mismatch_is_rejected():
+    print("\n[TEST] PageCursor: 游标不能用于其他表或其他排序方式")
+    cursor = PageCursor("secret")
+    token = cursor.encode("users:id", [10])
+    with pytest.raises(InvalidCursorError):
+        cursor.decode(token, "users:-id")
+
+
+def test_invalid_cursor_is_value_error():
+    print("\n[TEST] PageCursor: InvalidCursorError 是 ValueError 的子类")
+    assert issubclass(InvalidCursorError, ValueError)
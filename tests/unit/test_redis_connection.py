@@ -0,0 +1,328 @@
+"""Unit tests — core.database.connection.redis（无需 Redis）."""
+
+import asyncio
+import threading
+
+import pytest
+import redis as redis_lib
+
+from core.database.connection.redis import (
+    RedisConnectionManager,
+    RedisPoolSettings,
+    RedisTopology,
+)
+
+
+class _SlowPingClient:
+    """ping() 阻塞到被放行，模拟慢心跳。"""
+
+    def __init__(self) -> None:
+        self.pinging = threading.Event()
+        self.release = threading.Event()
+
+    def ping(self) -> bool:
+        self.pinging.set()
+        self.release.wait(timeout=5)
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# RedisPoolSettings
+# ---------------------------------------------------------------------------
+
+_ENV = ("REDIS_MAX_CONNECTIONS", "REDIS_POOL_TIMEOUT", "REDIS_SOCKET_TIMEOUT",
+        "REDIS_SOCKET_CONNECT_TIMEOUT", "REDIS_HEALTH_CHECK_INTERVAL")
+
+
+def test_settings_defaults(monkeypatch):
+    print("\n[TEST] RedisPoolSettings: 未设置环境变量时使用默认值")
+    for name in _ENV:
+        monkeypatch.delenv(name, raising=False)
+    assert RedisPoolSettings.from_env() == RedisPoolSettings()
+
+
+def test_settings_from_env(monkeypatch):
+    print("\n[TEST] RedisPoolSettings: 从环境变量读取连接池参数")
+    monkeypatch.setenv("REDIS_MAX_CONNECTIONS", "8")
+    monkeypatch.setenv("REDIS_POOL_TIMEOUT", "0.5")
+    monkeypatch.setenv("REDIS_SOCKET_TIMEOUT", "1.5")
+    monkeypatch.setenv("REDIS_SOCKET_CONNECT_TIMEOUT", "2")
+    monkeypatch.setenv("REDIS_HEALTH_CHECK_INTERVAL", "15")
+    assert RedisPoolSettings.from_env().pool_kwargs() == {
+        "max_connections": 8,
+        "timeout": 0.5,
+        "socket_timeout": 1.5,
+        "socket_connect_timeout": 2.0,
+        "health_check_interval": 15,
+        "decode_responses": True,
+    }
+
+
+@pytest.mark.parametrize("name, value", [("REDIS_MAX_CONNECTIONS", "0"), ("REDIS_POOL_TIMEOUT", "soon")])
+def test_settings_reject_invalid_values(monkeypatch, name, value):
+    print(f"\n[TEST] RedisPoolSettings: {name}={value} 非法时抛出 EnvironmentError")
+    monkeypatch.setenv(name, value)
+    with pytest.raises(EnvironmentError):
+        RedisPoolSettings.from_env()
+
+
+# ---------------------------------------------------------------------------
+# RedisTopology
+# ---------------------------------------------------------------------------
+
+def test_topology_defaults_to_standalone(monkeypatch):
+    print("\n[TEST] RedisTopology: 未设置 REDIS_MODE 时为单节点，未设置 REDIS_URL 不报错")
+    for name in ("REDIS_MODE", "REDIS_URL", "REDIS_SENTINELS"):
+        monkeypatch.delenv(name, raising=False)
+    topology = RedisTopology.from_env()
+    assert topology == RedisTopology()
+    with pytest.raises(EnvironmentError):
+        topology.require_url()
+
+
+def test_topology_sentinel_from_env(monkeypatch):
+    print("\n[TEST] RedisTopology: 哨兵地址、主节点名与 REDIS_URL 中的认证信息")
+    monkeypatch.setenv("REDIS_MODE", "Sentinel")
+    monkeypatch.setenv("REDIS_SENTINELS", "10.0.0.1:26379, sentinel-2:26380")
+    monkeypatch.setenv("REDIS_SENTINEL_MASTER", "tinder")
+    monkeypatch.setenv("REDIS_SENTINEL_PASSWORD", "s3")
+    monkeypatch.setenv("REDIS_URL", "redis://app:pw@ignored:6379/2")
+    topology = RedisTopology.from_env()
+    assert topology.mode == "sentinel" and topology.master_name == "tinder"
+    sentinels, sentinel_kwargs, connection_kwargs = topology.sentinel_args(RedisPoolSettings())
+    assert sentinels == [("10.0.0.1", 26379), ("sentinel-2", 26380)]
+    assert sentinel_kwargs["password"] == "s3"
+    assert connection_kwargs == {"username": "app", "password": "pw", "db": 2}
+
+
+@pytest.mark.parametrize("name, value", [("REDIS_MODE", "replicated"), ("REDIS_SENTINELS", "host-without-port")])
+def test_topology_rejects_invalid_values(monkeypatch, name, value):
+    print(f"\n[TEST] RedisTopology: {name}={value} 非法时抛出 EnvironmentError")
+    monkeypatch.setenv(name, value)
+    with pytest.raises(EnvironmentError):
+        RedisTopology.from_env()
+
+
+def test_sentinel_mode_requires_sentinels():
+    print("\n[TEST] RedisTopology: 哨兵模式未配置 REDIS_SENTINELS 时建立连接报错")
+    with pytest.raises(EnvironmentError):
+        RedisTopology(mode="sentinel").sentinel_args(RedisPoolSettings())
+
+
+def test_hash_tag_only_in_cluster_mode():
+    print("\n[TEST] hash_tag: 仅集群模式下包成 {value}")
+    assert RedisConnectionManager(topology=RedisTopology()).hash_tag("1.2.3.4") == "1.2.3.4"
+    cluster = RedisConnectionManager(topology=RedisTopology(mode="cluster", url="redis://x"))
+    assert cluster.hash_tag("1.2.3.4") == "{1.2.3.4}"
+
+
+# ---------------------------------------------------------------------------
+# RedisConnectionManager
+# ---------------------------------------------------------------------------
+
+def test_connect_uses_bounded_pool(monkeypatch):
+    print("\n[TEST] _connect: 客户端使用按配置创建的 BlockingConnectionPool")
+    monkeypatch.setenv("REDIS_URL", "redis://127.0.0.1:1/0")
+    monkeypatch.setattr(redis_lib.Redis, "ping", lambda self: True)
+    manager = RedisConnectionManager(RedisPoolSettings(max_connections=3, pool_timeout=0.25))
+    assert manager._connect() is True
+    pool = manager.get_client().connection_pool
+    assert isinstance(pool, redis_lib.BlockingConnectionPool)
+    assert pool.max_connections == 3
+    assert pool.timeout == 0.25
+    assert pool.connection_kwargs["socket_timeout"] == 5
+    manager._close()
+    assert manager.get_client() is None
+
+
+def test_connect_failure_keeps_previous_client(monkeypatch):
+    print("\n[TEST] _connect: 连接失败时保留原客户端并返回 False")
+    monkeypatch.setenv("REDIS_URL", "redis://127.0.0.1:1/0")
+    manager = RedisConnectionManager(RedisPoolSettings(socket_connect_timeout=0.2))
+    previous = _SlowPingClient()
+    manager._client = previous
+    assert manager._connect() is False
+    assert manager.get_client() is previous
+
+
+def test_get_client_does_not_take_lock():
+    print("\n[TEST] get_client: 其他线程持有锁时仍立即返回")
+    manager = RedisConnectionManager(RedisPoolSettings())
+    client = _SlowPingClient()
+    manager._client = client
+    with manager._lock:
+        result: list = []
+        thread = threading.Thread(target=lambda: result.append(manager.get_client()))
+        thread.start()
+        thread.join(timeout=1)
+    assert result == [client]
+
+
+def test_slow_heartbeat_does_not_block_lock():
+    print("\n[TEST] _is_alive: PING 在锁外执行，慢心跳期间锁可用")
+    manager = RedisConnectionManager(RedisPoolSettings())
+    client = _SlowPingClient()
+    manager._client = client
+    alive: list[bool] = []
+    heartbeat = threading.Thread(target=lambda: alive.append(manager._is_alive()))
+    heartbeat.start()
+    assert client.pinging.wait(timeout=1)
+    assert manager._lock.acquire(timeout=0.5)
+    manager._lock.release()
+    assert manager.get_client() is client
+    client.release.set()
+    heartbeat.join(timeout=1)
+    assert alive == [True]
+
+
+def test_is_alive_without_client():
+    print("\n[TEST] _is_alive: 未连接时返回 False")
+    assert RedisConnectionManager(RedisPoolSettings())._is_alive() is False
+
+
+class _PingClient:
+    def ping(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+def test_report_failure_enters_degraded_mode():
+    print("\n[TEST] report_failure: 立即进入降级状态并唤醒监控线程")
+    manager = RedisConnectionManager(RedisPoolSettings())
+    assert manager.degraded is False
+    manager.report_failure(redis_lib.ConnectionError("down"))
+    assert manager.degraded is True
+    assert manager._wake.is_set()
+
+
+def test_monitor_recovers_and_runs_callbacks():
+    print("\n[TEST] _monitor_loop: 报告失败后立即检查，连接可用时退出降级并执行恢复回调")
+    manager = RedisConnectionManager(RedisPoolSettings())
+    client = _PingClient()
+    manager._client = client
+    recovered = threading.Event()
+    received: list = []
+    manager.add_recovery_callback(lambda c: (_ for _ in ()).throw(RuntimeError("boom")))
+    manager.add_recovery_callback(lambda c: (received.append(c), recovered.set()))
+    monitor = threading.Thread(target=manager._monitor_loop, daemon=True)
+    monitor.start()
+    manager.report_failure(redis_lib.ConnectionError("down"))
+    assert recovered.wait(timeout=2)
+    assert manager.degraded is False and received == [client]
+    manager._stop_event.set()
+    manager._wake.set()
+    monitor.join(timeout=2)
+    assert not monitor.is_alive()
+
+
+def test_start_without_redis_is_degraded(monkeypatch):
+    print("\n[TEST] start: 初始连接失败时处于降级状态，后台继续重连")
+    monkeypatch.delenv("REDIS_MODE", raising=False)
+    monkeypatch.setenv("REDIS_URL", "redis://127.0.0.1:1/0")
+    manager = RedisConnectionManager(RedisPoolSettings(socket_connect_timeout=0.2))
+    manager.start()
+    try:
+        assert manager.degraded is True
+    finally:
+        manager.stop()
+
+
+def test_start_without_configured_url_is_not_degraded(monkeypatch):
+    print("\n[TEST] start: 未设置 REDIS_URL 时不连接、不进入降级、不启动监控线程")
+    monkeypatch.delenv("REDIS_MODE", raising=False)
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    manager = RedisConnectionManager(RedisPoolSettings())
+    manager.start()
+    try:
+        assert manager.degraded is False
+        assert manager.get_client() is None
+        assert manager._monitor_thread is None
+    finally:
+        manager.stop()
+
+
+@pytest.mark.parametrize("name, value", [
+    ("REDIS_MODE", "replica"),
+    ("REDIS_SENTINELS", "sentinel-1"),
+    ("REDIS_MAX_CONNECTIONS", "0"),
+])
+def test_start_fails_on_invalid_config(monkeypatch, name, value):
+    print(f"\n[TEST] start: {name}={value} 非法时启动即抛出 EnvironmentError")
+    monkeypatch.setenv("REDIS_MODE", "standalone")
+    monkeypatch.setenv("REDIS_URL", "redis://127.0.0.1:1/0")
+    monkeypatch.setenv(name, value)
+    manager = RedisConnectionManager()
+    with pytest.raises(EnvironmentError):
+        manager.start()
+    assert manager._monitor_thread is None
+
+
+@pytest.mark.parametrize("mode", ["sentinel", "cluster"])
+def test_start_requires_address_for_explicit_mode(monkeypatch, mode):
+    print(f"\n[TEST] start: REDIS_MODE={mode} 未给出地址时启动即抛出 EnvironmentError")
+    monkeypatch.setenv("REDIS_MODE", mode)
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    monkeypatch.delenv("REDIS_SENTINELS", raising=False)
+    with pytest.raises(EnvironmentError):
+        RedisConnectionManager(RedisPoolSettings()).start()
+
+
+def test_hash_tag_never_reads_env(monkeypatch):
+    print("\n[TEST] hash_tag: 启动前不解析环境变量，REDIS_MODE 非法也不会在请求路径上抛出")
+    monkeypatch.setenv("REDIS_MODE", "replica")
+    manager = RedisConnectionManager()
+    assert manager.hash_tag("1.2.3.4") == "1.2.3.4"
+    assert manager.cluster is False
+
+
+class _AsyncClosable:
+    def __init__(self) -> None:
+        self.closed = threading.Event()
+
+    async def aclose(self) -> None:
+        self.closed.set()
+
+
+def test_stop_closes_async_client_on_its_running_loop():
+    print("\n[TEST] stop: 其他线程中仍在运行的事件循环的异步客户端，在该循环中执行 aclose()")
+    manager = RedisConnectionManager(RedisPoolSettings())
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        client = _AsyncClosable()
+        manager._async_clients[loop] = client
+        manager.stop()
+        assert client.closed.wait(timeout=2)
+        assert manager._async_clients == {}
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=2)
+        loop.close()
+
+
+def test_get_async_client_keeps_clients_of_live_loops(monkeypatch):
+    print("\n[TEST] get_async_client: 新循环创建客户端时只移出已关闭循环的客户端")
+    manager = RedisConnectionManager(RedisPoolSettings())
+    manager._client = object()
+    discarded = []
+    monkeypatch.setattr(manager, "_build_async_client", object)
+    monkeypatch.setattr(manager, "_discard_async_client", lambda loop, client: discarded.append(client))
+    live, closed = asyncio.new_event_loop(), asyncio.new_event_loop()
+    closed.close()
+    manager._async_clients.update({live: "live", closed: "closed"})
+
+    async def get():
+        return manager.get_async_client()
+
+    try:
+        client = asyncio.run(get())
+        assert discarded == ["closed"]
+        assert set(manager._async_clients.values()) == {"live", client}
+    finally:
+        live.close()
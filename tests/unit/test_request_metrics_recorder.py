@@ -0,0 +1,183 @@
+"""Unit tests — core.middleware.analytics.metrics（按分钟的请求指标聚合，无需数据库）."""
+
+import threading
+from datetime import datetime
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+import core.middleware.analytics.middleware as analytics_middleware
+from core.database.dao.request_logs import (
+    LATENCY_BUCKETS_MS,
+    LATENCY_COLUMNS,
+    latency_bucket,
+    latency_percentile,
+)
+from core.middleware.analytics.metrics import RequestMetricsRecorder
+from core.middleware.analytics.middleware import RequestAnalyticsMiddleware
+
+# 2026-01-01 12:00:00（本地时间）所在分钟的起点
+_MINUTE = datetime(2026, 1, 1, 12, 0).timestamp()
+
+
+def _recorder(**overrides) -> RequestMetricsRecorder:
+    writes: list[list[dict]] = []
+
+    def writer(rows):
+        writes.append(rows)
+        return len(rows)
+
+    recorder = RequestMetricsRecorder(**{
+        "flush_interval": 60,
+        "maintenance_interval": 3600,
+        "writer": writer,
+        "maintainer": lambda: None,
+        **overrides,
+    })
+    recorder.writes = writes
+    return recorder
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    recorder = _recorder()
+    monkeypatch.setattr(analytics_middleware, "request_metrics", recorder)
+    return recorder
+
+
+@pytest.fixture
+def client():
+    router = APIRouter(prefix="/songs")
+
+    @router.get("/{song_id}")
+    def get_song(song_id: int):
+        if song_id == 0:
+            raise RuntimeError("boom")
+        return {"id": song_id}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(RequestAnalyticsMiddleware)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+# ---------------------------------------------------------------------------
+# latency_bucket / latency_percentile
+# ---------------------------------------------------------------------------
+
+def test_latency_bucket_boundaries():
+    print("\n[TEST] latency_bucket: 桶上界包含在本桶内，超过最大上界计入最后一个桶")
+    assert latency_bucket(0) == 0
+    assert latency_bucket(10) == 0
+    assert latency_bucket(10.1) == 1
+    assert latency_bucket(2500) == len(LATENCY_BUCKETS_MS) - 1
+    assert latency_bucket(60_000) == len(LATENCY_COLUMNS) - 1
+
+
+def test_latency_percentile_from_histogram():
+    print("\n[TEST] latency_percentile: 返回分位数所在桶的上界，落在最后一个桶时返回最大延迟")
+    row = dict.fromkeys(LATENCY_COLUMNS, 0)
+    assert latency_percentile({**row, "latency_max_ms": 0}, 0.95) is None
+    row.update(latency_le_10=90, latency_le_100=9, latency_le_inf=1, latency_max_ms=4000.0)
+    assert latency_percentile(row, 0.5) == 10.0
+    assert latency_percentile(row, 0.95) == 100.0
+    assert latency_percentile(row, 1.0) == 4000.0
+
+
+# ---------------------------------------------------------------------------
+# RequestMetricsRecorder
+# ---------------------------------------------------------------------------
+
+def test_flush_writes_one_row_per_path_and_minute():
+    print("\n[TEST] RequestMetricsRecorder.flush: 按 (路径, 分钟) 合并计数、5xx 次数与延迟直方图")
+    recorder = _recorder()
+    recorder.record("/a", 200, 5, now=_MINUTE + 1)
+    recorder.record("/a", 503, 30, now=_MINUTE + 59)
+    recorder.record("/a", 404, 3000, now=_MINUTE + 61)
+    recorder.record("/b", 200, 12, now=_MINUTE + 2)
+    assert recorder.flush() == 3
+    rows = {(row["request_path"], row["bucket"]): row for row in recorder.writes[0]}
+    first = rows[("/a", datetime(2026, 1, 1, 12, 0))]
+    assert (first["request_count"], first["error_count"]) == (2, 1)
+    assert (first["latency_sum_ms"], first["latency_max_ms"]) == (35, 30)
+    assert (first["latency_le_10"], first["latency_le_50"], first["latency_le_inf"]) == (1, 1, 0)
+    second = rows[("/a", datetime(2026, 1, 1, 12, 1))]
+    assert (second["request_count"], second["error_count"], second["latency_le_inf"]) == (1, 0, 1)
+    assert rows[("/b", datetime(2026, 1, 1, 12, 0))]["latency_le_25"] == 1
+    assert recorder.flush() == 0
+
+
+def test_failed_flush_merges_back():
+    print("\n[TEST] RequestMetricsRecorder.flush: 写入失败时条目合并回内存，计数累加、最大延迟取较大值")
+    fail = [True]
+    written: list[list[dict]] = []
+
+    def writer(rows):
+        if fail[0]:
+            raise RuntimeError("database unavailable")
+        written.append(rows)
+        return len(rows)
+
+    recorder = RequestMetricsRecorder(60, 3600, writer=writer, maintainer=lambda: None)
+    recorder.record("/a", 200, 80, now=_MINUTE)
+    assert recorder.flush() == 0
+    recorder.record("/a", 500, 20, now=_MINUTE)
+    stats = recorder.stats()
+    assert (stats["failed"], stats["pending_buckets"]) == (1, 1)
+    fail[0] = False
+    assert recorder.flush() == 1
+    row = written[0][0]
+    assert (row["request_count"], row["error_count"], row["latency_max_ms"]) == (2, 1, 80)
+    assert row["latency_sum_ms"] == 100
+
+
+def test_maintenance_failure_is_logged_not_raised():
+    print("\n[TEST] RequestMetricsRecorder.maintain: 维护失败只计数，不影响后续刷写")
+
+    def maintainer():
+        raise RuntimeError("lock timeout")
+
+    recorder = _recorder(maintainer=maintainer)
+    assert recorder.maintain() is None
+    assert recorder.stats()["maintenance_failed"] == 1
+
+
+def test_background_thread_maintains_then_flushes():
+    print("\n[TEST] RequestMetricsRecorder.start: 启动时先维护一次，之后按间隔刷写，stop 时写入剩余指标")
+    maintained = threading.Event()
+    flushed = threading.Event()
+    recorder = RequestMetricsRecorder(
+        flush_interval=0.05,
+        maintenance_interval=3600,
+        writer=lambda rows: flushed.set() or len(rows),
+        maintainer=lambda: maintained.set(),
+    )
+    recorder.start()
+    try:
+        recorder.record("/", 200, 1)
+        assert maintained.wait(timeout=2)
+        assert flushed.wait(timeout=2)
+    finally:
+        recorder.stop()
+    assert recorder.stats()["maintenance_runs"] == 1
+    recorder.record("/", 200, 1)
+    assert recorder.stats()["pending_buckets"] == 1
+
+
+# ---------------------------------------------------------------------------
+# RequestAnalyticsMiddleware
+# ---------------------------------------------------------------------------
+
+def test_middleware_records_status_and_latency(recorder, client):
+    print("\n[TEST] RequestAnalyticsMiddleware: 按路由模板记录状态码与耗时，未处理异常计为 5xx")
+    assert client.get("/songs/1").status_code == 200
+    assert client.get("/songs/0").status_code == 500
+    client.get("/missing")
+    recorder.flush()
+    rows = {row["request_path"]: row for row in recorder.writes[0]}
+    song = rows["/songs/{song_id}"]
+    assert (song["request_count"], song["error_count"]) == (2, 1)
+    assert song["latency_sum_ms"] > 0
+    assert sum(song[name] for name in LATENCY_COLUMNS) == 2
+    assert rows["<unmatched>"]["error_count"] == 0
@@ -0,0 +1,72 @@
+"""Unit tests — core.helper.TokenCache.index.TokenCache (no database, no Redis)."""
+
+import time
+
+from core.helper.TokenCache.index import TokenCache
+
+
+def _cache(rows: dict, **options) -> TokenCache:
+    """构造只使用进程内缓存的 TokenCache，``rows`` 模拟 token → (用户, 剩余秒数)。"""
+    cache = TokenCache(use_redis=False, **options)
+    cache.loads = 0
+
+    def load(token):
+        cache.loads += 1
+        return rows.get(token, ("", 0))
+
+    cache._load = load
+    return cache
+
+
+def test_repeated_resolve_hits_cache():
+    print("\n[TEST] TokenCache.resolve: 同一 token 只查询一次数据库")
+    cache = _cache({"t1": ("user-1", float("inf"))})
+    assert cache.resolve("t1") == "user-1"
+    assert cache.resolve("t1") == "user-1"
+    assert cache.loads == 1
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["local_hits"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_unknown_token_is_negatively_cached():
+    print("\n[TEST] TokenCache.resolve: 无效 token 返回 unknown 并进入负缓存")
+    cache = _cache({})
+    assert cache.resolve("bad") == "unknown"
+    assert cache.resolve("bad") == "unknown"
+    assert cache.loads == 1
+
+
+def test_entry_expires_with_token():
+    print("\n[TEST] TokenCache.resolve: 缓存有效期不超过 token 的剩余有效期")
+    rows = {"t1": ("user-1", 0.05)}
+    cache = _cache(rows)
+    assert cache.resolve("t1") == "user-1"
+    time.sleep(0.1)
+    rows["t1"] = ("", 0)
+    assert cache.resolve("t1") == "unknown"
+    assert cache.loads == 2
+
+
+def test_invalidate_forces_reload():
+    print("\n[TEST] TokenCache.invalidate: 吊销后重新查询数据库")
+    rows = {"t1": ("user-1", float("inf"))}
+    cache = _cache(rows)
+    cache.resolve("t1")
+    rows["t1"] = ("", 0)
+    cache.invalidate("t1")
+    assert cache.peek("t1") is None
+    assert cache.resolve("t1") == "unknown"
+
+
+def test_lookup_failure_is_not_cached():
+    print("\n[TEST] TokenCache.resolve: 数据库查询失败时返回 unknown 且不缓存")
+    cache = TokenCache(use_redis=False)
+
+    def broken(token):
+        raise RuntimeError("db down")
+
+    cache._load = broken
+    assert cache.resolve("t1") == "unknown"
+    assert cache.peek("t1") is None
@@ -0,0 +1,50 @@
+"""Unit tests — core.helper.TTLCache.index.TTLCache"""
+
+import time
+
+from core.helper.TTLCache.index import TTLCache
+
+
+def test_get_returns_cached_value():
+    print("\n[TEST] TTLCache: 写入后可读取，并计入命中")
+    cache = TTLCache(maxsize=10)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_missing_key_returns_default():
+    print("\n[TEST] TTLCache: 不存在的 key 返回 default，并计入未命中")
+    cache = TTLCache(maxsize=10)
+    assert cache.get("missing", "fallback") == "fallback"
+    assert cache.stats()["misses"] == 1
+
+
+def test_entry_expires():
+    print("\n[TEST] TTLCache: 过期条目不再返回")
+    cache = TTLCache(maxsize=10)
+    cache.set("a", 1, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.ttl("a") is None
+
+
+def test_lru_eviction():
+    print("\n[TEST] TTLCache: 超出容量时淘汰最久未使用的条目")
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert len(cache) == 2
+
+
+def test_hit_rate():
+    print("\n[TEST] TTLCache.stats: hit_rate = hits / (hits + misses)")
+    cache = TTLCache(maxsize=10)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    assert cache.stats()["hit_rate"] == 0.5